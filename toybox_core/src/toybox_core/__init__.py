@@ -1,5 +1,34 @@
 # from . import client as toybox
 # from .client import init_node, deinit_node
-from .connection import Connection, Publisher, Subscriber
-from . import launch
-from . import node
\ No newline at end of file
+
+# Everything here is loaded the first time it's asked for (PEP 562), rather than on
+# `import toybox_core`. Connections and Nodes drag in grpc and protobuf, and the tbx-*
+# commands that don't need them (e.g., `tbx-info package`) shouldn't have to wait for them.
+import importlib
+from typing import Any
+
+# name -> (module, attribute in that module, or None for the module itself)
+_LAZY: dict[str,tuple[str,str | None]] = {
+    "Connection": (".connection", "Connection"),
+    "Publisher": (".connection", "Publisher"),
+    "Subscriber": (".connection", "Subscriber"),
+    "launch": (".launch", None),
+    "node": (".node", None),
+}
+
+
+def __getattr__(name: str) -> Any:
+
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attribute = _LAZY[name]
+    module = importlib.import_module(module_name, __name__)
+    value: Any = module if attribute is None else getattr(module, attribute)
+    # Only pay for the lookup once.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+import asyncio
+import grpc
+from queue import Empty
+import signal
+import threading
+from typing import Coroutine
+
+from toybox_core.client import Client
+from toybox_core.logging import LOG
+from toybox_core.rpc.aio import (
+    AsyncHealthServicer,
+    AsyncMetricsInterceptor,
+    AsyncMetricsServicer,
+    AsyncParamsServicer,
+    AsyncRegisterServicer,
+    AsyncServiceServicer,
+    AsyncTopicServicer,
+)
+from toybox_core.rpc.channel import SERVER_OPTIONS
+from toybox_core.rpc.register import DEFAULT_LEASE_DURATION
+from toybox_core.rpc.topic import DEFAULT_FANOUT_THRESHOLD
+from toybox_core.server import LEASE_CHECK_PERIOD, ToyboxServer
+from toybox_core.topic import Topic
+
+from toybox_msgs.core.Health_pb2_grpc import add_HealthServicer_to_server
+from toybox_msgs.core.Metrics_pb2_grpc import add_MetricsServicer_to_server
+from toybox_msgs.core.Node_pb2 import InformConfirmation, TopicPublisherInfo
+from toybox_msgs.core.Node_pb2_grpc import NodeStub
+from toybox_msgs.core.Null_pb2 import Null
+from toybox_msgs.core.Param_pb2_grpc import add_ParamsServicer_to_server
+from toybox_msgs.core.Register_pb2_grpc import add_RegisterServicer_to_server
+from toybox_msgs.core.Service_pb2_grpc import add_ServiceServicer_to_server
+from toybox_msgs.core.Topic_pb2_grpc import add_TopicServicer_to_server
+
+
+# How long to wait before re-trying a failed announcement, in seconds.
+ANNOUNCEMENT_RETRY_PERIOD: float = 0.5
+
+
+class AsyncToyboxServer(ToyboxServer):
+    """
+    A ToyboxServer that runs on a single asyncio event loop (grpc.aio), rather than
+    tying up a thread per in-flight RPC. Announcements are sent as soon as they're
+    queued, each as its own task, instead of one per tick of spin().
+    """
+
+    def __init__(
+        self,
+        port: int | None = None,
+        lease_duration: float = DEFAULT_LEASE_DURATION,
+        address: str | None = None,
+        state_dir: str | None = None,
+        fanout_threshold: int = DEFAULT_FANOUT_THRESHOLD,
+    ) -> None:
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping: asyncio.Event | None = None
+        self._stopped: threading.Event = threading.Event()
+        self._notify_clients: bool = True
+
+        # Keep references to running tasks, otherwise they can be garbage collected mid-flight.
+        self._tasks: set[asyncio.Task] = set()
+        self._node_stubs: dict[str, tuple[grpc.aio.Channel, NodeStub]] = {}
+
+        super().__init__(
+            port=port, lease_duration=lease_duration, address=address, state_dir=state_dir,
+            fanout_threshold=fanout_threshold)
+
+    def _configure_server(self) -> None:
+        # A grpc.aio server belongs to the event loop it's created on, so building
+        # it has to wait until serve() creates the loop.
+        self._server: grpc.aio.Server | None = None
+        self.rpc_port: int = 0
+
+    def serve(self) -> None:
+        asyncio.run(self._serve())
+
+    def spin(self) -> None:
+        """
+        Run until shutdown. What the threaded server does each tick happens as tasks on
+        the event loop here, so this is serve(), or waiting for it if it's already running.
+        """
+        if self._loop is None:
+            self.serve()
+        else:
+            self._stopped.wait()
+
+    async def _serve(self) -> None:
+
+        if self._shutdown_event.is_set():
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+
+        self._server = grpc.aio.server(
+            interceptors=[AsyncMetricsInterceptor(self._metrics)],
+            options=SERVER_OPTIONS)
+        add_HealthServicer_to_server(
+            servicer=AsyncHealthServicer(self._health_servicer),
+            server=self._server)
+        add_TopicServicer_to_server(
+            servicer=AsyncTopicServicer(
+                self._topic_servicer,
+                announce_callback=self._schedule_announcements),
+            server=self._server)
+        add_RegisterServicer_to_server(
+            servicer=AsyncRegisterServicer(
+                self._register_servicer,
+                announce_callback=self._schedule_announcements),
+            server=self._server)
+        add_MetricsServicer_to_server(
+            servicer=AsyncMetricsServicer(self._metrics_servicer),
+            server=self._server)
+        add_ServiceServicer_to_server(
+            servicer=AsyncServiceServicer(self._service_servicer),
+            server=self._server)
+        add_ParamsServicer_to_server(
+            servicer=AsyncParamsServicer(self._param_servicer),
+            server=self._server)
+
+        self.rpc_port = self._server.add_insecure_port(self.address)
+        await self._server.start()
+        LOG("INFO", f"Server <{self._name}> (aio) ready on {self.address}.")
+
+        try:
+            self._loop.add_signal_handler(signal.SIGINT, self.shutdown)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Not on the main thread; whoever started us is responsible for shutdown().
+            pass
+
+        self._spawn(self._check_leases())
+
+        await self._stopping.wait()
+        await self._stop()
+
+    def shutdown(self, notify_clients: bool | None = None) -> None:
+        """
+        Stop the server (from any thread), sending the shutdown signal to any
+        registered clients first (by default, only if we aren't keeping our state).
+        """
+        if self._shutdown_event.is_set():
+            return
+
+        self._shutdown_event.set()
+        self._notify_clients = notify_clients if notify_clients is not None else self._journal is None
+
+        if self._loop is None or self._loop.is_closed() or self._stopping is None:
+            self._close_journal()
+            return
+        self._loop.call_soon_threadsafe(self._stopping.set)
+
+        # If we weren't called from the loop itself, don't return until it's done.
+        try:
+            running: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not self._loop:
+            self._stopped.wait(timeout=5.0)
+
+    async def _stop(self) -> None:
+
+        if self._notify_clients:
+            await asyncio.gather(
+                *[self._inform_of_shutdown(client) for client in list(self._clients.values())],
+                return_exceptions=True)
+
+        for task in list(self._tasks):
+            task.cancel()
+
+        await self._server.stop(grace=2.0)
+        self._close_journal()
+
+        for channel, _ in self._node_stubs.values():
+            await channel.close()
+        self._node_stubs.clear()
+
+        self._stopped.set()
+
+    async def _inform_of_shutdown(self, client: Client) -> None:
+        try:
+            await self._node_stub(client).InformOfShutdown(Null(), timeout=0.25)
+        except grpc.RpcError:
+            # We don't care...
+            return
+        LOG("INFO", f"Sent shutdown request to {client.client_id} at {client.addr}:{client.rpc_port}")
+
+    def _spawn(self, coro: Coroutine) -> None:
+        task: asyncio.Task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _node_stub(self, client: Client) -> NodeStub:
+        """
+        Get an asyncio stub for talking to a client's Node service.
+        """
+        entry: tuple[grpc.aio.Channel, NodeStub] | None = self._node_stubs.get(client.client_id)
+        if entry is None:
+            channel: grpc.aio.Channel = grpc.aio.insecure_channel(f"{client.addr}:{client.rpc_port}")
+            entry = (channel, NodeStub(channel))
+            self._node_stubs[client.client_id] = entry
+        return entry[1]
+
+    def deregister_clients(self, client_names: list[str]) -> dict[str,list[str]]:
+
+        lost_publishers: dict[str,list[str]] = super().deregister_clients(client_names)
+
+        for client_name in client_names:
+            entry: tuple[grpc.aio.Channel, NodeStub] | None = self._node_stubs.pop(client_name, None)
+            if entry is not None:
+                self._spawn(entry[0].close())
+
+        # Losing a relay queues announcements for its subscribers.
+        self._schedule_announcements()
+        return lost_publishers
+
+    async def _check_leases(self) -> None:
+        while True:
+            await asyncio.sleep(LEASE_CHECK_PERIOD)
+            self._expire_stale_clients()
+
+    def _inform_publisher_lost(self, topic: Topic, publisher_name: str) -> None:
+
+        topic_pub: TopicPublisherInfo = TopicPublisherInfo()
+        topic_pub.topic_def.CopyFrom(topic.to_msg())
+        topic_pub.publisher.publisher_id = publisher_name
+
+        for subscriber_name in topic.subscribers:
+            subscriber: Client | None = self._clients.get(subscriber_name, None)
+            if subscriber is None:
+                continue
+            self._spawn(self._send_publisher_lost(subscriber, topic_pub))
+
+    async def _send_publisher_lost(self, subscriber: Client, topic_pub: TopicPublisherInfo) -> None:
+        # Best-effort, same as the threaded server.
+        try:
+            await self._node_stub(subscriber).InformOfPublisherLost(topic_pub, timeout=0.25)
+        except grpc.RpcError as e:
+            LOG("DEBUG", f"Failed to inform <{subscriber.client_id}> that " \
+                f"<{topic_pub.publisher.publisher_id}> is gone: {e}")
+
+    def _schedule_announcements(self) -> None:
+        """
+        Turn every queued announcement into a task.
+        """
+        while True:
+            try:
+                publisher_name, topic_name = self._announcements.get(block=False)
+            except Empty:
+                return
+            self._spawn(self._announce(publisher_name=publisher_name, topic_name=topic_name))
+
+    async def _announce(self, publisher_name: str, topic_name: str) -> None:
+
+        LOG("DEBUG", f"Announcing new topic {topic_name} from publisher {publisher_name}")
+        topic_pub: TopicPublisherInfo | None = self._get_publisher_info(
+            publisher_name=publisher_name,
+            topic_name=topic_name)
+        if topic_pub is None:
+            return
+
+        await asyncio.gather(*[
+            self._send_publisher(subscriber, topic_pub)
+            for _, subscriber in self._get_subscribers_to_inform(
+                publisher_name=publisher_name,
+                topic_name=topic_name)])
+
+    async def _send_publisher(self, subscriber: Client, topic_pub: TopicPublisherInfo) -> None:
+
+        publisher_name: str = topic_pub.publisher.publisher_id
+        topic_name: str = topic_pub.topic_def.topic_name
+
+        # Keep trying for as long as both ends are still around; an expired lease
+        # on either side ends this.
+        while True:
+            try:
+                inform_conf: InformConfirmation = await self._node_stub(subscriber).InformOfPublisher(
+                    topic_pub, timeout=1.0)
+                break
+            except grpc.RpcError as e:
+                LOG("DEBUG", f"Failed to inform <{subscriber.client_id}> of <{topic_name}>, retrying: {e}")
+
+            await asyncio.sleep(ANNOUNCEMENT_RETRY_PERIOD)
+            if subscriber.client_id not in self._clients:
+                return
+            if self._get_publisher_info(publisher_name=publisher_name, topic_name=topic_name) is None:
+                return
+
+        if inform_conf.return_code != 0:
+            LOG("WARN", f"Failed to inform subscriber {subscriber.client_id} of topic {topic_name}: {inform_conf.status}")
+            return
+        LOG("DEBUG", f"Successfully informed <{subscriber.client_id}> of <{topic_name}>")
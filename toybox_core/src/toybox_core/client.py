@@ -9,6 +9,7 @@ DESC: Functions intended to be used by the 'clients' of this library
 from dataclasses import dataclass, field
 import grpc
 import threading
+import time
 
 from toybox_msgs.core.Node_pb2_grpc import NodeStub
 
@@ -27,6 +28,9 @@ class Client():
 
     _initialized: bool = False
 
+    # time.monotonic() deadline after which this client is considered dead.
+    lease_expiry: float = float("inf")
+
     def initialize(self) -> None:
         if self._initialized:
             return
@@ -42,6 +46,13 @@ class Client():
         self._initialized = True
         LOG("DEBUG", f"Finished initializing client <{self.client_id}>")
 
+    def renew_lease(self, lease_duration: float) -> None:
+        self.lease_expiry = time.monotonic() + lease_duration
+
+    def lease_expired(self, now: float | None = None) -> bool:
+        now = now if now is not None else time.monotonic()
+        return now > self.lease_expiry
+
     @property
     def channel(self) -> grpc.Channel:
         if not self._initialized:
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+"""
+What time it is, according to a Node.
+
+SystemClock is wall-clock time, and is what Nodes use by default. SteadyClock never
+jumps (but means nothing outside of this process). SimClock only moves when it's
+told to, either directly by whatever's doing the simulating, or by following a
+clock topic that the simulator (or a log replay) publishes; that way, time-dependent
+logic works the same whether the simulation runs faster or slower than real time.
+
+Set TBX_SIM_TIME=1 to have Nodes follow the CLOCK_TOPIC by default.
+"""
+
+from abc import ABC, abstractmethod
+import os
+import threading
+import time
+from typing import Callable
+
+from toybox_core.logging import LOG
+
+from toybox_msgs.core.Time_pb2 import Timestamp
+
+
+TBX_SIM_TIME_ENV: str = "TBX_SIM_TIME"
+
+# Where simulators (and replays) publish simulated time, as core.Timestamp messages.
+CLOCK_TOPIC: str = "/clock"
+
+
+def to_timestamp(seconds: float) -> Timestamp:
+    secs, nanosecs = divmod(round(seconds * 1e9), 1_000_000_000)
+    return Timestamp(secs=secs, nanosecs=nanosecs)
+
+
+def from_timestamp(stamp: Timestamp) -> float:
+    return stamp.secs + (stamp.nanosecs * 1e-9)
+
+
+class Clock(ABC):
+
+    # Whether this clock only moves when it's told to.
+    simulated: bool = False
+
+    @abstractmethod
+    def now(self) -> float:
+        """
+        The current time, in seconds.
+        """
+        raise NotImplementedError
+
+    def timestamp(self) -> Timestamp:
+        return to_timestamp(self.now())
+
+    def sleep_until(self, deadline: float, timeout: float | None = None) -> bool:
+        """
+        Block until this clock reads `deadline`, or `timeout` (real) seconds pass.
+
+        Returns:
+            bool: False if we timed out first
+        """
+        remaining: float = deadline - self.now()
+        if timeout is not None and remaining > timeout:
+            time.sleep(max(timeout, 0.0))
+            return False
+        if remaining > 0:
+            time.sleep(remaining)
+        return True
+
+    def sleep(self, duration: float) -> bool:
+        return self.sleep_until(self.now() + duration)
+
+    def wall_timeout(self, duration: float) -> float | None:
+        """
+        How long to wait, in real seconds, for `duration` of this clock's time to pass.
+        None means there's no telling; wait to be woken by a listener instead.
+        """
+        return max(duration, 0.0)
+
+    def add_listener(self, listener: Callable[[float], None]) -> None:
+        """
+        Call `listener(now)` whenever the clock is moved. Real clocks move on their own,
+        so they never call anyone.
+        """
+        pass
+
+    def remove_listener(self, listener: Callable[[float], None]) -> None:
+        pass
+
+
+class SystemClock(Clock):
+
+    def now(self) -> float:
+        return time.time()
+
+
+class SteadyClock(Clock):
+
+    def now(self) -> float:
+        return time.monotonic()
+
+
+class SimClock(Clock):
+    """
+    Simulated time. If `topic` is set, Nodes using this clock subscribe to it, and
+    follow whatever time is published there.
+    """
+
+    simulated: bool = True
+
+    def __init__(self, start: float = 0.0, topic: str | None = None) -> None:
+
+        self._now: float = start
+        self.topic: str | None = topic
+
+        self._condition: threading.Condition = threading.Condition()
+        self._listeners: list[Callable[[float], None]] = []
+
+    def now(self) -> float:
+        return self._now
+
+    def set(self, now: float) -> None:
+
+        with self._condition:
+            if now < self._now:
+                # e.g., a log replay that started over.
+                LOG("WARN", f"Simulated time went backwards, from {self._now} to {now}")
+            self._now = now
+            self._condition.notify_all()
+            listeners: list[Callable[[float], None]] = list(self._listeners)
+
+        for listener in listeners:
+            listener(now)
+
+    def on_clock_message(self, message: Timestamp) -> None:
+        """
+        Subscriber callback for the clock topic.
+        """
+        self.set(from_timestamp(message))
+
+    def sleep_until(self, deadline: float, timeout: float | None = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self._now >= deadline, timeout=timeout)
+
+    def wall_timeout(self, duration: float) -> float | None:
+        return None
+
+    def add_listener(self, listener: Callable[[float], None]) -> None:
+        with self._condition:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[float], None]) -> None:
+        with self._condition:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+def use_sim_time() -> bool:
+    return os.environ.get(TBX_SIM_TIME_ENV, "").lower() in ("1", "true", "yes")
+
+
+def default_clock() -> Clock:
+    """
+    A clock for a Node that wasn't given one: simulated time from the CLOCK_TOPIC if
+    TBX_SIM_TIME says so, otherwise the system clock.
+    """
+    if use_sim_time():
+        return SimClock(topic=CLOCK_TOPIC)
+    return SystemClock()
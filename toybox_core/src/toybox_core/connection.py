@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 import enum
 import errno
 from queue import Queue, Empty
+import random
 import select
 import socket
 import time
@@ -14,11 +15,61 @@ import uuid
 import grpc
 from google.protobuf.message import Message
 
+from toybox_core.filter import MessageFilter
 from toybox_core.logging import LOG, TbxLogger
 import toybox_core.protocol
 from toybox_core.protocol import TbxMessage
+from toybox_core.reactor import Reactor
 from toybox_core.topic import Topic
-from toybox_core.rpc.topic import advertise_topic_rpc
+from toybox_core.discovery import Discovery, get_discovery
+from toybox_msgs.core.Topic_pb2 import SubscriberOptions
+
+
+# How long a publisher waits for a new subscriber to say what it wants (its
+# SubscriberOptions), before sending it everything, in seconds.
+HANDSHAKE_TIMEOUT: float = 1.0
+
+# Publishers send a heartbeat to any subscriber they haven't sent anything to in
+# HEARTBEAT_PERIOD; subscribers that hear nothing at all for HEARTBEAT_TIMEOUT give up on
+# their publisher and reconnect. (A publisher that exits is noticed straight away, from
+# its socket closing; these are for the ones that hang, or whose host goes away.)
+HEARTBEAT_PERIOD: float = 0.25
+HEARTBEAT_TIMEOUT: float = 1.0
+
+# A subscriber that lost its publisher retries after RECONNECT_BACKOFF, doubling each
+# time up to RECONNECT_BACKOFF_MAX (jittered, so a publisher's subscribers don't all
+# come back at once).
+RECONNECT_BACKOFF: float = 0.05
+RECONNECT_BACKOFF_MAX: float = 2.0
+CONNECT_TIMEOUT: float = 0.5
+
+# TCP keepalive on data connections (seconds idle, seconds between probes, probes),
+# for peers that disappear without a word, e.g. a pulled cable.
+KEEPALIVE: tuple[int,int,int] = (2, 1, 3)
+
+# How much a BULK publisher lets pile up for one subscriber before it starts dropping
+# (whole) messages for it, in bytes.
+BULK_BACKLOG: int = 1 << 20
+# How much a Subscriber reads off its socket at a time.
+RECV_SIZE: int = 1 << 17
+
+# How often connections without a Reactor look for work, in seconds. CONTROL
+# connections don't wait this out; they wake up as soon as there's something to do.
+POLL_PERIOD: float = 0.01
+
+class Priority(enum.IntEnum):
+    """
+    How urgent a topic's messages are, relative to everything else a Node has going on.
+
+    CONTROL topics (e.g. velocity commands) get their own threads, even in a Node that
+    shares a Reactor, and TCP_NODELAY, and are sent the moment they're published rather
+    than at the next poll. BULK topics (e.g. scans, images) never block on a slow
+    subscriber; they queue up to BULK_BACKLOG for it and then drop messages. Steps on a
+    shared Reactor run in priority order.
+    """
+    BULK = 0
+    NORMAL = 1
+    CONTROL = 2
 
 class Connection_State(enum.Enum):
     NOT_CONNECTED = 1
@@ -41,8 +92,17 @@ class Connection():
     shutdown_event: threading.Event = field(default_factory=threading.Event)
     # pub-sub
     topic: Topic | None = None
-    # number of failures to receive/send since last success
-    failures: int = 0
+    # What a subscriber asked its publisher for (see SubscriberOptions).
+    max_rate: float = 0.0
+    message_filter: MessageFilter | None = None
+    # When a rate-limited subscriber can next be sent a message (time.monotonic()).
+    next_send: float = 0.0
+    # When we last sent to/heard from the other end (time.monotonic()).
+    last_sent: float = 0.0
+    last_heard: float = 0.0
+    # Bytes we've committed to sending but the socket hasn't taken yet (BULK only).
+    unsent: bytearray = field(default_factory=bytearray)
+    priority: Priority = Priority.NORMAL
 
     def connect(self) -> None:
         self.sock.connect((self.host, self.port))
@@ -76,8 +136,18 @@ class Publisher(Connection):
         host: str,
         port: int,
         logger: TbxLogger | None = None,
-        shutdown_event: threading.Event | None = None
+        shutdown_event: threading.Event | None = None,
+        discovery: Discovery | None = None,
+        reactor: Reactor | None = None,
+        relay: bool = False,
+        priority: Priority = Priority.NORMAL,
     ) -> None:
+        """
+        A `relay` Publisher re-publishes a topic that somebody else publishes, for whichever
+        subscribers the tbx-server sends its way (see toybox_core.relay).
+
+        See Priority for what `priority` changes.
+        """
 
         Connection.__init__(
             self,
@@ -87,84 +157,289 @@ class Publisher(Connection):
             port=port,
             topic=Topic(name=topic_name, message_type=message_type),
             logger=logger,
+            priority=Priority(priority),
         )
         self.sock.bind(('', self.port))
 
         self.topic: Topic # type-hinting shenanigans
+        # (packed message, id()s of the subscribers whose filters rejected it)
+        self.outbound: Queue[tuple[bytes,frozenset[int]]]
 
+        self.relay: bool = relay
         self._subscribers: list[Connection] = []
+        # Accepted, but we don't know what they want yet: (subscriber, when accepted).
+        self._pending: list[tuple[Connection,float]] = []
+        self._discovery: Discovery = discovery if discovery is not None else get_discovery()
 
         # Allow the caller to overwrite our shutdown_event, if they want.
         if shutdown_event is not None:
             self.shutdown_event = shutdown_event
 
-        self._listen_thread: threading.Thread = threading.Thread(target=self.listen)
+        # enable socket to accept connections
+        self.sock.listen()
+        # make socket non-blocking
+        self.sock.settimeout(0)
+
+        # Either a Reactor drives our sockets, or we get our own threads to do it.
+        # CONTROL topics always get their own, so they never wait behind anyone else.
+        self._listen_thread: threading.Thread | None = None
+        self._spin_thread: threading.Thread | None = None
+        if reactor is not None and self.priority is not Priority.CONTROL:
+            reactor.add(self.step, priority=self.priority)
+            return
+
+        self._listen_thread = threading.Thread(target=self.listen)
         self._listen_thread.name = f"{self.name}_{topic_name.replace('/','_')}_publisher_listen"
         self._listen_thread.start()
 
-        self._spin_thread: threading.Thread = threading.Thread(target=self.spin)
+        self._spin_thread = threading.Thread(target=self.spin)
         self._spin_thread.name = f"{self.name}_{topic_name.replace('/','_')}_publisher_spin"
         self._spin_thread.start()
 
     # threading.Thread
     def listen(self) -> None:
 
-        # enable socket to accept connections
-        self.sock.listen()
-        # make socket non-blocking
-        self.sock.settimeout(0)
+        while not self.shutdown:
+            if not self._accept_once():
+                time.sleep(0.1)
+
+        self._close()
+
+    # threading.Thread
+    def spin(self) -> None:
 
         while not self.shutdown:
-            try:
-                conn, addr = self.sock.accept()
-                self.log("DEBUG", f"<{self.name}> accepted conn request from {conn.getpeername()}")
-                with self.lock:
-                    subscriber: Connection = Connection(
-                        name="", 
-                        sock=conn,
-                        host=addr[0], 
-                        port=addr[1],
-                    )                
+            if self.priority is Priority.CONTROL:
+                # Wait on the queue itself, so a message goes out as soon as it's published.
+                self._send_once(timeout=POLL_PERIOD)
+            else:
+                # rate-limit to prevent 100% CPU usage
+                time.sleep(POLL_PERIOD)
+                self._send_once()
+            self._handshake_once()
+            self._flush_once()
+            self._heartbeat_once()
+
+        # This is just paranoia...
+        self.trigger_shutdown()
+
+    # Reactor step
+    def step(self) -> bool:
+
+        if self.shutdown:
+            self._close()
+            return False
+
+        self._accept_once()
+        self._handshake_once()
+        self._send_once()
+        self._flush_once()
+        self._heartbeat_once()
+        return True
+
+    def _accept_once(self) -> bool:
+        """
+        Accept a waiting subscriber, if there is one.
+        """
+
+        try:
+            conn, addr = self.sock.accept()
+        except BlockingIOError:
+            return False
+
+        self.log("DEBUG", f"<{self.name}> accepted conn request from {conn.getpeername()}")
+        enable_keepalive(conn)
+        if self.priority is Priority.CONTROL:
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.lock:
+            subscriber: Connection = Connection(
+                name="", 
+                sock=conn,
+                host=addr[0], 
+                port=addr[1],
+                priority=self.priority,
+            )                
+            self._pending.append((subscriber, time.monotonic()))
+        return True
+
+    def _handshake_once(self) -> None:
+        """
+        Read the SubscriberOptions of any new subscribers that have sent them, and start
+        sending to them. Subscribers that take too long get everything.
+        """
+
+        if not self._pending:
+            return
+
+        socks: list[socket.socket] = [subscriber.sock for subscriber, _ in self._pending]
+        ready_to_read, _, _ = select.select(socks, [], [], 0)
+
+        now: float = time.monotonic()
+        for subscriber, accepted in list(self._pending):
+            if subscriber.sock in ready_to_read:
+                keep: bool = self._read_options(subscriber)
+            elif now - accepted > HANDSHAKE_TIMEOUT:
+                self.log("WARN", f"<{self.name}> got no options from {subscriber.host}:{subscriber.port}, sending it everything.")
+                keep = True
+            else:
+                continue
+
+            with self.lock:
+                self._pending.remove((subscriber, accepted))
+                if keep:
+                    subscriber.last_sent = now
+                    if self.priority is Priority.BULK:
+                        # From here on, we only ever send() what the socket will take.
+                        subscriber.sock.setblocking(False)
                     self._subscribers.append(subscriber)
-            except BlockingIOError:
-                time.sleep(0.1)
+            if not keep:
+                subscriber.sock.close()
+
+    def _read_options(self, subscriber: Connection) -> bool:
+        """
+        Apply a new subscriber's SubscriberOptions to it.
+
+        Returns:
+            bool: False if the subscriber should be dropped instead.
+        """
+
+        try:
+            message: TbxMessage | None = toybox_core.protocol.read(subscriber.sock)
+        except (socket.error, EOFError):
+            message = None
+        if message is None:
+            self.log("DEBUG", f"<{self.name}> subscriber {subscriber.host}:{subscriber.port} hung up before subscribing.")
+            return False
+
+        message_type, message_data = toybox_core.protocol.split_message(
+            message.message_raw, message.type_length, message.payload_length)
+        if message_type != SubscriberOptions.DESCRIPTOR.full_name:
+            self.log("WARN", f"<{self.name}> expected subscriber options, got <{message_type}>. Sending everything.")
+            return True
+
+        options: SubscriberOptions = toybox_core.protocol.unpack_message(
+            obj_type=SubscriberOptions, message_data=message_data)
+        subscriber.max_rate = max(options.max_rate, 0.0)
+        if options.filter:
+            try:
+                subscriber.message_filter = MessageFilter(options.filter, self.topic.message_type)
+            except ValueError as e:
+                self.log("ERR", f"<{self.name}> dropping subscriber with a bad filter: {e}")
+                return False
+
+        self.log("DEBUG", f"<{self.name}> subscriber {subscriber.host}:{subscriber.port} wants " + 
+            f"max_rate={subscriber.max_rate}, filter={subscriber.message_filter}")
+        return True
 
-        self.sock.shutdown(socket.SHUT_RDWR)
+    def _close(self) -> None:
+
+        # A listening socket was never connected, so there may be nothing to shut down.
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
         self.sock.close()
 
+        # Hang up on our subscribers too, so they know to go looking for us.
+        with self.lock:
+            for subscriber in self._subscribers + [pending for pending, _ in self._pending]:
+                subscriber.sock.close()
+            self._subscribers.clear()
+            self._pending.clear()
+
         # This is just paranoia...
         self.trigger_shutdown()
 
-    # threading.Thread
-    def spin(self) -> None:
+    def _send_once(self, timeout: float = 0.0) -> None:
+        """
+        Send the next outbound message (if there is one, or one shows up within
+        `timeout`) to every subscriber that wants it.
+        """
 
-        while not self.shutdown:
-            # rate-limit to prevent 100% CPU usage
-            time.sleep(0.01)
+        try:
+            message, rejected = self.outbound.get(block=timeout > 0, timeout=timeout or None)
+        except Empty:
+            return
+        
+        now: float = time.monotonic()
+        for subscriber in list(self._subscribers):
 
+            if id(subscriber) in rejected:
+                continue
+            if subscriber.max_rate > 0:
+                if now < subscriber.next_send:
+                    continue
+                # Keep to the requested rate on average, rather than drifting slower by
+                # however late each published message happens to land; unless we're way
+                # behind, in which case just start over from now.
+                interval: float = 1.0 / subscriber.max_rate
+                subscriber.next_send = subscriber.next_send + interval \
+                    if now - subscriber.next_send < interval else now + interval
+
+            self._send_to(subscriber, message, now)
+
+    def _heartbeat_once(self) -> None:
+        """
+        Let subscribers we've had nothing to send to for a while know we're still here.
+        """
+
+        now: float = time.monotonic()
+        for subscriber in list(self._subscribers):
+            # Anything still unsent will go out soon enough to count.
+            if now - subscriber.last_sent >= HEARTBEAT_PERIOD and not subscriber.unsent:
+                self._send_to(subscriber, toybox_core.protocol.HEARTBEAT, now)
+
+    def _send_to(self, subscriber: Connection, data: bytes, now: float) -> bool:
+        """
+        Send to one subscriber, dropping it if it's gone. (It'll reconnect if it's still
+        around, so there's no point hanging on to a broken socket.)
+
+        BULK subscribers just get `data` queued up, for _flush_once() to send as the
+        socket takes it; unless they're already too far behind, in which case it's dropped.
+        """
+
+        if self.priority is Priority.BULK:
+            if len(subscriber.unsent) > BULK_BACKLOG:
+                self.log("DEBUG", f"<{self.name}> subscriber {subscriber.host}:{subscriber.port} is behind, dropping a message.")
+                return False
+            subscriber.unsent += data
+            return True
+
+        try:
+            subscriber.sock.sendall(data)
+        except socket.error as e:
+            self._drop(subscriber, e)
+            return False
+
+        subscriber.last_sent = now
+        return True
+
+    def _flush_once(self) -> None:
+        """
+        Send whatever the sockets of BULK subscribers will take without blocking.
+        """
+
+        now: float = time.monotonic()
+        for subscriber in list(self._subscribers):
+            if not subscriber.unsent:
+                continue
             try:
-                message: bytes = self.outbound.get(block=False)
-            except Empty:
+                sent: int = subscriber.sock.send(subscriber.unsent)
+            except BlockingIOError:
                 continue
-            
-            for subscriber in self._subscribers:
-                
-                try:
-                    subscriber.sock.sendall(message)
-                    # If we send successfully (i.e., don't throw a socket error),
-                    # reset our failure counter
-                    subscriber.failures = 0
-                except socket.error:
-                    subscriber.failures +=1
-
-                # TODO: would be smarter to do this with a timeout, rather than a raw counter
-                # since messages can happen so fast
-                if subscriber.failures > 3:
-                    self._subscribers.remove(subscriber)
-                    self.log("WARN", f"Removed subscriber <{subscriber.name}> after too many failed sends.")
+            except socket.error as e:
+                self._drop(subscriber, e)
+                continue
+            del subscriber.unsent[:sent]
+            subscriber.last_sent = now
 
-        # This is just paranoia...
-        self.trigger_shutdown()
+    def _drop(self, subscriber: Connection, error: Exception) -> None:
+
+        with self.lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+        subscriber.sock.close()
+        self.log("WARN", f"<{self.name}> dropped subscriber {subscriber.host}:{subscriber.port}: {error}")
 
     def trigger_shutdown(self) -> None:
         
@@ -178,7 +453,7 @@ class Publisher(Connection):
         self._shutdown = True
 
         for thread in [self._listen_thread, self._spin_thread]:
-            if thread.is_alive():
+            if thread is None or thread.is_alive():
                 continue
             thread.join()
         
@@ -188,13 +463,15 @@ class Publisher(Connection):
     ) -> bool:
 
         # Advertise the topic to the TopicServer
+        advertise: Callable[..., bool] = \
+            self._discovery.advertise_relay if self.relay else self._discovery.advertise
         try:
-            result: bool = advertise_topic_rpc(
-                client_name=advertiser_id if advertiser_id else self.name,
-                client_host=self.host,
+            result: bool = advertise(
+                name=advertiser_id if advertiser_id else self.name,
+                host=self.host,
                 topic_port=self.port,
                 topic_name=self.topic.name,
-                message_type=self.topic.message_type)
+                message_type=self.topic.message_type.DESCRIPTOR.full_name)
         except grpc.RpcError as e:
             self.log("ERR", f"Failed to advertise {self.topic.name}: {e}")
             raise e
@@ -216,7 +493,39 @@ class Publisher(Connection):
 
         packed_message: bytes = toybox_core.protocol.pack_message(message)
 
-        self.outbound.put(packed_message)
+        # Filters look at the message now, since the caller is free to change it as
+        # soon as we return.
+        self.outbound.put((packed_message, self._rejected_by(message)))
+
+    def publish_raw(
+        self,
+        payload: bytes
+    ) -> None:
+        """
+        Publish an already-serialized message (e.g., what a raw Subscriber was handed) as-is.
+        It's only deserialized if one of our subscribers' filters has to look at it.
+        """
+
+        if len(self._subscribers) == 0:
+            return
+
+        packed_message: bytes = toybox_core.protocol.pack_payload(
+            self.topic.message_type.DESCRIPTOR.full_name, payload)
+
+        rejected: frozenset[int] = frozenset()
+        if any(subscriber.message_filter is not None for subscriber in self._subscribers):
+            rejected = self._rejected_by(toybox_core.protocol.unpack_message(
+                obj_type=self.topic.message_type, message_data=payload))
+
+        self.outbound.put((packed_message, rejected))
+
+    def _rejected_by(self, message: Message) -> frozenset[int]:
+        """
+        The id()s of the subscribers whose filters don't want `message`.
+        """
+        return frozenset(
+            id(subscriber) for subscriber in self._subscribers
+            if subscriber.message_filter is not None and not subscriber.message_filter(message))
 
     @property
     def shutdown(self) -> bool:
@@ -234,8 +543,35 @@ class Subscriber(Connection):
         publisher_info: tuple[str,str,int] | None = None,
         callback: Callable[[Message], None] | None = None,
         logger: TbxLogger | None = None,
-        shutdown_event: threading.Event | None = None
+        shutdown_event: threading.Event | None = None,
+        reactor: Reactor | None = None,
+        max_rate: float = 0.0,
+        filter_expression: str | None = None,
+        raw: bool = False,
+        resolver: Callable[[], list[tuple[str,str,int]]] | None = None,
+        priority: Priority = Priority.NORMAL,
     ) -> None:
+        """
+        `max_rate` (messages/s) and `filter_expression` (see toybox_core.filter) are sent
+        to every publisher we connect to, and it holds back whatever we don't want.
+
+        A `raw` Subscriber hands its callbacks each message's serialized bytes, rather
+        than deserializing it first.
+
+        If we lose our publisher (it hangs up, or goes quiet for longer than
+        HEARTBEAT_TIMEOUT), we keep trying to reconnect, with backoff. The first try is
+        at the address we had; after that, `resolver` (if given) is asked for the topic's
+        current publishers, in case it came back somewhere else.
+
+        See Priority for what `priority` changes.
+
+        Raises:
+            ValueError: if `filter_expression` doesn't make sense for `message_type`.
+        """
+
+        # Before we grab a socket, since this is the one thing the caller might get wrong.
+        message_filter: MessageFilter | None = \
+            MessageFilter(filter_expression, message_type) if filter_expression else None
         
         Connection.__init__(
             self,
@@ -244,13 +580,26 @@ class Subscriber(Connection):
             host=host,
             port=port,
             topic=Topic(name=topic_name, message_type=message_type),
-            logger=logger
+            logger=logger,
+            max_rate=max(max_rate, 0.0),
+            message_filter=message_filter,
+            priority=Priority(priority),
         )
         self.sock.bind((self.host, self.port))
         
         self.topic: Topic
 
         self._callbacks: list[Callable[[Message], None]] = [callback] if callback else []
+        self.raw: bool = raw
+        # What we've read, up to the end of the last complete message.
+        self._buffer: bytearray = bytearray()
+
+        self._resolver: Callable[[], list[tuple[str,str,int]]] | None = resolver
+        # The publisher we're trying to get back to, how many times we've tried, and when
+        # to try next (time.monotonic()).
+        self._lost: tuple[str,str,int] | None = None
+        self._attempts: int = 0
+        self._next_attempt: float = 0.0
         
         self._publisher = publisher_info
         if self._publisher is not None:
@@ -260,7 +609,14 @@ class Subscriber(Connection):
         if shutdown_event is not None:
             self.shutdown_event = shutdown_event
 
-        self._spin_thread: threading.Thread = threading.Thread(target=self.spin)
+        # Either a Reactor drives our socket, or we get our own thread to do it.
+        # CONTROL topics always get their own, so they never wait behind anyone else.
+        self._spin_thread: threading.Thread | None = None
+        if reactor is not None and self.priority is not Priority.CONTROL:
+            reactor.add(self.step, priority=self.priority)
+            return
+
+        self._spin_thread = threading.Thread(target=self.spin)
         self._spin_thread.name = f"{topic_name.replace('/','_')}_subscriber"
         self._spin_thread.start()
 
@@ -268,16 +624,53 @@ class Subscriber(Connection):
     def spin(self) -> None:
 
         while not self.shutdown:
-            time.sleep(0.01)
-            
-            if self._publisher is None:
-                continue
-            
-            # Get available [in/out]bound sockets
-            ready_to_read, _, _ = select.select([self.sock], [], [], 0)
-            if self.sock in ready_to_read:    
-                message: TbxMessage | None = toybox_core.protocol.read(self.sock)
-                if message is None:
+            if self.priority is Priority.CONTROL:
+                # Wait on the socket itself, so a message is handled as soon as it lands.
+                self._receive_once(timeout=POLL_PERIOD)
+            else:
+                time.sleep(POLL_PERIOD)
+                self._receive_once()
+
+    # Reactor step
+    def step(self) -> bool:
+
+        if self.shutdown:
+            return False
+        self._receive_once()
+        return True
+
+    def _receive_once(self, timeout: float = 0.0) -> None:
+        """
+        Read whatever's waiting from our publisher (waiting up to `timeout` for something
+        to show up), and hand every complete message to our callbacks.
+        """
+
+        if self._publisher is None:
+            # Nothing to select() on, so wait out the timeout here instead; otherwise
+            # spin() goes round as fast as it can until somebody hands us a publisher.
+            if timeout > 0:
+                time.sleep(timeout)
+            self._reconnect_once()
+            return
+
+        # Get available [in/out]bound sockets
+        ready_to_read, _, _ = select.select([self.sock], [], [], timeout)
+        if self.sock in ready_to_read:
+            # Only ever read what's there, so a message that's still on its way (e.g., a
+            # big one from a BULK publisher) never holds up whoever else we share a thread with.
+            try:
+                received: bytes = self.sock.recv(RECV_SIZE)
+            except socket.error as e:
+                self._lose_publisher(f"it hung up ({e})")
+                return
+            if not received:
+                self._lose_publisher("it hung up")
+                return
+
+            self.last_heard = time.monotonic()
+            self._buffer += received
+            for message in toybox_core.protocol.unpack_frames(self._buffer):
+                if toybox_core.protocol.is_heartbeat(message):
                     continue
 
                 LOG("DEBUG", f"Message read was: <{message.message_raw}>")
@@ -288,21 +681,33 @@ class Subscriber(Connection):
                         message.payload_length)
                 LOG("DEBUG", f"Putting message in inbound queue: <{split_message[1].hex()}>")
                 self.inbound.put(split_message[1])
-            
+        elif time.monotonic() - self.last_heard > HEARTBEAT_TIMEOUT:
+            self._lose_publisher(f"nothing from it in {HEARTBEAT_TIMEOUT}s")
+            return
+        
+        while True:
             try:
                 message_bytes: bytes = self.inbound.get(block=False)
             except Empty:
-                continue
-  
-            LOG("DEBUG", f"Pulling message from inbound queue <{message_bytes.hex()}>")
-            unpacked_msg: Message = toybox_core.protocol.unpack_message(
-                obj_type=self.topic.message_type, 
-                message_data=message_bytes)
-            
-            # TODO: could get more robust with callbacks
+                return
+            self._dispatch(message_bytes)
+
+    def _dispatch(self, message_bytes: bytes) -> None:
+
+        LOG("DEBUG", f"Pulling message from inbound queue <{message_bytes.hex()}>")
+        if self.raw:
             for callback in self.callbacks:
-                LOG("DEBUG", f"Calling callback {repr(callback)}")
-                callback(unpacked_msg)
+                callback(message_bytes)
+            return
+
+        unpacked_msg: Message = toybox_core.protocol.unpack_message(
+            obj_type=self.topic.message_type, 
+            message_data=message_bytes)
+        
+        # TODO: could get more robust with callbacks
+        for callback in self.callbacks:
+            LOG("DEBUG", f"Calling callback {repr(callback)}")
+            callback(unpacked_msg)
 
     def trigger_shutdown(self) -> None:
         
@@ -310,11 +715,13 @@ class Subscriber(Connection):
             return
         
         self._shutdown = True
-        self._spin_thread.join()
+        if self._spin_thread is not None:
+            self._spin_thread.join()
 
     def connect_to_publisher(
         self, 
-        publisher_info: tuple[str,str,int]
+        publisher_info: tuple[str,str,int],
+        log_level: str = "ERR",
     ) -> bool:
         
         pub_name: str = publisher_info[0]
@@ -322,11 +729,22 @@ class Subscriber(Connection):
         pub_port: int = publisher_info[2]
         
         try:
+            enable_keepalive(self.sock)
+            if self.priority is Priority.CONTROL:
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock.settimeout(CONNECT_TIMEOUT)
             self.sock.connect((pub_host, pub_port))
+            self.sock.settimeout(None)
+            # Always say what we want (even if it's everything), so the publisher doesn't
+            # have to wait around to find out.
+            self.sock.sendall(toybox_core.protocol.pack_message(self.options))
         except Exception as e:
-            self.log("ERR", f"Failed to connect to publisher <{pub_name}> at {pub_host}:{pub_port}: {e}")
+            self.log(log_level, f"Failed to connect to publisher <{pub_name}> at {pub_host}:{pub_port}: {e}")
+            # Whatever state a failed connect() left the socket in, we can't use it again.
+            self._reset_socket()
             return False
 
+        self.last_heard = time.monotonic()
         return True
 
     def add_publisher(self, publisher_info: tuple[str,str,int]) -> bool:
@@ -337,10 +755,90 @@ class Subscriber(Connection):
 
         if self.connect_to_publisher(publisher_info=publisher_info):
             self._publisher = publisher_info
+            self._lost = None
             return True
         else:
             return False
 
+    def remove_publisher(self, publisher_id: str) -> bool:
+        """
+        Drop our connection to the given publisher, if we have one, leaving this
+        Subscriber free to be handed a new publisher later.
+        """
+
+        # The tbx-server says it's gone for good, so stop trying to get it back.
+        if self._lost is not None and self._lost[0] == publisher_id:
+            self._lost = None
+
+        if self._publisher is None or self._publisher[0] != publisher_id:
+            return False
+
+        self.log("DEBUG", f"Removing publisher <{publisher_id}> from subscriber <{self.name}>")
+        self._publisher = None
+        self._reset_socket()
+
+        return True
+
+    def _lose_publisher(self, reason: str) -> None:
+        """
+        Our publisher stopped talking to us, without the tbx-server saying it's gone.
+        Start trying to reconnect.
+        """
+
+        self.log("WARN", f"<{self.name}> lost publisher {self._publisher}: {reason}. Reconnecting.")
+        self._lost = self._publisher
+        self._attempts = 0
+        self._next_attempt = time.monotonic()
+        self._publisher = None
+        self._reset_socket()
+
+    def _reconnect_once(self) -> None:
+        """
+        Take another shot at getting back to a publisher we lost, if it's time.
+        """
+
+        if self._lost is None or time.monotonic() < self._next_attempt:
+            return
+
+        self._attempts += 1
+        target: tuple[str,str,int] = self._lost
+
+        # The address we had didn't work last time; see where the publisher is now.
+        if self._attempts > 1 and self._resolver is not None:
+            try:
+                publishers: list[tuple[str,str,int]] = self._resolver()
+            except grpc.RpcError as e:
+                self.log("DEBUG", f"<{self.name}> couldn't look up publishers for <{self.topic.name}>: {e}")
+                publishers = []
+            # Prefer the same publisher, wherever it is now.
+            same: list[tuple[str,str,int]] = [pub for pub in publishers if pub[0] == target[0]]
+            if same or publishers:
+                target = (same or publishers)[0]
+
+        if self.connect_to_publisher(publisher_info=target, log_level="DEBUG"):
+            self.log("INFO", f"<{self.name}> reconnected to publisher {target} after {self._attempts} attempt(s).")
+            self._publisher = target
+            self._lost = None
+            return
+
+        self._next_attempt = time.monotonic() + reconnect_delay(self._attempts)
+
+    def _reset_socket(self) -> None:
+
+        # A socket that's been connect()ed can't be re-used, so swap in a fresh one.
+        old_sock: socket.socket = self.sock
+        self.sock = socket.socket(family=socket.AF_INET, type=socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.sock.bind((self.host, self.port))
+        except OSError:
+            # Our old port is stuck in TIME_WAIT, just take whatever we can get.
+            self.sock.bind((self.host, 0))
+            self.port = self.sock.getsockname()[1]
+        old_sock.close()
+        # Half a message from the old connection is no use to the next one.
+        self._buffer.clear()
+
     @property
     def publisher(self) -> tuple[str,str,int] | None:
         # get mutex?
@@ -349,6 +847,12 @@ class Subscriber(Connection):
     @property
     def callbacks(self) -> list[Callable[[Message], None]]:
         return self._callbacks
+
+    @property
+    def options(self) -> SubscriberOptions:
+        return SubscriberOptions(
+            max_rate=self.max_rate,
+            filter=self.message_filter.expression if self.message_filter is not None else "")
     
     @property
     def shutdown(self) -> bool:
@@ -356,6 +860,24 @@ class Subscriber(Connection):
     
 
 
+def enable_keepalive(sock: socket.socket) -> None:
+
+    idle, interval, count = KEEPALIVE
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # Not every platform lets us tune these, so take what we can get.
+    for option, value in (("TCP_KEEPIDLE", idle), ("TCP_KEEPINTVL", interval), ("TCP_KEEPCNT", count)):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+def reconnect_delay(attempt: int) -> float:
+    """
+    How long to wait before the `attempt`th (1-based) try at reconnecting.
+    """
+    delay: float = min(RECONNECT_BACKOFF * (2 ** min(attempt - 1, 16)), RECONNECT_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
 def port_in_use(
     port: int, 
     host: str = 'localhost'
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+"""
+Many Nodes, one runtime.
+
+On its own, every Node gets a thread pool, an RPC server, and threads to poll its
+sockets (as does each of its Publishers and Subscribers). Nodes created in a
+NodeContainer share all of that instead: one executor, one RPC server (and port),
+one Reactor thread polling every socket, and one TimerScheduler thread for all of
+their timers. The Node API doesn't change.
+
+    container: NodeContainer = NodeContainer()
+    left: Node = Node("left", container=container)
+    right: Node = Node("right", container=container)
+"""
+
+import concurrent.futures as futures
+import threading
+from typing import TYPE_CHECKING
+
+import grpc
+
+from toybox_core.clock import Clock
+from toybox_core.connection import get_available_port
+from toybox_core.reactor import Reactor
+from toybox_core.rpc.node import ContainerNodeServicer, NodeRPCServicer
+from toybox_core.timer import TimerScheduler
+
+from toybox_msgs.core.Node_pb2_grpc import add_NodeServicer_to_server
+
+if TYPE_CHECKING:
+    from toybox_core.node import Node
+
+
+# Shared between every Node in the container, so give it a few more workers than
+# a lone Node gets.
+DEFAULT_MAX_WORKERS: int = 16
+
+
+class NodeContainer():
+
+    def __init__(
+        self,
+        name: str = "tbx_container",
+        port: int | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        clock: Clock | None = None,
+    ) -> None:
+
+        self._name: str = name
+        self._port: int = port if port else get_available_port()
+
+        self._executor: futures.ThreadPoolExecutor = futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=name)
+        self._reactor: Reactor = Reactor(name=f"{name}_reactor")
+        # Timers of Nodes that keep (simulated) time by some other clock get a scheduler of their own.
+        self._timers: TimerScheduler = TimerScheduler(
+            executor=self._executor, 
+            name=f"{name}_timers", 
+            clock=clock)
+
+        self._servicer: ContainerNodeServicer = ContainerNodeServicer()
+        self._rpc_server: grpc.Server = grpc.server(thread_pool=self._executor)
+        add_NodeServicer_to_server(servicer=self._servicer, server=self._rpc_server)
+        self._rpc_server.add_insecure_port(f'[::]:{self._port}')
+
+        self._nodes: list["Node"] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._started: bool = False
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def executor(self) -> futures.ThreadPoolExecutor:
+        return self._executor
+
+    @property
+    def reactor(self) -> Reactor:
+        return self._reactor
+
+    @property
+    def timers(self) -> TimerScheduler:
+        return self._timers
+
+    @property
+    def nodes(self) -> list["Node"]:
+        with self._lock:
+            return list(self._nodes)
+
+    def add(self, node: "Node", servicer: NodeRPCServicer) -> None:
+        """
+        Called by Nodes created with this container.
+        """
+        with self._lock:
+            self._nodes.append(node)
+        self._servicer.add(servicer)
+
+    def remove(self, node: "Node", servicer: NodeRPCServicer) -> None:
+        with self._lock:
+            if node in self._nodes:
+                self._nodes.remove(node)
+        self._servicer.remove(servicer)
+
+    def start(self) -> None:
+        """
+        Start serving RPCs. Nodes call this when they start, so there's no need to.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._rpc_server.start()
+            self._started = True
+
+    def shutdown(self) -> None:
+        """
+        Shut down every Node in the container, then the container itself.
+        """
+
+        for node in self.nodes:
+            node.shutdown()
+
+        self._reactor.stop()
+        self._timers.stop()
+        self._rpc_server.stop(grace=None)
+        self._executor.shutdown(wait=False)
+
+
+_container: NodeContainer | None = None
+_container_lock: threading.Lock = threading.Lock()
+
+
+def get_container() -> NodeContainer:
+    """
+    The process-wide NodeContainer, for code that creates lots of Nodes without
+    owning the process (e.g., simulator plugins).
+    """
+    global _container
+
+    with _container_lock:
+        if _container is None:
+            _container = NodeContainer()
+        return _container
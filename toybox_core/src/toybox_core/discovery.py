@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+
+"""
+How Nodes find each other.
+
+By default, everything goes through the tbx-server (ServerDiscovery). Single-host
+deployments can set TBX_DISCOVERY=local to use a shared registry file instead,
+with no server process at all (see toybox_core.local_discovery).
+"""
+
+from abc import ABC, abstractmethod
+import os
+import threading
+from typing import Any, Callable
+
+from toybox_core.rpc.param import ParamCache, get_param_cache, set_param_rpc
+from toybox_core.rpc.register import (
+    DeclareNodeResult,
+    declare_node_rpc,
+    deregister_client_rpc,
+    heartbeater,
+    register_client_rpc,
+)
+from toybox_core.rpc.service import advertise_service_rpc, lookup_service_rpc
+from toybox_core.rpc.topic import (
+    advertise_relay_rpc,
+    advertise_topic_rpc,
+    subscribe_topic_rpc,
+    topic_publishers_rpc,
+)
+
+from toybox_msgs.core.Node_pb2_grpc import NodeServicer
+from toybox_msgs.core.Service_pb2 import ServiceInfo
+
+
+TBX_DISCOVERY_ENV: str = "TBX_DISCOVERY"
+
+SERVER_DISCOVERY: str = "server"
+LOCAL_DISCOVERY: str = "local"
+
+
+class Discovery(ABC):
+    """
+    The registration and topic-discovery operations that a Node needs, whatever's
+    actually keeping track of them.
+    """
+
+    @abstractmethod
+    def register(
+        self,
+        name: str,
+        host: str,
+        port: int,
+        data_port: int = -1
+    ) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def declare(
+        self,
+        name: str,
+        host: str,
+        port: int,
+        data_port: int = -1,
+        advertisements: list[tuple[str,str,int]] | None = None,
+        subscriptions: list[tuple[str,str]] | None = None,
+        reassert: bool = False,
+    ) -> DeclareNodeResult:
+        """
+        Register, advertise, and subscribe, all at once. Same arguments as declare_node_rpc().
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def advertise(
+        self,
+        name: str,
+        host: str,
+        topic_port: int,
+        topic_name: str,
+        message_type: str,
+    ) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def advertise_relay(
+        self,
+        name: str,
+        host: str,
+        topic_port: int,
+        topic_name: str,
+        message_type: str,
+    ) -> bool:
+        """
+        Offer to re-publish a topic, so that new subscribers can be sent here rather than
+        to the topic's publishers (see toybox_core.relay).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def subscribe(
+        self,
+        name: str,
+        topic_name: str,
+        message_type: str,
+    ) -> list[tuple[str,str,int]]:
+        """
+        Returns:
+            list[tuple[str,str,int]]: (publisher_id, host, port) of the topic's current publishers
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def advertise_service(
+        self,
+        name: str,
+        host: str,
+        service_port: int,
+        service_name: str,
+        request_type: str,
+        response_type: str,
+    ) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def lookup_service(self, service_name: str) -> ServiceInfo | None:
+        """
+        Returns:
+            ServiceInfo | None: who provides the service, and where; None if nobody does
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def topic_publishers(self, topic_name: str) -> list[str]:
+        """
+        Who's currently publishing a topic, without subscribing to it.
+
+        Returns:
+            list[str]: the publishers' client names
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def param_cache(self) -> ParamCache:
+        """
+        This process's copy of every parameter, kept up to date as they change.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_param(self, name: str, value: Any) -> bool:
+        """
+        Set a parameter for everyone. Once it's been set, a parameter's type can't change.
+
+        Returns:
+            bool: whether the new value was accepted
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def deregister(self, name: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def attach(
+        self,
+        name: str,
+        servicer: NodeServicer,
+        on_lease_lost: Callable[[str], None] | None = None,
+    ) -> None:
+        """
+        Keep a registered client's registration alive, and keep it informed (through
+        `servicer`) of publishers that come and go on the topics it subscribes to.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def detach(self, name: str) -> None:
+        raise NotImplementedError
+
+
+class ServerDiscovery(Discovery):
+    """
+    Discovery through the tbx-server. The server reaches back out to the Node's own RPC
+    server to announce new publishers, so attach() just has to keep the lease alive.
+    """
+
+    def register(self, name: str, host: str, port: int, data_port: int = -1) -> bool:
+        return register_client_rpc(name=name, host=host, port=port, data_port=data_port)
+
+    def declare(
+        self,
+        name: str,
+        host: str,
+        port: int,
+        data_port: int = -1,
+        advertisements: list[tuple[str,str,int]] | None = None,
+        subscriptions: list[tuple[str,str]] | None = None,
+        reassert: bool = False,
+    ) -> DeclareNodeResult:
+        return declare_node_rpc(
+            name=name,
+            host=host,
+            port=port,
+            data_port=data_port,
+            advertisements=advertisements,
+            subscriptions=subscriptions,
+            reassert=reassert)
+
+    def advertise(
+        self,
+        name: str,
+        host: str,
+        topic_port: int,
+        topic_name: str,
+        message_type: str,
+    ) -> bool:
+        return advertise_topic_rpc(
+            client_name=name,
+            client_host=host,
+            topic_port=topic_port,
+            topic_name=topic_name,
+            message_type=message_type)
+
+    def advertise_relay(
+        self,
+        name: str,
+        host: str,
+        topic_port: int,
+        topic_name: str,
+        message_type: str,
+    ) -> bool:
+        return advertise_relay_rpc(
+            client_name=name,
+            client_host=host,
+            topic_port=topic_port,
+            topic_name=topic_name,
+            message_type=message_type)
+
+    def subscribe(self, name: str, topic_name: str, message_type: str) -> list[tuple[str,str,int]]:
+        return subscribe_topic_rpc(
+            subscriber_id=name,
+            topic_name=topic_name,
+            message_type=message_type)
+
+    def advertise_service(
+        self,
+        name: str,
+        host: str,
+        service_port: int,
+        service_name: str,
+        request_type: str,
+        response_type: str,
+    ) -> bool:
+        return advertise_service_rpc(
+            provider_id=name,
+            provider_host=host,
+            service_port=service_port,
+            service_name=service_name,
+            request_type=request_type,
+            response_type=response_type)
+
+    def lookup_service(self, service_name: str) -> ServiceInfo | None:
+        return lookup_service_rpc(service_name=service_name)
+
+    def topic_publishers(self, topic_name: str) -> list[str]:
+        return topic_publishers_rpc(topic_name=topic_name)
+
+    def param_cache(self) -> ParamCache:
+        return get_param_cache()
+
+    def set_param(self, name: str, value: Any) -> bool:
+        return set_param_rpc(name=name, value=value)
+
+    def deregister(self, name: str) -> bool:
+        return deregister_client_rpc(name=name, ignore_response=True)
+
+    def attach(
+        self,
+        name: str,
+        servicer: NodeServicer,
+        on_lease_lost: Callable[[str], None] | None = None,
+    ) -> None:
+        heartbeater.add(client_id=name, on_lease_lost=on_lease_lost)
+
+    def detach(self, name: str) -> None:
+        heartbeater.remove(client_id=name)
+
+
+_discovery: dict[str,Discovery] = {}
+_discovery_lock: threading.Lock = threading.Lock()
+
+
+def get_discovery_kind() -> str:
+    return os.environ.get(TBX_DISCOVERY_ENV, SERVER_DISCOVERY).lower()
+
+
+def get_discovery(kind: str | None = None) -> Discovery:
+    """
+    Get the process-wide Discovery backend of the given kind (by default, whatever
+    TBX_DISCOVERY says).
+    """
+    kind = kind if kind is not None else get_discovery_kind()
+
+    with _discovery_lock:
+        discovery: Discovery | None = _discovery.get(kind, None)
+        if discovery is not None:
+            return discovery
+
+        if kind == SERVER_DISCOVERY:
+            discovery = ServerDiscovery()
+        elif kind == LOCAL_DISCOVERY:
+            from toybox_core.local_discovery import LocalDiscovery
+            discovery = LocalDiscovery()
+        else:
+            raise ValueError(f"Unknown discovery backend <{kind}>, expected one of " \
+                f"{[SERVER_DISCOVERY, LOCAL_DISCOVERY]}")
+
+        _discovery[kind] = discovery
+        return discovery
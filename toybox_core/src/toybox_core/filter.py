@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+"""
+Content filters that subscribers hand to their publishers.
+
+A filter is one or more comparisons between a (scalar) message field and a literal,
+joined by `and`:
+
+    linear.x > 0.5 and header.frame_id == 'base_link'
+
+Fields are dotted paths through nested messages. Literals are numbers, quoted strings,
+or true/false. That's the whole language; it's meant to be cheap enough to run on every
+message a publisher sends, not to be clever.
+"""
+
+from dataclasses import dataclass
+import operator
+import re
+from typing import Any, Callable
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.message import Message
+
+
+_COMPARISON: re.Pattern = re.compile(
+    r"^\s*(?P<field>[A-Za-z_][\w]*(?:\.[A-Za-z_][\w]*)*)\s*(?P<op>==|!=|<=|>=|<|>)\s*(?P<literal>.+?)\s*$")
+
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _parse_literal(literal: str) -> Any:
+
+    if len(literal) >= 2 and literal[0] == literal[-1] and literal[0] in "'\"":
+        return literal[1:-1]
+    if literal in ("true", "True"):
+        return True
+    if literal in ("false", "False"):
+        return False
+    try:
+        return int(literal)
+    except ValueError:
+        pass
+    try:
+        return float(literal)
+    except ValueError:
+        raise ValueError(f"Can't make sense of <{literal}>; quote strings, e.g. 'like this'.")
+
+
+def _is_repeated(field: FieldDescriptor) -> bool:
+    # Newer protobufs dropped `label` in favour of `is_repeated`.
+    if hasattr(field, "is_repeated"):
+        return field.is_repeated
+    return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+def _check_path(descriptor: Descriptor, path: list[str]) -> None:
+    """
+    Make sure `path` leads through nested messages to a single, scalar field.
+    """
+
+    for depth, name in enumerate(path):
+        field: FieldDescriptor | None = descriptor.fields_by_name.get(name)
+        if field is None:
+            raise ValueError(f"<{descriptor.full_name}> has no field <{name}>.")
+        if _is_repeated(field):
+            raise ValueError(f"Can't filter on repeated field <{'.'.join(path[:depth + 1])}>.")
+
+        last: bool = depth == len(path) - 1
+        is_message: bool = field.type == FieldDescriptor.TYPE_MESSAGE
+        if last and is_message:
+            raise ValueError(f"<{'.'.join(path)}> is a message; compare one of its fields instead.")
+        if not last and not is_message:
+            raise ValueError(f"<{'.'.join(path[:depth + 1])}> isn't a message, so it has no fields.")
+        if is_message:
+            descriptor = field.message_type
+
+
+@dataclass
+class Comparison():
+    path: list[str]
+    compare: Callable[[Any, Any], bool]
+    value: Any
+
+    def __call__(self, message: Message) -> bool:
+
+        field: Any = message
+        for name in self.path:
+            field = getattr(field, name)
+        try:
+            return self.compare(field, self.value)
+        except TypeError:
+            # e.g., comparing a string field to a number.
+            return False
+
+
+class MessageFilter():
+
+    def __init__(
+        self,
+        expression: str,
+        message_type: Message | None = None,
+    ) -> None:
+        """
+        Args:
+            expression (str): What to filter on (see above).
+            message_type (Message | None): If given, check that every field in the \
+                expression exists, so typos fail here instead of filtering out everything.
+
+        Raises:
+            ValueError: if the expression doesn't parse, or doesn't fit the message type.
+        """
+
+        self.expression: str = expression.strip()
+        self._comparisons: list[Comparison] = []
+
+        if not self.expression:
+            raise ValueError("Empty filter expression.")
+
+        for clause in re.split(r"\s+and\s+", self.expression):
+            match: re.Match | None = _COMPARISON.match(clause)
+            if match is None:
+                raise ValueError(f"Can't parse filter clause <{clause}>; expected <field> <op> <value>.")
+
+            path: list[str] = match["field"].split(".")
+            if message_type is not None:
+                _check_path(message_type.DESCRIPTOR, path)
+
+            self._comparisons.append(Comparison(
+                path=path,
+                compare=_OPERATORS[match["op"]],
+                value=_parse_literal(match["literal"])))
+
+    def __call__(self, message: Message) -> bool:
+        return all(comparison(message) for comparison in self._comparisons)
+
+    def __repr__(self) -> str:
+        return f"MessageFilter({self.expression!r})"
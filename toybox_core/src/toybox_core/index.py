@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+
+"""
+An on-disk index of installed toybox packages, their launchable nodes, and those nodes'
+constructor parameters.
+
+Finding toybox packages means looking at every installed distribution (and parsing its
+pyproject.toml), and finding a node's parameters means importing it. Both are slow in a
+big environment, and neither changes unless something is (re)installed or edited. So we
+do the work once, write it down, and after that only redo it for the distributions whose
+dist-info, pyproject.toml, or node source files have changed since. (Packages installed
+with `pip install -e` never touch their dist-info when they're edited, so the node
+sources have to be checked too.)
+
+Node parameters are read from the node's source (with `ast`), not by importing it. If a
+constructor is too clever for that (inherited, non-literal defaults, annotations that
+aren't builtins), its parameters are left out of the index, and the node is imported
+when somebody actually asks for them.
+
+The index lives at $TBX_INDEX, or in the user's cache directory.
+"""
+
+import ast
+from dataclasses import asdict, dataclass, field
+import importlib.metadata
+import importlib.util
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+from typing import Any
+
+from toybox_core.logging import LOG
+from toybox_core.metadata import ToyboxMetadata, ToyboxTableSpec, find_pyproject_toml
+
+
+TBX_INDEX_ENV: str = "TBX_INDEX"
+INDEX_VERSION: int = 2
+
+# How many `from x import Y`s we'll follow looking for where a node class is defined.
+MAX_IMPORT_HOPS: int = 3
+
+
+def cache_dir() -> pathlib.Path:
+    """
+    Where toybox keeps the things it works out once and then remembers.
+    """
+    cache: str = os.environ.get("XDG_CACHE_HOME", None) or os.path.join(os.path.expanduser("~"), ".cache")
+    return pathlib.Path(cache) / "toybox"
+
+
+def default_index_path() -> pathlib.Path:
+    path: str | None = os.environ.get(TBX_INDEX_ENV, None)
+    if path:
+        return pathlib.Path(path)
+    # Different interpreters see different distributions.
+    return cache_dir() / f"index-py{sys.version_info[0]}{sys.version_info[1]}.json"
+
+
+def _mtime(path: str | None) -> float:
+    if path is None:
+        return 0.0
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+@dataclass
+class NodeEntry:
+    # "<package>.<entry point name>", as used by tbx-launch.
+    full_name: str
+    # The entry point's value, "<module>:<attribute>".
+    value: str
+    # {name, annotation, required, default} per constructor parameter, or None if they
+    # couldn't be worked out without importing the node.
+    params: list[dict[str,Any]] | None = None
+    # Every source file the params were read from (following imports), and its mtime.
+    sources: dict[str,float] = field(default_factory=dict)
+
+    def stale(self) -> bool:
+        return any(_mtime(path) != mtime for path, mtime in self.sources.items())
+
+
+@dataclass
+class DistributionEntry:
+    name: str
+    mtime: float
+    toml_path: str | None = None
+    toml_mtime: float = 0.0
+    # ToyboxMetadata, as a dict; None if this isn't a toybox package.
+    metadata: dict[str,Any] | None = None
+    nodes: list[NodeEntry] = field(default_factory=list)
+
+    def stale(self, mtime: float) -> bool:
+        return mtime != self.mtime or _mtime(self.toml_path) != self.toml_mtime or \
+            any(node.stale() for node in self.nodes)
+
+    @classmethod
+    def from_dict(cls, data: dict[str,Any]) -> "DistributionEntry":
+        nodes: list[NodeEntry] = [NodeEntry(**node) for node in data.pop("nodes", [])]
+        return cls(nodes=nodes, **data)
+
+
+def _module_file(module_name: str) -> pathlib.Path | None:
+    """
+    Where a module's source is, without importing it (or any of its parents).
+    """
+
+    parts: list[str] = module_name.split(".")
+    try:
+        spec = importlib.util.find_spec(parts[0])
+    except (ImportError, ValueError):
+        return None
+    if spec is None:
+        return None
+    if len(parts) == 1:
+        return pathlib.Path(spec.origin) if spec.origin and spec.origin.endswith(".py") else None
+
+    for location in spec.submodule_search_locations or []:
+        base: pathlib.Path = pathlib.Path(location).joinpath(*parts[1:])
+        for candidate in (base.with_suffix(".py"), base / "__init__.py"):
+            if candidate.is_file():
+                return candidate
+    return None
+
+
+def _resolve_import(current: str, level: int, imported_from: str | None) -> str:
+    if level == 0:
+        return imported_from or ""
+    # Relative import: drop `level` trailing parts (the module itself counts as one).
+    base: list[str] = current.split(".")[:-level]
+    return ".".join(base + ([imported_from] if imported_from else []))
+
+
+def _find_class(
+    module_name: str,
+    class_name: str,
+    hops: int = 0,
+    sources: dict[str,float] | None = None,
+) -> ast.ClassDef | None:
+    """
+    Find the definition of `class_name`, as seen from `module_name`, following imports.
+    Every file looked at along the way is added to `sources` (with its mtime).
+    """
+
+    path: pathlib.Path | None = _module_file(module_name)
+    if path is None:
+        return None
+    if sources is not None:
+        sources[str(path)] = _mtime(str(path))
+    try:
+        tree: ast.Module = ast.parse(path.read_text(), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+    for statement in tree.body:
+        if isinstance(statement, ast.ClassDef) and statement.name == class_name:
+            return statement
+
+    if hops >= MAX_IMPORT_HOPS:
+        return None
+    # A package's __init__ is one level deeper than its name suggests, as far as
+    # relative imports are concerned.
+    current: str = f"{module_name}.__init__" if path.name == "__init__.py" else module_name
+    for statement in tree.body:
+        if not isinstance(statement, ast.ImportFrom):
+            continue
+        for alias in statement.names:
+            if (alias.asname or alias.name) == class_name:
+                source: str = _resolve_import(current, statement.level, statement.module)
+                return _find_class(source, alias.name, hops + 1, sources)
+    return None
+
+
+def _literal(node: ast.expr) -> tuple[bool, Any]:
+    """
+    The value of a default, if it's a plain literal (and will survive a trip through JSON).
+    """
+    try:
+        value: Any = ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return False, None
+    if value is not None and not isinstance(value, (bool, int, float, str)):
+        return False, None
+    return True, value
+
+
+def read_node_params(
+    entry_point_value: str,
+    sources: dict[str,float] | None = None,
+) -> list[dict[str,Any]] | None:
+    """
+    A node's constructor parameters, read from its source. The files they were read
+    from are added to `sources` (with their mtimes).
+
+    Returns:
+        list[dict[str,Any]] | None: {name, annotation, required, default} per parameter, \
+            or None if we can't tell without importing it.
+    """
+
+    module_name, _, attribute = entry_point_value.partition(":")
+    if not attribute:
+        return None
+
+    definition: ast.ClassDef | None = _find_class(module_name.strip(), attribute.strip(), sources=sources)
+    if definition is None:
+        return None
+    init: ast.FunctionDef | None = next(
+        (statement for statement in definition.body
+         if isinstance(statement, ast.FunctionDef) and statement.name == "__init__"), None)
+    if init is None:
+        # Inherited; we'd have to resolve base classes, so leave it to the import.
+        return None
+
+    arguments: ast.arguments = init.args
+    positional: list[ast.arg] = arguments.posonlyargs + arguments.args
+    # Defaults belong to the last len(defaults) positional parameters.
+    defaults: list[ast.expr | None] = \
+        [None] * (len(positional) - len(arguments.defaults)) + list(arguments.defaults)
+
+    params: list[dict[str,Any]] = []
+    for arg, default in list(zip(positional, defaults)) + list(zip(arguments.kwonlyargs, arguments.kw_defaults)):
+        if arg.arg == "self":
+            continue
+        param: dict[str,Any] = {
+            "name": arg.arg,
+            "annotation": ast.unparse(arg.annotation) if arg.annotation is not None else None,
+            "required": default is None,
+        }
+        if default is not None:
+            ok, value = _literal(default)
+            if not ok:
+                return None
+            param["default"] = value
+        params.append(param)
+
+    return params
+
+
+def _index_distribution(distribution: importlib.metadata.Distribution, mtime: float) -> DistributionEntry:
+
+    entry: DistributionEntry = DistributionEntry(name=distribution.name, mtime=mtime)
+
+    try:
+        toml_path: pathlib.Path = find_pyproject_toml(module_name=distribution.name)
+    except Exception:
+        return entry
+    entry.toml_path = str(toml_path)
+    entry.toml_mtime = _mtime(entry.toml_path)
+
+    try:
+        meta: ToyboxMetadata | None = ToyboxMetadata.extract_from_toml(toml_path=toml_path)
+    except Exception as e:
+        LOG("DEBUG", f"Skipping <{distribution.name}>: {e}")
+        return entry
+    if meta is None:
+        return entry
+
+    entry.metadata = asdict(meta)
+    entry.metadata["package_root"] = str(meta.package_root)
+
+    # The installed entry points, which (unlike the pyproject.toml) are what importlib
+    # will actually load.
+    for entry_point in distribution.entry_points:
+        if entry_point.group != ToyboxTableSpec.TBX_NODES:
+            continue
+        package_name: str = entry_point.value.split(".")[0]
+        sources: dict[str,float] = {}
+        entry.nodes.append(NodeEntry(
+            full_name=f"{package_name}.{entry_point.name}",
+            value=entry_point.value,
+            params=read_node_params(entry_point.value, sources=sources),
+            sources=sources))
+
+    return entry
+
+
+class PackageIndex():
+
+    def __init__(self, path: pathlib.Path | str | None = None) -> None:
+
+        self._path: pathlib.Path = pathlib.Path(path) if path is not None else default_index_path()
+        self._distributions: dict[str,DistributionEntry] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """
+        Read the index from disk. A missing or unreadable index is just an empty one.
+        """
+
+        try:
+            data: dict[str,Any] = json.loads(self._path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+
+        try:
+            self._distributions = {
+                path: DistributionEntry.from_dict(entry)
+                for path, entry in data.get("distributions", {}).items()}
+        except TypeError as e:
+            LOG("WARN", f"Ignoring malformed package index at {self._path}: {e}")
+            self._distributions = {}
+
+    def save(self) -> None:
+
+        data: dict[str,Any] = {
+            "version": INDEX_VERSION,
+            "distributions": {path: asdict(entry) for path, entry in self._distributions.items()},
+        }
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename, so nobody ever reads half an index.
+            descriptor, temp_path = tempfile.mkstemp(dir=self._path.parent, prefix=".index-")
+            with os.fdopen(descriptor, "w") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self._path)
+        except OSError as e:
+            LOG("WARN", f"Failed to write package index to {self._path}: {e}")
+
+    def refresh(self, rebuild: bool = False) -> bool:
+        """
+        Bring the index up to date with what's installed, re-indexing only the
+        distributions that changed (or everything, if `rebuild`). Saves it if anything did.
+
+        Returns:
+            bool: whether anything changed
+        """
+
+        with self._lock:
+            changed: bool = False
+            # Rebuilt in the order importlib lists them, so that when two distributions
+            # have the same name, the one that wins here is the one that wins there.
+            distributions: dict[str,DistributionEntry] = {}
+
+            for distribution in importlib.metadata.distributions():
+                # Distributions that don't come from a path can't be kept track of, so
+                # they're indexed from scratch every time.
+                location: Any = getattr(distribution, "_path", None)
+                key: str = str(location) if location is not None else f"<{distribution.name}>"
+                if key in distributions:
+                    # e.g., a directory that's on sys.path twice.
+                    continue
+
+                mtime: float = _mtime(str(location)) if location is not None else -1.0
+                existing: DistributionEntry | None = self._distributions.get(key, None)
+                if not rebuild and existing is not None and mtime >= 0 and not existing.stale(mtime):
+                    distributions[key] = existing
+                    continue
+
+                distributions[key] = _index_distribution(distribution, mtime)
+                changed = True
+
+            changed |= list(distributions) != list(self._distributions)
+            self._distributions = distributions
+            if changed:
+                self.save()
+            return changed
+
+    def packages(self) -> dict[str,ToyboxMetadata]:
+
+        packages: dict[str,ToyboxMetadata] = {}
+        for entry in self._distributions.values():
+            if entry.metadata is None:
+                continue
+            metadata: dict[str,Any] = dict(entry.metadata)
+            metadata["package_root"] = pathlib.Path(metadata["package_root"])
+            # The first distribution on the path wins, like importlib.
+            packages.setdefault(entry.name, ToyboxMetadata(**metadata))
+        return packages
+
+    def nodes(self) -> dict[str,NodeEntry]:
+
+        nodes: dict[str,NodeEntry] = {}
+        for entry in self._distributions.values():
+            for node in entry.nodes:
+                nodes.setdefault(node.full_name, node)
+        return nodes
+
+    @property
+    def path(self) -> pathlib.Path:
+        return self._path
+
+
+# One per process, refreshed the first time it's asked for.
+_index: PackageIndex | None = None
+_index_lock: threading.Lock = threading.Lock()
+
+
+def get_index() -> PackageIndex:
+
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PackageIndex()
+            _index.refresh()
+        return _index
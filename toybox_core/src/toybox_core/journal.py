@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+"""
+Keeps the tbx-server's registry on disk, so a restarted server picks up where it
+left off instead of making every Node start over.
+
+The state directory holds a snapshot of the registry (as of some generation) and an
+append-only journal of every RegistryEvent since. Both are just length-prefixed
+RegistryEvents, and since every event carries the full state of whatever it's about,
+replaying the snapshot and then the journal rebuilds the registry.
+
+Nothing is written by whoever changed the registry (which, in the asyncio server, is
+the event loop): events and snapshots are queued, in order, for a writer thread that
+does the file I/O, so a slow disk or an fsync can't stall every other RPC.
+"""
+
+import os
+from queue import Queue
+import struct
+import threading
+from typing import BinaryIO, Iterator
+
+from toybox_core.client import Client
+from toybox_core.logging import LOG
+from toybox_core.registry import RegistryEvents, apply_event, snapshot
+from toybox_core.topic import Topic
+
+from toybox_msgs.core.Register_pb2 import RegistryEvent
+
+
+SNAPSHOT_FILE: str = "registry.snapshot"
+JOURNAL_FILE: str = "registry.journal"
+
+# How many journaled events to let pile up before taking a fresh snapshot.
+DEFAULT_SNAPSHOT_INTERVAL: int = 1000
+
+# Each record is its length, then a serialized RegistryEvent.
+RECORD_HEADER: struct.Struct = struct.Struct("<I")
+
+
+def write_record(file: BinaryIO, event: RegistryEvent) -> None:
+    data: bytes = event.SerializeToString()
+    file.write(RECORD_HEADER.pack(len(data)) + data)
+
+
+def read_records(path: str) -> Iterator[RegistryEvent]:
+    """
+    Every complete record in the file. A torn write at the end (from a crash) is ignored.
+    """
+
+    if not os.path.exists(path):
+        return
+
+    with open(path, "rb") as file:
+        while True:
+            header: bytes = file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            length: int = RECORD_HEADER.unpack(header)[0]
+            data: bytes = file.read(length)
+            if len(data) < length:
+                LOG("WARN", f"Ignoring a truncated record at the end of <{path}>.")
+                return
+            yield RegistryEvent.FromString(data)
+
+
+class RegistryJournal():
+
+    def __init__(
+        self,
+        state_dir: str,
+        snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL,
+    ) -> None:
+
+        self._state_dir: str = state_dir
+        self._snapshot_path: str = os.path.join(state_dir, SNAPSHOT_FILE)
+        self._journal_path: str = os.path.join(state_dir, JOURNAL_FILE)
+        self._snapshot_interval: int = snapshot_interval
+
+        self._clients: dict[str,Client] = {}
+        self._topics: dict[str,Topic] = {}
+        self._events: RegistryEvents | None = None
+
+        # Events journaled since the last snapshot was queued.
+        self._journaled: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+        # What the writer has to do, in order: a RegistryEvent to journal, or a whole
+        # snapshot (a list of them) to replace the journal with. None stops it.
+        self._queue: Queue[RegistryEvent | list[RegistryEvent] | None] = Queue()
+        self._writer: threading.Thread | None = None
+        # Only ever touched by the writer.
+        self._journal: BinaryIO | None = None
+
+        os.makedirs(state_dir, exist_ok=True)
+
+    def load(
+        self,
+        clients: dict[str,Client],
+        topics: dict[str,Topic],
+    ) -> int:
+        """
+        Rebuild the registry from disk into `clients` and `topics`.
+
+        Returns:
+            int: the generation the registry was at (0 if there was nothing saved)
+        """
+
+        generation: int = 0
+        for event in read_records(self._snapshot_path):
+            apply_event(event, clients=clients, topics=topics)
+            generation = event.generation
+
+        replayed: int = 0
+        for event in read_records(self._journal_path):
+            # A crash between writing a snapshot and truncating the journal leaves
+            # events that the snapshot already has.
+            if event.generation <= generation:
+                continue
+            apply_event(event, clients=clients, topics=topics)
+            generation = event.generation
+            replayed += 1
+
+        if generation:
+            LOG("INFO", f"Restored {len(clients)} clients and {len(topics)} topics " \
+                f"from <{self._state_dir}> (generation {generation}, {replayed} journaled events).")
+        return generation
+
+    def attach(
+        self,
+        events: RegistryEvents,
+        clients: dict[str,Client],
+        topics: dict[str,Topic],
+    ) -> None:
+        """
+        Start journaling every change recorded in `events` to the registry in `clients`
+        and `topics`, starting with a snapshot of how it stands now.
+        """
+
+        self._events = events
+        self._clients = clients
+        self._topics = topics
+
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.name = "tbx_journal"
+        self._writer.start()
+
+        self.snapshot()
+        events.add_listener(self._record)
+
+    def _record(self, event: RegistryEvent) -> None:
+
+        with self._lock:
+            self._queue.put(event)
+            self._journaled += 1
+            due: bool = self._journaled >= self._snapshot_interval
+
+        if due:
+            self.snapshot()
+
+    def snapshot(self) -> None:
+        """
+        Write the whole registry out, and start a fresh journal.
+        """
+
+        if self._events is None:
+            return
+
+        with self._lock:
+            # Taken now, so it's as of the last event queued, but written by the writer.
+            self._queue.put(snapshot(self._events.generation, clients=self._clients, topics=self._topics))
+            self._journaled = 0
+
+    def flush(self) -> None:
+        """
+        Wait for everything queued so far to be written.
+        """
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+
+        if self._events is None:
+            return
+        self._events.remove_listener(self._record)
+        self.snapshot()
+
+        self._queue.put(None)
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    # threading.Thread
+    def _write(self) -> None:
+
+        while True:
+            work: RegistryEvent | list[RegistryEvent] | None = self._queue.get()
+            try:
+                if work is None:
+                    if self._journal is not None:
+                        self._journal.close()
+                        self._journal = None
+                    return
+                elif isinstance(work, list):
+                    self._write_snapshot(work)
+                elif self._journal is not None:
+                    write_record(self._journal, work)
+                    self._journal.flush()
+            except OSError as e:
+                LOG("ERR", f"Failed to write to <{self._state_dir}>: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write_snapshot(self, events: list[RegistryEvent]) -> None:
+
+        tmp_path: str = self._snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            for event in events:
+                write_record(file, event)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self._journal_path, "wb")
@@ -1,22 +1,33 @@
 #!/usr/bin/env python3
 
 import atexit
+import builtins
 import concurrent.futures
-from dataclasses import dataclass
+import contextlib
+from dataclasses import dataclass, field
 from enum import Enum
+import functools
 import importlib.util
 from importlib.machinery import ModuleSpec
-from importlib.metadata import entry_points, EntryPoints
+import multiprocessing
+import multiprocessing.context
+import multiprocessing.forkserver
+import multiprocessing.synchronize
+import os
+from queue import Empty
+from importlib.metadata import entry_points, EntryPoint, EntryPoints
 from inspect import signature, Signature, Parameter
+import operator
 import pathlib
 import random
 import signal
 import threading
+import time
 from types import ModuleType
-from typing import Any, Callable, Generic, List, TypeVar, get_args
-from toybox_core.rpc.health import try_health_check_rpc
+from typing import Any, Callable, Generic, Iterator, List, TypeVar, get_args
 from typing_extensions import Self
 
+from toybox_core.index import NodeEntry, get_index
 from toybox_core.launchable import Launchable
 from toybox_core.logging import LOG, TbxLogger
 from toybox_core.metadata import ToyboxMetadata, find_tbx_packages
@@ -57,9 +68,18 @@ def discover_all_launchable_nodes() -> dict[str,Launchable]:
 
 def discover_one_launchable_node(node_name: str) -> Launchable:
 
+    # Found in the package index if we can, since that doesn't mean looking at every
+    # installed distribution again (which entry_points() does, every time).
+    indexed: list[NodeEntry] = [
+        entry for entry in get_index().nodes().values()
+        if entry.full_name == f"{entry.value.split('.')[0]}.{node_name}"]
+    launchable_entry: list[EntryPoint] | EntryPoints = [
+        EntryPoint(name=node_name, value=entry.value, group=TBX_NODES) for entry in indexed]
+    if not launchable_entry:
+        launchable_entry = entry_points().select(group=TBX_NODES, name=node_name)
+
     # TODO: this approach to naming makes it such that all nodes must have unique names,
     # even among different packages, which is probably not what I want...
-    launchable_entry: EntryPoints = entry_points().select(group=TBX_NODES, name=node_name)
 
     # We want exactly one launchable node
     if len(launchable_entry) > 1:
@@ -76,38 +96,86 @@ def discover_one_launchable_node(node_name: str) -> Launchable:
 
 
 def discover_launchable_node_params(package_name: str, node_name: str) -> dict[str,NodeParam]:
-
-    launchable_params: dict[str,NodeParam] = {}
+    """
+    A launchable node's constructor parameters. These come from the package index, so
+    normally nothing gets imported; a node whose parameters the index couldn't read from
+    its source (see toybox_core.index) is imported, but only that one.
+    """
 
     full_node_name: str = f"{package_name}.{node_name}"
     
-    all_launchable_nodes: dict[str,Launchable] = discover_all_launchable_nodes()
-    
-    node: Launchable | None = all_launchable_nodes.get(full_node_name, None)
-    if node is not None:
-        init_func_signature: Signature = signature(node.__init__)
-        for param in init_func_signature.parameters.values():
-            # We obviously don't care about self here
-            if param.name == "self":
-                continue
+    entry: NodeEntry | None = get_index().nodes().get(full_node_name, None)
+    if entry is None:
+        return {}
 
-            launchable_params[param.name] = NodeParam(
-                name=param.name, 
-                type=param.annotation,
-                required=(param.default is Parameter.empty),
-                value=param.default)
-        
-        # TODO: This would be a good place for "declared" non-constructor tbx params,
-        # like from a @classmethod or something....
+    launchable_params: dict[str,NodeParam] | None = indexed_node_params(entry)
+    if launchable_params is not None:
+        return launchable_params
 
-    return launchable_params
+    node: Any = EntryPoint(name=node_name, value=entry.value, group=TBX_NODES).load()
+    if not issubclass(node, Launchable):
+        return {}
+    return get_one_launchable_node_params(node)
+
+
+def indexed_node_params(entry: NodeEntry) -> dict[str,NodeParam] | None:
+    """
+    NodeParams for an indexed node, or None if the index doesn't know them (or only
+    knows annotations that would take an import to make sense of).
+    """
+
+    if entry.params is None:
+        return None
+
+    params: dict[str,NodeParam] = {}
+    for param in entry.params:
+        annotation: str | None = param["annotation"]
+        param_type: Any = Parameter.empty
+        if annotation is not None:
+            param_type = _builtin_annotation(annotation)
+            if param_type is None:
+                return None
+
+        params[param["name"]] = NodeParam(
+            name=param["name"],
+            type=param_type,
+            required=param["required"],
+            value=Parameter.empty if param["required"] else param["default"])
+
+    return params
+
+
+def _builtin_annotation(annotation: str) -> Any:
+    """
+    Turn an annotation like "int" or "str | None" back into a type, without importing
+    anything. None if it isn't made of builtins.
+    """
+
+    types: list[Any] = []
+    for part in annotation.split("|"):
+        name: str = part.strip()
+        if name == "None":
+            types.append(type(None))
+            continue
+        found: Any = getattr(builtins, name, None) if name.isidentifier() else None
+        if not isinstance(found, type):
+            return None
+        types.append(found)
+
+    return functools.reduce(operator.or_, types)
+
+
+@functools.cache
+def _init_signature(node: Launchable) -> Signature:
+    # Nested launch files ask about the same nodes over and over.
+    return signature(node.__init__)
 
 
 def get_one_launchable_node_params(node: Launchable) -> dict[str, NodeParam]:
 
     params: dict[str, NodeParam] = {}
 
-    init_func_signature: Signature = signature(node.__init__)
+    init_func_signature: Signature = _init_signature(node)
     for param in init_func_signature.parameters.values():
         # We obviously don't care about self here
         if param.name == "self":
@@ -188,21 +256,98 @@ class LaunchType(Enum):
     EXECUTABLE = 3 # TODO
 
 
+class LaunchMode(Enum):
+    # Every Launchable gets a thread, in this process.
+    THREAD = 1
+    # Every co-location group (see LaunchDescription) gets a process; every Launchable
+    # gets a thread in its group's process.
+    PROCESS = 2
+
+
+# Kinds of Dependency.
+DEPENDS_ON_READY: str = "ready"
+DEPENDS_ON_TOPIC: str = "topic"
+
+
+@dataclass(frozen=True)
+class Dependency:
+    """
+    Something a Launchable waits for before it starts (i.e., before its pre_launch()).
+    """
+    # One of the DEPENDS_ON_* kinds.
+    kind: str
+    # A Launchable's name, or a topic's.
+    target: str
+
+    def __str__(self) -> str:
+        return f"<{self.kind}: {self.target}>"
+
+
+def after_ready(name: str) -> Dependency:
+    """
+    Wait until the Launchable called `name` is ready: it's finished pre-launching, so
+    whatever it declares (topics, services) has been declared.
+    """
+    return Dependency(kind=DEPENDS_ON_READY, target=name)
+
+
+def topic_advertised(topic_name: str) -> Dependency:
+    """
+    Wait until somebody (anybody) is publishing `topic_name`.
+    """
+    return Dependency(kind=DEPENDS_ON_TOPIC, target=topic_name)
+
+
+@dataclass
+class LaunchRecipe:
+    """
+    How to make one Launchable: what instantiate() would do, but without doing it yet,
+    so that it can be shipped off to another process and done there.
+    """
+    launchable_class: type
+    kwargs: dict[str,Any]
+    # Launchables with the same group share a process (in LaunchMode.PROCESS). None means
+    # a process of its own.
+    group: str | None = None
+    # CPUs that the group's process is pinned to; None means wherever the OS likes.
+    cpus: list[int] | None = None
+    # What has to happen before this starts (see launch_by_dependencies). None means
+    # the old way: launch() once everything else (that didn't say) is done pre-launching.
+    depends_on: list[Dependency] | None = None
+
+    def build(self) -> Launchable:
+        return self.launchable_class(**self.kwargs)
+
+
 class LaunchDescription():
     # TODO: unused for now
     priority: int = -1
-    group: str = ""
 
     def __init__(
         self,
         name: str,
         launch_type: LaunchType = LaunchType.NODE,
-        params: dict[str,NodeParam] | None = None
+        params: dict[str,NodeParam] | None = None,
+        group: str | None = None,
+        cpus: list[int] | None = None,
+        depends_on: list[Dependency] | None = None,
     ) -> None:
+        """
+        `group` and `cpus` only matter for LaunchMode.PROCESS: everything launched from a
+        description with a group runs in that group's process (pinned to `cpus`, if
+        given). They apply to nested descriptions too, unless those set their own.
+
+        `depends_on` is what everything launched from this description waits for before
+        starting (see launch_by_dependencies); nested descriptions wait for their own
+        dependencies as well as these.
+        """
         
         self.name: str = name
         self.launch_type: LaunchType = launch_type
         self.params: dict[str,NodeParam] = params if params else {}
+        self.group: str | None = group
+        self.cpus: list[int] | None = cpus
+        self.depends_on: list[Dependency] | None = depends_on
 
         # self.launchable_class: Launchable | None = launchable_class
 
@@ -237,10 +382,35 @@ class LaunchDescription():
 
     def instantiate(self) -> list[Launchable]:
 
+        launchables: list[Launchable] = [recipe.build() for recipe in self.recipes()]
+
+        # Just a sanity check...
+        assert all([isinstance(launchable, Launchable) for launchable in launchables]), \
+            "All values returned from instantiate() MUST be Launchables"
+
+        return launchables
+
+    def recipes(
+        self,
+        group: str | None = None,
+        cpus: list[int] | None = None,
+        depends_on: list[Dependency] | None = None,
+    ) -> list[LaunchRecipe]:
+        """
+        What instantiate() would build, without building it. `group`, `cpus` and
+        `depends_on` are inherited from the description we're nested in, if any.
+        """
+
         if self.to_launch is None:
             raise Exception(f"LaunchDescription {self.name} has no 'to_launch' assigned.")
 
-        launchables: list[Launchable] = []
+        group = self.group if self.group is not None else group
+        cpus = self.cpus if self.cpus is not None else cpus
+        if self.depends_on is not None:
+            depends_on = (depends_on or []) + [
+                dependency for dependency in self.depends_on if dependency not in (depends_on or [])]
+
+        recipes: list[LaunchRecipe] = []
 
         for launch in self.to_launch:
             # TODO: There's something funky going on with imports from entrypoints that causes
@@ -250,19 +420,19 @@ class LaunchDescription():
                 # TODO: I'm providing ALL params of the parent to the launchable here,
                 # could I just provide the needed subset (maybe as a optional param to this function)
                 # when I call instantiate on the nested LaunchDescription?
-                launchables.append(launch(**unravel_params(self.params))) # type: ignore
+                recipes.append(LaunchRecipe(
+                    launchable_class=launch, # type: ignore
+                    kwargs=unravel_params(self.params),
+                    group=group,
+                    cpus=cpus,
+                    depends_on=list(depends_on) if depends_on is not None else None))
             elif isinstance(launch, LaunchDescription):
                 # Danger! Recursive...
-                sub_launchables: list[Launchable] = launch.instantiate()
-                launchables.extend(sub_launchables)
+                recipes.extend(launch.recipes(group=group, cpus=cpus, depends_on=depends_on))
             else:
                 raise Exception(f"Something is very wrong... {self.to_launch}")
 
-        # Just a sanity check...
-        assert all([isinstance(launchable, Launchable) for launchable in launchables]), \
-            "All values returned from instantiate() MUST be Launchables"
-
-        return launchables
+        return recipes
 
 
 def get_launch_description(
@@ -295,14 +465,45 @@ def find_launch_file(package: str, launch_file_name: str) -> pathlib.Path:
     return meta.get_launch_file(launch_file_name=launch_file_name)
 
 
+# Launch files that have already been executed, by path: (mtime, module). Getting a launch
+# file's params and then its descriptions shouldn't mean running it twice.
+_launch_files: dict[pathlib.Path,tuple[int,ModuleType]] = {}
+# Everything passed to load_launch_file() while someone's recording (see recording_launch_files).
+_recordings: list[list[pathlib.Path]] = []
+
+
+@contextlib.contextmanager
+def recording_launch_files() -> Iterator[list[pathlib.Path]]:
+    """
+    Collect the path of every launch file that's loaded in this block, nested ones included.
+    """
+    recorded: list[pathlib.Path] = []
+    _recordings.append(recorded)
+    try:
+        yield recorded
+    finally:
+        _recordings.remove(recorded)
+
+
 def load_launch_file(launch_file_path: pathlib.Path) -> ModuleType:
 
+    path: pathlib.Path = pathlib.Path(launch_file_path).resolve()
+    for recorded in _recordings:
+        if path not in recorded:
+            recorded.append(path)
+
+    mtime: int = path.stat().st_mtime_ns
+    loaded: tuple[int,ModuleType] | None = _launch_files.get(path, None)
+    if loaded is not None and loaded[0] == mtime:
+        return loaded[1]
+
     spec: ModuleSpec | None = importlib.util.spec_from_file_location(name="launch_file", location=launch_file_path)
     if spec is None:
         raise Exception(f"Failed to get spec for launch file {launch_file_path}, for some reason.")
     launch_file: ModuleType = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(launch_file)
 
+    _launch_files[path] = (mtime, launch_file)
     return launch_file
 
 
@@ -455,6 +656,29 @@ def phase_postlaunch(launchable: Launchable) -> bool:
     
     return True
 
+def run_dedicated(func: Callable[..., T], *args: Any, name: str | None = None) -> concurrent.futures.Future:
+    """
+    Run `func(*args)` in a thread of its own, and get a Future for it.
+
+    Launch phases don't go to a ThreadPoolExecutor: its workers are capped (at
+    min(32, CPUs + 4), by default), and since launch() usually doesn't return until
+    shutdown, anything past the cap would never get to start.
+    """
+
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=name).start()
+    return future
+
+
 def launch_concurrent(
     launchables: list[Launchable], 
     func: Callable[[Launchable],bool],
@@ -462,7 +686,7 @@ def launch_concurrent(
 # ) -> tuple[bool, list[Launchable]]: # list contains Launchables that returned early. 
 ) -> bool:
     """
-    Launch the given set of Launchables using a concurrent.futures.ThreadPoolExecutor.
+    Launch the given set of Launchables, each in its own thread (see run_dedicated).
     """
 
     # Register a CTRL-C handler that will shutdown all of the Launchables.
@@ -471,31 +695,29 @@ def launch_concurrent(
             launchable.shutdown()
     signal.signal(signal.SIGINT, ctrl_c_handler)
 
-    # Spin up a thread pool for all of the Launchables.
-    with concurrent.futures.ThreadPoolExecutor(max_workers=None) as exec:
-
-        launch_group_futures: dict[concurrent.futures.Future, Launchable] = {}
-        for launchable in launchables:
-            future: concurrent.futures.Future = exec.submit(func, launchable)
-            launch_group_futures[future] = launchable
-
-        # ## An option to resolve the TODO in launch_phase_by_phase could be something like this?
-        # ## This works! But I need to figure out how to better integrate it (and if I need it at all).
-        # finished_early: list[Launchables]
-        # for completed in concurrent.futures.as_completed(fs=launch_group_futures.keys()):
-        #     if completed.result() == True:
-        #         if post_func is not None:
-        #             exec.submit(post_func, launch_group_futures[completed])
-        #             finished_early.append(launch_group_futures[completed])
-
-        done, not_done = concurrent.futures.wait(
-            launch_group_futures.keys(),
-            timeout=None,
-            return_when=concurrent.futures.ALL_COMPLETED)
-        
-        for finished_task in done:
-            if not finished_task.result():
-                return False
+    launch_group_futures: dict[concurrent.futures.Future, Launchable] = {}
+    for launchable in launchables:
+        future: concurrent.futures.Future = run_dedicated(
+            func, launchable, name=f"launch-{launchable.name}")
+        launch_group_futures[future] = launchable
+
+    # ## An option to resolve the TODO in launch_phase_by_phase could be something like this?
+    # ## This works! But I need to figure out how to better integrate it (and if I need it at all).
+    # finished_early: list[Launchables]
+    # for completed in concurrent.futures.as_completed(fs=launch_group_futures.keys()):
+    #     if completed.result() == True:
+    #         if post_func is not None:
+    #             exec.submit(post_func, launch_group_futures[completed])
+    #             finished_early.append(launch_group_futures[completed])
+
+    done, not_done = concurrent.futures.wait(
+        launch_group_futures.keys(),
+        timeout=None,
+        return_when=concurrent.futures.ALL_COMPLETED)
+    
+    for finished_task in done:
+        if not finished_task.result():
+            return False
 
     # return True, finished_early
     return True
@@ -514,6 +736,8 @@ def launch_phase_by_phase(launchables: list[Launchable]) -> None:
     #
     # This isn't a huge problem right now since for the most part, the post_launch phase
     # doesn't do very much...
+    #
+    # (launch_by_dependencies() doesn't have this problem, and is what launch_all() uses now.)
 
     LOG("INFO", f"Starting <PRELAUNCH> phase.")
     if not launch_concurrent(launchables, phase_prelaunch):
@@ -532,6 +756,477 @@ def launch_phase_by_phase(launchables: list[Launchable]) -> None:
     LOG("INFO", f"Finished <POSTLAUNCH> phase.")
 
 
+# How often we check on dependencies that aren't other Launchables (e.g., topics), in seconds.
+DEPENDENCY_POLL_PERIOD: float = 0.05
+
+
+@dataclass
+class LaunchTimeline:
+    """
+    When one Launchable went through each of its phases, in seconds since the launch began.
+    """
+    name: str
+    depends_on: list[Dependency] | None = None
+    # phase -> (started, finished)
+    phases: dict[str,tuple[float,float]] = field(default_factory=dict)
+    # The last of its dependencies to be satisfied (i.e., the one it actually waited on), and when.
+    waited_for: Dependency | None = None
+    waited_until: float = 0.0
+    # The phase that failed, if one did.
+    failed: str | None = None
+
+    @property
+    def ready(self) -> float | None:
+        """
+        When it finished pre-launching (successfully), if it has.
+        """
+        prelaunch: tuple[float,float] | None = self.phases.get("PRELAUNCH", None)
+        if prelaunch is None or self.failed == "PRELAUNCH":
+            return None
+        return prelaunch[1]
+
+
+@dataclass
+class LaunchReport:
+    ok: bool = True
+    timelines: list[LaunchTimeline] = field(default_factory=list)
+
+    def time_to_ready(self) -> float | None:
+        readies: list[float | None] = [timeline.ready for timeline in self.timelines]
+        if not readies or None in readies:
+            return None
+        return max(readies)
+
+    def critical_path(self) -> list[str]:
+        """
+        What time-to-ready came down to: the last Launchable to be ready, what it waited
+        for, what THAT waited for, and so on. Earliest first.
+        """
+
+        ready: list[LaunchTimeline] = [timeline for timeline in self.timelines if timeline.ready is not None]
+        if not ready:
+            return []
+        by_name: dict[str,LaunchTimeline] = {timeline.name: timeline for timeline in self.timelines}
+
+        path: list[str] = []
+        current: LaunchTimeline | None = max(ready, key=lambda timeline: timeline.ready)
+        while current is not None:
+            started, finished = current.phases["PRELAUNCH"]
+            path.append(f"<{current.name}> pre-launched {started:.3f}s -> {finished:.3f}s")
+            dependency: Dependency | None = current.waited_for
+            if dependency is None:
+                break
+            path.append(f"<{current.name}> waited for {dependency} until {current.waited_until:.3f}s")
+            current = by_name.get(dependency.target, None) if dependency.kind == DEPENDS_ON_READY else None
+
+        return list(reversed(path))
+
+    def __str__(self) -> str:
+        time_to_ready: float | None = self.time_to_ready()
+        lines: list[str] = [
+            f"Time to ready: {time_to_ready:.3f}s" if time_to_ready is not None else "Not everything got ready."]
+        lines.append("Critical path:")
+        lines.extend(f"    {step}" for step in self.critical_path())
+        return "\n".join(lines)
+
+
+def check_dependencies(
+    launchables: list[Launchable],
+    depends_on: list[list[Dependency] | None],
+) -> dict[str,int]:
+    """
+    Make sure every Launchable that's depended on exists (exactly once), and that nothing
+    ends up waiting on itself.
+
+    Returns:
+        dict[str,int]: Launchable name -> index, for everything that's depended on
+    """
+
+    indices: dict[str,list[int]] = {}
+    for i, launchable in enumerate(launchables):
+        indices.setdefault(launchable.name, []).append(i)
+
+    after: list[list[int]] = []
+    for launchable, dependencies in zip(launchables, depends_on):
+        waits_for: list[int] = []
+        for dependency in dependencies or []:
+            if dependency.kind == DEPENDS_ON_TOPIC:
+                continue
+            if dependency.kind != DEPENDS_ON_READY:
+                raise LaunchError(f"<{launchable.name}> has a dependency of unknown kind: {dependency}")
+            found: list[int] = indices.get(dependency.target, [])
+            if len(found) != 1:
+                raise LaunchError(f"<{launchable.name}> depends on {dependency}, but there are " \
+                    f"{len(found)} Launchables with that name.")
+            waits_for.append(found[0])
+        after.append(waits_for)
+
+    # Anything that (eventually) waits on itself would never start.
+    NOT_VISITED, VISITING, VISITED = 0, 1, 2
+    state: list[int] = [NOT_VISITED] * len(launchables)
+    def visit(i: int, chain: list[str]) -> None:
+        if state[i] == VISITED:
+            return
+        if state[i] == VISITING:
+            raise LaunchError(f"Launch dependencies go round in a circle: {' -> '.join(chain)}")
+        state[i] = VISITING
+        for j in after[i]:
+            visit(j, chain + [launchables[j].name])
+        state[i] = VISITED
+    for i, launchable in enumerate(launchables):
+        visit(i, [launchable.name])
+
+    return {name: found[0] for name, found in indices.items() if len(found) == 1}
+
+
+def launch_by_dependencies(
+    launchables: list[Launchable],
+    depends_on: list[list[Dependency] | None] | None = None,
+) -> LaunchReport:
+    """
+    Launch the given Launchables, each in a thread of its own, moving each of them through
+    its phases as soon as it can, rather than phase by phase:
+    * it pre-launches as soon as its dependencies (if any) are satisfied,
+    * it launches as soon as it's done pre-launching; or, if it didn't say what it depends
+      on (None), once everything else that didn't say is done too (like launch_phase_by_phase),
+    * it post-launches as soon as its own launch() returns.
+
+    If anything fails, nothing that hasn't started a phase yet will, and everything that
+has is shut down (it may well be sitting in launch(), waiting to be).
+
+    Returns when everything has finished. The critical path to everything being ready
+    (i.e., done pre-launching) is logged as soon as it is.
+    """
+
+    depends_on = depends_on if depends_on is not None else [None] * len(launchables)
+    names: dict[str,int] = check_dependencies(launchables, depends_on)
+
+    start: float = time.monotonic()
+    report: LaunchReport = LaunchReport(timelines=[
+        LaunchTimeline(name=launchable.name, depends_on=dependencies)
+        for launchable, dependencies in zip(launchables, depends_on)])
+
+    # Everything that changes what somebody might be waiting for happens under `changed`.
+    changed: threading.Condition = threading.Condition()
+    abort: threading.Event = threading.Event()
+    # Counted down as things finish pre-launching (one way or another). Counts, rather
+    # than checking everyone every time, since there might be hundreds of them.
+    not_prelaunched: list[int] = [len(launchables)]
+    undeclared: list[int] = [sum(1 for dependencies in depends_on if dependencies is None)]
+    # Set once all of the Launchables that didn't say what they depend on are done pre-launching.
+    barrier: threading.Event = threading.Event()
+    if undeclared[0] == 0:
+        barrier.set()
+    # Who's started a phase, and so has to be shut down if the launch is aborted.
+    started: list[bool] = [False] * len(launchables)
+    discovery_lock: threading.Lock = threading.Lock()
+    discovery: list[Any] = []
+
+    def now() -> float:
+        return time.monotonic() - start
+
+    def stop() -> list[Launchable]:
+        """
+        Abort the launch, shutting down (and returning) everybody who'd started a phase.
+        """
+        with changed:
+            if abort.is_set():
+                return []
+            abort.set()
+            barrier.set()
+            changed.notify_all()
+            # Nobody starts a phase once abort is set, so this is everyone who ever will.
+            running: list[Launchable] = [
+                launchable for launchable, began in zip(launchables, started) if began]
+
+        for launchable in running:
+            try:
+                launchable.shutdown()
+            except Exception as e:
+                LOG("ERR", f"Shutting down <{launchable.name}> after an aborted launch raised: {e}")
+        return running
+
+    def publishing(topic_name: str) -> bool:
+        with discovery_lock:
+            if not discovery:
+                # Only now, since it brings grpc with it.
+                from toybox_core.discovery import get_discovery
+                discovery.append(get_discovery())
+        return bool(discovery[0].topic_publishers(topic_name))
+
+    def wait_for(i: int) -> bool:
+        timeline: LaunchTimeline = report.timelines[i]
+        pending: list[Dependency] = list(depends_on[i] or [])
+
+        def satisfied(dependency: Dependency) -> None:
+            pending.remove(dependency)
+            timeline.waited_for = dependency
+            timeline.waited_until = now()
+
+        while True:
+            # Topics are checked outside of the lock, since it can take a while.
+            for dependency in [dep for dep in pending if dep.kind == DEPENDS_ON_TOPIC]:
+                if publishing(dependency.target):
+                    satisfied(dependency)
+            with changed:
+                for dependency in [dep for dep in pending if dep.kind == DEPENDS_ON_READY]:
+                    if report.timelines[names[dependency.target]].ready is not None:
+                        satisfied(dependency)
+                if not pending:
+                    return True
+                if abort.is_set():
+                    return False
+                polling: bool = any(dep.kind == DEPENDS_ON_TOPIC for dep in pending)
+                changed.wait(timeout=DEPENDENCY_POLL_PERIOD if polling else None)
+
+    def wait_for_everyone_else() -> bool:
+        barrier.wait()
+        return not abort.is_set()
+
+    def run_phase(i: int, phase: str, func: Callable[[Launchable],bool]) -> bool:
+        with changed:
+            if abort.is_set():
+                return False
+            started[i] = True
+        began: float = now()
+        try:
+            result: bool = func(launchables[i])
+        except Exception as e:
+            LOG("ERR", f"Launch phase <{phase}> for <{launchables[i].name}> raised: {e}")
+            result = False
+        report.timelines[i].phases[phase] = (began, now())
+        if not result:
+            report.timelines[i].failed = phase
+            stop()
+        return result
+
+    def run(i: int) -> bool:
+
+        if not wait_for(i):
+            return False
+
+        result: bool = run_phase(i, "PRELAUNCH", phase_prelaunch)
+        with changed:
+            not_prelaunched[0] -= 1
+            if depends_on[i] is None:
+                undeclared[0] -= 1
+                if undeclared[0] == 0:
+                    barrier.set()
+            changed.notify_all()
+        if not result:
+            return False
+
+        if depends_on[i] is None and not wait_for_everyone_else():
+            return False
+        if not run_phase(i, "LAUNCH", phase_launch):
+            return False
+        return run_phase(i, "POSTLAUNCH", phase_postlaunch)
+
+    if threading.current_thread() is threading.main_thread():
+        # Register a CTRL-C handler that will shutdown all of the Launchables.
+        def ctrl_c_handler(signum, frame) -> None:
+            already: set[int] = {id(launchable) for launchable in stop()}
+            for launchable in launchables:
+                if id(launchable) not in already:
+                    launchable.shutdown()
+        signal.signal(signal.SIGINT, ctrl_c_handler)
+
+    # Every Launchable gets its own thread, since most of them will spend their lives
+    # waiting (for dependencies, or in launch()).
+    futures: list[concurrent.futures.Future] = [
+        run_dedicated(run, i, name=f"launch-{launchable.name}") for i, launchable in enumerate(launchables)]
+
+    with changed:
+        changed.wait_for(lambda: abort.is_set() or not_prelaunched[0] == 0)
+    LOG("INFO", f"Launch {'aborted' if abort.is_set() else 'ready'}.\n{report}")
+
+    report.ok = all(future.result() for future in futures)
+    return report
+
+
+# The phases of launch_phase_by_phase(), in order.
+PHASES: list[tuple[str, Callable[[Launchable],bool]]] = [
+    ("PRELAUNCH", phase_prelaunch),
+    ("LAUNCH", phase_launch),
+    ("POSTLAUNCH", phase_postlaunch),
+]
+
+# How often we check on a launch group's process while waiting for it, in seconds.
+GROUP_POLL_PERIOD: float = 0.1
+
+# What every launch group's process is going to import anyway, so the launcher's
+# forkserver imports it once, up front (see launch_context).
+WARM_MODULES: list[str] = [
+    "grpc",
+    "google.protobuf.message",
+    # Which brings the rest of the tbx client side (connection, discovery, the core
+    # toybox_msgs) with it.
+    "toybox_core.node",
+    "toybox_core.launch",
+]
+
+
+def launch_context(
+    start_method: str | None = None,
+    preload: list[str] | None = None,
+) -> multiprocessing.context.BaseContext:
+    """
+    Where launch groups' processes come from. By default, a forkserver: a warm interpreter,
+    with WARM_MODULES (and `preload`, e.g. the modules our Launchables live in) already
+    imported, that every launch group is forked from. So a new node process starts without
+    paying for grpc, protobuf, etc. all over again. Where there's no forkserver, it's spawn
+    (a fresh interpreter every time).
+
+    Not plain fork: by now this process may well have threads of its own (e.g., a tbx-server).
+    The forkserver doesn't; all it does is import.
+
+    The forkserver is started the first time it's needed and lives as long as we do, so
+    only what's asked to be preloaded before then is.
+    """
+
+    if start_method is None:
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context: multiprocessing.context.BaseContext = multiprocessing.get_context(start_method)
+
+    if start_method == "forkserver":
+        # __main__ is special to the forkserver (it'd be re-run as a script), so leave it out.
+        modules: list[str] = WARM_MODULES + [module for module in preload or [] if module != "__main__"]
+        context.set_forkserver_preload(list(dict.fromkeys(modules)))
+
+    return context
+
+
+def warm_up_launcher(preload: list[str] | None = None, wait: bool = False) -> None:
+    """
+    Start the launcher's forkserver now (rather than when the first launch group needs
+    it), e.g. while the tbx-server is starting. If `wait`, don't return until it's
+    done importing.
+    """
+
+    context: multiprocessing.context.BaseContext = launch_context(preload=preload)
+    if context.get_start_method() != "forkserver":
+        return
+
+    multiprocessing.forkserver.ensure_running()
+    if wait:
+        # The forkserver can't fork anything until it's done with its imports.
+        process: multiprocessing.Process = context.Process(target=time.sleep, args=(0,))
+        process.start()
+        process.join()
+
+
+def group_recipes(recipes: list[LaunchRecipe]) -> dict[str,list[LaunchRecipe]]:
+    """
+    Sort recipes into the processes they'll run in. Ungrouped ones get a process each.
+    """
+
+    groups: dict[str,list[LaunchRecipe]] = {}
+    for index, recipe in enumerate(recipes):
+        name: str = recipe.group if recipe.group is not None \
+            else f"{recipe.launchable_class.__name__}_{index}"
+        groups.setdefault(name, []).append(recipe)
+    return groups
+
+
+def _run_launch_group(
+    group: str,
+    recipes: list[LaunchRecipe],
+    results: multiprocessing.Queue,
+    go: list[multiprocessing.synchronize.Event],
+    abort: multiprocessing.synchronize.Event,
+) -> None:
+    """
+    The body of one launch group's process: launch_phase_by_phase() for just our
+    Launchables, except that between phases we report in, and wait until every other
+    group has finished the same phase too.
+    """
+
+    cpus: list[int] | None = recipes[0].cpus
+    if cpus:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+        else:
+            LOG("WARN", f"Can't pin launch group <{group}> to CPUs {cpus} on this platform.")
+
+    try:
+        launchables: list[Launchable] = [recipe.build() for recipe in recipes]
+    except Exception as e:
+        LOG("ERR", f"Failed to instantiate launch group <{group}>: {e}")
+        results.put((group, False))
+        return
+
+    for index, (phase, func) in enumerate(PHASES):
+        results.put((group, launch_concurrent(launchables, func)))
+
+        while not go[index].wait(timeout=GROUP_POLL_PERIOD):
+            if abort.is_set():
+                LOG("DEBUG", f"Launch group <{group}> stopping after <{phase}>; another group failed.")
+                for launchable in launchables:
+                    launchable.shutdown()
+                return
+
+
+def launch_in_processes(recipes: list[LaunchRecipe], start_method: str | None = None) -> bool:
+    """
+    launch_phase_by_phase(), with each launch group in its own process (so they don't
+    share a GIL). Every group finishes a phase before any group starts the next one,
+    like the threads of launch_phase_by_phase() do.
+
+    The processes come from launch_context(start_method).
+    """
+
+    context: multiprocessing.context.BaseContext = launch_context(
+        start_method=start_method,
+        preload=[recipe.launchable_class.__module__ for recipe in recipes])
+    results: multiprocessing.Queue = context.Queue()
+    go: list[multiprocessing.synchronize.Event] = [context.Event() for _ in PHASES]
+    abort: multiprocessing.synchronize.Event = context.Event()
+
+    processes: dict[str, multiprocessing.Process] = {}
+    for group, members in group_recipes(recipes).items():
+        process: multiprocessing.Process = context.Process(
+            target=_run_launch_group,
+            args=(group, members, results, go, abort),
+            name=f"tbx_launch_{group}")
+        process.start()
+        processes[group] = process
+
+    succeeded: bool = True
+    try:
+        for index, (phase, _) in enumerate(PHASES):
+            LOG("INFO", f"Starting <{phase}> phase in {len(processes)} processes.")
+
+            reported: dict[str,bool] = {}
+            while len(reported) < len(processes):
+                try:
+                    group, result = results.get(timeout=GROUP_POLL_PERIOD)
+                    reported[group] = result
+                except Empty:
+                    for group, process in processes.items():
+                        if group not in reported and not process.is_alive():
+                            LOG("ERR", f"Launch group <{group}> died during <{phase}> (exit code {process.exitcode}).")
+                            reported[group] = False
+
+            failed: list[str] = [group for group, result in reported.items() if not result]
+            if failed:
+                LOG("ERR", f"<{phase}> phase failed for launch groups {failed}.")
+                succeeded = False
+                break
+
+            LOG("INFO", f"Finished <{phase}> phase.")
+            go[index].set()
+    except KeyboardInterrupt:
+        # Our launch groups got the same CTRL-C, and are shutting themselves down.
+        succeeded = False
+
+    if not succeeded:
+        abort.set()
+    for process in processes.values():
+        process.join()
+
+    return succeeded
+
+
 def launch_tbx_server() -> tuple[Launchable,threading.Thread]:
 
     # TODO: getting the TbxServer description is probably a "special case" that I can just create a 
@@ -552,9 +1247,15 @@ def launch_tbx_server() -> tuple[Launchable,threading.Thread]:
     return (tbx_server, tbx_server_thread)
 
 
-def launch_all(launch_desc: LaunchDescription, no_server: bool = False, random_launch_order: bool = True) -> None:
+def launch_all(
+    launch_desc: LaunchDescription, 
+    no_server: bool = False, 
+    random_launch_order: bool = True,
+    mode: LaunchMode = LaunchMode.THREAD,
+) -> None:
     """
-    Launch all provided LaunchDescriptions in parallel.
+    Launch all provided LaunchDescriptions in parallel; in threads of this process, or
+    in a process per launch group (see LaunchMode).
 
     Returns when all Launched objects have finished.
     """
@@ -563,21 +1264,63 @@ def launch_all(launch_desc: LaunchDescription, no_server: bool = False, random_l
         raise LaunchError("Nothing to launch!")
 
     # Resolve any LaunchDescriptions within our top-level LaunchDescription
-    # and get a set of Launchables.
-    launchables: list[Launchable] = launch_desc.instantiate()
-    
+    # and get the makings of a set of Launchables.
+    launch_recipes(
+        recipes=launch_desc.recipes(),
+        no_server=no_server,
+        random_launch_order=random_launch_order,
+        mode=mode)
+
+
+def launch_recipes(
+    recipes: list[LaunchRecipe],
+    no_server: bool = False,
+    random_launch_order: bool = True,
+    mode: LaunchMode = LaunchMode.THREAD,
+) -> None:
+    """
+    launch_all(), for Launchables that have already been worked out (e.g., from a
+    LaunchPlan; see toybox_core.launch_plan).
+    """
+
+    if not recipes:
+        raise LaunchError("Nothing to launch!")
+
     # DEBUG: does ordering change the behavior here?
-    if random_launch_order:
-        random.shuffle(launchables)
+    if random_launch_order and mode is LaunchMode.THREAD:
+        recipes = random.sample(recipes, k=len(recipes))
+
+    launchables: list[Launchable] = []
+    if mode is LaunchMode.THREAD:
+        launchables = [recipe.build() for recipe in recipes]
+        assert all([isinstance(launchable, Launchable) for launchable in launchables]), \
+            "All values returned from instantiate() MUST be Launchables"
+    elif any(recipe.depends_on for recipe in recipes):
+        LOG("WARN", "Launch dependencies only apply to LaunchMode.THREAD; " \
+            "launch groups go phase by phase, regardless.")
+
+    # Get the launcher's forkserver importing while we see about the tbx-server.
+    if mode is LaunchMode.PROCESS:
+        warm_up_launcher(preload=[recipe.launchable_class.__module__ for recipe in recipes])
 
-    # If we don't have an instance of tbx-server running, add it here.
+    # If we don't have an instance of tbx-server running (and we need one), add it here.
     tbx_server: Launchable | None = None
     server_thread: threading.Thread | None = None
+    # Deferred, because they bring grpc with them, and plenty of people import this
+    # module without ever launching anything (e.g., to read a launch file's params).
+    from toybox_core.discovery import LOCAL_DISCOVERY, get_discovery_kind
+    from toybox_core.rpc.health import try_health_check_rpc
+    no_server = no_server or get_discovery_kind() == LOCAL_DISCOVERY
     if not no_server and not try_health_check_rpc() :
         tbx_server, server_thread = launch_tbx_server()
 
     # Actually begin the launch process for our launchables.
-    launch_phase_by_phase(launchables=launchables)
+    if mode is LaunchMode.PROCESS:
+        launch_in_processes(recipes=recipes)
+    else:
+        launch_by_dependencies(
+            launchables=launchables,
+            depends_on=[recipe.depends_on for recipe in recipes])
 
     # If we inserted a tbx-server, we "need" to kill it when we're done.
     if tbx_server is not None:
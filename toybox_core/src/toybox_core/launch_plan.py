@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+"""
+Compiled launch plans.
+
+Launching a file means finding its package, running the launch file (and any launch
+files it pulls in), discovering every node it mentions, and introspecting their
+constructors, all to end up with a flat list of "make this class with these kwargs, in
+this group". A LaunchPlan is that list, written down. The next time somebody launches
+the same file with the same arguments, and none of the files it was compiled from have
+changed, we skip straight to the list.
+
+Plans live in $TBX_PLAN_CACHE, or in the user's cache directory.
+"""
+
+from dataclasses import asdict, dataclass, field
+import hashlib
+import json
+import os
+import pathlib
+import pkgutil
+import sys
+import tempfile
+from typing import Any
+
+from toybox_core.index import cache_dir
+from toybox_core.launch import (
+    Dependency,
+    LaunchDescription,
+    LaunchRecipe,
+    NodeParam,
+    get_launch_descs_from_file,
+    get_launch_params_from_file,
+    recording_launch_files,
+)
+from toybox_core.logging import LOG
+from toybox_core.metadata import ToyboxMetadata, find_pyproject_toml
+
+
+TBX_PLAN_CACHE_ENV: str = "TBX_PLAN_CACHE"
+PLAN_VERSION: int = 2
+
+
+def default_plan_dir() -> pathlib.Path:
+    path: str | None = os.environ.get(TBX_PLAN_CACHE_ENV, None)
+    if path:
+        return pathlib.Path(path)
+    return cache_dir() / "plans"
+
+
+def plan_key(package: str, launch_file_name: str, args: dict[str,Any]) -> str:
+    """
+    What a plan is filed under: what was launched, with what, by which interpreter.
+    """
+    data: str = json.dumps({
+        "version": PLAN_VERSION,
+        "prefix": sys.prefix,
+        "package": package,
+        "launch_file": launch_file_name,
+        "args": {name: repr(value) for name, value in sorted(args.items())},
+    }, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _hash_file(path: str) -> str | None:
+    try:
+        return hashlib.sha256(pathlib.Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _json_safe(value: Any) -> bool:
+    if value is None or type(value) in (bool, int, float, str):
+        return True
+    if type(value) is list:
+        return all(_json_safe(item) for item in value)
+    if type(value) is dict:
+        return all(type(key) is str and _json_safe(item) for key, item in value.items())
+    return False
+
+
+@dataclass
+class PlannedLaunchable:
+    # "<module>:<qualified name>" of the Launchable's class.
+    target: str
+    kwargs: dict[str,Any]
+    group: str | None = None
+    cpus: list[int] | None = None
+    # Dependency, as dicts.
+    depends_on: list[dict[str,str]] | None = None
+
+
+@dataclass
+class LaunchPlan:
+    key: str
+    # Every file the plan was worked out from (launch files, and the modules the
+    # Launchables live in), and its sha256. If any of them change, so might the plan.
+    files: dict[str,str] = field(default_factory=dict)
+    launchables: list[PlannedLaunchable] = field(default_factory=list)
+
+    def valid(self) -> bool:
+        return all(_hash_file(path) == digest for path, digest in self.files.items())
+
+    def recipes(self) -> list[LaunchRecipe]:
+        """
+        The plan, ready to launch. This imports the Launchables' modules (which launching
+        them would have done anyway), and nothing else.
+        """
+        return [
+            LaunchRecipe(
+                launchable_class=pkgutil.resolve_name(launchable.target),
+                kwargs=dict(launchable.kwargs),
+                group=launchable.group,
+                cpus=list(launchable.cpus) if launchable.cpus is not None else None,
+                depends_on=[Dependency(**dependency) for dependency in launchable.depends_on]
+                    if launchable.depends_on is not None else None)
+            for launchable in self.launchables]
+
+    @classmethod
+    def from_dict(cls, data: dict[str,Any]) -> "LaunchPlan":
+        launchables: list[PlannedLaunchable] = [
+            PlannedLaunchable(**launchable) for launchable in data.pop("launchables", [])]
+        return cls(launchables=launchables, **data)
+
+
+class PlanCache():
+
+    def __init__(self, directory: pathlib.Path | str | None = None) -> None:
+        self._directory: pathlib.Path = \
+            pathlib.Path(directory) if directory is not None else default_plan_dir()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self._directory / f"{key}.json"
+
+    def load(self, key: str) -> LaunchPlan | None:
+        """
+        The plan filed under `key`, if there is one and it's still good.
+        """
+
+        try:
+            data: dict[str,Any] = json.loads(self._path(key).read_text())
+        except (OSError, ValueError):
+            return None
+        if data.pop("version", None) != PLAN_VERSION:
+            return None
+
+        try:
+            plan: LaunchPlan = LaunchPlan.from_dict(data)
+        except TypeError as e:
+            LOG("WARN", f"Ignoring malformed launch plan at {self._path(key)}: {e}")
+            return None
+
+        if plan.key != key or not plan.valid():
+            return None
+        return plan
+
+    def save(self, plan: LaunchPlan) -> None:
+
+        data: dict[str,Any] = {"version": PLAN_VERSION, **asdict(plan)}
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename, so nobody ever reads half a plan.
+            descriptor, temp_path = tempfile.mkstemp(dir=self._directory, prefix=".plan-")
+            with os.fdopen(descriptor, "w") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self._path(plan.key))
+        except OSError as e:
+            LOG("WARN", f"Failed to write launch plan to {self._path(plan.key)}: {e}")
+
+    @property
+    def directory(self) -> pathlib.Path:
+        return self._directory
+
+
+def compile_launch_file(
+    package: str,
+    launch_file_name: str,
+    args: dict[str,Any],
+) -> tuple[list[LaunchRecipe], LaunchPlan | None]:
+    """
+    Work out everything that launching `launch_file_name` (from `package`) with `args`
+    would launch, the slow way.
+
+    Returns:
+        tuple[list[LaunchRecipe], LaunchPlan | None]: the recipes, and a plan of them, \
+            or None if they can't be written down (e.g., a class defined in a launch file).
+    """
+
+    toml_path: pathlib.Path = find_pyproject_toml(module_name=package)
+    meta: ToyboxMetadata | None = ToyboxMetadata.extract_from_toml(toml_path=toml_path)
+    if meta is None:
+        raise Exception(f"Failed to process metadata for package {package}")
+
+    launch_file: pathlib.Path = meta.get_launch_file(launch_file_name=launch_file_name)
+
+    with recording_launch_files() as launch_files:
+        launch_params: dict[str,NodeParam] = get_launch_params_from_file(launch_file_path=launch_file)
+        # I need to handle required params here....
+        for name, value in args.items():
+            param: NodeParam | None = launch_params.get(name, None)
+            if param is None:
+                continue
+            param.value = value
+
+        launch_group: LaunchDescription = get_launch_descs_from_file(
+            launch_file_path=launch_file,
+            launch_params=launch_params)
+        recipes: list[LaunchRecipe] = launch_group.recipes()
+
+    plan: LaunchPlan = LaunchPlan(key=plan_key(package, launch_file_name, args))
+    sources: list[str] = [str(path) for path in launch_files]
+    for recipe in recipes:
+        launchable_class: type = recipe.launchable_class
+        target: str = f"{launchable_class.__module__}:{launchable_class.__qualname__}"
+        try:
+            resolvable: bool = pkgutil.resolve_name(target) is launchable_class
+        except (ImportError, AttributeError, ValueError):
+            resolvable = False
+        if not resolvable or not _json_safe(recipe.kwargs):
+            LOG("DEBUG", f"Not writing down a plan for {launch_file}: can't record {target}({recipe.kwargs})")
+            return recipes, None
+
+        source: str | None = getattr(sys.modules.get(launchable_class.__module__, None), "__file__", None)
+        if source is not None:
+            sources.append(source)
+        plan.launchables.append(PlannedLaunchable(
+            target=target,
+            kwargs=dict(recipe.kwargs),
+            group=recipe.group,
+            cpus=list(recipe.cpus) if recipe.cpus is not None else None,
+            depends_on=[asdict(dependency) for dependency in recipe.depends_on]
+                if recipe.depends_on is not None else None))
+
+    for source in sources:
+        digest: str | None = _hash_file(source)
+        if digest is None:
+            return recipes, None
+        plan.files[source] = digest
+
+    return recipes, plan
+
+
+def plan_launch_file(
+    package: str,
+    launch_file_name: str,
+    args: dict[str,Any] | None = None,
+    cache: PlanCache | None = None,
+    replan: bool = False,
+) -> list[LaunchRecipe]:
+    """
+    What launching `launch_file_name` (from `package`) with `args` would launch: from
+    its cached plan if there's a good one (and not `replan`), otherwise compiled (and
+    the plan cached for next time).
+    """
+
+    args = args if args is not None else {}
+    cache = cache if cache is not None else PlanCache()
+
+    key: str = plan_key(package, launch_file_name, args)
+    plan: LaunchPlan | None = None if replan else cache.load(key)
+    if plan is not None:
+        try:
+            recipes: list[LaunchRecipe] = plan.recipes()
+            LOG("DEBUG", f"Launching {package}/{launch_file_name} from its plan ({len(recipes)} launchables)")
+            return recipes
+        except (ImportError, AttributeError, ValueError) as e:
+            LOG("DEBUG", f"Cached plan for {package}/{launch_file_name} is out of date ({e}), recompiling.")
+
+    recipes, plan = compile_launch_file(package, launch_file_name, args)
+    if plan is not None:
+        cache.save(plan)
+    return recipes
@@ -26,7 +26,9 @@ class Launchable(ABC):
         Function called to launch the node. Required.
 
         At this point, the TBX server and its resources are available and all other nodes have 
-        completed their prelaunch() phases.
+        completed their prelaunch() phases. (Unless this node was launched with dependencies,
+        in which case, only the ones it depends on are guaranteed to have; see
+        toybox_core.launch.launch_by_dependencies.)
 
         Guaranteed to be called only after pre_launch() and before post_launch().
         """
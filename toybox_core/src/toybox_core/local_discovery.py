@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+
+"""
+Serverless discovery for single-host deployments.
+
+Instead of a tbx-server, every Node on the host shares a registry file (in /dev/shm,
+by default). Writers take an exclusive fcntl lock, rewrite the registry and bump a
+generation counter in the file's header; each process maps that header and polls
+the counter to notice changes, then tells its Nodes about any new (or dead)
+publishers exactly like the tbx-server would. Parameters live in the same file, and
+each process's ParamCache is refreshed from it the same way.
+
+Entries are tagged with the PID that wrote them, so a Node that crashes (and so
+never de-registers) is ignored, and cleaned up by the next writer.
+"""
+
+import base64
+from contextlib import contextmanager
+import fcntl
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from toybox_core.discovery import Discovery
+from toybox_core.logging import LOG
+from toybox_core.rpc.param import ParamCache, to_param_value
+from toybox_core.rpc.register import DeclareNodeResult
+
+import toybox_msgs.core.Node_pb2 as Node_pb2
+from toybox_msgs.core.Node_pb2_grpc import NodeServicer
+from toybox_msgs.core.Param_pb2 import Param, ParamEvent, ParamValue
+from toybox_msgs.core.Service_pb2 import ServiceInfo
+
+
+TBX_LOCAL_REGISTRY_ENV: str = "TBX_LOCAL_REGISTRY"
+
+# magic, format version, generation, length of the JSON body that follows the header
+HEADER: struct.Struct = struct.Struct("<4sIQQ")
+REGISTRY_MAGIC: bytes = b"TBXR"
+REGISTRY_VERSION: int = 1
+
+# How often watchers check the generation counter, in seconds.
+WATCH_PERIOD: float = 0.01
+# How often watchers re-read the registry even if nothing's changed, to notice
+# Nodes that died without cleaning up after themselves.
+LIVENESS_PERIOD: float = 1.0
+
+
+def default_registry_path() -> str:
+    path: str | None = os.environ.get(TBX_LOCAL_REGISTRY_ENV, None)
+    if path:
+        return path
+    directory: str = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"tbx-registry-{os.getuid()}")
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # It exists, it just isn't ours.
+        return True
+    return True
+
+
+def empty_registry() -> dict[str,Any]:
+    return {"clients": {}, "topics": {}, "services": {}, "params": {}}
+
+
+class SharedRegistry():
+    """
+    The registry file itself. The registry is a dict of the form:
+
+        {
+            "clients": {client_id: {"host", "port", "data_port", "pid"}},
+            "topics": {topic_name: {"message_type", "publishers": {client_id: [host, port]}, "subscribers": [client_id]}},
+            "services": {service_name: {"request_type", "response_type", "provider", "host", "port"}},
+            "params": {param_name: {"kind", "value"}}
+        }
+
+    where a parameter's kind is the ParamValue field it'd be sent in (bytes values are
+    base64-encoded).
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+
+        self.path: str = path if path is not None else default_registry_path()
+
+        self._fd: int = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        # flock() locks belong to the open file, not the thread, so threads sharing
+        # _fd would sail straight past each other's locks without this.
+        self._thread_lock: threading.Lock = threading.Lock()
+        with self._locked(fcntl.LOCK_EX):
+            if os.fstat(self._fd).st_size < HEADER.size:
+                self._write(empty_registry(), generation=0)
+            else:
+                magic, version, _, _ = HEADER.unpack(os.pread(self._fd, HEADER.size, 0))
+                if magic != REGISTRY_MAGIC or version != REGISTRY_VERSION:
+                    LOG("WARN", f"Re-initializing unrecognized registry file {self.path}")
+                    self._write(empty_registry(), generation=0)
+
+        # Only the header is mapped; it's all the watchers need to look at.
+        self._header: mmap.mmap = mmap.mmap(self._fd, HEADER.size)
+
+    def close(self) -> None:
+        self._header.close()
+        os.close(self._fd)
+
+    @property
+    def generation(self) -> int:
+        return HEADER.unpack_from(self._header, 0)[2]
+
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        with self._thread_lock:
+            fcntl.flock(self._fd, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _read(self) -> tuple[int,dict[str,Any]]:
+        _, _, generation, length = HEADER.unpack(os.pread(self._fd, HEADER.size, 0))
+        if length == 0:
+            return generation, empty_registry()
+        return generation, json.loads(os.pread(self._fd, length, HEADER.size))
+
+    def _write(self, registry: dict[str,Any], generation: int) -> None:
+        body: bytes = json.dumps(registry, separators=(",", ":")).encode()
+        os.ftruncate(self._fd, HEADER.size + len(body))
+        os.pwrite(self._fd, body, HEADER.size)
+        # The header goes last, so the generation only moves once the body is in place.
+        os.pwrite(self._fd, HEADER.pack(REGISTRY_MAGIC, REGISTRY_VERSION, generation, len(body)), 0)
+
+    def read(self) -> tuple[int,dict[str,Any]]:
+        """
+        Returns:
+            tuple[int,dict[str,Any]]: the generation, and the registry (minus any dead clients)
+        """
+        with self._locked(fcntl.LOCK_SH):
+            generation, registry = self._read()
+        prune_dead_clients(registry)
+        return generation, registry
+
+    @contextmanager
+    def update(self) -> Iterator[dict[str,Any]]:
+        """
+        Modify the registry in place; changes are written back (and the generation bumped)
+        when the context exits without raising.
+        """
+        with self._locked(fcntl.LOCK_EX):
+            generation, registry = self._read()
+            prune_dead_clients(registry)
+            yield registry
+            self._write(registry, generation=generation + 1)
+
+
+def prune_dead_clients(registry: dict[str,Any]) -> list[str]:
+    """
+    Remove clients whose processes are gone, along with their topics.
+    """
+    dead: list[str] = [
+        client_id for client_id, client in registry["clients"].items() if not pid_alive(client["pid"])]
+    remove_clients(registry, dead)
+    return dead
+
+
+def remove_clients(registry: dict[str,Any], client_ids: list[str]) -> None:
+
+    if not client_ids:
+        return
+
+    for client_id in client_ids:
+        registry["clients"].pop(client_id, None)
+
+    orphans: list[str] = []
+    for topic_name, topic in registry["topics"].items():
+        for client_id in client_ids:
+            topic["publishers"].pop(client_id, None)
+        topic["subscribers"] = [sub for sub in topic["subscribers"] if sub not in client_ids]
+        if not topic["publishers"] and not topic["subscribers"]:
+            orphans.append(topic_name)
+
+    for orphan in orphans:
+        del registry["topics"][orphan]
+
+    # Registries written before services existed don't have any.
+    services: dict[str,Any] = registry.setdefault("services", {})
+    for service_name in [name for name, service in services.items() if service["provider"] in client_ids]:
+        del services[service_name]
+
+
+def encode_param(value: Any) -> dict[str,Any]:
+
+    kind: str | None = to_param_value(value).WhichOneof("value")
+    if isinstance(value, bytes):
+        value = base64.b64encode(value).decode()
+    return {"kind": kind, "value": value}
+
+
+def decode_param(param: dict[str,Any]) -> ParamValue:
+
+    value: Any = param["value"]
+    if param["kind"] == "bytes_value":
+        value = base64.b64decode(value)
+    return ParamValue(**{param["kind"]: value})
+
+
+def snapshot_params(cache: ParamCache, generation: int, registry: dict[str,Any]) -> None:
+    """
+    Bring `cache` up to date with the registry's parameters, as if the tbx-server had
+    sent it a snapshot.
+    """
+
+    cache.apply(ParamEvent(kind=ParamEvent.RESET, generation=generation))
+    for name, param in registry.get("params", {}).items():
+        cache.apply(ParamEvent(
+            kind=ParamEvent.SET, generation=generation,
+            param=Param(name=name, value=decode_param(param))))
+    cache.apply(ParamEvent(kind=ParamEvent.SNAPSHOT_END, generation=generation))
+
+
+class LocalDiscovery(Discovery):
+    """
+    Discovery through a SharedRegistry. Follows the same rules as the tbx-server:
+    client IDs are unique, and a topic only ever has one message type.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+
+        self._registry: SharedRegistry = SharedRegistry(path=path)
+
+        # {client_id: servicer to inform of publishers coming and going}
+        self._attached: dict[str,NodeServicer] = {}
+        # {(client_id, topic_name): {publisher_id: (host, port)}} as last told to the client
+        self._known_publishers: dict[tuple[str,str],dict[str,tuple[str,int]]] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._watcher: threading.Thread | None = None
+        # Only once somebody asks for parameters; from then on, the watcher keeps it current.
+        self._params: ParamCache | None = None
+        self._closed: bool = False
+
+    @property
+    def registry(self) -> SharedRegistry:
+        return self._registry
+
+    def close(self) -> None:
+        """
+        Stop watching the registry, and close it.
+        """
+        with self._lock:
+            self._closed = True
+            watcher: threading.Thread | None = self._watcher
+        if watcher is not None:
+            watcher.join(timeout=1.0)
+        self._registry.close()
+
+    def register(self, name: str, host: str, port: int, data_port: int = -1) -> bool:
+
+        with self._registry.update() as registry:
+            return self._register(registry, name=name, host=host, port=port, data_port=data_port)
+
+    def _register(
+        self,
+        registry: dict[str,Any],
+        name: str,
+        host: str,
+        port: int,
+        data_port: int
+    ) -> bool:
+
+        if name in registry["clients"]:
+            LOG("WARN", f"Refused to register client with name <{name}>. Client with that ID already exists.")
+            return False
+
+        registry["clients"][name] = {"host": host, "port": port, "data_port": data_port, "pid": os.getpid()}
+        return True
+
+    def declare(
+        self,
+        name: str,
+        host: str,
+        port: int,
+        data_port: int = -1,
+        advertisements: list[tuple[str,str,int]] | None = None,
+        subscriptions: list[tuple[str,str]] | None = None,
+        reassert: bool = False,
+    ) -> DeclareNodeResult:
+
+        result: DeclareNodeResult = DeclareNodeResult(registered=False, advertised=[], publishers=[])
+
+        with self._registry.update() as registry:
+            if reassert:
+                remove_clients(registry, [name])
+            if not self._register(registry, name=name, host=host, port=port, data_port=data_port):
+                return result
+            result.registered = True
+
+            for topic_name, message_type, topic_port in (advertisements or []):
+                result.advertised.append(self._advertise(
+                    registry, name=name, host=host, topic_port=topic_port,
+                    topic_name=topic_name, message_type=message_type))
+            for topic_name, message_type in (subscriptions or []):
+                result.publishers.append(self._subscribe(
+                    registry, name=name, topic_name=topic_name, message_type=message_type))
+
+        return result
+
+    def advertise(
+        self,
+        name: str,
+        host: str,
+        topic_port: int,
+        topic_name: str,
+        message_type: str,
+    ) -> bool:
+
+        with self._registry.update() as registry:
+            return self._advertise(
+                registry, name=name, host=host, topic_port=topic_port,
+                topic_name=topic_name, message_type=message_type)
+
+    def _advertise(
+        self,
+        registry: dict[str,Any],
+        name: str,
+        host: str,
+        topic_port: int,
+        topic_name: str,
+        message_type: str,
+    ) -> bool:
+
+        topic: dict[str,Any] = registry["topics"].setdefault(
+            topic_name, {"message_type": message_type, "publishers": {}, "subscribers": []})
+
+        if name in topic["publishers"]:
+            LOG("DEBUG", f"Rejecting advertisement from {name} for {topic_name}: Advertiser already declared this topic.")
+            return False
+        if topic["message_type"] != message_type:
+            LOG("DEBUG", f"Rejecting advertisement from {name} for {topic_name}: Message type doesn't match.")
+            return False
+
+        topic["publishers"][name] = [host, topic_port]
+        return True
+
+    def subscribe(self, name: str, topic_name: str, message_type: str) -> list[tuple[str,str,int]]:
+
+        with self._registry.update() as registry:
+            return self._subscribe(registry, name=name, topic_name=topic_name, message_type=message_type)
+
+    def _subscribe(
+        self,
+        registry: dict[str,Any],
+        name: str,
+        topic_name: str,
+        message_type: str,
+    ) -> list[tuple[str,str,int]]:
+
+        topic: dict[str,Any] = registry["topics"].setdefault(
+            topic_name, {"message_type": message_type, "publishers": {}, "subscribers": []})
+
+        if topic["message_type"] != message_type:
+            LOG("WARN", f"Subscriber requested message type {message_type} doesn't match topic definition {topic['message_type']}")
+            return []
+
+        if name not in topic["subscribers"]:
+            topic["subscribers"].append(name)
+
+        publishers: list[tuple[str,str,int]] = [
+            (publisher_id, host, port) for publisher_id, (host, port) in topic["publishers"].items()]
+        with self._lock:
+            self._known_publishers[(name, topic_name)] = {
+                publisher_id: (host, port) for publisher_id, host, port in publishers if publisher_id != name}
+
+        return publishers
+
+    def advertise_relay(
+        self,
+        name: str,
+        host: str,
+        topic_port: int,
+        topic_name: str,
+        message_type: str,
+    ) -> bool:
+        # Nothing here hands out publishers as subscribers come and go, so there's nobody
+        # to send subscribers to a relay.
+        LOG("WARN", f"Relays need a tbx-server; <{name}> won't be sent any subscribers for <{topic_name}>.")
+        return False
+
+    def advertise_service(
+        self,
+        name: str,
+        host: str,
+        service_port: int,
+        service_name: str,
+        request_type: str,
+        response_type: str,
+    ) -> bool:
+
+        with self._registry.update() as registry:
+            services: dict[str,Any] = registry.setdefault("services", {})
+            existing: dict[str,Any] | None = services.get(service_name, None)
+            if existing is not None and existing["provider"] != name:
+                LOG("DEBUG", f"Rejecting advertisement from {name} for service <{service_name}>: " \
+                    f"already provided by {existing['provider']}.")
+                return False
+
+            services[service_name] = {
+                "request_type": request_type,
+                "response_type": response_type,
+                "provider": name,
+                "host": host,
+                "port": service_port}
+        return True
+
+    def topic_publishers(self, topic_name: str) -> list[str]:
+
+        _, registry = self._registry.read()
+        return list(registry["topics"].get(topic_name, {}).get("publishers", {}).keys())
+
+    def lookup_service(self, service_name: str) -> ServiceInfo | None:
+
+        _, registry = self._registry.read()
+        service: dict[str,Any] | None = registry.get("services", {}).get(service_name, None)
+        if service is None:
+            return None
+
+        return ServiceInfo(
+            service_name=service_name,
+            request_type=service["request_type"],
+            response_type=service["response_type"],
+            provider_id=service["provider"],
+            provider_host=service["host"],
+            service_port=service["port"])
+
+    def param_cache(self) -> ParamCache:
+
+        with self._lock:
+            if self._params is None:
+                # Filled in before anyone else can see it, so the watcher can't interleave
+                # its own snapshot with this one.
+                params: ParamCache = ParamCache()
+                snapshot_params(params, *self._registry.read())
+                self._params = params
+                self._start_watcher()
+            return self._params
+
+    def set_param(self, name: str, value: Any) -> bool:
+
+        if not name:
+            LOG("WARN", f"Failed to set parameter <{name}>: Parameters need a name.")
+            return False
+
+        param: dict[str,Any] = encode_param(value)
+        with self._registry.update() as registry:
+            # Registries written before parameters existed don't have any.
+            params: dict[str,Any] = registry.setdefault("params", {})
+            existing: dict[str,Any] | None = params.get(name, None)
+            if existing is not None and existing["kind"] != param["kind"]:
+                LOG("WARN", f"Failed to set parameter <{name}>: Parameter <{name}> already exists with a different type.")
+                return False
+            params[name] = param
+        return True
+
+    def deregister(self, name: str) -> bool:
+
+        with self._registry.update() as registry:
+            if name not in registry["clients"]:
+                return False
+            remove_clients(registry, [name])
+        return True
+
+    def attach(
+        self,
+        name: str,
+        servicer: NodeServicer,
+        on_lease_lost: Callable[[str], None] | None = None,
+    ) -> None:
+        # There's no lease to lose; we're alive for as long as our process is.
+        with self._lock:
+            self._attached[name] = servicer
+            self._start_watcher()
+
+    def detach(self, name: str) -> None:
+        with self._lock:
+            self._attached.pop(name, None)
+            for key in [key for key in self._known_publishers if key[0] == name]:
+                del self._known_publishers[key]
+
+    def _start_watcher(self) -> None:
+        # Called with the lock held.
+        if self._watcher is None or not self._watcher.is_alive():
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.name = "tbx_local_discovery"
+            self._watcher.start()
+
+    def _active(self) -> bool:
+        with self._lock:
+            return not self._closed and (len(self._attached) > 0 or self._params is not None)
+
+    # threading.Thread
+    def _watch(self) -> None:
+
+        last_generation: int = -1
+        last_read: float = 0.0
+
+        while self._active():
+            now: float = time.monotonic()
+            generation: int = self._registry.generation
+            if generation == last_generation and (now - last_read) < LIVENESS_PERIOD:
+                time.sleep(WATCH_PERIOD)
+                continue
+
+            last_read = now
+            last_generation, registry = self._registry.read()
+            self._inform(registry)
+            if self._params is not None:
+                snapshot_params(self._params, last_generation, registry)
+
+    def _inform(self, registry: dict[str,Any]) -> None:
+        """
+        Tell every attached client about publishers that have appeared or disappeared on
+        the topics they're subscribed to, since the last time we told them anything.
+        """
+
+        with self._lock:
+            attached: dict[str,NodeServicer] = dict(self._attached)
+
+        for client_id, servicer in attached.items():
+            for topic_name, topic in registry["topics"].items():
+                if client_id not in topic["subscribers"]:
+                    continue
+
+                current: dict[str,tuple[str,int]] = {
+                    publisher_id: (host, port) for publisher_id, (host, port) in topic["publishers"].items()
+                    # Same as the tbx-server, don't announce a client's own topics to itself.
+                    if publisher_id != client_id}
+                with self._lock:
+                    known: dict[str,tuple[str,int]] = self._known_publishers.get((client_id, topic_name), {})
+                    self._known_publishers[(client_id, topic_name)] = current
+
+                for publisher_id in known.keys() - current.keys():
+                    servicer.InformOfPublisherLost(
+                        topic_publisher_info(topic_name, topic["message_type"], publisher_id), None)
+                for publisher_id in current.keys() - known.keys():
+                    host, port = current[publisher_id]
+                    servicer.InformOfPublisher(
+                        topic_publisher_info(topic_name, topic["message_type"], publisher_id, host, port), None)
+
+
+def topic_publisher_info(
+    topic_name: str,
+    message_type: str,
+    publisher_id: str,
+    host: str = "",
+    port: int = 0,
+) -> Node_pb2.TopicPublisherInfo:
+
+    info: Node_pb2.TopicPublisherInfo = Node_pb2.TopicPublisherInfo()
+    info.topic_def.topic_name = topic_name
+    info.topic_def.message_type = message_type
+    info.publisher.publisher_id = publisher_id
+    info.publisher.publisher_host = host
+    info.publisher.topic_port = port
+    return info
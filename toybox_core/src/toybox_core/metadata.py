@@ -239,6 +239,21 @@ class ToyboxMetadata:
 
 
 def find_tbx_packages() -> dict[str,ToyboxMetadata]:
+    """
+    Every installed toybox package, from the package index (see toybox_core.index), which
+    only looks again at distributions that changed since it last did.
+    """
+
+    # The index builds on this module, so it can't be imported up top.
+    from toybox_core.index import get_index
+    return get_index().packages()
+
+
+def scan_tbx_packages() -> dict[str,ToyboxMetadata]:
+    """
+    Every installed toybox package, found the slow way: by looking at every installed
+    distribution, right now.
+    """
 
     tbx_packages: dict[str,ToyboxMetadata] = {}
 
@@ -6,7 +6,7 @@ import select
 import socket
 import threading
 import time
-from typing import Callable
+from typing import Any, Callable
 
 import grpc
 from google.protobuf.message import Message
@@ -14,16 +14,30 @@ import concurrent.futures as futures
 
 from toybox_core.connection import (
     Connection,
+    Priority,
     Subscriber,
     Publisher,
     get_available_port,
 )
 
-from toybox_core.rpc.register import deregister_client_rpc, register_client_rpc
-from toybox_core.rpc.topic import subscribe_topic_rpc
+from toybox_core.clock import Clock, SimClock, SteadyClock, default_clock
+from toybox_core.container import NodeContainer
+from toybox_core.discovery import Discovery, get_discovery
+from toybox_core.rpc.register import DeclareNodeResult
 
 from toybox_core.logging import TbxLogger
+from toybox_core.reactor import Reactor
 from toybox_core.rpc.node import NodeRPCServicer
+from toybox_core.rpc.param import ParamCache, ParamCallback
+from toybox_core.service import (
+    DEFAULT_CALL_TIMEOUT,
+    ServiceClient,
+    ServiceError,
+    ServiceServer,
+)
+from toybox_core.timer import Timer, TimerScheduler
+from toybox_msgs.core.Service_pb2 import ServiceInfo
+from toybox_msgs.core.Time_pb2 import Timestamp
 from toybox_msgs.core.Node_pb2_grpc import add_NodeServicer_to_server
 
 class Node():
@@ -34,11 +48,24 @@ class Node():
         host: str = "localhost",
         port: int | None = None,
         log_level: str | None = None,
-        autostart: bool = True
+        autostart: bool = True,
+        discovery: Discovery | None = None,
+        container: NodeContainer | None = None,
+        clock: Clock | None = None,
     ) -> None:
 
         self._name = name
         self._host: str = host
+
+        # What now() means for this Node; wall-clock time, unless we're simulating.
+        self._clock: Clock = clock if clock is not None else default_clock()
+
+        # Nodes in a container share its executor, RPC server (and port), and reactor,
+        # rather than getting their own.
+        self._container: NodeContainer | None = container
+        self._reactor: Reactor | None = container.reactor if container is not None else None
+        if container is not None:
+            port = container.port
         self._port: int = port if port else get_available_port()
 
         # configure logger
@@ -46,6 +73,9 @@ class Node():
         if log_level:
             self.set_log_level(log_level=log_level)
 
+        # How we find (and are found by) other Nodes; the tbx-server, unless configured otherwise.
+        self._discovery: Discovery = discovery if discovery is not None else get_discovery()
+
         # The shutdown property allows for Node-holders to trigger a shutdown
         # of this Node.
         self._shutdown: bool = False
@@ -72,24 +102,51 @@ class Node():
 
         self._threads: list[threading.Thread] = []
 
-        # listen for incoming connections in separate thread
-        self.listen_thread: threading.Thread = threading.Thread(target=self._listen)
-        self.listen_thread.name = f"{self._name.replace('/','_')}_listen"
-        self._threads.append(self.listen_thread)
+        if container is None:
+            # listen for incoming connections in separate thread
+            self.listen_thread: threading.Thread = threading.Thread(target=self._listen)
+            self.listen_thread.name = f"{self._name.replace('/','_')}_listen"
+            self._threads.append(self.listen_thread)
 
-        # run our spin function as a separate thread
-        self.spin_thread: threading.Thread = threading.Thread(target=self._spin)
-        self.spin_thread.name = f"{self._name.replace('/','_')}_spin"
-        self._threads.append(self.spin_thread)
+            # run our spin function as a separate thread
+            self.spin_thread: threading.Thread = threading.Thread(target=self._spin)
+            self.spin_thread.name = f"{self._name.replace('/','_')}_spin"
+            self._threads.append(self.spin_thread)
 
-        self._rpc_server: grpc.Server
-        self._executor: futures.ThreadPoolExecutor = futures.ThreadPoolExecutor(
-            max_workers=10)
+        self._rpc_server: grpc.Server | None = None
+        self._executor: futures.ThreadPoolExecutor = container.executor if container is not None \
+            else futures.ThreadPoolExecutor(max_workers=10)
         self._configure_rpc_servicer()
 
+        # Periodic callbacks, all run off of one scheduler (the container's, if we're in one).
+        self._timer_scheduler: TimerScheduler | None = None
+        self._timers: list[Timer] = []
+
+        # Request/response services we provide, and connections to the ones we call.
+        self._services: dict[str,ServiceServer] = {}
+        self._service_clients: dict[str,ServiceClient] = {}
+        self._services_lock: threading.Lock = threading.Lock()
+
+        # Parameters come from a cache shared by the whole process (through discovery),
+        # fetched on first use.
+        self._param_cache: ParamCache | None = None
+        self._param_callbacks: list[ParamCallback] = []
+
+        # Topics declared (but not yet advertised/subscribed) before start(). They're
+        # sent to the tbx-server along with our registration, in one RPC.
+        self._declared_publishers: list[Publisher] = []
+        self._declared_subscribers: list[Subscriber] = []
+
         self._registered: bool = False
         self._ready: bool = False
 
+        # A simulated clock that follows a topic needs us to subscribe to it for it.
+        if isinstance(self._clock, SimClock) and self._clock.topic is not None:
+            self.declare_subscriber(
+                topic_name=self._clock.topic,
+                message_type=Timestamp,
+                callback_fn=self._clock.on_clock_message)
+
         if autostart:
             self.log("DEBUG", f"{self._name} auto-starting")
             self.start()
@@ -100,12 +157,30 @@ class Node():
         if self._ready:
             return
 
-        if (not self._registered) and (not self._register()):
+        if self._declared_publishers or self._declared_subscribers:
+            registered: bool = self._declare()
+        else:
+            registered = self._register()
+        if not registered:
             self.log("ERR", f"Failed to register node with tbx server.")
             raise Exception(f"Could not register node <'{self}'> with tbx-server.")
 
+        # Services created before we registered are advertised now.
+        for service in list(self._services.values()):
+            if not service.advertise(provider_id=self._name, discovery=self._discovery):
+                self.log("ERR", f"Failed to advertise service <{service.service_name}>")
+
+        # enable socket to accept connections
+        self._msg_socket.listen()
+        # make socket non-blocking
+        self._msg_socket.settimeout(0)
+
         # non-blocking
-        self._rpc_server.start()
+        if self._container is not None:
+            self._container.start()
+            self._reactor.add(self._step)
+        else:
+            self._rpc_server.start()
 
         for thread in self._threads:
             thread.start()
@@ -125,9 +200,12 @@ class Node():
             # If the server requests that we shut down, we assume that we don't
             # need to de-register with it.
             self._registered = False
+        self._discovery.detach(name=self._name)
 
         # Signal to threads that they should stop what they're doing
         self._shutdown = True
+        if self._container is not None:
+            self._container.remove(self, self._node_servicer)
 
         # Make sure all connections, pubs, and subs get the signal to shutdown.
         for connection in self.connections.values():
@@ -137,6 +215,25 @@ class Node():
         for subscriber in self.subscribers:
             subscriber.trigger_shutdown()
 
+        with self._services_lock:
+            services: list[ServiceServer] = list(self._services.values())
+            service_clients: list[ServiceClient] = list(self._service_clients.values())
+            self._service_clients.clear()
+        for service in services:
+            service.shutdown()
+        for service_client in service_clients:
+            service_client.close()
+
+        if self._param_cache is not None:
+            for callback in self._param_callbacks:
+                self._param_cache.remove_listener(callback)
+
+        for timer in self._timers:
+            timer.cancel()
+        if self._timer_scheduler is not None and \
+            (self._container is None or self._timer_scheduler is not self._container.timers):
+            self._timer_scheduler.stop()
+
         # Wait for any still-living threads to finish up.
         for thread in self._threads:
             if not thread.is_alive():
@@ -144,6 +241,32 @@ class Node():
             thread.join()
 
         self.log("INFO", f"Finished shutdown.")
+        self._shutdown_event.set()
+
+    def spin(self, timeout: float | None = None) -> bool:
+        """
+        Block until this Node shuts down, leaving timers and callbacks to do the work.
+
+        Returns:
+            bool: whether the Node shut down (False if we timed out first)
+        """
+        return self._shutdown_event.wait(timeout=timeout)
+
+    def now(self) -> float:
+        """
+        The current time by this Node's clock, in seconds.
+        """
+        return self._clock.now()
+
+    def timestamp(self) -> Timestamp:
+        """
+        The current time by this Node's clock, for stamping messages.
+        """
+        return self._clock.timestamp()
+
+    @property
+    def clock(self) -> Clock:
+        return self._clock
 
     def is_shutdown(self) -> bool:
         return self._shutdown or self._shutdown_event.is_set()
@@ -153,12 +276,19 @@ class Node():
         Create the RPC server that we'll use to field RPCs from other clients.
         """
 
+        self._node_servicer: NodeRPCServicer = NodeRPCServicer(
+            subscribers=self._subscribers, 
+            shutdown_callback=self.shutdown,
+            logger=self._logger)
+
+        if self._container is not None:
+            # The container's server fields RPCs for all of its Nodes.
+            self._container.add(self, self._node_servicer)
+            return
+
         self._rpc_server = grpc.server(thread_pool=self._executor)
         add_NodeServicer_to_server(
-            servicer=NodeRPCServicer(
-                subscribers=self._subscribers, 
-                shutdown_callback=self.shutdown,
-                logger=self._logger),
+            servicer=self._node_servicer,
             server=self._rpc_server,
         )
 
@@ -174,7 +304,7 @@ class Node():
             return True
 
         # Register ourselves with the tbx-server
-        result: bool = register_client_rpc(
+        result: bool = self._discovery.register(
             name=self._name, 
             host=self._host,
             port=self._port,
@@ -182,10 +312,117 @@ class Node():
         if not result:
             return False
         
+        self._on_registered()
+        return True
+
+    def _declare(self) -> bool:
+        """
+        Register this Node with the TBX server, advertising and subscribing to all
+        declared topics in the same round trip.
+        """
+
+        if self._registered:
+            return True
+
+        publishers: list[Publisher] = self._declared_publishers
+        subscribers: list[Subscriber] = self._declared_subscribers
+
+        result: DeclareNodeResult = self._discovery.declare(
+            name=self._name,
+            host=self._host,
+            port=self._port,
+            data_port=self._msg_port,
+            advertisements=[
+                (pub.topic.name, pub.topic.message_type.DESCRIPTOR.full_name, pub.port) 
+                for pub in publishers],
+            subscriptions=[
+                (sub.topic.name, sub.topic.message_type.DESCRIPTOR.full_name) 
+                for sub in subscribers])
+        if not result.registered:
+            return False
+
+        self._on_registered()
+        self._declared_publishers = []
+        self._declared_subscribers = []
+
+        for publisher, advertised in zip(publishers, result.advertised):
+            if not advertised:
+                self.log("ERR", f"Failed to advertise topic <{publisher.topic.name}>")
+                publisher.trigger_shutdown()
+                continue
+            self.publishers.append(publisher)
+
+        for subscriber, topic_publishers in zip(subscribers, result.publishers):
+            self._connect_subscriber(subscriber=subscriber, publishers=topic_publishers)
+
+        return True
+
+    def _on_registered(self) -> None:
+
         self._registered = True
         atexit.register(self._deregister)
 
-        return True
+        # Keep our registration alive. If we stop heartbeating (e.g., we crash), the
+        # tbx-server will clean up after us once our lease runs out.
+        self._discovery.attach(
+            name=self._name, 
+            servicer=self._node_servicer, 
+            on_lease_lost=self._on_lease_lost)
+
+    def _on_lease_lost(self, client_id: str) -> None:
+        """
+        The tbx-server has forgotten about us (most likely because our lease ran out while
+        we weren't looking), or restarted and only might remember us. Either way, re-assert
+        our registration and all of our topics in one go.
+        """
+
+        if self.is_shutdown():
+            return
+
+        self.log("WARN", f"Lost registration with tbx-server, re-asserting it.")
+
+        # We may hold several Subscribers for one topic, but only need to subscribe once.
+        unique_subscribers: dict[str,Subscriber] = {sub.topic.name: sub for sub in self.subscribers}
+        # Relays are offered once we're back, like services.
+        publishers: list[Publisher] = [pub for pub in self.publishers if not pub.relay]
+
+        result: DeclareNodeResult = self._discovery.declare(
+            name=self._name,
+            host=self._host,
+            port=self._port,
+            data_port=self._msg_port,
+            advertisements=[
+                (pub.topic.name, pub.topic.message_type.DESCRIPTOR.full_name, pub.port) 
+                for pub in publishers],
+            subscriptions=[
+                (sub.topic.name, sub.topic.message_type.DESCRIPTOR.full_name) 
+                for sub in unique_subscribers.values()],
+            reassert=True)
+        if not result.registered:
+            self.log("ERR", f"Failed to re-register with tbx-server.")
+            self._registered = False
+            return
+
+        self._discovery.attach(
+            name=self._name, 
+            servicer=self._node_servicer, 
+            on_lease_lost=self._on_lease_lost)
+
+        for publisher, advertised in zip(publishers, result.advertised):
+            if not advertised:
+                self.log("ERR", f"Failed to re-advertise topic <{publisher.topic.name}>")
+
+        for subscriber, topic_publishers in zip(unique_subscribers.values(), result.publishers):
+            if topic_publishers:
+                subscriber.add_publisher(topic_publishers[0])
+
+        for publisher in self.publishers:
+            if publisher.relay and not publisher.advertise(advertiser_id=self._name):
+                self.log("ERR", f"Failed to re-advertise relay for <{publisher.topic.name}>")
+
+        for service in list(self._services.values()):
+            if not service.advertise(provider_id=self._name, discovery=self._discovery):
+                self.log("ERR", f"Failed to re-advertise service <{service.service_name}>")
 
     def _deregister(self) -> None:
 
@@ -194,7 +431,8 @@ class Node():
             # there's a chance some other shutdown hook got here first.
             return
         
-        deregister_client_rpc(name=self._name, ignore_response=True)
+        self._discovery.detach(name=self._name)
+        self._discovery.deregister(name=self._name)
         self._registered = False
 
     # threading.Thread
@@ -204,28 +442,52 @@ class Node():
         Ephemeral connections either go away quickly, or are transitioned to Subs/Pubs.
         """
 
-        # enable socket to accept connections
-        self._msg_socket.listen()
-        # make socket non-blocking
-        self._msg_socket.settimeout(0)
-
         # listen for new connections to add to list
         while not self.is_shutdown():
-            try:
-                conn, addr = self._msg_socket.accept()
-                self.log("DEBUG", f"<{self._name}> accepted conn request from {conn.getpeername()}")
-                with self._conn_lock:
-                    self._connections[conn] = Connection(
-                        name="",
-                        sock=conn,
-                        host=addr[0],
-                        port=addr[1])
-            except BlockingIOError:
+            if not self._accept_once():
                 time.sleep(0.01)
 
-        self._msg_socket.shutdown(socket.SHUT_RDWR)
+        self._close_msg_socket()
+
+    def _accept_once(self) -> bool:
+
+        try:
+            conn, addr = self._msg_socket.accept()
+        except BlockingIOError:
+            return False
+
+        self.log("DEBUG", f"<{self._name}> accepted conn request from {conn.getpeername()}")
+        with self._conn_lock:
+            self._connections[conn] = Connection(
+                name="",
+                sock=conn,
+                host=addr[0],
+                port=addr[1])
+        return True
+
+    def _close_msg_socket(self) -> None:
+
+        # A listening socket was never connected, so there may be nothing to shut down.
+        try:
+            self._msg_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
         self._msg_socket.close()
 
+    # Reactor step
+    def _step(self) -> bool:
+        """
+        What the listen and spin threads do, one pass at a time, for a container's reactor.
+        """
+
+        if self.is_shutdown():
+            self._close_msg_socket()
+            return False
+
+        self._accept_once()
+        self._spin_once()
+        return True
+
     def _spin_once(self) -> None:
         """
         Message-handling loop. One-shot.
@@ -288,7 +550,9 @@ class Node():
     def _configure_publisher(
         self, 
         topic_name: str, 
-        message_type: str
+        message_type: str,
+        relay: bool = False,
+        priority: Priority = Priority.NORMAL,
     ) -> Publisher:
 
         # create a publisher, 
@@ -299,7 +563,11 @@ class Node():
             host=self._host,
             port=get_available_port(host=self._host, start=self._msg_port),
             logger=self._logger,
-            shutdown_event=self.shutdown_event)
+            shutdown_event=self.shutdown_event,
+            discovery=self._discovery,
+            reactor=self._reactor,
+            relay=relay,
+            priority=priority)
 
         return publisher
 
@@ -309,6 +577,10 @@ class Node():
         message_type: Message, 
         publisher_info: tuple[str,str,int] | None,
         callback: Callable | None = None,
+        max_rate: float = 0.0,
+        filter_expression: str | None = None,
+        raw: bool = False,
+        priority: Priority = Priority.NORMAL,
     ) -> Subscriber:
 
         subscriber: Subscriber = Subscriber(
@@ -318,7 +590,16 @@ class Node():
             port=get_available_port(host=self._host, start=self._msg_port),
             publisher_info=publisher_info,
             callback=callback,
-            logger=self._logger)
+            logger=self._logger,
+            reactor=self._reactor,
+            max_rate=max_rate,
+            filter_expression=filter_expression,
+            raw=raw,
+            resolver=lambda: self._discovery.subscribe(
+                name=self._name,
+                topic_name=topic_name,
+                message_type=message_type.DESCRIPTOR.full_name),
+            priority=priority)
 
         self.subscribers.append(subscriber)
         return subscriber
@@ -326,7 +607,9 @@ class Node():
     def advertise(
         self,
         topic_name: str,
-        message_type: Message
+        message_type: Message,
+        relay: bool = False,
+        priority: Priority = Priority.NORMAL,
     ) -> Publisher | None:
         """
         Advertise a topic that this Node plans to publish.
@@ -334,6 +617,9 @@ class Node():
         Args:
             topic_name (str): The name of the topic
             message_type (Message): The message type of the topic
+            relay (bool): Offer to re-publish a topic that someone else publishes, for \
+                subscribers that the tbx-server sends our way (see toybox_core.relay).
+            priority (Priority): How urgent the topic is (see toybox_core.connection.Priority).
 
         Returns:
             Publisher | None : If the topic was advertised properly, returns the Publisher, \
@@ -342,10 +628,13 @@ class Node():
 
         pub: Publisher = self._configure_publisher(
             topic_name=topic_name,
-            message_type=message_type)
+            message_type=message_type,
+            relay=relay,
+            priority=priority)
 
         if not pub.advertise(advertiser_id=self._name):
             self.log("ERR", f"Failed to advertise topic <{topic_name}>")
+            pub.trigger_shutdown()
             return None
         
         self.log("DEBUG", f"Successfully advertised topic <{topic_name}> with message type <{message_type.DESCRIPTOR.full_name}>")
@@ -357,8 +646,22 @@ class Node():
         self,
         topic_name: str,
         message_type: Message,
-        callback_fn: Callable | None = None
+        callback_fn: Callable | None = None,
+        max_rate: float = 0.0,
+        filter_expression: str | None = None,
+        raw: bool = False,
+        priority: Priority = Priority.NORMAL,
     ) -> bool:
+        """
+        Subscribe to a topic. Publishers hold back messages beyond `max_rate` per second
+        (0 means no limit) and any that don't match `filter_expression` (see
+        toybox_core.filter), so they're never sent or decoded. If `raw`, `callback_fn` is
+        handed serialized messages, and nothing is decoded at all. `priority` is how
+        urgent the topic is to us (see toybox_core.connection.Priority).
+
+        Raises:
+            ValueError: if `filter_expression` doesn't make sense for `message_type`.
+        """
 
         # Create subscriber FIRST to avoid race conditions with tbx-server in
         # the case that there isn't a publisher when we send the request, but 
@@ -368,19 +671,36 @@ class Node():
             topic_name=topic_name,
             message_type=message_type,
             publisher_info=None,
-            callback=callback_fn)
+            callback=callback_fn,
+            max_rate=max_rate,
+            filter_expression=filter_expression,
+            raw=raw,
+            priority=priority)
 
         # Request information about publishers of a specific topic.
         self.log("DEBUG", f"Requesting topic info for {topic_name} from server.")
         try:
-            publishers: list[tuple[str,str,int]] = subscribe_topic_rpc(
-                subscriber_id=self._name,
+            publishers: list[tuple[str,str,int]] = self._discovery.subscribe(
+                name=self._name,
                 topic_name=topic_name,
                 message_type=message_type.DESCRIPTOR.full_name)
         except grpc.RpcError as rpc_error:
             self.log("WARN", f"Failed to get publisher info from tbx-server: {rpc_error}")
             return False
         
+        return self._connect_subscriber(subscriber=subscriber, publishers=publishers)
+
+    def _connect_subscriber(
+        self,
+        subscriber: Subscriber,
+        publishers: list[tuple[str,str,int]],
+    ) -> bool:
+        """
+        Connect a freshly-configured Subscriber to the publishers the tbx-server gave us.
+        """
+
+        topic_name: str = subscriber.topic.name
+
         if publishers:
             self.log("DEBUG", f"At least one publisher for topic <{topic_name}>: {[pub[0] for pub in publishers]}")
 
@@ -400,13 +720,276 @@ class Node():
                     self.log("DEBUG", f"Subscribing to <{topic_name}> from publisher <{publisher[0]}>")
                     self._configure_subscriber(
                         topic_name=topic_name,
-                        message_type=message_type,
+                        message_type=subscriber.topic.message_type,
                         publisher_info=publisher,
-                        callback=callback_fn)
+                        callback=subscriber.callbacks[0] if subscriber.callbacks else None,
+                        max_rate=subscriber.max_rate,
+                        filter_expression=subscriber.options.filter,
+                        raw=subscriber.raw,
+                        priority=subscriber.priority)
         else:
             self.log("DEBUG", f"No publishers declared for topic <{topic_name}>")
 
         return True
+
+    def create_timer(
+        self,
+        period: float,
+        callback: Callable[[], None],
+        oneshot: bool = False,
+    ) -> Timer:
+        """
+        Call `callback` (on this Node's executor) every `period` seconds, or just once,
+        `period` seconds from now. If this Node's clock is simulated, so are the seconds.
+
+        Returns:
+            Timer: cancel() it to stop the callbacks; its `stats` say how it's keeping up.
+        """
+
+        if self._timer_scheduler is None:
+            # Timers keep simulated time if we do. Otherwise they use a steady clock, since
+            # they're about how much time passes, not what time it is.
+            clock: Clock = self._clock if self._clock.simulated else SteadyClock()
+            # The container's scheduler will do, as long as it keeps the same sort of time.
+            shared: TimerScheduler | None = self._container.timers if self._container is not None else None
+            if shared is not None and \
+                (shared.clock is clock or not (clock.simulated or shared.clock.simulated)):
+                self._timer_scheduler = shared
+            else:
+                self._timer_scheduler = TimerScheduler(
+                    executor=self._executor, 
+                    name=f"{self._name.replace('/','_')}_timers",
+                    clock=clock)
+
+        timer: Timer = Timer(
+            period=period, 
+            callback=callback, 
+            name=f"{self._name}/{getattr(callback, '__name__', 'timer')}",
+            oneshot=oneshot)
+        self._timers.append(timer)
+        return self._timer_scheduler.add(timer)
+
+    def create_service(
+        self,
+        service_name: str,
+        request_type: type[Message],
+        response_type: type[Message],
+        handler: Callable[[Message], Message],
+    ) -> ServiceServer | None:
+        """
+        Provide a request/response service. `handler` is called (on this Node's executor)
+        with each request, and returns the response; if it raises, the caller gets a
+        ServiceError instead.
+
+        Returns:
+            ServiceServer | None: The ServiceServer, or None if the service couldn't be advertised.
+        """
+
+        service: ServiceServer = ServiceServer(
+            service_name=service_name,
+            request_type=request_type,
+            response_type=response_type,
+            handler=handler,
+            host=self._host,
+            port=get_available_port(host=self._host, start=self._msg_port),
+            executor=self._executor,
+            logger=self._logger,
+            reactor=self._reactor)
+
+        # If we haven't registered yet, the service is advertised once we have (in start()).
+        if self._registered and not service.advertise(provider_id=self._name, discovery=self._discovery):
+            self.log("ERR", f"Failed to advertise service <{service_name}>")
+            service.shutdown()
+            return None
+
+        with self._services_lock:
+            self._services[service_name] = service
+        return service
+
+    def call(
+        self,
+        service_name: str,
+        request: Message,
+        timeout: float | None = DEFAULT_CALL_TIMEOUT,
+        response_type: type[Message] | None = None,
+    ) -> Message:
+        """
+        Call a service, and wait for its response. Concurrent calls to the same service
+        share one connection to its provider.
+
+        Args:
+            response_type (type[Message] | None): only needed if the response type's module \
+                hasn't been imported
+
+        Raises:
+            TimeoutError: if the response doesn't arrive within `timeout` seconds
+            ServiceError: if nobody provides the service, or the call failed
+        """
+
+        future: futures.Future = self.call_async(
+            service_name=service_name, 
+            request=request, 
+            response_type=response_type)
+        try:
+            return future.result(timeout=timeout)
+        except futures.TimeoutError:
+            raise TimeoutError(f"Call to service <{service_name}> timed out after {timeout}s")
+
+    def call_async(
+        self,
+        service_name: str,
+        request: Message,
+        response_type: type[Message] | None = None,
+    ) -> futures.Future:
+        """
+        Call a service without waiting for its response, e.g., to have several calls in
+        flight at once.
+
+        Returns:
+            futures.Future: completes with the response, or a ServiceError
+        """
+
+        client: ServiceClient = self._service_client(service_name, response_type)
+        try:
+            return client.call_async(request)
+        except ServiceError:
+            # The provider may have moved (or restarted); look it up again next time.
+            self._forget_service_client(service_name, client)
+            raise
+
+    def _service_client(
+        self,
+        service_name: str,
+        response_type: type[Message] | None,
+    ) -> ServiceClient:
+
+        with self._services_lock:
+            client: ServiceClient | None = self._service_clients.get(service_name, None)
+        if client is not None and not client.closed:
+            return client
+
+        info: ServiceInfo | None = self._discovery.lookup_service(service_name=service_name)
+        if info is None:
+            raise ServiceError(f"Nobody provides service <{service_name}>")
+
+        client = ServiceClient(info=info, response_type=response_type, logger=self._logger)
+        with self._services_lock:
+            # Someone else may have beaten us to it; keep theirs.
+            existing: ServiceClient | None = self._service_clients.get(service_name, None)
+            if existing is not None and not existing.closed:
+                client.close()
+                return existing
+            self._service_clients[service_name] = client
+        return client
+
+    def _forget_service_client(self, service_name: str, client: ServiceClient) -> None:
+
+        client.close()
+        with self._services_lock:
+            if self._service_clients.get(service_name, None) is client:
+                del self._service_clients[service_name]
+
+    def get_param(self, name: str, default: Any = None) -> Any:
+        """
+        Get a parameter's current value, or `default` if it isn't set. This is served
+        from a local copy of the parameters, so it's cheap enough to call from a loop.
+        """
+        return self._params().get(name, default)
+
+    def set_param(self, name: str, value: Any) -> bool:
+        """
+        Set a parameter for everyone. Once it's been set, a parameter's type can't change.
+
+        Returns:
+            bool: whether the new value was accepted
+        """
+
+        try:
+            result: bool = self._discovery.set_param(name=name, value=value)
+        except grpc.RpcError as e:
+            self.log("ERR", f"Failed to set parameter <{name}>: {e}")
+            return False
+
+        if result:
+            # Don't make our own get_param() wait for the server to tell us what we just said.
+            self._params().put(name, value)
+        return result
+
+    def on_param_change(self, prefix: str, callback: ParamCallback) -> None:
+        """
+        Call `callback(name, value)` whenever a parameter whose name starts with `prefix`
+        changes. `value` is None if the parameter was deleted.
+        """
+        self._params().add_listener(prefix, callback)
+        self._param_callbacks.append(callback)
+
+    def _params(self) -> ParamCache:
+        if self._param_cache is None:
+            self._param_cache = self._discovery.param_cache()
+        return self._param_cache
+
+    def declare_publisher(
+        self,
+        topic_name: str,
+        message_type: Message,
+        priority: Priority = Priority.NORMAL,
+    ) -> Publisher | None:
+        """
+        Declare a topic that this Node plans to publish. If the Node hasn't started yet,
+        the topic is advertised along with the Node's registration in start(). Otherwise,
+        this is the same as advertise().
+
+        Returns:
+            Publisher | None : The Publisher, or None if the topic couldn't be advertised.
+        """
+
+        if self._registered:
+            return self.advertise(topic_name=topic_name, message_type=message_type, priority=priority)
+
+        pub: Publisher = self._configure_publisher(
+            topic_name=topic_name,
+            message_type=message_type,
+            priority=priority)
+        self._declared_publishers.append(pub)
+        return pub
+
+    def declare_subscriber(
+        self,
+        topic_name: str,
+        message_type: Message,
+        callback_fn: Callable | None = None,
+        max_rate: float = 0.0,
+        filter_expression: str | None = None,
+        raw: bool = False,
+        priority: Priority = Priority.NORMAL,
+    ) -> bool:
+        """
+        Declare a subscription for this Node. If the Node hasn't started yet, the subscription
+        is sent along with the Node's registration in start(). Otherwise, this is the same as 
+        subscribe().
+        """
+
+        if self._registered:
+            return self.subscribe(
+                topic_name=topic_name, 
+                message_type=message_type, 
+                callback_fn=callback_fn,
+                max_rate=max_rate,
+                filter_expression=filter_expression,
+                raw=raw,
+                priority=priority)
+
+        subscriber: Subscriber = self._configure_subscriber(
+            topic_name=topic_name,
+            message_type=message_type,
+            publisher_info=None,
+            callback=callback_fn,
+            max_rate=max_rate,
+            filter_expression=filter_expression,
+            raw=raw,
+            priority=priority)
+        self._declared_subscribers.append(subscriber)
+        return True
     
     def log(
         self,
@@ -451,6 +1034,11 @@ class Node():
             self._publishers_lock.release()
             return pubs
 
+    @property
+    def services(self) -> list[ServiceServer]:
+        with self._services_lock:
+            return list(self._services.values())
+
     @property
     def ready(self) -> bool:
         return self._ready
@@ -13,12 +13,37 @@ PREFIX_LENGTH: int = 4
 PREFIX_TYPE_LENGTH: int = 2
 PREFIX_PAYLOAD_LENGTH: int = 2
 
+# An empty message (no type, no payload). Publishers send these when they've had nothing
+# else to send for a while, so subscribers can tell a quiet topic from a dead publisher.
+HEARTBEAT: bytes = struct.pack("HH", 0, 0)
+
 @dataclass
 class TbxMessage():
     message_raw: bytes
     type_length: int
     payload_length: int
     
+def _recv_exactly(
+    sock: socket.socket,
+    length: int,
+) -> bytes:
+    """
+    recv() can hand back less than we asked for (e.g., a big message split across
+    segments), so keep asking until we have all of it.
+
+    Raises:
+        EOFError: if the other end hangs up first
+    """
+
+    received: bytearray = bytearray()
+    while len(received) < length:
+        chunk: bytes = sock.recv(length - len(received))
+        if not chunk:
+            raise EOFError(f"Connection closed <{len(received)}/{length}> bytes into a read")
+        received += chunk
+    return bytes(received)
+
+
 def read(
     sock: socket.socket
 ) -> TbxMessage | None:
@@ -30,6 +55,7 @@ def read(
 
     Raises:
         e: socket.error
+        EOFError: if the sender hung up (cleanly or not)
 
     Returns:
         TbxMessage | None: ()
@@ -37,7 +63,7 @@ def read(
 
     # attempt to receive first PREFIX_LEGNTH bytes of message
     try:
-        prefix_bytes: bytes = sock.recv(PREFIX_LENGTH)
+        prefix_bytes: bytes = _recv_exactly(sock, PREFIX_LENGTH)
     except socket.error as e:
         raise e
 
@@ -45,7 +71,6 @@ def read(
     try:
         prefix: Tuple[Any,...] = struct.unpack("HH", prefix_bytes)
     except struct.error as e:
-        # If the sender of a message disconnects suddenly, this is where it'll be caught.
         return None
     
     message_type_len: int = prefix[0]
@@ -54,7 +79,7 @@ def read(
         bytes, <{message_type_len}> type, <{message_payload_len}> message.")
     
     # receive (T)ype and (V)alue
-    received: bytes = sock.recv(message_type_len + message_payload_len)
+    received: bytes = _recv_exactly(sock, message_type_len + message_payload_len)
     LOG(log_level="DEBUG", message=f"Received bytes <{received!r}>")
 
     return TbxMessage(message_raw=received, 
@@ -62,6 +87,36 @@ def read(
                       payload_length=message_payload_len)
 
 
+def unpack_frames(
+    buffer: bytearray,
+) -> list[TbxMessage]:
+    """
+    Pull every complete message off the front of `buffer`, leaving any partial message
+    behind for the next read to finish. (The non-blocking counterpart to read().)
+    """
+
+    messages: list[TbxMessage] = []
+    offset: int = 0
+    while len(buffer) - offset >= PREFIX_LENGTH:
+        type_len, payload_len = struct.unpack_from("HH", buffer, offset)
+        end: int = offset + PREFIX_LENGTH + type_len + payload_len
+        if len(buffer) < end:
+            break
+
+        messages.append(TbxMessage(
+            message_raw=bytes(buffer[offset + PREFIX_LENGTH:end]),
+            type_length=type_len,
+            payload_length=payload_len))
+        offset = end
+
+    del buffer[:offset]
+    return messages
+
+
+def is_heartbeat(message: TbxMessage) -> bool:
+    return message.type_length == 0 and message.payload_length == 0
+
+
 def pack_message(
     message: Message,
 ) -> bytes:
@@ -101,6 +156,19 @@ def pack_message(
     return bytes(packed_message)
 
 
+def pack_payload(
+    message_type: str,
+    payload: bytes,
+) -> bytes:
+    """
+    Package an already-serialized message in the same LTV format as pack_message(), e.g.
+    to pass along a message we received without deserializing and re-serializing it.
+    """
+
+    type_bytes: bytes = message_type.encode('utf-8')
+    return struct.pack("HH", len(type_bytes), len(payload)) + type_bytes + payload
+
+
 def unpack_message(
     obj_type: Message, 
     message_data: bytes
@@ -154,3 +222,72 @@ def split_message(
     LOG("DEBUG", f"Received message data: <{message_data!r}>")
 
     return (message_type, message_data)
+
+
+# Service calls get their own framing. Every frame carries the correlation ID of the
+# call that it belongs to, so a caller can have many calls in flight on one connection
+# and match up the replies in whatever order they come back.
+#   correlation ID (uint32), status (uint8), type length (uint16), payload length (uint32)
+SERVICE_PREFIX: struct.Struct = struct.Struct("<IBHI")
+
+SERVICE_OK: int = 0
+# The payload is a UTF-8 error message, rather than a response.
+SERVICE_ERROR: int = 1
+
+@dataclass
+class ServiceFrame():
+    correlation_id: int
+    status: int
+    message_type: str
+    payload: bytes
+
+
+def pack_service_frame(
+    correlation_id: int,
+    message: Message | None = None,
+    error: str | None = None,
+) -> bytes:
+    """
+    Package a service request/response (or, if `error` is given, a failed call) for
+    socket transmission.
+    """
+
+    if error is not None:
+        message_type: bytes = b""
+        payload: bytes = error.encode('utf-8')
+        status: int = SERVICE_ERROR
+    else:
+        message_type = message.DESCRIPTOR.full_name.encode('utf-8')
+        payload = message.SerializeToString()
+        status = SERVICE_OK
+
+    prefix: bytes = SERVICE_PREFIX.pack(correlation_id, status, len(message_type), len(payload))
+    return prefix + message_type + payload
+
+
+def unpack_service_frames(
+    buffer: bytearray,
+) -> list[ServiceFrame]:
+    """
+    Pull every complete service frame off the front of `buffer`, leaving any partial
+    frame behind for the next read to finish.
+    """
+
+    frames: list[ServiceFrame] = []
+    offset: int = 0
+    while len(buffer) - offset >= SERVICE_PREFIX.size:
+        correlation_id, status, type_len, payload_len = SERVICE_PREFIX.unpack_from(buffer, offset)
+        end: int = offset + SERVICE_PREFIX.size + type_len + payload_len
+        if len(buffer) < end:
+            break
+
+        type_start: int = offset + SERVICE_PREFIX.size
+        frames.append(ServiceFrame(
+            correlation_id=correlation_id,
+            status=status,
+            message_type=bytes(buffer[type_start:type_start + type_len]).decode('utf-8'),
+            payload=bytes(buffer[type_start + type_len:end])))
+        offset = end
+
+    del buffer[:offset]
+    return frames
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+One thread that drives many sockets.
+
+Nodes, Publishers and Subscribers normally each poll their sockets from their own
+threads. Handed a Reactor, they register a non-blocking step function with it
+instead, and the Reactor calls every step in turn from a single thread.
+
+Steps run highest priority first (see toybox_core.connection.Priority), so a pass that
+has both a bulk topic and a more urgent one to service gets the urgent one out first.
+"""
+
+import threading
+import time
+from typing import Callable
+
+from toybox_core.logging import LOG
+
+
+# How long the reactor sleeps between passes over its steps, in seconds. Matches the
+# rate at which the threads it replaces polled.
+REACTOR_PERIOD: float = 0.01
+
+
+class Reactor():
+
+    def __init__(self, name: str = "tbx_reactor", period: float = REACTOR_PERIOD) -> None:
+
+        self._name: str = name
+        self._period: float = period
+
+        # Each step does whatever work is ready, without blocking. Returning False
+        # means it's done for good, and should be dropped.
+        self._steps: list[Callable[[], bool]] = []
+        self._priorities: dict[Callable[[], bool], int] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+        self._stopping: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, step: Callable[[], bool], priority: int = 0) -> None:
+
+        with self._lock:
+            self._priorities[step] = priority
+            # After everything of the same (or higher) priority that's already here.
+            index: int = len(self._steps)
+            while index > 0 and self._priorities[self._steps[index - 1]] < priority:
+                index -= 1
+            self._steps.insert(index, step)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.name = self._name
+                self._thread.start()
+
+    def remove(self, step: Callable[[], bool]) -> None:
+
+        with self._lock:
+            if step in self._steps:
+                self._steps.remove(step)
+                self._priorities.pop(step, None)
+
+    def stop(self) -> None:
+
+        self._stopping.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._steps)
+
+    # threading.Thread
+    def _run(self) -> None:
+
+        while not self._stopping.is_set():
+            with self._lock:
+                steps: list[Callable[[], bool]] = list(self._steps)
+
+            for step in steps:
+                try:
+                    keep: bool = step()
+                except Exception as e:
+                    LOG("ERR", f"Reactor step {step} failed, dropping it: {e}")
+                    keep = False
+                if not keep:
+                    self.remove(step)
+
+            time.sleep(self._period)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+"""
+Change tracking for the tbx-server's registry (its clients and topics).
+
+Every change bumps a generation number and is kept, for a while, in a bounded
+log of RegistryEvents. Anyone who knows the last generation they saw can ask
+for just what changed since then, instead of re-listing everything.
+"""
+
+from bisect import bisect_right
+from collections import deque
+import threading
+from typing import Callable
+
+from toybox_core.client import Client
+from toybox_core.topic import Topic
+
+from toybox_msgs.core.Register_pb2 import ClientInfo, ClientMetadata, RegistryEvent
+from toybox_msgs.core.Topic_pb2 import PublisherInfo, TopicDefinition, TopicState
+
+
+# How many events to remember. Watchers that fall further behind than this get a snapshot.
+DEFAULT_MAX_EVENTS: int = 1024
+
+
+def client_info(client: Client) -> ClientInfo:
+    return ClientInfo(
+        client_id=client.client_id,
+        meta=ClientMetadata(
+            addr=client.addr,
+            port=client.rpc_port,
+            data_port=client.data_port))
+
+
+def topic_state(topic: Topic) -> TopicState:
+    state: TopicState = TopicState(
+        topic_def=topic.to_msg(),
+        subscriber_ids=topic.subscribers)
+    for publisher_id, (host, port) in topic.publishers.items():
+        state.publishers.append(PublisherInfo(
+            publisher_id=publisher_id,
+            publisher_host=host,
+            topic_port=port))
+    return state
+
+
+def paginate(
+    names: list[str],
+    page_size: int,
+    page_token: str,
+) -> tuple[list[str],str]:
+    """
+    Get one page of `names` (which must be sorted). The page token is just the last
+    name on the previous page, so paging stays consistent if things are added or
+    removed in between.
+
+    Returns:
+        tuple[list[str],str]: the names on this page, and the token for the next one
+            (empty if this is the last page)
+    """
+    start: int = bisect_right(names, page_token) if page_token else 0
+    if page_size <= 0:
+        return names[start:], ""
+
+    page: list[str] = names[start:start + page_size]
+    next_token: str = page[-1] if (start + page_size) < len(names) else ""
+    return page, next_token
+
+
+class RegistryEvents():
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS) -> None:
+
+        self._generation: int = 0
+        self._events: deque[RegistryEvent] = deque(maxlen=max_events)
+
+        self._lock: threading.Condition = threading.Condition()
+        self._listeners: list[Callable[[RegistryEvent], None]] = []
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def reset(self, generation: int) -> None:
+        """
+        Pick up counting from `generation` (e.g., after restoring a saved registry),
+        forgetting any events so far.
+        """
+        with self._lock:
+            self._generation = generation
+            self._events.clear()
+
+    def client_updated(self, client: Client) -> None:
+        self._record(RegistryEvent(
+            kind=RegistryEvent.CLIENT_UPDATED,
+            client=client_info(client)))
+
+    def client_removed(self, client_id: str) -> None:
+        self._record(RegistryEvent(
+            kind=RegistryEvent.CLIENT_REMOVED,
+            client=ClientInfo(client_id=client_id)))
+
+    def topic_updated(self, topic: Topic) -> None:
+        self._record(RegistryEvent(
+            kind=RegistryEvent.TOPIC_UPDATED,
+            topic=topic_state(topic)))
+
+    def topic_removed(self, topic_name: str) -> None:
+        self._record(RegistryEvent(
+            kind=RegistryEvent.TOPIC_REMOVED,
+            topic=TopicState(topic_def=TopicDefinition(topic_name=topic_name))))
+
+    def _record(self, event: RegistryEvent) -> None:
+
+        with self._lock:
+            self._generation += 1
+            event.generation = self._generation
+            self._events.append(event)
+            self._lock.notify_all()
+
+            # Still holding the lock, so that listeners see events in order.
+            for listener in self._listeners:
+                listener(event)
+
+    def since(self, generation: int) -> list[RegistryEvent] | None:
+        """
+        Get every event after `generation`.
+
+        Returns:
+            list[RegistryEvent] | None: the events, oldest first, or None if they're
+                no longer available (in which case, start over from a snapshot).
+        """
+        with self._lock:
+            if generation == 0 or generation > self._generation:
+                # Either a brand-new watcher, or one that's seen a different server.
+                return None
+            if generation == self._generation:
+                return []
+            if not self._events or self._events[0].generation > generation + 1:
+                return None
+            return [event for event in self._events if event.generation > generation]
+
+    def wait(self, generation: int, timeout: float | None = None) -> bool:
+        """
+        Block until the registry moves past `generation`, or `timeout` runs out.
+        """
+        with self._lock:
+            return self._lock.wait_for(lambda: self._generation != generation, timeout=timeout)
+
+    def add_listener(self, listener: Callable[[RegistryEvent], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[RegistryEvent], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+def snapshot(
+    generation: int,
+    clients: dict[str,Client],
+    topics: dict[str,Topic],
+) -> list[RegistryEvent]:
+    """
+    The entire registry as a RESET, one event per client and topic, then SNAPSHOT_END.
+    """
+    events: list[RegistryEvent] = [RegistryEvent(kind=RegistryEvent.RESET, generation=generation)]
+    for client in list(clients.values()):
+        events.append(RegistryEvent(
+            generation=generation,
+            kind=RegistryEvent.CLIENT_UPDATED,
+            client=client_info(client)))
+    for topic in list(topics.values()):
+        events.append(RegistryEvent(
+            generation=generation,
+            kind=RegistryEvent.TOPIC_UPDATED,
+            topic=topic_state(topic)))
+    events.append(RegistryEvent(kind=RegistryEvent.SNAPSHOT_END, generation=generation))
+    return events
+
+
+def apply_event(
+    event: RegistryEvent,
+    clients: dict[str,Client],
+    topics: dict[str,Topic],
+) -> None:
+    """
+    Apply a RegistryEvent to a copy of the registry. Every event carries the full state
+    of whatever it's about, so applying the same event twice is harmless.
+    """
+
+    if event.kind == RegistryEvent.RESET:
+        topics.clear()
+        clients.clear()
+    elif event.kind == RegistryEvent.CLIENT_UPDATED:
+        clients[event.client.client_id] = Client(
+            client_id=event.client.client_id,
+            addr=event.client.meta.addr,
+            rpc_port=event.client.meta.port,
+            data_port=event.client.meta.data_port)
+    elif event.kind == RegistryEvent.CLIENT_REMOVED:
+        clients.pop(event.client.client_id, None)
+    elif event.kind == RegistryEvent.TOPIC_UPDATED:
+        topic_name: str = event.topic.topic_def.topic_name
+        topics[topic_name] = Topic(
+            name=topic_name,
+            message_type=event.topic.topic_def.message_type,
+            publishers={
+                pub.publisher_id: (pub.publisher_host, pub.topic_port)
+                for pub in event.topic.publishers},
+            subscribers=list(event.topic.subscriber_ids))
+    elif event.kind == RegistryEvent.TOPIC_REMOVED:
+        topics.pop(event.topic.topic_def.topic_name, None)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""
+Fan-out for topics with lots of subscribers.
+
+A Publisher pays for one send per subscriber per message, so a topic with dozens of
+subscribers costs its publisher dozens of sends. A TopicRelay subscribes to the topic
+once (without decoding anything), and re-publishes it. Once a topic has enough
+subscribers of its own (see the tbx-server's --fanout-threshold), the tbx-server sends
+new subscribers to the topic's relays instead, so the publisher's cost stops growing.
+Relays can themselves be sent to other relays, which makes a tree.
+
+    tbx-launch node TopicRelay name=imu_relay topic_name=/imu message_type=state/Orientation/Orientation
+"""
+
+import importlib
+
+from google.protobuf.message import Message
+
+from toybox_core.connection import Publisher
+from toybox_core.launchable import Launchable
+from toybox_core.node import Node
+
+
+def import_message_type(message_type: str) -> type[Message]:
+    """
+    Import a message type given as <package>/<module>/<message>, e.g. "state/Velocity/Velocity"
+    (the same way tbx-echo takes them).
+    """
+
+    parts: list[str] = message_type.split("/")
+    if len(parts) != 3:
+        raise ValueError(f"Expected <package>/<module>/<message>, got <{message_type}>")
+
+    module = importlib.import_module(f"toybox_msgs.{parts[0]}.{parts[1]}_pb2")
+    return getattr(module, parts[2])
+
+
+class TopicRelay(Launchable):
+
+    def __init__(
+        self,
+        name: str,
+        topic_name: str,
+        message_type: str,
+    ) -> None:
+
+        self._name: str = name
+        self._topic_name: str = topic_name
+        self._message_type: type[Message] = import_message_type(message_type)
+
+        self._node: Node = Node(name=self._name, autostart=False)
+        self._publisher: Publisher | None = None
+
+    def pre_launch(self) -> bool:
+
+        self._node.start()
+
+        # Subscribe first: the tbx-server only takes relays for topics they're getting.
+        if not self._node.subscribe(
+            topic_name=self._topic_name,
+            message_type=self._message_type,
+            callback_fn=self._relay,
+            raw=True):
+            return False
+
+        self._publisher = self._node.advertise(
+            topic_name=self._topic_name,
+            message_type=self._message_type,
+            relay=True)
+        return self._publisher is not None
+
+    def launch(self) -> bool:
+        self._node.spin()
+        return True
+
+    def shutdown(self) -> None:
+        self._node.shutdown()
+
+    def _relay(self, payload: bytes) -> None:
+        if self._publisher is not None:
+            self._publisher.publish_raw(payload)
+
+    @property
+    def publisher(self) -> Publisher | None:
+        return self._publisher
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+
+"""
+Coroutine versions of the tbx-server's servicers, for use with a grpc.aio server.
+
+These wrap the regular servicers rather than re-implementing them. None of the
+wrapped methods block (the registry journal, if there is one, hands its file I/O to
+a writer thread; see toybox_core.journal), so calling them directly from the event
+loop is safe, and since everything runs on that one loop the registry is only ever
+touched by one thread at a time.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import grpc
+
+from toybox_core.rpc.health import HealthRPCServicer
+from toybox_core.rpc.metrics import MIN_WATCH_PERIOD, MetricsRPCServicer, RpcMetrics
+from toybox_core.rpc.param import ParamRPCServicer, watched
+from toybox_core.rpc.register import RegisterServicer
+from toybox_core.rpc.service import ServiceRPCServicer
+from toybox_core.rpc.topic import TopicRPCServicer
+
+from toybox_msgs.core.Health_pb2 import HealthCheckRequest, HealthCheckResponse
+from toybox_msgs.core.Health_pb2_grpc import HealthServicer
+from toybox_msgs.core.Metrics_pb2 import MetricsRequest, MetricsSnapshot, WatchMetricsRequest
+from toybox_msgs.core.Metrics_pb2_grpc import MetricsServicer
+from toybox_msgs.core.Param_pb2 import (
+    DeleteParamRequest,
+    GetParamsRequest,
+    ParamEvent,
+    ParamList,
+    SetParamRequest,
+    WatchParamsRequest,
+)
+from toybox_msgs.core.Param_pb2_grpc import ParamsServicer
+from toybox_msgs.core.Service_pb2 import (
+    AdvertiseServiceRequest,
+    LookupServiceRequest,
+    LookupServiceResponse,
+)
+from toybox_msgs.core.Service_pb2_grpc import ServiceServicer
+from toybox_msgs.core.Topic_pb2 import (
+    AdvertiseRequest,
+    Confirmation,
+    ListTopicsRequest,
+    SubscriptionRequest,
+    SubscriptionResponse,
+    TopicList
+)
+from toybox_msgs.core.Topic_pb2_grpc import TopicServicer
+import toybox_msgs.core.Register_pb2 as Register_pb2
+import toybox_msgs.core.Register_pb2_grpc as Register_pb2_grpc
+
+
+class AsyncHealthServicer(HealthServicer):
+
+    def __init__(self, servicer: HealthRPCServicer) -> None:
+        self._servicer: HealthRPCServicer = servicer
+
+    async def Check(
+        self,
+        request: HealthCheckRequest,
+        context: grpc.aio.ServicerContext
+    ) -> HealthCheckResponse:
+        return self._servicer.Check(request, context)
+
+
+class AsyncTopicServicer(TopicServicer):
+
+    def __init__(
+        self,
+        servicer: TopicRPCServicer,
+        announce_callback: Callable[[], None] | None = None,
+    ) -> None:
+        self._servicer: TopicRPCServicer = servicer
+
+        # Called after anything that might have queued an announcement.
+        self._announce_callback: Callable[[], None] | None = announce_callback
+
+    async def AdvertiseTopic(
+        self,
+        request: AdvertiseRequest,
+        context: grpc.aio.ServicerContext
+    ) -> Confirmation:
+        conf: Confirmation = self._servicer.AdvertiseTopic(request, context)
+        if self._announce_callback is not None:
+            self._announce_callback()
+        return conf
+
+    async def DeAdvertiseTopic(self, request, context) -> Confirmation:
+        return self._servicer.DeAdvertiseTopic(request, context)
+
+    async def AdvertiseRelay(
+        self,
+        request: AdvertiseRequest,
+        context: grpc.aio.ServicerContext
+    ) -> Confirmation:
+        return self._servicer.AdvertiseRelay(request, context)
+
+    async def SubscribeTopic(
+        self,
+        request: SubscriptionRequest,
+        context: grpc.aio.ServicerContext
+    ) -> SubscriptionResponse:
+        return self._servicer.SubscribeTopic(request, context)
+
+    async def ListTopics(
+        self,
+        request: ListTopicsRequest,
+        context: grpc.aio.ServicerContext
+    ) -> TopicList:
+        return self._servicer.ListTopics(request, context)
+
+
+class AsyncServiceServicer(ServiceServicer):
+
+    def __init__(self, servicer: ServiceRPCServicer) -> None:
+        self._servicer: ServiceRPCServicer = servicer
+
+    async def AdvertiseService(
+        self,
+        request: AdvertiseServiceRequest,
+        context: grpc.aio.ServicerContext
+    ) -> Confirmation:
+        return self._servicer.AdvertiseService(request, context)
+
+    async def LookupService(
+        self,
+        request: LookupServiceRequest,
+        context: grpc.aio.ServicerContext
+    ) -> LookupServiceResponse:
+        return self._servicer.LookupService(request, context)
+
+
+class AsyncParamsServicer(ParamsServicer):
+
+    def __init__(self, servicer: ParamRPCServicer) -> None:
+        self._servicer: ParamRPCServicer = servicer
+
+    async def GetParams(
+        self,
+        request: GetParamsRequest,
+        context: grpc.aio.ServicerContext
+    ) -> ParamList:
+        return self._servicer.GetParams(request, context)
+
+    async def SetParam(
+        self,
+        request: SetParamRequest,
+        context: grpc.aio.ServicerContext
+    ) -> Confirmation:
+        return self._servicer.SetParam(request, context)
+
+    async def DeleteParam(
+        self,
+        request: DeleteParamRequest,
+        context: grpc.aio.ServicerContext
+    ) -> Confirmation:
+        return self._servicer.DeleteParam(request, context)
+
+    async def WatchParams(
+        self,
+        request: WatchParamsRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> AsyncIterator[ParamEvent]:
+
+        # Same as WatchRegistry: get woken up by the loop, rather than parking a thread.
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        changed: asyncio.Event = asyncio.Event()
+        def on_event(_: ParamEvent) -> None:
+            loop.call_soon_threadsafe(changed.set)
+
+        self._servicer.store.add_listener(on_event)
+        try:
+            generation: int = request.since_generation
+            while True:
+                changed.clear()
+                events: list[ParamEvent] = self._servicer.store.events_since(generation, request.prefix)
+                for event in events:
+                    if watched(event, request.prefix):
+                        yield event
+                if events:
+                    generation = events[-1].generation
+                await changed.wait()
+        finally:
+            self._servicer.store.remove_listener(on_event)
+
+
+class AsyncRegisterServicer(Register_pb2_grpc.RegisterServicer):
+
+    def __init__(
+        self,
+        servicer: RegisterServicer,
+        announce_callback: Callable[[], None] | None = None,
+    ) -> None:
+        self._servicer: RegisterServicer = servicer
+        self._announce_callback: Callable[[], None] | None = announce_callback
+
+    async def RegisterClient(
+        self,
+        request: Register_pb2.RegisterRequest,
+        context: grpc.aio.ServicerContext
+    ) -> Register_pb2.RegisterResponse:
+        return self._servicer.RegisterClient(request, context)
+
+    async def DeRegisterClient(
+        self,
+        request: Register_pb2.DeRegisterRequest,
+        context: grpc.aio.ServicerContext
+    ) -> Register_pb2.RegisterResponse:
+        return self._servicer.DeRegisterClient(request, context)
+
+    async def GetClientInfo(
+        self,
+        request: Register_pb2.Client_ID,
+        context: grpc.aio.ServicerContext
+    ) -> Register_pb2.ClientResponse:
+        return self._servicer.GetClientInfo(request, context)
+
+    async def GetRegisteredClients(
+        self,
+        request: Register_pb2.ListClientsRequest,
+        context: grpc.aio.ServicerContext
+    ) -> Register_pb2.ClientList:
+        return self._servicer.GetRegisteredClients(request, context)
+
+    async def Heartbeat(
+        self,
+        request_iterator: AsyncIterator[Register_pb2.HeartbeatRequest],
+        context: grpc.aio.ServicerContext,
+    ) -> AsyncIterator[Register_pb2.HeartbeatResponse]:
+        async for request in request_iterator:
+            yield self._servicer.renew_leases(request)
+
+    async def DeclareNode(
+        self,
+        request: Register_pb2.DeclareNodeRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> Register_pb2.DeclareNodeResponse:
+        response: Register_pb2.DeclareNodeResponse = self._servicer.DeclareNode(request, context)
+        if self._announce_callback is not None:
+            self._announce_callback()
+        return response
+
+    async def WatchRegistry(
+        self,
+        request: Register_pb2.WatchRegistryRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> AsyncIterator[Register_pb2.RegistryEvent]:
+
+        if self._servicer.events is None:
+            await context.abort(grpc.StatusCode.UNIMPLEMENTED, "tbx-server isn't tracking registry changes.")
+
+        # Rather than parking a thread in RegistryEvents.wait(), get woken up by the loop.
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        changed: asyncio.Event = asyncio.Event()
+        def on_event(_: Register_pb2.RegistryEvent) -> None:
+            loop.call_soon_threadsafe(changed.set)
+
+        self._servicer.events.add_listener(on_event)
+        try:
+            generation: int = request.since_generation
+            while True:
+                changed.clear()
+                events: list[Register_pb2.RegistryEvent] = self._servicer.events_since(generation)
+                for event in events:
+                    yield event
+                if events:
+                    generation = events[-1].generation
+                await changed.wait()
+        finally:
+            self._servicer.events.remove_listener(on_event)
+
+
+class AsyncMetricsServicer(MetricsServicer):
+
+    def __init__(self, servicer: MetricsRPCServicer) -> None:
+        self._servicer: MetricsRPCServicer = servicer
+
+    async def GetMetrics(
+        self,
+        request: MetricsRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> MetricsSnapshot:
+        return self._servicer.GetMetrics(request, context)
+
+    async def WatchMetrics(
+        self,
+        request: WatchMetricsRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> AsyncIterator[MetricsSnapshot]:
+
+        period: float = max(request.period, MIN_WATCH_PERIOD)
+        while True:
+            yield self._servicer.snapshot(request.request)
+            await asyncio.sleep(period)
+
+
+class AsyncMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """
+    The same as MetricsInterceptor, for coroutine (and async generator) handlers.
+    """
+
+    def __init__(self, metrics: RpcMetrics) -> None:
+        self._metrics: RpcMetrics = metrics
+
+    async def intercept_service(
+        self,
+        continuation: Callable[[grpc.HandlerCallDetails], Awaitable[grpc.RpcMethodHandler]],
+        handler_call_details: grpc.HandlerCallDetails,
+    ) -> grpc.RpcMethodHandler | None:
+
+        handler: grpc.RpcMethodHandler | None = await continuation(handler_call_details)
+        if handler is None:
+            return None
+
+        method: str = handler_call_details.method
+        if handler.unary_unary is not None:
+            return handler._replace(unary_unary=self._timed(method, handler.unary_unary))
+        if handler.unary_stream is not None:
+            return handler._replace(unary_stream=self._counted(method, handler.unary_stream))
+        if handler.stream_unary is not None:
+            return handler._replace(stream_unary=self._counted_unary(method, handler.stream_unary))
+        return handler._replace(stream_stream=self._counted(method, handler.stream_stream))
+
+    def _timed(self, method: str, behavior: Callable) -> Callable:
+
+        async def timed(request: Any, context: grpc.aio.ServicerContext) -> Any:
+            start: float = time.perf_counter()
+            try:
+                response: Any = await behavior(request, context)
+            except Exception:
+                self._metrics.record(method, latency=time.perf_counter() - start, error=True)
+                raise
+            self._metrics.record(method, latency=time.perf_counter() - start)
+            return response
+
+        return timed
+
+    def _counted_unary(self, method: str, behavior: Callable) -> Callable:
+
+        async def counted(request: Any, context: grpc.aio.ServicerContext) -> Any:
+            self._metrics.record(method)
+            try:
+                return await behavior(request, context)
+            except Exception:
+                self._metrics.record_error(method)
+                raise
+
+        return counted
+
+    def _counted(self, method: str, behavior: Callable) -> Callable:
+
+        async def counted(request: Any, context: grpc.aio.ServicerContext) -> AsyncIterator[Any]:
+            self._metrics.record(method)
+            try:
+                async for response in behavior(request, context):
+                    yield response
+            except Exception:
+                self._metrics.record_error(method)
+                raise
+
+        return counted
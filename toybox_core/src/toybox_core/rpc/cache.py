@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+"""
+A client-side copy of the tbx-server's registry: the topic graph and the list of
+registered clients. It's kept up to date by the server's WatchRegistry stream, so
+queries are answered locally instead of costing an RPC each.
+
+Once the process-wide cache has been started (get_discovery_cache()), list_topics_rpc(),
+get_registered_clients_rpc() and topic_publishers_rpc() answer from it for as long as
+it's in sync.
+"""
+
+import threading
+import time
+
+import grpc
+
+from toybox_core.client import Client
+from toybox_core.logging import LOG
+from toybox_core.registry import apply_event
+from toybox_core.rpc.channel import get_stub, rpc_timeout
+from toybox_core.topic import Topic
+import toybox_msgs.core.Register_pb2 as Register_pb2
+import toybox_msgs.core.Register_pb2_grpc as Register_pb2_grpc
+
+
+class DiscoveryCache():
+
+    # How long to wait before re-connecting a broken watch stream, in seconds.
+    RETRY_PERIOD: float = 0.5
+
+    def __init__(self) -> None:
+
+        self._topics: dict[str,Topic] = {}
+        self._clients: dict[str,Client] = {}
+        self._generation: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+        # Set once the cache has caught up with the server at least once.
+        self._synced: threading.Event = threading.Event()
+        self._stopping: threading.Event = threading.Event()
+        self._stream: grpc.Future | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def synced(self) -> bool:
+        """
+        Whether the cache is following the server right now, i.e., its answers are current.
+        """
+        return self._synced.is_set()
+
+    def start(self, timeout: float | None = None) -> bool:
+        """
+        Start following the tbx-server's registry.
+
+        Returns:
+            bool: whether the cache was populated within `timeout`
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.name = "tbx_discovery_cache"
+            self._thread.start()
+
+        return self._synced.wait(timeout=timeout)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._synced.clear()
+        stream: grpc.Future | None = self._stream
+        if stream is not None:
+            stream.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def topics(self, prefix: str = "") -> list[Topic]:
+        with self._lock:
+            return [topic for name, topic in sorted(self._topics.items()) if name.startswith(prefix)]
+
+    def get_topic(self, topic_name: str) -> Topic | None:
+        with self._lock:
+            return self._topics.get(topic_name, None)
+
+    def clients(self, prefix: str = "") -> list[Client]:
+        with self._lock:
+            return [client for name, client in sorted(self._clients.items()) if name.startswith(prefix)]
+
+    def get_client(self, client_id: str) -> Client | None:
+        with self._lock:
+            return self._clients.get(client_id, None)
+
+    # threading.Thread
+    def _run(self) -> None:
+
+        while not self._stopping.is_set():
+            request: Register_pb2.WatchRegistryRequest = Register_pb2.WatchRegistryRequest(
+                since_generation=self._generation)
+            try:
+                self._stream = get_stub(Register_pb2_grpc.RegisterStub).WatchRegistry(
+                    request, wait_for_ready=True)
+                for event in self._stream:
+                    self.apply(event)
+                    if event.kind == Register_pb2.RegistryEvent.SNAPSHOT_END:
+                        self._synced.set()
+            except grpc.RpcError as e:
+                if self._stopping.is_set():
+                    return
+                # Whatever happened while we were away, we won't know we've caught up
+                # until we've seen a snapshot end. Until then, lookups go to the server.
+                self._synced.clear()
+                self._generation = 0
+                LOG("DEBUG", f"Registry watch stream broke, retrying: {e}")
+                time.sleep(self.RETRY_PERIOD)
+
+    def apply(self, event: Register_pb2.RegistryEvent) -> None:
+
+        with self._lock:
+            apply_event(event, clients=self._clients, topics=self._topics)
+            self._generation = event.generation
+
+
+_cache: DiscoveryCache | None = None
+_cache_lock: threading.Lock = threading.Lock()
+
+
+def get_discovery_cache() -> DiscoveryCache:
+    """
+    The process-wide DiscoveryCache, started (and given a chance to sync) on first use.
+    """
+    global _cache
+
+    with _cache_lock:
+        if _cache is not None:
+            return _cache
+        _cache = DiscoveryCache()
+
+    if not _cache.start(timeout=rpc_timeout()):
+        LOG("DEBUG", "Discovery cache hasn't caught up with the tbx-server yet; asking it directly until then.")
+    return _cache
+
+
+def synced_discovery_cache() -> DiscoveryCache | None:
+    """
+    The process-wide DiscoveryCache if it's been started and is in sync, without starting it.
+    """
+    cache: DiscoveryCache | None = _cache
+    if cache is None or not cache.synced:
+        return None
+    return cache
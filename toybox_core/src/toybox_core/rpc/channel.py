@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""
+The control-plane client: every stub that talks to the tbx-server shares one
+lazily-created channel per process.
+
+The tbx-server's address can be set with the TBX_SERVER environment variable
+(e.g., `localhost:50051`, or `unix:/tmp/tbx.sock` for a Unix domain socket),
+and the default RPC deadline with TBX_RPC_TIMEOUT (in seconds).
+"""
+
+import os
+import threading
+from typing import Any, TypeVar
+
+import grpc
+
+
+DEFAULT_TBX_SERVER_HOST: str = "localhost"
+DEFAULT_TBX_SERVER_PORT: int = 50051
+DEFAULT_TBX_SERVER_TARGET: str = f"{DEFAULT_TBX_SERVER_HOST}:{DEFAULT_TBX_SERVER_PORT}"
+
+# Deadline for control-plane RPCs, in seconds.
+DEFAULT_RPC_TIMEOUT: float = 5.0
+
+TBX_SERVER_ENV: str = "TBX_SERVER"
+TBX_RPC_TIMEOUT_ENV: str = "TBX_RPC_TIMEOUT"
+
+# Ping the server periodically so that dead connections are noticed, even when idle.
+CHANNEL_OPTIONS: list[tuple[str,Any]] = [
+    ("grpc.keepalive_time_ms", 10000),
+    ("grpc.keepalive_timeout_ms", 5000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# The server has to agree to the pings above, or it'll hang up on us.
+SERVER_OPTIONS: list[tuple[str,Any]] = [
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_ping_interval_without_data_ms", 5000),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+
+StubType = TypeVar("StubType")
+
+_lock: threading.Lock = threading.Lock()
+_target: str | None = None
+_timeout: float | None = None
+_channel: grpc.Channel | None = None
+_stubs: dict[type, Any] = {}
+
+
+def get_server_target() -> str:
+    """
+    The address of the tbx-server, in gRPC target syntax.
+    """
+    if _target is not None:
+        return _target
+    return os.environ.get(TBX_SERVER_ENV, DEFAULT_TBX_SERVER_TARGET)
+
+
+def get_bind_address(target: str | None = None) -> str:
+    """
+    The address a tbx-server should bind so that clients using `target` can reach it.
+    """
+    target = target if target is not None else get_server_target()
+    if target.startswith("unix:"):
+        return target
+
+    port: str = target.rsplit(":", maxsplit=1)[-1]
+    return f"[::]:{port}"
+
+
+def rpc_timeout() -> float:
+    if _timeout is not None:
+        return _timeout
+    try:
+        return float(os.environ.get(TBX_RPC_TIMEOUT_ENV, DEFAULT_RPC_TIMEOUT))
+    except ValueError:
+        return DEFAULT_RPC_TIMEOUT
+
+
+def configure(
+    target: str | None = None,
+    timeout: float | None = None
+) -> None:
+    """
+    Override the environment-provided configuration. Any existing channel is closed,
+    and will be re-created (lazily) with the new target.
+    """
+    global _target, _timeout
+
+    _target = target
+    _timeout = timeout
+    close_channel()
+
+
+def get_channel() -> grpc.Channel:
+    """
+    Get the process-wide channel to the tbx-server, creating it on first use.
+    """
+    global _channel
+
+    with _lock:
+        if _channel is None:
+            _channel = grpc.insecure_channel(get_server_target(), options=CHANNEL_OPTIONS)
+        return _channel
+
+
+def get_stub(stub_class: type[StubType]) -> StubType:
+    """
+    Get a (cached) stub of type `stub_class` on the shared channel.
+    """
+    stub: Any | None = _stubs.get(stub_class, None)
+    if stub is not None:
+        return stub
+
+    channel: grpc.Channel = get_channel()
+    with _lock:
+        stub = _stubs.setdefault(stub_class, stub_class(channel))
+    return stub
+
+
+def close_channel() -> None:
+    global _channel
+
+    with _lock:
+        if _channel is not None:
+            _channel.close()
+        _channel = None
+        _stubs.clear()
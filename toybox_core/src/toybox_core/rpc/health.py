@@ -8,6 +8,12 @@ from toybox_msgs.core.Health_pb2 import (
     HealthState)
 from toybox_msgs.core.Health_pb2_grpc import HealthServicer, HealthStub
 
+from toybox_core.rpc.channel import DEFAULT_TBX_SERVER_HOST, DEFAULT_TBX_SERVER_PORT, get_channel
+
+
+# Readiness checks should answer quickly, whether or not anyone's there.
+HEALTH_CHECK_TIMEOUT: float = 0.5
+
 
 class HealthRPCServicer(HealthServicer):
 
@@ -28,15 +34,29 @@ class HealthRPCServicer(HealthServicer):
 
 
 def try_health_check_rpc(
-    addr: str = "localhost", 
-    port: int = 50051
+    addr: str | None = None, 
+    port: int | None = None,
+    timeout: float = HEALTH_CHECK_TIMEOUT,
 ) -> bool:
-    
-    channel: grpc.Channel = grpc.insecure_channel(f"{addr}:{port}")
+    """
+    Check whether a tbx-server is up. By default, checks the configured tbx-server
+    over the shared control-plane channel.
+    """
+
+    if addr is None and port is None:
+        return _health_check(channel=get_channel(), timeout=timeout)
+
+    target: str = f"{addr if addr else DEFAULT_TBX_SERVER_HOST}:{port if port else DEFAULT_TBX_SERVER_PORT}"
+    with grpc.insecure_channel(target) as channel:
+        return _health_check(channel=channel, timeout=timeout)
+
+
+def _health_check(channel: grpc.Channel, timeout: float) -> bool:
+
     stub: HealthStub = HealthStub(channel=channel)
 
     try:
-        response: HealthCheckResponse = stub.Check(HealthCheckRequest())
+        response: HealthCheckResponse = stub.Check(HealthCheckRequest(), timeout=timeout)
     except grpc.RpcError:
         return False
     
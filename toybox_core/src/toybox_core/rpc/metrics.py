@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+"""
+What the tbx-server is up to: per-RPC call counts, error counts and latency
+histograms (collected by a server interceptor), plus the size of its registry
+and announcement backlog.
+
+Recording a call costs a lock and a bisect, so it's cheap enough to leave on.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from queue import Queue
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+import grpc
+
+from toybox_core.client import Client
+from toybox_core.logging import LOG
+from toybox_core.registry import RegistryEvents, topic_state
+from toybox_core.rpc.channel import get_stub, rpc_timeout
+from toybox_core.topic import Topic
+
+from toybox_msgs.core.Metrics_pb2 import (
+    MetricsRequest,
+    MetricsSnapshot,
+    RpcStats,
+    WatchMetricsRequest,
+)
+from toybox_msgs.core.Metrics_pb2_grpc import MetricsServicer, MetricsStub
+
+
+# Upper bounds of the latency buckets, in seconds: 50us to 5s, doubling-ish.
+LATENCY_BOUNDS: tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# The fastest WatchMetrics will send snapshots, in seconds.
+MIN_WATCH_PERIOD: float = 0.1
+
+
+@dataclass
+class MethodStats:
+    calls: int = 0
+    errors: int = 0
+    # One more bucket than there are bounds, for anything slower than the last one.
+    latency_counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BOUNDS) + 1))
+    latency_sum: float = 0.0
+
+
+class RpcMetrics():
+    """
+    Counters and latency histograms for every RPC method the server handles.
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[str,MethodStats] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(
+        self,
+        method: str,
+        latency: float | None = None,
+        error: bool = False,
+    ) -> None:
+
+        with self._lock:
+            stats: MethodStats | None = self._stats.get(method, None)
+            if stats is None:
+                stats = self._stats[method] = MethodStats()
+            stats.calls += 1
+            if error:
+                stats.errors += 1
+            if latency is not None:
+                stats.latency_counts[bisect_left(LATENCY_BOUNDS, latency)] += 1
+                stats.latency_sum += latency
+
+    def record_error(self, method: str) -> None:
+        """
+        Count an error for a call that's already been counted (e.g., a stream that broke).
+        """
+        with self._lock:
+            stats: MethodStats | None = self._stats.get(method, None)
+            if stats is not None:
+                stats.errors += 1
+
+    def to_msgs(self) -> list[RpcStats]:
+
+        with self._lock:
+            return [
+                RpcStats(
+                    method=method,
+                    calls=stats.calls,
+                    errors=stats.errors,
+                    latency_counts=stats.latency_counts,
+                    latency_sum=stats.latency_sum)
+                for method, stats in sorted(self._stats.items())]
+
+
+def percentile(stats: RpcStats, bounds: list[float], q: float) -> float | None:
+    """
+    Estimate a latency percentile (q in [0, 1]) as the upper bound of the bucket it
+    falls in. Anything past the last bound is reported as infinity.
+    """
+
+    total: int = sum(stats.latency_counts)
+    if total == 0:
+        return None
+
+    seen: int = 0
+    for i, count in enumerate(stats.latency_counts):
+        seen += count
+        if seen >= q * total:
+            return bounds[i] if i < len(bounds) else float("inf")
+    return float("inf")
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """
+    Records every RPC the server handles. Unary calls are timed; streaming calls
+    are only counted, since how long a stream lives says nothing about the server.
+    """
+
+    def __init__(self, metrics: RpcMetrics) -> None:
+        self._metrics: RpcMetrics = metrics
+
+    def intercept_service(
+        self,
+        continuation: Callable[[grpc.HandlerCallDetails], grpc.RpcMethodHandler | None],
+        handler_call_details: grpc.HandlerCallDetails,
+    ) -> grpc.RpcMethodHandler | None:
+
+        handler: grpc.RpcMethodHandler | None = continuation(handler_call_details)
+        if handler is None:
+            return None
+
+        method: str = handler_call_details.method
+        if handler.unary_unary is not None:
+            return handler._replace(unary_unary=self._timed(method, handler.unary_unary))
+        if handler.unary_stream is not None:
+            return handler._replace(unary_stream=self._counted(method, handler.unary_stream))
+        if handler.stream_unary is not None:
+            return handler._replace(stream_unary=self._counted_unary(method, handler.stream_unary))
+        return handler._replace(stream_stream=self._counted(method, handler.stream_stream))
+
+    def _timed(self, method: str, behavior: Callable) -> Callable:
+
+        def timed(request: Any, context: grpc.ServicerContext) -> Any:
+            start: float = time.perf_counter()
+            try:
+                response: Any = behavior(request, context)
+            except Exception:
+                self._metrics.record(method, latency=time.perf_counter() - start, error=True)
+                raise
+            self._metrics.record(method, latency=time.perf_counter() - start)
+            return response
+
+        return timed
+
+    def _counted_unary(self, method: str, behavior: Callable) -> Callable:
+
+        def counted(request: Any, context: grpc.ServicerContext) -> Any:
+            self._metrics.record(method)
+            try:
+                return behavior(request, context)
+            except Exception:
+                self._metrics.record_error(method)
+                raise
+
+        return counted
+
+    def _counted(self, method: str, behavior: Callable) -> Callable:
+
+        def counted(request: Any, context: grpc.ServicerContext) -> Iterator[Any]:
+            self._metrics.record(method)
+            try:
+                yield from behavior(request, context)
+            except Exception:
+                self._metrics.record_error(method)
+                raise
+
+        return counted
+
+
+class MetricsRPCServicer(MetricsServicer):
+
+    def __init__(
+        self,
+        metrics: RpcMetrics,
+        clients: dict[str,Client],
+        topics: dict[str,Topic],
+        announcements: Queue,
+        events: RegistryEvents | None = None,
+    ) -> None:
+        self._metrics: RpcMetrics = metrics
+        self._clients: dict[str,Client] = clients
+        self._topics: dict[str,Topic] = topics
+        self._announcements: Queue = announcements
+        self._events: RegistryEvents | None = events
+
+        self._started: float = time.monotonic()
+
+    def GetMetrics(
+        self,
+        request: MetricsRequest,
+        context: grpc.ServicerContext,
+    ) -> MetricsSnapshot:
+        return self.snapshot(request)
+
+    def WatchMetrics(
+        self,
+        request: WatchMetricsRequest,
+        context: grpc.ServicerContext,
+    ) -> Iterator[MetricsSnapshot]:
+
+        period: float = max(request.period, MIN_WATCH_PERIOD)
+        while context.is_active():
+            yield self.snapshot(request.request)
+            time.sleep(period)
+
+    def snapshot(self, request: MetricsRequest) -> MetricsSnapshot:
+
+        snapshot: MetricsSnapshot = MetricsSnapshot(
+            uptime=time.monotonic() - self._started,
+            generation=self._events.generation if self._events is not None else 0,
+            client_count=len(self._clients),
+            topic_count=len(self._topics),
+            announcement_backlog=self._announcements.qsize(),
+            latency_bounds=LATENCY_BOUNDS,
+            rpcs=self._metrics.to_msgs())
+
+        if request.include_graph:
+            for topic in list(self._topics.values()):
+                snapshot.graph.append(topic_state(topic))
+
+        return snapshot
+
+
+def metrics_stub() -> MetricsStub:
+    return get_stub(MetricsStub)
+
+
+def get_metrics_rpc(include_graph: bool = False) -> MetricsSnapshot | None:
+
+    try:
+        return metrics_stub().GetMetrics(
+            MetricsRequest(include_graph=include_graph),
+            timeout=rpc_timeout())
+    except grpc.RpcError as e:
+        LOG("ERR", f"Calling GetMetrics RPC failed: {e}")
+        return None
+
+
+def watch_metrics_rpc(
+    period: float = 1.0,
+    include_graph: bool = False,
+) -> Iterator[MetricsSnapshot]:
+    """
+    Snapshots from the tbx-server every `period` seconds, until it goes away.
+    """
+
+    request: WatchMetricsRequest = WatchMetricsRequest(
+        request=MetricsRequest(include_graph=include_graph),
+        period=period)
+    try:
+        for snapshot in metrics_stub().WatchMetrics(request):
+            yield snapshot
+    except grpc.RpcError as e:
+        LOG("ERR", f"Metrics stream broke: {e}")
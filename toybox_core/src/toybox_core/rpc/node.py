@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import grpc
+import threading
 from typing import Any, Callable
 
 from toybox_core.connection import Subscriber
@@ -30,6 +31,9 @@ class NodeRPCServicer(NodeServicer):
 
         self.logger: TbxLogger = logger if logger else TbxLogger()
 
+    def subscribed_to(self, topic_name: str) -> bool:
+        return any(sub.topic.name == topic_name for sub in list(self._subscribers))
+
     def InformOfPublisher(
         self, 
         request: Node_pb2.TopicPublisherInfo, 
@@ -68,6 +72,26 @@ class NodeRPCServicer(NodeServicer):
         
         return Node_pb2.InformConfirmation(return_code=0)
 
+    def InformOfPublisherLost(
+        self,
+        request: Node_pb2.TopicPublisherInfo,
+        context: grpc.ServicerContext,
+    ) -> Node_pb2.InformConfirmation:
+        """
+        The tbx-server tells us that a publisher we may be connected to has died.
+        """
+
+        self.logger.LOG("DEBUG", f"Got InformOfPublisherLost RPC {request.publisher}")
+        topic_name: str = request.topic_def.topic_name
+        publisher_id: str = request.publisher.publisher_id
+
+        for subscriber in self._subscribers:
+            if subscriber.topic.name != topic_name:
+                continue
+            subscriber.remove_publisher(publisher_id)
+
+        return Node_pb2.InformConfirmation(return_code=0)
+
     def InformOfShutdown(
         self, 
         request: Null, 
@@ -78,3 +102,67 @@ class NodeRPCServicer(NodeServicer):
         # This may or may not ever get back to the caller, which doesn't matter
         # since the caller won't be waiting for the response anyway.
         return Null()
+
+
+class ContainerNodeServicer(NodeServicer):
+    """
+    Services RPCs for every Node in a NodeContainer. They all share one RPC server (and
+    so were all registered at the same port), so each RPC goes to whichever of them it
+    concerns.
+    """
+
+    def __init__(self) -> None:
+        self._servicers: list[NodeRPCServicer] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def add(self, servicer: NodeRPCServicer) -> None:
+        with self._lock:
+            self._servicers.append(servicer)
+
+    def remove(self, servicer: NodeRPCServicer) -> None:
+        with self._lock:
+            if servicer in self._servicers:
+                self._servicers.remove(servicer)
+
+    def _subscribed_to(self, topic_name: str) -> list[NodeRPCServicer]:
+        with self._lock:
+            return [servicer for servicer in self._servicers if servicer.subscribed_to(topic_name)]
+
+    def InformOfPublisher(
+        self, 
+        request: Node_pb2.TopicPublisherInfo, 
+        context: grpc.ServicerContext,
+    ) -> Node_pb2.InformConfirmation:
+        
+        # Every Node here that subscribes to the topic gets the publisher, whichever one
+        # the tbx-server meant; adding a publisher twice is harmless.
+        response: Node_pb2.InformConfirmation = Node_pb2.InformConfirmation(
+            return_code=1,
+            status="Not subscribed to this topic.")
+        for servicer in self._subscribed_to(request.topic_def.topic_name):
+            confirmation: Node_pb2.InformConfirmation = servicer.InformOfPublisher(request, context)
+            if response.return_code != 0:
+                response = confirmation
+        return response
+
+    def InformOfPublisherLost(
+        self,
+        request: Node_pb2.TopicPublisherInfo,
+        context: grpc.ServicerContext,
+    ) -> Node_pb2.InformConfirmation:
+
+        for servicer in self._subscribed_to(request.topic_def.topic_name):
+            servicer.InformOfPublisherLost(request, context)
+        return Node_pb2.InformConfirmation(return_code=0)
+
+    def InformOfShutdown(
+        self, 
+        request: Null, 
+        context: grpc.ServicerContext
+    ) -> Null:
+
+        with self._lock:
+            servicers: list[NodeRPCServicer] = list(self._servicers)
+        for servicer in servicers:
+            servicer.InformOfShutdown(request, context)
+        return Null()
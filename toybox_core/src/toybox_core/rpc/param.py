@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+
+"""
+Runtime parameters.
+
+The tbx-server keeps every parameter in a ParamStore, which (like the registry) bumps
+a generation number on every change and remembers recent changes for a while. Each
+process keeps a ParamCache: a copy of every parameter, kept up to date by the
+server's WatchParams stream. Reading a parameter is a dict lookup, so it's fine to do
+from a control loop; setting one is an RPC, after which every cache hears about it.
+"""
+
+from collections import deque
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+import grpc
+
+from toybox_msgs.core.Param_pb2 import (
+    DeleteParamRequest,
+    GetParamsRequest,
+    Param,
+    ParamEvent,
+    ParamList,
+    ParamValue,
+    SetParamRequest,
+    WatchParamsRequest,
+)
+from toybox_msgs.core.Param_pb2_grpc import ParamsServicer, ParamsStub
+from toybox_msgs.core.Topic_pb2 import Confirmation
+
+from toybox_core.logging import LOG
+from toybox_core.registry import DEFAULT_MAX_EVENTS
+from toybox_core.rpc.channel import get_stub, rpc_timeout
+
+
+# How often a WatchParams stream checks whether its caller is still there, in seconds.
+WATCH_POLL_PERIOD: float = 1.0
+
+ParamCallback = Callable[[str, Any], None]
+
+
+def to_param_value(value: Any) -> ParamValue:
+
+    # bool first, since bools are ints too.
+    if isinstance(value, bool):
+        return ParamValue(bool_value=value)
+    elif isinstance(value, int):
+        return ParamValue(int_value=value)
+    elif isinstance(value, float):
+        return ParamValue(double_value=value)
+    elif isinstance(value, str):
+        return ParamValue(string_value=value)
+    elif isinstance(value, bytes):
+        return ParamValue(bytes_value=value)
+    raise TypeError(f"Parameters can't be of type <{type(value).__name__}>")
+
+
+def from_param_value(value: ParamValue) -> Any:
+    kind: str | None = value.WhichOneof("value")
+    return getattr(value, kind) if kind is not None else None
+
+
+def watched(event: ParamEvent, prefix: str) -> bool:
+    """
+    Whether a watcher of parameters starting with `prefix` should see `event`.
+    """
+    if event.kind in (ParamEvent.SET, ParamEvent.DELETED):
+        return event.param.name.startswith(prefix)
+    return True
+
+
+class ParamStore():
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS) -> None:
+
+        self._params: dict[str,ParamValue] = {}
+        self._generation: int = 0
+        self._events: deque[ParamEvent] = deque(maxlen=max_events)
+
+        self._lock: threading.Condition = threading.Condition()
+        self._listeners: list[Callable[[ParamEvent], None]] = []
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, prefix: str = "") -> list[Param]:
+        with self._lock:
+            return [
+                Param(name=name, value=value)
+                for name, value in sorted(self._params.items()) if name.startswith(prefix)]
+
+    def set(self, name: str, value: ParamValue) -> bool:
+        """
+        Returns:
+            bool: False if the parameter already exists with a different type
+        """
+
+        with self._lock:
+            existing: ParamValue | None = self._params.get(name, None)
+            if existing is not None and existing.WhichOneof("value") != value.WhichOneof("value"):
+                return False
+            if existing == value:
+                # Nothing's changed, so don't bother anyone about it.
+                return True
+
+            self._params[name] = value
+            self._record(ParamEvent(kind=ParamEvent.SET, param=Param(name=name, value=value)))
+        return True
+
+    def delete(self, name: str) -> bool:
+
+        with self._lock:
+            if self._params.pop(name, None) is None:
+                return False
+            self._record(ParamEvent(kind=ParamEvent.DELETED, param=Param(name=name)))
+        return True
+
+    def _record(self, event: ParamEvent) -> None:
+
+        # Called with the lock held.
+        self._generation += 1
+        event.generation = self._generation
+        self._events.append(event)
+        self._lock.notify_all()
+
+        for listener in self._listeners:
+            listener(event)
+
+    def since(self, generation: int) -> list[ParamEvent] | None:
+        """
+        Get every event after `generation`.
+
+        Returns:
+            list[ParamEvent] | None: the events, oldest first, or None if they're no
+                longer available (in which case, start over from a snapshot).
+        """
+        with self._lock:
+            if generation == 0 or generation > self._generation:
+                return None
+            if generation == self._generation:
+                return []
+            if not self._events or self._events[0].generation > generation + 1:
+                return None
+            return [event for event in self._events if event.generation > generation]
+
+    def snapshot(self, prefix: str = "") -> list[ParamEvent]:
+        """
+        Every parameter as a RESET, one SET per parameter, then SNAPSHOT_END.
+        """
+        with self._lock:
+            generation: int = self._generation
+            events: list[ParamEvent] = [ParamEvent(kind=ParamEvent.RESET, generation=generation)]
+            for name, value in sorted(self._params.items()):
+                if name.startswith(prefix):
+                    events.append(ParamEvent(
+                        kind=ParamEvent.SET,
+                        param=Param(name=name, value=value),
+                        generation=generation))
+            events.append(ParamEvent(kind=ParamEvent.SNAPSHOT_END, generation=generation))
+            return events
+
+    def events_since(self, generation: int, prefix: str = "") -> list[ParamEvent]:
+        """
+        Everything a watcher that's seen `generation` needs to catch up, including events
+        for parameters that don't start with `prefix` (which the watcher should skip, but
+        which still move its generation along).
+        """
+        events: list[ParamEvent] | None = self.since(generation)
+        if events is None:
+            return self.snapshot(prefix)
+        return events
+
+    def wait(self, generation: int, timeout: float | None = None) -> bool:
+        """
+        Block until the parameters move past `generation`, or `timeout` runs out.
+        """
+        with self._lock:
+            return self._lock.wait_for(lambda: self._generation != generation, timeout=timeout)
+
+    def add_listener(self, listener: Callable[[ParamEvent], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[ParamEvent], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+class ParamRPCServicer(ParamsServicer):
+
+    def __init__(self, store: ParamStore) -> None:
+        self._store: ParamStore = store
+
+    @property
+    def store(self) -> ParamStore:
+        return self._store
+
+    def GetParams(
+        self,
+        request: GetParamsRequest,
+        context: grpc.ServicerContext,
+    ) -> ParamList:
+        return ParamList(
+            params=self._store.get(request.prefix),
+            generation=self._store.generation)
+
+    def SetParam(
+        self,
+        request: SetParamRequest,
+        context: grpc.ServicerContext,
+    ) -> Confirmation:
+
+        conf: Confirmation = Confirmation(uuid="-", return_code=0)
+        if not request.param.name:
+            conf.return_code = 1
+            conf.status = "Parameters need a name."
+        elif request.param.value.WhichOneof("value") is None:
+            conf.return_code = 2
+            conf.status = f"No value given for parameter <{request.param.name}>."
+        elif not self._store.set(request.param.name, request.param.value):
+            conf.return_code = 3
+            conf.status = f"Parameter <{request.param.name}> already exists with a different type."
+        return conf
+
+    def DeleteParam(
+        self,
+        request: DeleteParamRequest,
+        context: grpc.ServicerContext,
+    ) -> Confirmation:
+
+        conf: Confirmation = Confirmation(uuid="-", return_code=0)
+        if not self._store.delete(request.name):
+            conf.return_code = 1
+            conf.status = f"No parameter <{request.name}>."
+        return conf
+
+    def WatchParams(
+        self,
+        request: WatchParamsRequest,
+        context: grpc.ServicerContext,
+    ) -> Iterator[ParamEvent]:
+
+        generation: int = request.since_generation
+        while context.is_active():
+            events: list[ParamEvent] = self._store.events_since(generation, request.prefix)
+            for event in events:
+                if watched(event, request.prefix):
+                    yield event
+            if events:
+                generation = events[-1].generation
+
+            self._store.wait(generation, timeout=WATCH_POLL_PERIOD)
+
+
+class ParamCache():
+    """
+    A copy of the tbx-server's parameters (those starting with `prefix`), kept up to
+    date by its WatchParams stream.
+    """
+
+    # How long to wait before re-connecting a broken watch stream, in seconds.
+    RETRY_PERIOD: float = 0.5
+
+    def __init__(self, prefix: str = "") -> None:
+
+        self._prefix: str = prefix
+        self._params: dict[str,Any] = {}
+        # While a snapshot is coming in, the old values keep being served from _params.
+        self._incoming: dict[str,Any] | None = None
+        self._generation: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+        # (prefix, callback), called with (name, value) whenever a parameter changes.
+        # The value is None if the parameter was deleted.
+        self._listeners: list[tuple[str,ParamCallback]] = []
+
+        self._synced: threading.Event = threading.Event()
+        self._stopping: threading.Event = threading.Event()
+        self._stream: grpc.Future | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def synced(self) -> bool:
+        return self._synced.is_set()
+
+    def start(self, timeout: float | None = None) -> bool:
+        """
+        Start following the tbx-server's parameters.
+
+        Returns:
+            bool: whether the cache was populated within `timeout`
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.name = "tbx_param_cache"
+            self._thread.start()
+
+        return self._synced.wait(timeout=timeout)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        stream: grpc.Future | None = self._stream
+        if stream is not None:
+            stream.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        # Lock-free: a single dict lookup is atomic, and _params is only ever replaced wholesale.
+        return self._params.get(name, default)
+
+    def params(self, prefix: str = "") -> dict[str,Any]:
+        with self._lock:
+            return {name: value for name, value in self._params.items() if name.startswith(prefix)}
+
+    def put(self, name: str, value: Any) -> None:
+        """
+        Update our copy ahead of the server's event, e.g., right after setting a parameter.
+        """
+        self._changed({name: value})
+
+    def add_listener(self, prefix: str, callback: ParamCallback) -> None:
+        with self._lock:
+            self._listeners.append((prefix, callback))
+
+    def remove_listener(self, callback: ParamCallback) -> None:
+        with self._lock:
+            self._listeners = [listener for listener in self._listeners if listener[1] is not callback]
+
+    # threading.Thread
+    def _run(self) -> None:
+
+        while not self._stopping.is_set():
+            request: WatchParamsRequest = WatchParamsRequest(
+                prefix=self._prefix,
+                since_generation=self._generation)
+            try:
+                self._stream = params_stub().WatchParams(request, wait_for_ready=True)
+                for event in self._stream:
+                    self.apply(event)
+            except grpc.RpcError as e:
+                if self._stopping.is_set():
+                    return
+                LOG("DEBUG", f"Parameter watch stream broke, retrying: {e}")
+                time.sleep(self.RETRY_PERIOD)
+
+    def apply(self, event: ParamEvent) -> None:
+
+        self._generation = event.generation
+
+        if event.kind == ParamEvent.RESET:
+            self._incoming = {}
+        elif event.kind == ParamEvent.SNAPSHOT_END:
+            if self._incoming is not None:
+                incoming: dict[str,Any] = self._incoming
+                self._incoming = None
+                changes: dict[str,Any] = {name: None for name in self._params if name not in incoming}
+                changes.update(incoming)
+                self._changed(changes, replace=True)
+            self._synced.set()
+        elif self._incoming is not None:
+            if event.kind == ParamEvent.SET:
+                self._incoming[event.param.name] = from_param_value(event.param.value)
+        elif event.kind == ParamEvent.SET:
+            self._changed({event.param.name: from_param_value(event.param.value)})
+        elif event.kind == ParamEvent.DELETED:
+            self._changed({event.param.name: None})
+
+    def _changed(self, changes: dict[str,Any], replace: bool = False) -> None:
+        """
+        Apply `changes` ({name: value, or None to delete}) and tell listeners about the
+        ones that actually changed anything.
+        """
+
+        with self._lock:
+            params: dict[str,Any] = dict(self._params)
+            changed: list[tuple[str,Any]] = []
+            for name, value in changes.items():
+                if params.get(name, None) == value and (value is None or name in params):
+                    continue
+                if value is None:
+                    params.pop(name, None)
+                else:
+                    params[name] = value
+                changed.append((name, value))
+            self._params = params
+            listeners: list[tuple[str,ParamCallback]] = list(self._listeners)
+
+        for name, value in changed:
+            for prefix, callback in listeners:
+                if not name.startswith(prefix):
+                    continue
+                try:
+                    callback(name, value)
+                except Exception as e:
+                    LOG("ERR", f"Parameter callback {callback} raised: {e}")
+
+
+_cache: ParamCache | None = None
+_cache_lock: threading.Lock = threading.Lock()
+
+
+def get_param_cache() -> ParamCache:
+    """
+    The process-wide ParamCache, started (and given a chance to sync) on first use.
+    """
+    global _cache
+
+    with _cache_lock:
+        if _cache is not None:
+            return _cache
+        _cache = ParamCache()
+
+    if not _cache.start(timeout=rpc_timeout()):
+        LOG("WARN", "Couldn't fetch parameters from the tbx-server yet; defaults will be used until then.")
+    return _cache
+
+
+def params_stub() -> ParamsStub:
+    return get_stub(ParamsStub)
+
+
+def get_params_rpc(prefix: str = "") -> dict[str,Any]:
+
+    response: ParamList = params_stub().GetParams(
+        request=GetParamsRequest(prefix=prefix),
+        timeout=rpc_timeout(),
+        wait_for_ready=True)
+    return {param.name: from_param_value(param.value) for param in response.params}
+
+
+def set_param_rpc(name: str, value: Any) -> bool:
+
+    request: SetParamRequest = SetParamRequest(param=Param(name=name, value=to_param_value(value)))
+    conf: Confirmation = params_stub().SetParam(
+        request=request,
+        timeout=rpc_timeout(),
+        wait_for_ready=True)
+    if conf.return_code != 0:
+        LOG("WARN", f"Failed to set parameter <{name}>: {conf.status}")
+    return (conf.return_code == 0)
+
+
+def delete_param_rpc(name: str) -> bool:
+
+    conf: Confirmation = params_stub().DeleteParam(
+        request=DeleteParamRequest(name=name),
+        timeout=rpc_timeout(),
+        wait_for_ready=True)
+    return (conf.return_code == 0)
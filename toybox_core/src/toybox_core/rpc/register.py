@@ -1,18 +1,30 @@
 #!/usr/bin/env python3
 
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Union
+from typing import Callable, Dict, Iterator, List, Union
 
 import grpc
 import concurrent.futures as futures
 import threading
+import time
 
 from toybox_core.client import Client
 from toybox_core.logging import LOG
+from toybox_core.registry import RegistryEvents, client_info, paginate, snapshot
+from toybox_core.rpc.cache import DiscoveryCache, synced_discovery_cache
+from toybox_core.rpc.channel import DEFAULT_TBX_SERVER_PORT, get_stub, rpc_timeout
+from toybox_core.rpc.topic import TopicRPCServicer
 from toybox_core.topic import Topic
 import toybox_msgs.core.Register_pb2 as Register_pb2
 import toybox_msgs.core.Register_pb2_grpc as Register_pb2_grpc
-import toybox_msgs.core.Null_pb2 as Null_pb2
+import toybox_msgs.core.Topic_pb2 as Topic_pb2
+
+
+# How long a client's registration lives without a heartbeat, in seconds.
+DEFAULT_LEASE_DURATION: float = 5.0
+
+# How often WatchRegistry streams check whether their watcher has gone away, in seconds.
+WATCH_POLL_PERIOD: float = 1.0
 
 
 class RegisterServicer(Register_pb2_grpc.RegisterServicer):
@@ -21,14 +33,31 @@ class RegisterServicer(Register_pb2_grpc.RegisterServicer):
         self, 
         clients: dict[str,Client],
         topics: dict[str,Topic],
-        deregister_callback: Callable[[str], bool] | None = None
+        deregister_callback: Callable[[str], bool] | None = None,
+        lease_duration: float = DEFAULT_LEASE_DURATION,
+        topic_servicer: TopicRPCServicer | None = None,
+        events: RegistryEvents | None = None,
+        epoch: int = 0,
     ) -> None:
         self._clients: dict[str,Client] = clients
         self._topics: dict[str,Topic] = topics
+        self._events: RegistryEvents | None = events
+
+        # DeclareNode handles topics too, so it needs someone to hand them off to.
+        self._topic_servicer: TopicRPCServicer | None = topic_servicer
 
         self._deregister_callback: Callable[[str], bool] | None 
         self._deregister_callback = deregister_callback
 
+        self._lease_duration: float = lease_duration
+
+        # Identifies this run of the server (0 if the server doesn't say).
+        self._epoch: int = epoch
+
+    @property
+    def events(self) -> RegistryEvents | None:
+        return self._events
+
     def RegisterClient(
         self, 
         request: Register_pb2.RegisterRequest, 
@@ -54,12 +83,18 @@ class RegisterServicer(Register_pb2_grpc.RegisterServicer):
             rpc_port=meta.port,
             data_port=meta.data_port if meta.data_port else -1)
         new_client.initialize()
+        new_client.renew_lease(self._lease_duration)
 
         self._clients[client_id] = new_client
+        if self._events is not None:
+            self._events.client_updated(new_client)
         
         LOG("INFO", f"Registered client <{client_id}> at <{meta.addr}:{meta.port}>")
         
-        return Register_pb2.RegisterResponse(return_code=0)
+        return Register_pb2.RegisterResponse(
+            return_code=0, 
+            lease_duration=self._lease_duration,
+            server_epoch=self._epoch)
 
     def DeRegisterClient(
         self, 
@@ -76,16 +111,11 @@ class RegisterServicer(Register_pb2_grpc.RegisterServicer):
                 return_code=1,
                 status=f'No client with ID <{client_id}> registered.')
         
-        if self._deregister_callback is None:
-            del self._clients[client_id]
-            LOG("INFO", f"De-registered client <{client_id}>.")
-            return Register_pb2.RegisterResponse(return_code=0)
-
-        result: bool = self._deregister_callback(client_id)
-        if not result:
+        if not self._remove_client(client_id):
             return Register_pb2.RegisterResponse(return_code=1, status="De-register callback failed.")
 
-        LOG("INFO", f"De-registered client <{client_id}> with de-register callback.")
+        LOG("INFO", f"De-registered client <{client_id}>" + \
+            (" with de-register callback." if self._deregister_callback is not None else "."))
         return Register_pb2.RegisterResponse(return_code=0)
     
     def GetClientInfo(
@@ -125,38 +155,194 @@ class RegisterServicer(Register_pb2_grpc.RegisterServicer):
     
     def GetRegisteredClients(
         self, 
-        request: Null_pb2.Null, 
+        request: Register_pb2.ListClientsRequest, 
         context: grpc.ServicerContext
     ) -> Register_pb2.ClientList:
         """
-        RPC call for getting a list of ALL registered TBX clients.
+        RPC call for getting a list of ALL registered TBX clients (or a page of them).
         """
 
         client_list: Register_pb2.ClientList = Register_pb2.ClientList()
-
-        for _, client in self._clients.items():
-            client_info: Register_pb2.ClientInfo = Register_pb2.ClientInfo()
-            
-            client_info.client_id = client.client_id
-            client_meta: Register_pb2.ClientMetadata = Register_pb2.ClientMetadata(
-                addr=client.addr,
-                port=client.rpc_port,
-                data_port=client.data_port)
-            client_info.meta.CopyFrom(client_meta)
-            
-            client_list.clients.append(client_info)
+        client_list.generation = self._events.generation if self._events is not None else 0
+
+        if request.if_generation_changed and request.if_generation_changed == client_list.generation:
+            client_list.unchanged = True
+            return client_list
+
+        client_ids: list[str] = sorted(
+            client_id for client_id in list(self._clients.keys()) if client_id.startswith(request.prefix))
+        page: list[str]
+        page, client_list.next_page_token = paginate(
+            names=client_ids,
+            page_size=request.page_size,
+            page_token=request.page_token)
+
+        for client_id in page:
+            client: Client | None = self._clients.get(client_id, None)
+            if client is not None:
+                client_list.clients.append(client_info(client))
         
         return client_list
 
+    def Heartbeat(
+        self,
+        request_iterator: Iterator[Register_pb2.HeartbeatRequest],
+        context: grpc.ServicerContext,
+    ) -> Iterator[Register_pb2.HeartbeatResponse]:
+        """
+        Streaming RPC used by clients to renew their leases. Each request can carry
+        any number of client IDs, so a process only ever needs one of these streams.
+        """
+
+        for request in request_iterator:
+            yield self.renew_leases(request)
+
+    def renew_leases(
+        self, 
+        request: Register_pb2.HeartbeatRequest
+    ) -> Register_pb2.HeartbeatResponse:
+
+        response: Register_pb2.HeartbeatResponse = Register_pb2.HeartbeatResponse(
+            lease_duration=self._lease_duration,
+            server_epoch=self._epoch)
+
+        for client_id in request.client_ids:
+            client: Client | None = self._clients.get(client_id, None)
+            if client is None:
+                response.unknown_client_ids.append(client_id)
+                continue
+            client.renew_lease(self._lease_duration)
+
+        return response
+
+    def DeclareNode(
+        self,
+        request: Register_pb2.DeclareNodeRequest,
+        context: grpc.ServicerContext,
+    ) -> Register_pb2.DeclareNodeResponse:
+        """
+        RPC called by clients that want to register, advertise, and subscribe all at once.
+        """
+
+        response: Register_pb2.DeclareNodeResponse = Register_pb2.DeclareNodeResponse()
+
+        client_id: str = request.registration.client_id
+        if request.reassert and client_id in self._clients:
+            # The declaration is the whole truth about this client, so drop whatever we
+            # had (e.g., restored from before a restart) and take it from the top. It goes
+            # the same way as a deregistration, so watchers and the journal see it go.
+            if not self._remove_client(client_id):
+                response.registration.return_code = 1
+                response.registration.status = f"Failed to replace client <{client_id}>."
+                return response
+        
+        response.registration.CopyFrom(self.RegisterClient(request.registration, context))
+        if response.registration.return_code != 0:
+            return response
+
+        if self._topic_servicer is None:
+            if request.advertisements or request.subscriptions:
+                response.registration.return_code = 1
+                response.registration.status = "tbx-server can't handle topics in DeclareNode."
+            return response
+
+        for advertisement in request.advertisements:
+            response.advertisements.append(
+                self._topic_servicer.AdvertiseTopic(advertisement, context))
+        for subscription in request.subscriptions:
+            response.subscriptions.append(
+                self._topic_servicer.SubscribeTopic(subscription, context))
+
+        LOG("INFO", f"{'Re-asserted' if request.reassert else 'Declared'} node <{client_id}> with " \
+            f"{len(request.advertisements)} publishers and {len(request.subscriptions)} subscriptions.")
+
+        return response
+
+    def _remove_client(self, client_id: str) -> bool:
+        """
+        Remove a client, and everything attached to it. With a de-register callback, that's
+        the callback's job; otherwise, the client's just taken off its topics.
+        """
+
+        if self._deregister_callback is not None:
+            return self._deregister_callback(client_id)
+
+        del self._clients[client_id]
+        if self._events is not None:
+            self._events.client_removed(client_id)
+        self._forget_topics(client_id)
+        return True
+
+    def _forget_topics(self, client_id: str) -> None:
+        """
+        Remove a client from every topic it's on, without informing its peers.
+        """
+
+        for topic in list(self._topics.values()):
+            changed: bool = False
+            if client_id in topic.publishers:
+                del topic.publishers[client_id]
+                changed = True
+            if client_id in topic.subscribers:
+                topic.subscribers.remove(client_id)
+                changed = True
+            if changed and self._events is not None:
+                self._events.topic_updated(topic)
+
+    def WatchRegistry(
+        self,
+        request: Register_pb2.WatchRegistryRequest,
+        context: grpc.ServicerContext,
+    ) -> Iterator[Register_pb2.RegistryEvent]:
+        """
+        Stream changes to the registry, starting after the watcher's last known generation.
+        """
+
+        if self._events is None:
+            context.abort(grpc.StatusCode.UNIMPLEMENTED, "tbx-server isn't tracking registry changes.")
+
+        generation: int = request.since_generation
+        while context.is_active():
+            events: list[Register_pb2.RegistryEvent] = self.events_since(generation)
+            for event in events:
+                yield event
+            if events:
+                generation = events[-1].generation
+
+            self._events.wait(generation, timeout=WATCH_POLL_PERIOD)
+
+    def events_since(self, generation: int) -> list[Register_pb2.RegistryEvent]:
+        """
+        Everything a watcher that's seen `generation` needs to catch up.
+        """
+
+        events: list[Register_pb2.RegistryEvent] | None = self._events.since(generation)
+        if events is not None:
+            return events
+
+        # The watcher's too far behind to catch up on events, so start it over. Anything
+        # that changes while we're taking the snapshot will show up as an event after
+        # it, and applying those twice is harmless.
+        return snapshot(
+            generation=self._events.generation,
+            clients=self._clients,
+            topics=self._topics)
+
+
+def register_stub() -> Register_pb2_grpc.RegisterStub:
+    return get_stub(Register_pb2_grpc.RegisterStub)
 
-channel: grpc.insecure_channel = grpc.insecure_channel('localhost:50051')
-register_stub: Register_pb2_grpc.RegisterStub = Register_pb2_grpc.RegisterStub(channel=channel)
 
 class RegisterServer():
     
-    def __init__(self, clients: Dict[str,Client] = {}) -> None:
+    def __init__(
+        self, 
+        clients: Dict[str,Client] = {}, 
+        port: int = DEFAULT_TBX_SERVER_PORT
+    ) -> None:
         self._clients = clients
-        self._servicer = RegisterServicer(clients=self._clients)
+        self._servicer = RegisterServicer(clients=self._clients, topics={})
+        self._port: int = port
     
     def serve(self) -> None:
         
@@ -166,7 +352,7 @@ class RegisterServer():
             self._server
         )
 
-        self._server.add_insecure_port('[::]:50051')
+        self._server.add_insecure_port(f'[::]:{self._port}')
         
         self._server.start()
     
@@ -191,7 +377,10 @@ def register_client_rpc(
     client_req.meta.data_port = data_port
 
     try:
-        result: Register_pb2.RegisterResponse = register_stub.RegisterClient(request=client_req)
+        result: Register_pb2.RegisterResponse = register_stub().RegisterClient(
+            request=client_req, 
+            timeout=rpc_timeout(),
+            wait_for_ready=True)
     except grpc.RpcError as e:
         LOG('ERR', f'Calling RegisterClient RPC failed: {e}')
         return False
@@ -201,6 +390,201 @@ def register_client_rpc(
     
     return (result.return_code == 0)
 
+
+class Heartbeater():
+    """
+    Keeps the leases of every registered client in this process alive over a single
+    Heartbeat stream. The stream (and its thread) only exist while there's at least
+    one client to renew.
+    """
+
+    DEFAULT_PERIOD: float = DEFAULT_LEASE_DURATION / 3
+    RETRY_PERIOD: float = 0.5
+
+    def __init__(self) -> None:
+        # {client_id: callback for when the server no longer knows about the client}
+        self._clients: dict[str, Callable[[str], None] | None] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._wakeup: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+        # Whether _run() is (still) going to renew everyone in _clients. Only changes under
+        # _lock, at the same time as the decision to start or stop, so a client added just
+        # as the last one leaves can't end up with nobody heartbeating for it.
+        self._running: bool = False
+
+        self._period: float = self.DEFAULT_PERIOD
+
+        # The epoch of the server we last heard from, 0 if we haven't yet.
+        self._epoch: int = 0
+
+    def add(
+        self, 
+        client_id: str, 
+        on_lease_lost: Callable[[str], None] | None = None
+    ) -> None:
+        with self._lock:
+            self._clients[client_id] = on_lease_lost
+            if not self._running:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.name = "tbx_heartbeat"
+                self._thread.start()
+        # Heartbeat right away, so that the new client doesn't wait a full period.
+        self._wakeup.set()
+
+    def remove(self, client_id: str) -> None:
+        with self._lock:
+            self._clients.pop(client_id, None)
+        self._wakeup.set()
+
+    def _active(self) -> bool:
+        with self._lock:
+            return len(self._clients) > 0
+
+    def _keep_running(self) -> bool:
+        """
+        Whether _run() should carry on; if not, it's done as far as add() is concerned.
+        """
+        with self._lock:
+            self._running = len(self._clients) > 0
+            return self._running
+
+    def _requests(self) -> Iterator[Register_pb2.HeartbeatRequest]:
+        while self._active():
+            with self._lock:
+                client_ids: list[str] = list(self._clients.keys())
+            yield Register_pb2.HeartbeatRequest(client_ids=client_ids)
+
+            self._wakeup.wait(timeout=self._period)
+            self._wakeup.clear()
+
+    # threading.Thread
+    def _run(self) -> None:
+        try:
+            self._heartbeat()
+        except BaseException:
+            # Dying, rather than stopping because there's nobody left, so let add() start
+            # another one. (After a normal stop, add() may already have.)
+            with self._lock:
+                self._running = False
+            raise
+
+    def _heartbeat(self) -> None:
+
+        while self._keep_running():
+            try:
+                for response in register_stub().Heartbeat(self._requests()):
+                    if response.lease_duration > 0:
+                        self._period = response.lease_duration / 3
+                    if self._epoch and response.server_epoch and response.server_epoch != self._epoch:
+                        # The server restarted, so whatever it knows about our clients
+                        # (if anything) is stale. Have every one of them re-assert itself.
+                        LOG("WARN", "tbx-server restarted.")
+                        self._epoch = response.server_epoch
+                        with self._lock:
+                            client_ids: list[str] = list(self._clients.keys())
+                        self._handle_lost(client_ids)
+                        continue
+                    self._epoch = response.server_epoch
+                    self._handle_unknown(list(response.unknown_client_ids))
+            except grpc.RpcError as e:
+                LOG("DEBUG", f"Heartbeat stream broke, retrying: {e}")
+                time.sleep(self.RETRY_PERIOD)
+
+    def _handle_unknown(self, client_ids: list[str]) -> None:
+
+        for client_id in client_ids:
+            LOG("WARN", f"tbx-server no longer knows about client <{client_id}>.")
+        self._handle_lost(client_ids)
+
+    def _handle_lost(self, client_ids: list[str]) -> None:
+
+        for client_id in client_ids:
+            with self._lock:
+                on_lease_lost: Callable[[str], None] | None = self._clients.pop(client_id, None)
+            if on_lease_lost is not None:
+                on_lease_lost(client_id)
+
+heartbeater: Heartbeater = Heartbeater()
+
+
+@dataclass
+class DeclareNodeResult:
+    # Whether the client was registered. If not, nothing else happened.
+    registered: bool
+    # Whether each advertisement succeeded, in the order they were provided.
+    advertised: list[bool]
+    # The (publisher_id, host, port) of each subscription's publishers, in the order provided.
+    publishers: list[list[tuple[str,str,int]]]
+
+
+def declare_node_rpc(
+    name: str,
+    host: str,
+    port: int,
+    data_port: int = -1,
+    advertisements: list[tuple[str,str,int]] | None = None,
+    subscriptions: list[tuple[str,str]] | None = None,
+    reassert: bool = False,
+) -> DeclareNodeResult:
+    """
+    Register a client along with all of its topics in a single RPC.
+
+    Args:
+        reassert: replace anything the server already has for this client, instead of failing
+        advertisements: (topic_name, message_type, topic_port) for each advertised topic
+        subscriptions: (topic_name, message_type) for each subscription
+    """
+    
+    advertisements = advertisements if advertisements else []
+    subscriptions = subscriptions if subscriptions else []
+
+    request: Register_pb2.DeclareNodeRequest = Register_pb2.DeclareNodeRequest(reassert=reassert)
+    request.registration.client_id = name
+    request.registration.meta.addr = host
+    request.registration.meta.port = port
+    request.registration.meta.data_port = data_port
+
+    for topic_name, message_type, topic_port in advertisements:
+        advertisement: Topic_pb2.AdvertiseRequest = request.advertisements.add()
+        advertisement.publisher.publisher_id = name
+        advertisement.publisher.publisher_host = host
+        advertisement.publisher.topic_port = topic_port
+        advertisement.topic_def.topic_name = topic_name
+        advertisement.topic_def.message_type = message_type
+
+    for topic_name, message_type in subscriptions:
+        subscription: Topic_pb2.SubscriptionRequest = request.subscriptions.add()
+        subscription.subscriber_id = name
+        subscription.topic_def.topic_name = topic_name
+        subscription.topic_def.message_type = message_type
+
+    failed: DeclareNodeResult = DeclareNodeResult(registered=False, advertised=[], publishers=[])
+    try:
+        response: Register_pb2.DeclareNodeResponse = register_stub().DeclareNode(
+            request=request,
+            timeout=rpc_timeout(),
+            wait_for_ready=True)
+    except grpc.RpcError as e:
+        LOG("ERR", f"Calling DeclareNode RPC failed: {e}")
+        return failed
+
+    if response.registration.return_code != 0:
+        LOG("ERR", f"RPC failed: {response.registration.status}")
+        return failed
+
+    publishers: list[list[tuple[str,str,int]]] = []
+    for subscription_response in response.subscriptions:
+        publishers.append([
+            (pub.publisher_id, pub.publisher_host, pub.topic_port) 
+            for pub in subscription_response.publisher_list])
+
+    return DeclareNodeResult(
+        registered=True,
+        advertised=[conf.return_code == 0 for conf in response.advertisements],
+        publishers=publishers)
+
+
 def deregister_client_rpc(
     name: str,
     ignore_response: bool = False,
@@ -211,7 +595,7 @@ def deregister_client_rpc(
     )
     result: Register_pb2.RegisterResponse 
     try:
-        result = register_stub.DeRegisterClient(request=req)
+        result = register_stub().DeRegisterClient(request=req, timeout=rpc_timeout())
         LOG("DEBUG", f"De-registering client <{name}> returned <{result.return_code == 0}>.")
     except grpc.RpcError as e:
         if not ignore_response:
@@ -229,23 +613,48 @@ def get_client_info_rpc(
     client_req: Register_pb2.Client_ID = Register_pb2.Client_ID(
         client_id=client_name
     )
-    result: Register_pb2.ClientResponse = register_stub.GetClientInfo(request=client_req)
+    result: Register_pb2.ClientResponse = register_stub().GetClientInfo(
+        request=client_req,
+        timeout=rpc_timeout(),
+        wait_for_ready=True)
 
     return result.client
 
-def get_registered_clients_rpc() -> Register_pb2.ClientList:
+def get_registered_clients_rpc(
+    prefix: str = "",
+    page_size: int = 0,
+) -> List[Client]:
+    """
+    List every registered client (whose name starts with `prefix`), `page_size` at a
+    time, or from this process's copy of the registry if it's following it.
+    """
 
-    request: Null_pb2.Null = Null_pb2.Null()
-    result: Register_pb2.ClientList = register_stub.GetRegisteredClients(request=request)
+    cache: DiscoveryCache | None = synced_discovery_cache()
+    if cache is not None:
+        return cache.clients(prefix)
 
     registered_clients: List[Client] = []
-    for client_info in result.clients:
-        client: Client = Client(
-            client_id=client_info.client_id,
-            addr=client_info.meta.addr,
-            rpc_port=client_info.meta.port,
-            data_port=client_info.meta.data_port
-        )
-        registered_clients.append(client)
+
+    request: Register_pb2.ListClientsRequest = Register_pb2.ListClientsRequest(
+        prefix=prefix, 
+        page_size=page_size)
+    while True:
+        result: Register_pb2.ClientList = register_stub().GetRegisteredClients(
+            request=request,
+            timeout=rpc_timeout(),
+            wait_for_ready=True)
+
+        for info in result.clients:
+            client: Client = Client(
+                client_id=info.client_id,
+                addr=info.meta.addr,
+                rpc_port=info.meta.port,
+                data_port=info.meta.data_port
+            )
+            registered_clients.append(client)
+
+        if not result.next_page_token:
+            break
+        request.page_token = result.next_page_token
     
     return registered_clients
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import threading
+
+import grpc
+
+from toybox_msgs.core.Service_pb2 import (
+    AdvertiseServiceRequest,
+    LookupServiceRequest,
+    LookupServiceResponse,
+    ServiceInfo,
+)
+from toybox_msgs.core.Service_pb2_grpc import ServiceServicer, ServiceStub
+from toybox_msgs.core.Topic_pb2 import Confirmation
+
+from toybox_core.client import Client
+from toybox_core.logging import LOG
+from toybox_core.rpc.channel import get_stub, rpc_timeout
+
+
+class ServiceRPCServicer(ServiceServicer):
+    """
+    Keeps track of who provides which request/response service. Like topics, a service
+    goes away with the client that provides it.
+    """
+
+    def __init__(
+        self,
+        services: dict[str, ServiceInfo],
+        clients: dict[str, Client],
+    ) -> None:
+        self._services: dict[str, ServiceInfo] = services
+        self._clients: dict[str, Client] = clients
+
+        self._service_lock: threading.Lock = threading.Lock()
+
+    def AdvertiseService(
+        self,
+        request: AdvertiseServiceRequest,
+        context: grpc.ServicerContext,
+    ) -> Confirmation:
+
+        service: ServiceInfo = request.service
+        conf: Confirmation = Confirmation(uuid="-", return_code=0)
+
+        LOG("DEBUG", f"Received AdvertiseService request from {service.provider_id} at " \
+            f"{service.provider_host}:{service.service_port} for <{service.service_name}>")
+
+        with self._service_lock:
+            existing: ServiceInfo | None = self._services.get(service.service_name, None)
+            # A provider may re-advertise its own service (e.g., after a restart), but a
+            # service only ever has one provider.
+            if existing is not None and existing.provider_id != service.provider_id:
+                LOG("DEBUG", f"Rejecting AdvertiseService request from {service.provider_id} for " \
+                    f"<{service.service_name}>: already provided by {existing.provider_id}.")
+                conf.return_code = 1
+                conf.status = f"service <{service.service_name}> is already provided by <{existing.provider_id}>"
+                return conf
+
+            self._services[service.service_name] = ServiceInfo()
+            self._services[service.service_name].CopyFrom(service)
+
+        conf.status = f"Service <{service.service_name}> advertised successfully."
+        return conf
+
+    def LookupService(
+        self,
+        request: LookupServiceRequest,
+        context: grpc.ServicerContext,
+    ) -> LookupServiceResponse:
+
+        response: LookupServiceResponse = LookupServiceResponse()
+        with self._service_lock:
+            service: ServiceInfo | None = self._services.get(request.service_name, None)
+            if service is not None:
+                response.found = True
+                response.service.CopyFrom(service)
+        return response
+
+
+def service_stub() -> ServiceStub:
+    return get_stub(ServiceStub)
+
+
+def advertise_service_rpc(
+    provider_id: str,
+    provider_host: str,
+    service_port: int,
+    service_name: str,
+    request_type: str,
+    response_type: str,
+) -> bool:
+
+    request: AdvertiseServiceRequest = AdvertiseServiceRequest()
+    request.service.service_name = service_name
+    request.service.request_type = request_type
+    request.service.response_type = response_type
+    request.service.provider_id = provider_id
+    request.service.provider_host = provider_host
+    request.service.service_port = service_port
+
+    conf: Confirmation = service_stub().AdvertiseService(
+        request=request,
+        timeout=rpc_timeout(),
+        wait_for_ready=True)
+    return (conf.return_code == 0)
+
+
+def lookup_service_rpc(service_name: str) -> ServiceInfo | None:
+
+    response: LookupServiceResponse = service_stub().LookupService(
+        request=LookupServiceRequest(service_name=service_name),
+        timeout=rpc_timeout(),
+        wait_for_ready=True)
+    return response.service if response.found else None
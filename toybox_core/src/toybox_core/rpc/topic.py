@@ -8,30 +8,42 @@ from queue import Queue
 from toybox_msgs.core.Topic_pb2 import (
     AdvertiseRequest,
     Confirmation,
+    ListTopicsRequest,
     SubscriptionRequest,
     SubscriptionResponse,
     TopicList
 )
 from toybox_msgs.core.Topic_pb2_grpc import TopicServicer, TopicStub
-from toybox_msgs.core.Null_pb2 import Null as NullMsg
 
 from toybox_core.client import Client
 from toybox_core.logging import LOG
+from toybox_core.registry import RegistryEvents, paginate, topic_state
+from toybox_core.rpc.cache import DiscoveryCache, synced_discovery_cache
+from toybox_core.rpc.channel import get_stub, rpc_timeout
 from toybox_core.topic import Topic
 
 
+# Once a topic has this many subscribers getting it straight from its publishers, new
+# subscribers are sent to one of its relays (if it has any).
+DEFAULT_FANOUT_THRESHOLD: int = 8
+
+
 class TopicRPCServicer(TopicServicer):
 
     def __init__(
         self, 
         topics: dict[str, Topic],
         clients: dict[str, Client],
-        announcements: Queue[tuple[str,str]]
+        announcements: Queue[tuple[str,str]],
+        events: RegistryEvents | None = None,
+        fanout_threshold: int = DEFAULT_FANOUT_THRESHOLD,
     ) -> None:
         self._topics = topics
         self._clients = clients
 
         self._announcements = announcements
+        self._events: RegistryEvents | None = events
+        self._fanout_threshold: int = fanout_threshold
 
         self._topic_lock: threading.Lock = threading.Lock()
 
@@ -70,6 +82,7 @@ class TopicRPCServicer(TopicServicer):
                 name=topic_name,
                 message_type=message_type,
                 publishers={advertiser_id: (advertiser_host, advertiser_port)})
+            self._topic_updated(self._topics[topic_name])
             conf.status = f"Topic <{topic_name}> from client <{advertiser_id}> advertised successfully."
             return conf
         
@@ -95,6 +108,7 @@ class TopicRPCServicer(TopicServicer):
         # If we've gotten to this point, the topic DOES exist already, and the topic definition
         # we were given by the RPC matches it. We're clear to add this new publisher.
         topic.publishers[advertiser_id] = (advertiser_host, advertiser_port)
+        self._topic_updated(topic)
         conf.status = f"Topic <{topic_name}> advertised successfully."
         LOG("DEBUG", f"Added new publisher <{advertiser_id}> for topic {topic_name}")
         
@@ -109,6 +123,40 @@ class TopicRPCServicer(TopicServicer):
     
     def DeAdvertiseTopic(self, request, context) -> Confirmation:
         raise NotImplementedError
+
+    def AdvertiseRelay(
+        self,
+        request: AdvertiseRequest,
+        context: grpc.ServicerContext,
+    ) -> Confirmation:
+        """
+        IN: AdvertiseRequest
+        OUT: Confirmation
+        """
+
+        relay_id: str = request.publisher.publisher_id
+        topic_name: str = request.topic_def.topic_name
+        message_type: str = request.topic_def.message_type
+
+        conf: Confirmation = Confirmation(uuid="-", return_code=0)
+
+        with self._topic_lock:
+            topic: Topic | None = self._topics.get(topic_name, None)
+            if topic is None or relay_id not in topic.subscribers:
+                # A relay has to get the topic from somewhere.
+                conf.return_code = 1
+                conf.status = f"<{relay_id}> has to subscribe to <{topic_name}> before relaying it."
+                return conf
+            if topic.message_type != message_type:
+                conf.return_code = 2
+                conf.status = f"Relayed message type <{message_type}> doesn't match <{topic.message_type}>"
+                return conf
+
+            topic.relays[relay_id] = (request.publisher.publisher_host, request.publisher.topic_port)
+
+        LOG("DEBUG", f"<{relay_id}> is relaying topic <{topic_name}>")
+        conf.status = f"Relay for <{topic_name}> advertised successfully."
+        return conf
     
     def SubscribeTopic(
         self, 
@@ -138,6 +186,7 @@ class TopicRPCServicer(TopicServicer):
                 name=topic_name,
                 message_type=message_type,
                 subscribers=[subscriber_id])
+            self._topic_updated(self._topics[topic_name])
         else:
             # The topic exists, and may or may not already have publishers
             # associated with it.
@@ -146,10 +195,22 @@ class TopicRPCServicer(TopicServicer):
                 response.conf.return_code = 1
                 return response
 
-            LOG("DEBUG", f"Adding subscriber <{subscriber_id}> to topic <{topic_name}>")
-            topic.subscribers.append(subscriber_id)
-
-            for publisher_id, publisher_info in topic.publishers.items():
+            # Subscribers ask again when they lose their publisher, so they may already be here.
+            if subscriber_id not in topic.subscribers:
+                LOG("DEBUG", f"Adding subscriber <{subscriber_id}> to topic <{topic_name}>")
+                topic.subscribers.append(subscriber_id)
+                self._topic_updated(topic)
+
+            relay_id: str | None = self._pick_relay(topic, subscriber_id)
+            if relay_id is not None:
+                LOG("DEBUG", f"Sending subscriber <{subscriber_id}> to relay <{relay_id}> for <{topic_name}>")
+                topic.relayed[subscriber_id] = relay_id
+                publishers: dict[str,tuple[str,int]] = {relay_id: topic.relays[relay_id]}
+            else:
+                topic.relayed.pop(subscriber_id, None)
+                publishers = topic.publishers
+
+            for publisher_id, publisher_info in publishers.items():
                 response.publisher_list.add(
                     publisher_id=publisher_id,
                     publisher_host=publisher_info[0],
@@ -161,28 +222,74 @@ class TopicRPCServicer(TopicServicer):
     
     def ListTopics(
         self,
-        request: NullMsg,
+        request: ListTopicsRequest,
         context: grpc.ServicerContext,
     ) -> TopicList:
 
         response: TopicList = TopicList()
-
-        for topic_name in self._topics.keys():
-            topic: Topic = self._topics[topic_name]
-            response.topics.append(topic.to_msg())
+        response.generation = self._events.generation if self._events is not None else 0
+
+        # Nothing's changed since the caller last looked, so don't bother building a list.
+        if request.if_generation_changed and request.if_generation_changed == response.generation:
+            response.unchanged = True
+            return response
+
+        topic_names: list[str] = sorted(
+            name for name in list(self._topics.keys()) if name.startswith(request.prefix))
+        page: list[str]
+        page, response.next_page_token = paginate(
+            names=topic_names, 
+            page_size=request.page_size, 
+            page_token=request.page_token)
+
+        for topic_name in page:
+            topic: Topic | None = self._topics.get(topic_name, None)
+            if topic is not None:
+                response.topics.append(topic.to_msg())
+                if request.include_state:
+                    response.states.append(topic_state(topic))
 
         return response
 
+    def _pick_relay(self, topic: Topic, subscriber_id: str) -> str | None:
+        """
+        The relay that a new subscriber to `topic` should get it from, if the topic's
+        publishers already have enough subscribers of their own. Relays themselves always
+        go straight to the publishers.
+        """
+
+        with self._topic_lock:
+            relays: list[str] = [relay for relay in topic.relays if relay != subscriber_id]
+            if not relays or subscriber_id in topic.relays:
+                return None
+
+            direct: int = sum(
+                1 for sub in topic.subscribers 
+                if sub not in topic.relayed and sub not in topic.relays and sub != subscriber_id)
+            if direct < self._fanout_threshold:
+                return None
+
+            # Spread subscribers evenly over the relays.
+            load: dict[str,int] = {relay: 0 for relay in relays}
+            for relay in topic.relayed.values():
+                if relay in load:
+                    load[relay] += 1
+            return min(relays, key=lambda relay: load[relay])
+
+    def _topic_updated(self, topic: Topic) -> None:
+        if self._events is not None:
+            self._events.topic_updated(topic)
 
-channel: grpc.insecure_channel = grpc.insecure_channel('[::]:50051')
-stub: TopicStub = TopicStub(channel=channel)
+
+def topic_stub() -> TopicStub:
+    return get_stub(TopicStub)
 
 def advertise_topic_rpc(
     client_name: str,
     client_host: str,
     topic_port: int,
     topic_name: str,
-    message_type: Message,
+    message_type: Message | str,
 ) -> bool:
 
     advertise_req: AdvertiseRequest = AdvertiseRequest()
@@ -190,9 +297,38 @@ def advertise_topic_rpc(
     advertise_req.publisher.publisher_host = client_host
     advertise_req.publisher.topic_port = topic_port
     advertise_req.topic_def.topic_name = topic_name
-    advertise_req.topic_def.message_type = message_type.DESCRIPTOR.full_name
+    advertise_req.topic_def.message_type = \
+        message_type if isinstance(message_type, str) else message_type.DESCRIPTOR.full_name
 
-    conf: Confirmation = stub.AdvertiseTopic(request=advertise_req)
+    conf: Confirmation = topic_stub().AdvertiseTopic(
+        request=advertise_req,
+        timeout=rpc_timeout(),
+        wait_for_ready=True)
+    return (conf.return_code == 0)
+
+
+def advertise_relay_rpc(
+    client_name: str,
+    client_host: str,
+    topic_port: int,
+    topic_name: str,
+    message_type: Message | str,
+) -> bool:
+
+    advertise_req: AdvertiseRequest = AdvertiseRequest()
+    advertise_req.publisher.publisher_id = client_name
+    advertise_req.publisher.publisher_host = client_host
+    advertise_req.publisher.topic_port = topic_port
+    advertise_req.topic_def.topic_name = topic_name
+    advertise_req.topic_def.message_type = \
+        message_type if isinstance(message_type, str) else message_type.DESCRIPTOR.full_name
+
+    conf: Confirmation = topic_stub().AdvertiseRelay(
+        request=advertise_req,
+        timeout=rpc_timeout(),
+        wait_for_ready=True)
+    if conf.return_code != 0:
+        LOG("WARN", f"Failed to advertise relay for <{topic_name}>: {conf.status}")
     return (conf.return_code == 0)
 
 
@@ -207,7 +343,10 @@ def subscribe_topic_rpc(
     subscribe_req.topic_def.topic_name = topic_name
     subscribe_req.topic_def.message_type = message_type
 
-    response: SubscriptionResponse = stub.SubscribeTopic(request=subscribe_req)
+    response: SubscriptionResponse = topic_stub().SubscribeTopic(
+        request=subscribe_req,
+        timeout=rpc_timeout(),
+        wait_for_ready=True)
 
     returned: list[tuple[str,str,int]] = []
     for publisher in response.publisher_list:
@@ -216,15 +355,67 @@ def subscribe_topic_rpc(
     return returned
 
 
-def list_topics_rpc() -> list[Topic]:
+def list_topics_rpc(
+    prefix: str = "",
+    page_size: int = 0,
+) -> list[Topic]:
+    """
+    List every topic (whose name starts with `prefix`), `page_size` at a time. If this
+    process is following the registry (see toybox_core.rpc.cache), the answer comes
+    from there instead.
+    """
+
+    cache: DiscoveryCache | None = synced_discovery_cache()
+    if cache is not None:
+        return [Topic(name=topic.name, message_type=topic.message_type) for topic in cache.topics(prefix)]
 
     returned: list[Topic] = []
 
-    request: NullMsg = NullMsg()
-    response: TopicList = stub.ListTopics(request=request)
+    request: ListTopicsRequest = ListTopicsRequest(prefix=prefix, page_size=page_size)
+    while True:
+        response: TopicList = topic_stub().ListTopics(
+            request=request,
+            timeout=rpc_timeout(),
+            wait_for_ready=True)
     
-    for topic_def in response.topics:
-        topic: Topic = Topic(name=topic_def.topic_name, message_type=topic_def.message_type)
-        returned.append(topic)
+        for topic_def in response.topics:
+            topic: Topic = Topic(name=topic_def.topic_name, message_type=topic_def.message_type)
+            returned.append(topic)
+
+        if not response.next_page_token:
+            break
+        request.page_token = response.next_page_token
+
+    return returned
+
 
-    return returned
\ No newline at end of file
+def topic_publishers_rpc(topic_name: str) -> list[str]:
+    """
+    Who's currently publishing `topic_name` (by client name), without subscribing to
+    it. If this process is following the registry, the answer comes from there instead.
+    """
+
+    cache: DiscoveryCache | None = synced_discovery_cache()
+    if cache is not None:
+        topic: Topic | None = cache.get_topic(topic_name)
+        return list(topic.publishers) if topic is not None else []
+
+    # Topic names are unique, but a prefix also matches any topic that starts with
+    # this one's name, so page through until the exact one turns up.
+    request: ListTopicsRequest = ListTopicsRequest(prefix=topic_name, include_state=True)
+    try:
+        while True:
+            response: TopicList = topic_stub().ListTopics(
+                request=request,
+                timeout=rpc_timeout())
+
+            for state in response.states:
+                if state.topic_def.topic_name == topic_name:
+                    return [publisher.publisher_id for publisher in state.publishers]
+
+            if not response.next_page_token:
+                return []
+            request.page_token = response.next_page_token
+    except grpc.RpcError as e:
+        LOG("ERR", f"Calling ListTopics RPC failed: {e}")
+        return []
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for the tbx control plane.
+
+    tbx-bench registry [--clients 10 100 1000] [--concurrency 64] [--mode threaded|aio|both]
+
+Starts a tbx-server in a subprocess, then has N simulated clients register,
+advertise a topic each, subscribe to someone else's topic, list the topic graph,
+and de-register, reporting throughput and latency of each phase.
+
+    tbx-bench launch [--launchables 10 100 500] [--scheduler dependencies|phases|both]
+
+Launches N Launchables that (like Nodes) don't return from launch() until they're
+shut down, and reports how long it takes for all of them to be launching.
+
+    tbx-bench spawn [--groups 1 4 16] [--method forkserver|spawn|both]
+
+Launches N launch groups (a process each) of one do-nothing Launchable, and reports
+how long it takes, with processes forked from the warm launcher vs. spawned cold.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable
+
+import toybox_core.launch as launch
+from toybox_core.launchable import Launchable
+from toybox_core.logging import set_log_level
+import toybox_core.rpc.channel as channel
+from toybox_core.rpc.health import try_health_check_rpc
+from toybox_core.rpc.register import deregister_client_rpc, register_client_rpc
+from toybox_core.rpc.topic import advertise_topic_rpc, list_topics_rpc, subscribe_topic_rpc
+
+from toybox_msgs.core.Test_pb2 import TestMessage
+
+
+# Listing is O(topics) on the server, so don't do it once per client.
+LIST_CALLS: int = 100
+
+
+@dataclass
+class PhaseResult:
+    phase: str
+    calls: int
+    seconds: float
+    latencies: list[float]
+
+    @property
+    def rate(self) -> float:
+        return self.calls / self.seconds if self.seconds > 0 else float("inf")
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered: list[float] = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def __str__(self) -> str:
+        return f"{self.phase:<12}{self.calls:>8}{self.seconds:>10.3f}{self.rate:>12.1f}" \
+            f"{self.percentile(0.5) * 1000:>10.2f}{self.percentile(0.99) * 1000:>10.2f}"
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(aio: bool, port: int) -> subprocess.Popen:
+
+    cmd: list[str] = [
+        sys.executable, "-m", "toybox_core.scripts.server",
+        "--address", f"[::]:{port}",
+        # The simulated clients don't heartbeat, so don't let them expire mid-run.
+        "--lease-duration", "3600",
+        "--log-level", "WARN"]
+    if aio:
+        cmd.append("--aio")
+
+    server: subprocess.Popen = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+
+    deadline: float = time.monotonic() + 10.0
+    while not try_health_check_rpc():
+        if time.monotonic() > deadline or server.poll() is not None:
+            server.kill()
+            raise RuntimeError("tbx-server failed to start.")
+        time.sleep(0.05)
+
+    return server
+
+
+def run_phase(
+    phase: str,
+    calls: list[Callable[[], object]],
+    executor: ThreadPoolExecutor,
+) -> PhaseResult:
+
+    def timed(call: Callable[[], object]) -> float:
+        start: float = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    start: float = time.perf_counter()
+    latencies: list[float] = list(executor.map(timed, calls))
+    return PhaseResult(
+        phase=phase,
+        calls=len(calls),
+        seconds=time.perf_counter() - start,
+        latencies=latencies)
+
+
+def bench_registry(num_clients: int, concurrency: int, run_id: str) -> list[PhaseResult]:
+
+    names: list[str] = [f"bench_{run_id}_{i}" for i in range(num_clients)]
+    topics: list[str] = [f"/bench/{run_id}/{i}" for i in range(num_clients)]
+    message_type: str = TestMessage.DESCRIPTOR.full_name
+
+    results: list[PhaseResult] = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results.append(run_phase("register", [
+            lambda name=name: register_client_rpc(name=name, host="localhost", port=1)
+            for name in names], executor))
+        results.append(run_phase("advertise", [
+            lambda name=name, topic=topic: advertise_topic_rpc(
+                client_name=name,
+                client_host="localhost",
+                topic_port=1,
+                topic_name=topic,
+                message_type=TestMessage)
+            for name, topic in zip(names, topics)], executor))
+        results.append(run_phase("subscribe", [
+            lambda name=name, i=i: subscribe_topic_rpc(
+                subscriber_id=name,
+                topic_name=topics[(i + 1) % num_clients],
+                message_type=message_type)
+            for i, name in enumerate(names)], executor))
+        results.append(run_phase("list", [
+            list_topics_rpc for _ in range(LIST_CALLS)], executor))
+        results.append(run_phase("deregister", [
+            lambda name=name: deregister_client_rpc(name=name)
+            for name in names], executor))
+
+    return results
+
+
+def registry(args: argparse.Namespace) -> None:
+
+    modes: list[str] = ["threaded", "aio"] if args.mode == "both" else [args.mode]
+
+    for mode in modes:
+        port: int = _free_port()
+        channel.configure(target=f"localhost:{port}")
+        server: subprocess.Popen = start_server(aio=(mode == "aio"), port=port)
+
+        try:
+            print(f"\n=== tbx-server ({mode}), concurrency {args.concurrency} ===")
+            for num_clients in args.clients:
+                print(f"\n-- {num_clients} clients --")
+                print(f"{'phase':<12}{'calls':>8}{'total(s)':>10}{'calls/s':>12}{'p50(ms)':>10}{'p99(ms)':>10}")
+                for result in bench_registry(
+                    num_clients=num_clients,
+                    concurrency=args.concurrency,
+                    run_id=f"{os.getpid()}_{num_clients}"):
+                    print(result)
+        finally:
+            channel.close_channel()
+            server.terminate()
+            server.wait(timeout=10.0)
+
+
+class IdleLaunchable(Launchable):
+    """
+    Sits in launch() until it's shut down. Like a Node, without any of the Node.
+    """
+
+    def __init__(self, name: str, launched: Callable[[], None]) -> None:
+        self._name: str = name
+        self._launched: Callable[[], None] = launched
+        self._stop: threading.Event = threading.Event()
+
+    def launch(self) -> bool:
+        self._launched()
+        self._stop.wait()
+        return True
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+
+def bench_launch(num_launchables: int, scheduler: str) -> float | None:
+    """
+    Returns:
+        float | None: seconds until every Launchable was in launch(), or None if they \
+            didn't all get there
+    """
+
+    lock: threading.Lock = threading.Lock()
+    all_launched: threading.Event = threading.Event()
+    count: list[int] = [0]
+
+    def launched() -> None:
+        with lock:
+            count[0] += 1
+            if count[0] == num_launchables:
+                all_launched.set()
+
+    launchables: list[IdleLaunchable] = [
+        IdleLaunchable(name=f"idle_{i}", launched=launched) for i in range(num_launchables)]
+    result: list[float | None] = [None]
+    start: float = time.perf_counter()
+
+    # The schedulers want the main thread (for their CTRL-C handlers), so this one
+    # waits for everything to be launching, then shuts it all down.
+    def watch() -> None:
+        if all_launched.wait(timeout=60.0):
+            result[0] = time.perf_counter() - start
+        for launchable in launchables:
+            launchable.shutdown()
+    watcher: threading.Thread = threading.Thread(target=watch)
+    watcher.start()
+
+    if scheduler == "dependencies":
+        launch.launch_by_dependencies(launchables=launchables)
+    else:
+        launch.launch_phase_by_phase(launchables=launchables)
+    watcher.join()
+
+    return result[0]
+
+
+def launch_scaling(args: argparse.Namespace) -> None:
+
+    # A few lines per Launchable per phase adds up.
+    set_log_level("WARN")
+    launch.logger.set_log_level("WARN")
+
+    schedulers: list[str] = ["dependencies", "phases"] if args.scheduler == "both" else [args.scheduler]
+    print(f"{'scheduler':<14}{'launchables':>12}{'launched(s)':>13}{'per(ms)':>10}")
+    for scheduler in schedulers:
+        for num_launchables in args.launchables:
+            seconds: float | None = bench_launch(num_launchables, scheduler)
+            if seconds is None:
+                print(f"{scheduler:<14}{num_launchables:>12}{'timed out':>13}")
+                continue
+            print(f"{scheduler:<14}{num_launchables:>12}{seconds:>13.3f}{seconds / num_launchables * 1000:>10.3f}")
+
+
+class QuickLaunchable(Launchable):
+    """
+    Launches, and that's it.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name: str = name
+
+    def launch(self) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+
+def spawn_scaling(args: argparse.Namespace) -> None:
+
+    set_log_level("WARN")
+    launch.logger.set_log_level("WARN")
+
+    methods: list[str] = ["forkserver", "spawn"] if args.method == "both" else [args.method]
+    print(f"{'method':<12}{'groups':>8}{'launched(s)':>13}{'per(ms)':>10}")
+    for method in methods:
+        if method == "forkserver":
+            # Its start-up (the imports) is paid once, not per launch, so it's not counted.
+            start: float = time.perf_counter()
+            launch.warm_up_launcher(preload=[QuickLaunchable.__module__], wait=True)
+            print(f"{'(warm up)':<12}{'':>8}{time.perf_counter() - start:>13.3f}")
+
+        for num_groups in args.groups:
+            recipes: list[launch.LaunchRecipe] = [
+                launch.LaunchRecipe(launchable_class=QuickLaunchable, kwargs={"name": f"quick_{i}"})
+                for i in range(num_groups)]
+            start = time.perf_counter()
+            if not launch.launch_in_processes(recipes=recipes, start_method=method):
+                print(f"{method:<12}{num_groups:>8}{'failed':>13}")
+                continue
+            seconds: float = time.perf_counter() - start
+            print(f"{method:<12}{num_groups:>8}{seconds:>13.3f}{seconds / num_groups * 1000:>10.1f}")
+
+
+def main() -> None:
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="tbx-bench")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    registry_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "registry", help="registration and discovery throughput vs. client count")
+    registry_parser.add_argument("--clients", type=int, nargs="+", default=[10, 100, 1000])
+    registry_parser.add_argument("--concurrency", type=int, default=64)
+    registry_parser.add_argument("--mode", choices=["threaded", "aio", "both"], default="both")
+    registry_parser.set_defaults(func=registry)
+
+    launch_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "launch", help="time until every Launchable is launching vs. how many there are")
+    launch_parser.add_argument("--launchables", type=int, nargs="+", default=[10, 100, 500])
+    launch_parser.add_argument("--scheduler", choices=["dependencies", "phases", "both"], default="both")
+    launch_parser.set_defaults(func=launch_scaling)
+
+    spawn_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "spawn", help="launch group process start-up, warm (forkserver) vs. cold (spawn)")
+    spawn_parser.add_argument("--groups", type=int, nargs="+", default=[1, 4, 16])
+    spawn_parser.add_argument("--method", choices=["forkserver", "spawn", "both"], default="both")
+    spawn_parser.set_defaults(func=spawn_scaling)
+
+    args: argparse.Namespace = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,35 @@
 #!/usr/bin/env python3
 
-from google.protobuf.message import Message
-import importlib
+import argparse
+import importlib.util
 import sys
-from typing import Any, List
+from typing import TYPE_CHECKING, Any, List
 import uuid
 import time
 
 import toybox_core as tbx
 
+if TYPE_CHECKING:
+    from google.protobuf.message import Message
 
-def echo_to_console(message: Message) -> None:
+
+def echo_to_console(message: "Message") -> None:
     print(f"{message}".strip())
     print("---")
 
 def main() -> None:
 
-    message_type: str = sys.argv[1]
-    topic: str = sys.argv[2]
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="tbx-echo")
+    parser.add_argument("message_type", help="e.g. state/Velocity/Velocity")
+    parser.add_argument("topic")
+    parser.add_argument("--rate", type=float, default=0.0,
+        help="Have the publisher send at most this many messages per second.")
+    parser.add_argument("--filter", default=None,
+        help="Have the publisher only send messages matching this, e.g. \"linear.x > 0.5\".")
+    args: argparse.Namespace = parser.parse_args()
+
+    message_type: str = args.message_type
+    topic: str = args.topic
 
     # Attempt to import the message we're listening for
     split_msg: List[str] = message_type.split("/")
@@ -41,7 +53,9 @@ def main() -> None:
     sub: tbx.Subscriber = echo_node.subscribe(
         topic_name=topic,
         message_type=getattr(module, split_msg[2]),
-        callback_fn=echo_to_console)
+        callback_fn=echo_to_console,
+        max_rate=args.rate,
+        filter_expression=args.filter)
 
 
 if __name__ == "__main__":
@@ -2,17 +2,52 @@
 
 import os
 import sys
+import time
+from typing import TYPE_CHECKING, Any
 
-from toybox_core.client import Client
-from toybox_core.rpc.register import get_registered_clients_rpc
+from toybox_core.index import NodeEntry, PackageIndex, get_index
 from toybox_core.metadata import find_tbx_packages, ToyboxMetadata
 
+# The verbs that talk to tbx-server import their RPCs (and with them, grpc and protobuf)
+# themselves, so that the ones that don't (e.g., `package`, `nodes`) start quickly.
+if TYPE_CHECKING:
+    from toybox_core.client import Client
+    from toybox_msgs.core.Metrics_pb2 import MetricsSnapshot
 
-def list_clients() -> None:
 
-    clients: list[Client] = get_registered_clients_rpc()
-    for client in clients:
-        print(str(client))
+def list_clients(args: list[str]) -> None:
+    """
+    tbx-info clients [--watch [PERIOD]]
+    """
+
+    from toybox_core.rpc.register import get_registered_clients_rpc
+
+    if "--watch" not in args:
+        clients: list[Client] = get_registered_clients_rpc()
+        for client in clients:
+            print(str(client))
+        return
+
+    period: float = 1.0
+    try:
+        period = float(args[args.index("--watch") + 1])
+    except (IndexError, ValueError):
+        pass
+
+    # Follow the registry, so re-listing costs nothing until something actually changes.
+    from toybox_core.rpc.cache import DiscoveryCache, get_discovery_cache
+    cache: DiscoveryCache = get_discovery_cache()
+    shown: int | None = None
+    try:
+        while True:
+            if cache.generation != shown:
+                shown = cache.generation
+                for client in get_registered_clients_rpc():
+                    print(str(client))
+                print()
+            time.sleep(period)
+    except KeyboardInterrupt:
+        pass
 
 def list_packages() -> None:
 
@@ -33,13 +68,136 @@ def info_about_package(package_name: str) -> None:
     print(meta.human_readable())
 
 
+def list_nodes() -> None:
+    """
+    tbx-info nodes
+    """
+
+    nodes: dict[str,NodeEntry] = get_index().nodes()
+    for full_name, node in sorted(nodes.items()):
+        if node.params is None:
+            print(f"{full_name}: ({node.value})")
+            continue
+        params: list[str] = [
+            param["name"] + (f": {param['annotation']}" if param["annotation"] else "") +
+            ("" if param["required"] else f" = {param['default']!r}")
+            for param in node.params]
+        print(f"{full_name}({', '.join(params)}): ({node.value})")
+
+
+def update_index(args: list[str]) -> None:
+    """
+    tbx-info index [--rebuild]
+    """
+
+    index: PackageIndex = PackageIndex()
+    changed: bool = index.refresh(rebuild="--rebuild" in args)
+    print(f"{index.path}: {len(index.packages())} packages, {len(index.nodes())} nodes" +
+        (" (updated)" if changed else " (up to date)"))
+
+
+def print_metrics(snapshot: "MetricsSnapshot") -> None:
+
+    from toybox_core.rpc.metrics import percentile
+
+    print(f"uptime: {snapshot.uptime:.1f}s, generation: {snapshot.generation}, " \
+        f"clients: {snapshot.client_count}, topics: {snapshot.topic_count}, " \
+        f"announcement backlog: {snapshot.announcement_backlog}")
+
+    def ms(seconds: float | None) -> str:
+        return "-" if seconds is None else f"{seconds * 1000:.2f}"
+
+    print(f"{'RPC':<40} {'calls':>8} {'errors':>7} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for rpc in snapshot.rpcs:
+        bounds: list[float] = list(snapshot.latency_bounds)
+        print(f"{rpc.method:<40} {rpc.calls:>8} {rpc.errors:>7} " \
+            f"{ms(percentile(rpc, bounds, 0.5)):>9} {ms(percentile(rpc, bounds, 0.99)):>9}")
+
+    for topic in snapshot.graph:
+        publishers: list[str] = [pub.publisher_id for pub in topic.publishers]
+        print(f"{topic.topic_def.topic_name} <{topic.topic_def.message_type}>: " \
+            f"{publishers} -> {list(topic.subscriber_ids)}")
+
+
+def show_metrics(args: list[str]) -> None:
+    """
+    tbx-info metrics [--graph] [--watch [PERIOD]]
+    """
+
+    from toybox_core.rpc.metrics import get_metrics_rpc, watch_metrics_rpc
+    include_graph: bool = "--graph" in args
+
+    if "--watch" not in args:
+        snapshot: MetricsSnapshot | None = get_metrics_rpc(include_graph=include_graph)
+        if snapshot is None:
+            sys.exit(1)
+        print_metrics(snapshot)
+        return
+
+    period: float = 1.0
+    try:
+        period = float(args[args.index("--watch") + 1])
+    except (IndexError, ValueError):
+        pass
+
+    try:
+        for snapshot in watch_metrics_rpc(period=period, include_graph=include_graph):
+            print_metrics(snapshot)
+            print()
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_param_value(text: str) -> Any:
+    """
+    Parameters given on the command line are whatever they look like: bool, int,
+    float, or (failing all of those) string.
+    """
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def show_params(args: list[str]) -> None:
+    """
+    tbx-info params [PREFIX]
+    tbx-info params set NAME VALUE
+    """
+
+    from toybox_core.rpc.param import get_params_rpc, set_param_rpc
+
+    if args and args[0] == "set":
+        if len(args) != 3:
+            print("Usage: tbx-info params set NAME VALUE")
+            sys.exit(1)
+        if not set_param_rpc(name=args[1], value=parse_param_value(args[2])):
+            sys.exit(1)
+        return
+
+    for name, value in get_params_rpc(prefix=args[0] if args else "").items():
+        print(f"{name}: {value!r}")
+
+
 def main() -> None:
 
     assert len(sys.argv) >= 2, "Needs at least 1 argument"
     verb: str = sys.argv[1]
     
     if verb == "clients":
-        list_clients()
+        list_clients(sys.argv[2:])
+    elif verb == "metrics":
+        show_metrics(sys.argv[2:])
+    elif verb == "params":
+        show_params(sys.argv[2:])
+    elif verb == "nodes":
+        list_nodes()
+    elif verb == "index":
+        update_index(sys.argv[2:])
     elif verb == "package":
         package_name: str | None = None
         try:
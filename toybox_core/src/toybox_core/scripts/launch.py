@@ -1,21 +1,17 @@
 #!/usr/bin/env python3
 
-import pathlib
 import sys
 
-import grpc
-
 from toybox_core.launch import (
     get_launch_description, 
     launch, 
-    launch_all, 
+    launch_recipes, 
     LaunchDescription, 
-    get_launch_descs_from_file, 
-    NodeParam, 
-    get_launch_params_from_file)
+    LaunchMode,
+    LaunchRecipe)
+from toybox_core.launch_plan import plan_launch_file
 from toybox_core.launchable import Launchable
 from toybox_core.logging import LOG
-from toybox_core.metadata import ToyboxMetadata, find_pyproject_toml
 
 
 def launch_a_node(node_name: str, **kwargs) -> None:
@@ -28,32 +24,27 @@ def launch_a_node(node_name: str, **kwargs) -> None:
     launch(launchable[0])
 
 
-def launch_a_file(module_name: str, launch_file_name: str, **kwargs) -> None:
+def launch_a_file(
+    module_name: str, 
+    launch_file_name: str, 
+    mode: LaunchMode = LaunchMode.THREAD, 
+    replan: bool = False,
+    **kwargs
+) -> None:
 
+    # Relaunching the same file with the same arguments skips all of the discovery and
+    # launch file execution, unless something changed (see toybox_core.launch_plan).
     try:
-        toml_path: pathlib.Path = find_pyproject_toml(module_name=module_name)
+        recipes: list[LaunchRecipe] = plan_launch_file(
+            package=module_name,
+            launch_file_name=launch_file_name,
+            args=kwargs,
+            replan=replan)
     except Exception as e:
-        LOG("FATAL", f"Failed to find pyproject.toml for {module_name}. Exception was: {e}")
+        LOG("FATAL", f"Failed to work out what to launch from {module_name}/{launch_file_name}. Exception was: {e}")
         sys.exit(1)
 
-    meta: ToyboxMetadata | None = ToyboxMetadata.extract_from_toml(toml_path=toml_path)
-    if meta is None:
-        raise Exception(f"Failed to process metadata for package {module_name}")
-
-    launch_file: pathlib.Path = meta.get_launch_file(launch_file_name=launch_file_name)
-    launch_params: dict[str,NodeParam] = get_launch_params_from_file(launch_file_path=launch_file)
-    # I need to handle required params here....
-    for name, value in kwargs.items():
-        param: NodeParam | None = launch_params.get(name, None)
-        if param is None:
-            continue
-        param.value = value
-
-    launch_group: LaunchDescription = get_launch_descs_from_file(
-        launch_file_path=launch_file,
-        launch_params=launch_params)
-
-    launch_all(launch_desc=launch_group)
+    launch_recipes(recipes=recipes, mode=mode)
 
 def main() -> None:
 
@@ -64,8 +55,12 @@ def main() -> None:
         module_name: str = sys.argv[2]
         file_name: str = sys.argv[3]
 
-        args: dict = dict(arg.split("=") for arg in sys.argv[4:])
-        launch_a_file(module_name,file_name,**args)
+        # --processes: a process per launch group, rather than a thread per node.
+        mode: LaunchMode = LaunchMode.PROCESS if "--processes" in sys.argv[4:] else LaunchMode.THREAD
+        # --replan: ignore any cached launch plan for this file (and write a fresh one).
+        replan: bool = "--replan" in sys.argv[4:]
+        args: dict = dict(arg.split("=") for arg in sys.argv[4:] if arg not in ("--processes", "--replan"))
+        launch_a_file(module_name, file_name, mode=mode, replan=replan, **args)
     else: 
         assert len(sys.argv) >= 2
         node_name: str = sys.argv[2]
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 
-from google.protobuf.message import Message
-import importlib
+import importlib.util
 import sys
 from typing import Any, List
 import uuid
@@ -1,17 +1,43 @@
 #!/usr/bin/env python3
 
+import argparse
 
 from toybox_core.logging import set_log_level
+from toybox_core.rpc.register import DEFAULT_LEASE_DURATION
+from toybox_core.rpc.topic import DEFAULT_FANOUT_THRESHOLD
 from toybox_core.server import ToyboxServer
 
 
 def main() -> None:
 
-    set_log_level("DEBUG")
-
-    tbx: ToyboxServer = ToyboxServer()
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="tbx-server")
+    parser.add_argument("--aio", action="store_true",
+        help="run the asyncio (grpc.aio) server instead of the threaded one")
+    parser.add_argument("--address", default=None,
+        help="address to bind, e.g. '[::]:50051' or 'unix:/tmp/tbx.sock' (default: from TBX_SERVER)")
+    parser.add_argument("--lease-duration", type=float, default=DEFAULT_LEASE_DURATION,
+        help="seconds a client stays registered without a heartbeat")
+    parser.add_argument("--state-dir", default=None,
+        help="keep the registry in this directory, so a restarted server picks up where it left off")
+    parser.add_argument("--fanout-threshold", type=int, default=DEFAULT_FANOUT_THRESHOLD,
+        help="direct subscribers a topic can have before new ones are sent to its relays")
+    parser.add_argument("--log-level", default="DEBUG")
+    args: argparse.Namespace = parser.parse_args()
+
+    set_log_level(args.log_level)
+
+    tbx: ToyboxServer
+    if args.aio:
+        from toybox_core.aio_server import AsyncToyboxServer
+        tbx = AsyncToyboxServer(
+            address=args.address, lease_duration=args.lease_duration, state_dir=args.state_dir,
+            fanout_threshold=args.fanout_threshold)
+    else:
+        tbx = ToyboxServer(
+            address=args.address, lease_duration=args.lease_duration, state_dir=args.state_dir,
+            fanout_threshold=args.fanout_threshold)
     tbx.serve()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,24 +1,56 @@
 #!/usr/bin/env python3
 
 import sys
-from typing import List
+import time
+from typing import TYPE_CHECKING, List
 
-from toybox_core.rpc.topic import list_topics_rpc
-from toybox_core.topic import Topic
+if TYPE_CHECKING:
+    from toybox_core.topic import Topic
 
-def list_topics() -> None:
-    topics: List[Topic] = list_topics_rpc()
+def print_topics(topics: List["Topic"]) -> None:
     if len(topics) == 0:
         print(f"No topics advertised.")
     for topic in topics:
         print(f"* {topic.name} : {topic.message_type}")
 
+def list_topics(args: List[str]) -> None:
+    """
+    tbx-topic list [--watch [PERIOD]]
+    """
+
+    # grpc (and friends) are only loaded when there's actually a server to talk to.
+    from toybox_core.rpc.topic import list_topics_rpc
+
+    if "--watch" not in args:
+        print_topics(list_topics_rpc())
+        return
+
+    period: float = 1.0
+    try:
+        period = float(args[args.index("--watch") + 1])
+    except (IndexError, ValueError):
+        pass
+
+    # Follow the registry, so re-listing costs nothing until something actually changes.
+    from toybox_core.rpc.cache import DiscoveryCache, get_discovery_cache
+    cache: DiscoveryCache = get_discovery_cache()
+    shown: int | None = None
+    try:
+        while True:
+            if cache.generation != shown:
+                shown = cache.generation
+                print_topics(list_topics_rpc())
+                print()
+            time.sleep(period)
+    except KeyboardInterrupt:
+        pass
+
 def main() -> None:
 
     verb: str = sys.argv[1]
 
     if verb == "list":
-        list_topics()
+        list_topics(sys.argv[2:])
     else:
         sys.exit(1)
 
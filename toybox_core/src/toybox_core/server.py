@@ -10,49 +10,138 @@ import threading
 import time
 
 from toybox_core.client import Client
+from toybox_core.journal import RegistryJournal
 from toybox_core.launchable import Launchable
 from toybox_core.logging import LOG
+from toybox_core.registry import RegistryEvents
 from toybox_core.topic import Topic
+from toybox_core.rpc.channel import (
+    DEFAULT_TBX_SERVER_HOST,
+    DEFAULT_TBX_SERVER_PORT,
+    SERVER_OPTIONS,
+    get_bind_address,
+)
 from toybox_core.rpc.health import HealthRPCServicer
-from toybox_core.rpc.topic import TopicRPCServicer
-from toybox_core.rpc.register import RegisterServicer
+from toybox_core.rpc.metrics import MetricsInterceptor, MetricsRPCServicer, RpcMetrics
+from toybox_core.rpc.param import ParamRPCServicer, ParamStore
+from toybox_core.rpc.service import ServiceRPCServicer
+from toybox_core.rpc.topic import DEFAULT_FANOUT_THRESHOLD, TopicRPCServicer
+from toybox_core.rpc.register import RegisterServicer, DEFAULT_LEASE_DURATION
 
 from toybox_msgs.core.Health_pb2_grpc import add_HealthServicer_to_server
+from toybox_msgs.core.Metrics_pb2_grpc import add_MetricsServicer_to_server
 from toybox_msgs.core.Node_pb2 import InformConfirmation, TopicPublisherInfo
 from toybox_msgs.core.Topic_pb2_grpc import add_TopicServicer_to_server
 from toybox_msgs.core.Register_pb2_grpc import add_RegisterServicer_to_server
 from toybox_msgs.core.Null_pb2 import Null
+from toybox_msgs.core.Param_pb2_grpc import add_ParamsServicer_to_server
+from toybox_msgs.core.Service_pb2 import ServiceInfo
+from toybox_msgs.core.Service_pb2_grpc import add_ServiceServicer_to_server
 
 
-DEFAULT_TBX_SERVER_HOST: str = "localhost"
-DEFAULT_TBX_SERVER_PORT: int = 50051
+# How often the server checks for clients whose leases have expired, in seconds.
+LEASE_CHECK_PERIOD: float = 0.5
 
 
 class ToyboxServer(Launchable):
 
-    def __init__(self, port: int | None = None) -> None:
+    def __init__(
+        self, 
+        port: int | None = None,
+        lease_duration: float = DEFAULT_LEASE_DURATION,
+        address: str | None = None,
+        state_dir: str | None = None,
+        fanout_threshold: int = DEFAULT_FANOUT_THRESHOLD,
+    ) -> None:
         
         self._name: str = "tbx-server"
 
+        # Tells clients when we've restarted; nanoseconds since the epoch is unique enough.
+        self._epoch: int = time.time_ns()
+
         # "Context" that will be handed to RPC servicers
         self._topics: dict[str,Topic] = {}
         self._clients: dict[str,Client] = {}
+        # Services aren't journaled; their providers re-advertise them after a restart.
+        self._services: dict[str,ServiceInfo] = {}
+        self._params: ParamStore = ParamStore()
         self._announcements: Queue[tuple[str,str]] = Queue()
+        self._events: RegistryEvents = RegistryEvents()
 
         self._client_lock: threading.Lock = threading.Lock()
+        self._last_lease_check: float = time.monotonic()
+
+        # Pick up the registry from where a previous run left it, and keep it on disk.
+        self._journal: RegistryJournal | None = None
+        if state_dir is not None:
+            self._journal = RegistryJournal(state_dir)
+            self._restore(lease_duration)
 
         # RPC servicers
         self._health_servicer: HealthRPCServicer = HealthRPCServicer()
         self._topic_servicer: TopicRPCServicer = TopicRPCServicer(
             topics=self._topics,
             clients=self._clients,
-            announcements=self._announcements)
+            announcements=self._announcements,
+            events=self._events,
+            fanout_threshold=fanout_threshold)
         self._register_servicer: RegisterServicer = RegisterServicer(
             clients=self._clients,
             topics=self._topics,
-            deregister_callback=self.deregister_client)
+            deregister_callback=self.deregister_client,
+            lease_duration=lease_duration,
+            topic_servicer=self._topic_servicer,
+            events=self._events,
+            epoch=self._epoch)
+        self._service_servicer: ServiceRPCServicer = ServiceRPCServicer(
+            services=self._services,
+            clients=self._clients)
+        self._param_servicer: ParamRPCServicer = ParamRPCServicer(store=self._params)
+
+        self._metrics: RpcMetrics = RpcMetrics()
+        self._metrics_servicer: MetricsRPCServicer = MetricsRPCServicer(
+            metrics=self._metrics,
+            clients=self._clients,
+            topics=self._topics,
+            announcements=self._announcements,
+            events=self._events)
+
+        self._shutdown_event: threading.Event = threading.Event()
+
+        # An explicit port wins, otherwise bind wherever clients have been told to look
+        # for us (which may be a unix: socket).
+        if address is None:
+            address = f'[::]:{port}' if port else get_bind_address()
+        self.address: str = address
+        self._configure_server()
+        
+        atexit.register(self.shutdown)
+        signal.signal(signal.SIGINT, self.ctrl_c_handler)
+
+    def _restore(self, lease_duration: float) -> None:
+
+        self._events.reset(self._journal.load(clients=self._clients, topics=self._topics))
 
-        self._server: grpc.Server = grpc.server(futures.ThreadPoolExecutor(max_workers=None))
+        # Give every restored client a full lease to check back in. The ones that are
+        # still around will re-assert themselves once they see that we restarted, and
+        # the rest expire like they would have anyway.
+        for client in self._clients.values():
+            client.initialize()
+            client.renew_lease(lease_duration)
+
+        self._journal.attach(self._events, clients=self._clients, topics=self._topics)
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _configure_server(self) -> None:
+
+        self._server: grpc.Server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=None),
+            interceptors=[MetricsInterceptor(self._metrics)],
+            options=SERVER_OPTIONS)
         add_HealthServicer_to_server(
             servicer=self._health_servicer,
             server=self._server)
@@ -62,16 +151,19 @@ class ToyboxServer(Launchable):
         add_RegisterServicer_to_server(
             servicer=self._register_servicer,
             server=self._server)
+        add_MetricsServicer_to_server(
+            servicer=self._metrics_servicer,
+            server=self._server)
+        add_ServiceServicer_to_server(
+            servicer=self._service_servicer,
+            server=self._server)
+        add_ParamsServicer_to_server(
+            servicer=self._param_servicer,
+            server=self._server)
 
-        self.rpc_port: int = port if port else DEFAULT_TBX_SERVER_PORT
-        rpc_port: int = self._server.add_insecure_port(f'[::]:{self.rpc_port}')
-        
-        LOG("INFO", f"Server <{self._name}> ready on port {rpc_port}.")
+        self.rpc_port: int = self._server.add_insecure_port(self.address)
         
-        atexit.register(self.shutdown)
-        signal.signal(signal.SIGINT, self.ctrl_c_handler)
-
-        self._shutdown_event: threading.Event = threading.Event()
+        LOG("INFO", f"Server <{self._name}> ready on {self.address}.")
 
     def launch(self) -> bool:
         self.serve()
@@ -88,19 +180,25 @@ class ToyboxServer(Launchable):
         while not self._shutdown_event.is_set():
             
             self._announce_new_topics()
+            self._expire_stale_clients()
             
             time.sleep(1/60)
         
-    def shutdown(self, notify_clients: bool = True) -> None:
+    def shutdown(self, notify_clients: bool | None = None) -> None:
         """
-        Send the shutdown signal to any registered clients.
+        Send the shutdown signal to any registered clients. By default, they're only
+        told when the server isn't keeping its state, since otherwise it'll be back.
         """
         if self._shutdown_event.is_set():
             return
 
         self._shutdown_event.set()
 
+        if notify_clients is None:
+            notify_clients = self._journal is None
         if not notify_clients:
+            self._server.stop(grace=2.0)
+            self._close_journal()
             return
 
         for name, client in self._clients.items():       
@@ -117,6 +215,7 @@ class ToyboxServer(Launchable):
             LOG("INFO", f"Sent shutdown request to {name} at {client.addr}:{client.rpc_port}")
 
         self._server.stop(grace=2.0)
+        self._close_journal()
 
     def ctrl_c_handler(self, signum, frame) -> None:
         self.shutdown()
@@ -127,31 +226,126 @@ class ToyboxServer(Launchable):
         Callback for deregistering clients; handles removing the client itself,
         as well as cleaning out any topics, ..., etc. that may be attached to it.
         """
+        relayed: list[Topic] = [topic for topic in list(self._topics.values()) if client_name in topic.relays]
+
+        self.deregister_clients([client_name])
+
+        # A relay that leaves politely still strands its subscribers, so send them back
+        # to the topic's publishers now, rather than waiting for them to notice.
+        for topic in relayed:
+            if topic.name in self._topics:
+                self._inform_publisher_lost(topic=topic, publisher_name=client_name)
+        return True
+
+    def deregister_clients(self, client_names: list[str]) -> dict[str,list[str]]:
+        """
+        Remove a batch of clients in one pass over the topics.
+
+        Returns:
+            dict[str,list[str]]: {topic_name: [publisher names that were removed from it]}, 
+                for any topics that lost a publisher but still have subscribers.
+        """
+
+        removed: set[str] = set(client_names)
 
         # A topic with no publishers and no subscribers is an orphan,
         # and orphans have got to go.
         orphans: list[str] = []
+        lost_publishers: dict[str,list[str]] = {}
 
-        # Get rid of the client...
+        # Get rid of the clients...
         with self._client_lock:
-            del self._clients[client_name]
+            for client_name in removed:
+                if self._clients.pop(client_name, None) is not None:
+                    self._events.client_removed(client_name)
 
-        # And make sure that any topics that it was subscribed to/advertising go away as well.
+        # And make sure that any topics that they were subscribed to/advertising go away as well.
         for topic_name, topic in self._topics.items():
-            if topic.publishers.get(client_name, None) is not None:
+            changed: bool = False
+            for client_name in removed.intersection(topic.publishers.keys()):
                 del topic.publishers[client_name]
-            if client_name in topic.subscribers:
-                topic.subscribers.remove(client_name)
+                lost_publishers.setdefault(topic_name, []).append(client_name)
+                changed = True
+            if removed.intersection(topic.subscribers):
+                topic.subscribers[:] = [sub for sub in topic.subscribers if sub not in removed]
+                changed = True
+            for subscriber_name in removed.intersection(topic.relayed.keys()):
+                del topic.relayed[subscriber_name]
+            for relay_name in removed.intersection(topic.relays.keys()):
+                # The relay's subscribers are back on the topic's publishers. They're told
+                # that the relay is gone along with everyone else's lost publishers, and
+                # then told about the publishers, same as if they'd just been advertised.
+                del topic.relays[relay_name]
+                lost_publishers.setdefault(topic_name, []).append(relay_name)
+                for subscriber_name, relay in list(topic.relayed.items()):
+                    if relay == relay_name:
+                        del topic.relayed[subscriber_name]
+                for publisher_name in topic.publishers:
+                    self._announcements.put((publisher_name, topic_name))
 
             # Is this an orphan? Put its name in the death note.
             if len(topic.publishers) == 0 and len(topic.subscribers) == 0:
                 orphans.append(topic_name)
+            elif changed:
+                self._events.topic_updated(topic)
         
         # Get rid of any orphans.
         for orphan in orphans:
             del self._topics[orphan]
+            lost_publishers.pop(orphan, None)
+            self._events.topic_removed(orphan)
 
-        return True
+        # Services go with their providers.
+        for service_name in [
+            name for name, service in list(self._services.items()) if service.provider_id in removed]:
+            self._services.pop(service_name, None)
+
+        return lost_publishers
+
+    def _expire_stale_clients(self) -> None:
+        """
+        Drop every client whose lease has run out, then let their peers know.
+        """
+
+        now: float = time.monotonic()
+        if (now - self._last_lease_check) < LEASE_CHECK_PERIOD:
+            return
+        self._last_lease_check = now
+
+        with self._client_lock:
+            expired: list[str] = [
+                name for name, client in self._clients.items() if client.lease_expired(now)]
+        if not expired:
+            return
+
+        LOG("WARN", f"Leases expired for clients: {expired}")
+        lost_publishers: dict[str,list[str]] = self.deregister_clients(expired)
+        
+        for topic_name, publisher_names in lost_publishers.items():
+            topic: Topic | None = self._topics.get(topic_name, None)
+            if topic is None:
+                continue
+            for publisher_name in publisher_names:
+                self._inform_publisher_lost(topic=topic, publisher_name=publisher_name)
+
+    def _inform_publisher_lost(self, topic: Topic, publisher_name: str) -> None:
+
+        topic_pub: TopicPublisherInfo = TopicPublisherInfo()
+        topic_pub.topic_def.CopyFrom(topic.to_msg())
+        topic_pub.publisher.publisher_id = publisher_name
+
+        for subscriber_name in topic.subscribers:
+            with self._client_lock:
+                subscriber: Client | None = self._clients.get(subscriber_name, None)
+            if subscriber is None:
+                continue
+
+            # Best-effort: a subscriber that misses this will find out when its
+            # connection to the publisher fails.
+            try:
+                subscriber.stub.InformOfPublisherLost(topic_pub, timeout=0.25)
+            except grpc.RpcError as e:
+                LOG("DEBUG", f"Failed to inform <{subscriber_name}> that <{publisher_name}> is gone: {e}")
     
     def _announce_new_topics(self) -> None:
 
@@ -164,44 +358,89 @@ class ToyboxServer(Launchable):
         topic_name: str = announcement[1]
         
         LOG("DEBUG", f"Announcing new topic {topic_name} from publisher {publisher_name}")
+        topic_pub: TopicPublisherInfo | None = self._get_publisher_info(
+            publisher_name=publisher_name, 
+            topic_name=topic_name)
+        if topic_pub is None:
+            return
+        
+        for subscriber_name, subscriber in self._get_subscribers_to_inform(
+            publisher_name=publisher_name, 
+            topic_name=topic_name):
+
+            LOG("DEBUG", f"Informing subscriber {subscriber_name} of topic {topic_name}")
+
+            # TEMP: just retry the InformOfPublisher RPC later if this fails
+            try:
+                inform_conf: InformConfirmation = subscriber.stub.InformOfPublisher(topic_pub, timeout=1.0)
+            except grpc.RpcError as e:
+                LOG("WARN", f"Failed to inform <{subscriber_name}> of <{topic_name}>, retrying: {e}")
+                self._announcements.put(announcement)
+                continue
+
+            if inform_conf.return_code != 0:
+                # Nothing to gain from retrying a refusal; the other subscribers still need to hear.
+                LOG("WARN", f"Failed to inform subscriber {subscriber_name} of topic {topic_name}: {inform_conf.status}")
+                continue
+            LOG("DEBUG", f"Successfully informed <{subscriber_name}> of <{topic_name}>")
+
+    def _get_publisher_info(
+        self, 
+        publisher_name: str, 
+        topic_name: str
+    ) -> TopicPublisherInfo | None:
+        """
+        Build the announcement for a publisher of a topic, if they both still exist.
+        """
+
         topic: Topic | None = self._topics.get(topic_name)
         if topic is None:
-            raise Exception(f"Tried to announce topic that doesn't exist: {topic_name}")
+            # The topic (and everyone attached to it) may have been cleaned up
+            # since the announcement was queued.
+            LOG("DEBUG", f"Dropping announcement for topic that no longer exists: {topic_name}")
+            return None
         
         publisher_addr: tuple[str,int] | None = topic.publishers.get(publisher_name, None)
-        assert publisher_addr is not None
-        
+        if publisher_addr is None:
+            LOG("DEBUG", f"Dropping announcement for <{topic_name}>, publisher <{publisher_name}> is gone.")
+            return None
+
+        topic_pub: TopicPublisherInfo = TopicPublisherInfo()
+        topic_pub.topic_def.CopyFrom(topic.to_msg())
+        topic_pub.publisher.publisher_id = publisher_name
+        topic_pub.publisher.publisher_host = publisher_addr[0]
+        topic_pub.publisher.topic_port = publisher_addr[1]
+        return topic_pub
+
+    def _get_subscribers_to_inform(
+        self, 
+        publisher_name: str, 
+        topic_name: str
+    ) -> list[tuple[str,Client]]:
+
+        topic: Topic | None = self._topics.get(topic_name)
+        if topic is None:
+            return []
+
+        subscribers: list[tuple[str,Client]] = []
         for subscriber_name in topic.subscribers:
             # Special case: a node advertises a topic that it's also subscribed to.
             # TODO: For now, skip it. May need to actually handle this in the future.
             if subscriber_name == publisher_name:
                 continue
-
-            LOG("DEBUG", f"Informing subscriber {subscriber_name} of topic {topic_name}")
+            # Subscribers that were sent to a relay get everything from there.
+            if subscriber_name in topic.relayed:
+                continue
 
             subscriber: Client | None = None
             with self._client_lock:
                 subscriber = self._clients.get(subscriber_name, None)
             
             if subscriber is None:
-                LOG("ERR", f"Subscriber {subscriber_name} is not a registered client.")
-                raise Exception(f"Tried to inform a subscriber that doesn't exist: {subscriber_name}")
-
-            topic_pub: TopicPublisherInfo = TopicPublisherInfo()
-            topic_pub.topic_def.CopyFrom(topic.to_msg())
-            topic_pub.publisher.publisher_id = publisher_name
-            topic_pub.publisher.publisher_host = publisher_addr[0]
-            topic_pub.publisher.topic_port = publisher_addr[1]
-
-            # TEMP: just retry the InformOfPublisher RPC later if this fails
-            try:
-                inform_conf: InformConfirmation = subscriber.stub.InformOfPublisher(topic_pub, timeout=1.0)
-            except grpc.RpcError as e:
-                print(f"fuck: {e}")
-                self._announcements.put(announcement)
+                # Most likely, the subscriber's lease expired. Nobody to inform.
+                LOG("DEBUG", f"Subscriber {subscriber_name} is not a registered client, skipping.")
                 continue
+            
+            subscribers.append((subscriber_name, subscriber))
 
-            if inform_conf.return_code != 0:
-                raise Exception(f"Failed to inform subscriber {subscriber_name} of topic {topic.name}: {inform_conf.status}")
-            LOG("DEBUG", f"Successfully informed <{subscriber_name}> of <{topic_name}>")
-
+        return subscribers
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+
+"""
+Request/response services on the data plane.
+
+A Node that provides a service listens on a port of its own and advertises it to
+the tbx-server (or whatever Discovery it uses), the same way a Publisher does. Callers
+look the service up once, then talk to the provider directly over a tbx socket,
+without gRPC in the way. Every request carries a correlation ID that its response
+echoes back, so one connection can carry any number of concurrent calls, and the
+provider answers each one as soon as its handler finishes.
+
+    node.create_service("reset_robot", ResetRequest, ResetResponse, handle_reset)
+    ...
+    response: ResetResponse = other_node.call("reset_robot", ResetRequest(), timeout=1.0)
+"""
+
+import concurrent.futures as futures
+from dataclasses import dataclass, field
+import itertools
+import select
+import socket
+import threading
+from typing import Callable
+import uuid
+
+from google.protobuf import descriptor_pool, message_factory
+from google.protobuf.message import Message
+
+from toybox_core.discovery import Discovery
+from toybox_core.logging import LOG, TbxLogger
+from toybox_core.protocol import (
+    SERVICE_ERROR,
+    ServiceFrame,
+    pack_service_frame,
+    unpack_message,
+    unpack_service_frames,
+)
+from toybox_core.reactor import Reactor
+
+from toybox_msgs.core.Service_pb2 import ServiceInfo
+
+
+# How long a call waits for its response by default, in seconds.
+DEFAULT_CALL_TIMEOUT: float = 5.0
+
+# How long a provider's own thread waits for something to happen before checking
+# whether it's been shut down, in seconds.
+POLL_PERIOD: float = 0.1
+
+RECV_SIZE: int = 65536
+
+
+class ServiceError(Exception):
+    """
+    A call failed: nobody provides the service, the provider couldn't be reached (or
+    went away mid-call), or the provider's handler raised.
+    """
+
+
+def message_class(full_name: str) -> type[Message]:
+    """
+    Find the Message class for a message type name, e.g. "core.Null". Its module has
+    to have been imported already.
+    """
+    try:
+        return message_factory.GetMessageClass(
+            descriptor_pool.Default().FindMessageTypeByName(full_name))
+    except KeyError:
+        raise ServiceError(f"Unknown message type <{full_name}>; import its module, " \
+            "or pass the response type explicitly.")
+
+
+def set_nodelay(sock: socket.socket) -> None:
+    # Calls are small and latency-sensitive, so don't let Nagle sit on them.
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+@dataclass
+class CallerConnection():
+    """
+    A provider's connection to one caller.
+    """
+    sock: socket.socket
+    buffer: bytearray = field(default_factory=bytearray)
+    # Responses are written from whichever executor thread ran the handler.
+    send_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ServiceServer():
+    """
+    The provider side of a service: accepts calls, runs `handler` for each request on
+    `executor`, and sends back whatever it returns.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        request_type: type[Message],
+        response_type: type[Message],
+        handler: Callable[[Message], Message],
+        host: str,
+        port: int,
+        executor: futures.Executor,
+        logger: TbxLogger | None = None,
+        reactor: Reactor | None = None,
+    ) -> None:
+
+        self.name: str = f"service_{service_name}_{str(uuid.uuid1())}"
+        self.service_name: str = service_name
+        self.request_type: type[Message] = request_type
+        self.response_type: type[Message] = response_type
+        self.host: str = host
+        self.port: int = port
+
+        self._handler: Callable[[Message], Message] = handler
+        self._executor: futures.Executor = executor
+        self._logger: TbxLogger | None = logger
+
+        self._sock: socket.socket = socket.socket(family=socket.AF_INET, type=socket.SOCK_STREAM)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen()
+        self._sock.settimeout(0)
+
+        self._callers: dict[socket.socket, CallerConnection] = {}
+        self._shutdown: threading.Event = threading.Event()
+
+        # Either a Reactor polls our sockets, or we get our own thread to do it.
+        self._thread: threading.Thread | None = None
+        if reactor is not None:
+            reactor.add(self.step)
+            return
+
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.name = f"{service_name.replace('/','_')}_service"
+        self._thread.start()
+
+    def advertise(self, provider_id: str, discovery: Discovery) -> bool:
+
+        return discovery.advertise_service(
+            name=provider_id,
+            host=self.host,
+            service_port=self.port,
+            service_name=self.service_name,
+            request_type=self.request_type.DESCRIPTOR.full_name,
+            response_type=self.response_type.DESCRIPTOR.full_name)
+
+    def shutdown(self) -> None:
+
+        if self._shutdown.is_set():
+            return
+        self._shutdown.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @property
+    def is_shutdown(self) -> bool:
+        return self._shutdown.is_set()
+
+    # threading.Thread
+    def _serve(self) -> None:
+
+        while not self._shutdown.is_set():
+            self._poll_once(timeout=POLL_PERIOD)
+        self._close()
+
+    # Reactor step
+    def step(self) -> bool:
+
+        if self._shutdown.is_set():
+            self._close()
+            return False
+        self._poll_once(timeout=0)
+        return True
+
+    def _poll_once(self, timeout: float) -> None:
+
+        sockets: list[socket.socket] = [self._sock, *self._callers.keys()]
+        ready_to_read, _, _ = select.select(sockets, [], [], timeout)
+
+        for sock in ready_to_read:
+            if sock is self._sock:
+                self._accept_once()
+            else:
+                self._receive(self._callers[sock])
+
+    def _accept_once(self) -> None:
+
+        try:
+            conn, addr = self._sock.accept()
+        except BlockingIOError:
+            return
+
+        self.log("DEBUG", f"<{self.name}> accepted caller {addr}")
+        conn.setblocking(True)
+        set_nodelay(conn)
+        self._callers[conn] = CallerConnection(sock=conn)
+
+    def _receive(self, caller: CallerConnection) -> None:
+
+        try:
+            data: bytes = caller.sock.recv(RECV_SIZE)
+        except OSError:
+            data = b""
+        if not data:
+            # The caller hung up.
+            self._drop(caller)
+            return
+
+        caller.buffer += data
+        for frame in unpack_service_frames(caller.buffer):
+            try:
+                self._executor.submit(self._handle, caller, frame)
+            except RuntimeError:
+                # The executor's been shut down, so we're on our way out too.
+                return
+
+    def _handle(self, caller: CallerConnection, frame: ServiceFrame) -> None:
+
+        reply: bytes
+        try:
+            if frame.message_type != self.request_type.DESCRIPTOR.full_name:
+                raise ServiceError(f"Expected a <{self.request_type.DESCRIPTOR.full_name}> request, " \
+                    f"got <{frame.message_type}>")
+            request: Message = unpack_message(obj_type=self.request_type, message_data=frame.payload)
+
+            response: Message = self._handler(request)
+            if not isinstance(response, self.response_type):
+                raise ServiceError(f"Handler returned <{type(response).__name__}>, expected " \
+                    f"<{self.response_type.DESCRIPTOR.full_name}>")
+            reply = pack_service_frame(frame.correlation_id, message=response)
+        except Exception as e:
+            self.log("WARN", f"Service <{self.service_name}> failed to handle a request: {e}")
+            reply = pack_service_frame(frame.correlation_id, error=str(e) or type(e).__name__)
+
+        try:
+            with caller.send_lock:
+                caller.sock.sendall(reply)
+        except OSError as e:
+            # The caller's gone; _receive() will notice and clean up.
+            self.log("DEBUG", f"Failed to reply to caller of <{self.service_name}>: {e}")
+
+    def _drop(self, caller: CallerConnection) -> None:
+
+        self._callers.pop(caller.sock, None)
+        caller.sock.close()
+
+    def _close(self) -> None:
+
+        for caller in list(self._callers.values()):
+            self._drop(caller)
+        self._sock.close()
+
+    def log(self, log_level: str, message: str) -> None:
+        if self._logger is not None:
+            self._logger.LOG(log_level=log_level, message=message)
+        else:
+            LOG(log_level=log_level, message=message)
+
+
+class ServiceClient():
+    """
+    The caller side of a service: one connection to the provider, shared by every call.
+    Each call gets a Future, which the reader thread completes when the response with
+    that call's correlation ID comes back.
+    """
+
+    def __init__(
+        self,
+        info: ServiceInfo,
+        response_type: type[Message] | None = None,
+        logger: TbxLogger | None = None,
+    ) -> None:
+
+        self.info: ServiceInfo = info
+        self.response_type: type[Message] = response_type if response_type is not None \
+            else message_class(info.response_type)
+        self._logger: TbxLogger | None = logger
+
+        self._sock: socket.socket = socket.socket(family=socket.AF_INET, type=socket.SOCK_STREAM)
+        try:
+            self._sock.connect((info.provider_host, info.service_port))
+        except OSError as e:
+            self._sock.close()
+            raise ServiceError(f"Failed to connect to <{info.provider_id}> for service " \
+                f"<{info.service_name}> at {info.provider_host}:{info.service_port}: {e}")
+        set_nodelay(self._sock)
+
+        self._correlation_ids: itertools.count = itertools.count(1)
+        self._pending: dict[int, futures.Future] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+
+        # Responses are read on a thread of our own, rather than a Reactor's, so that
+        # nothing stands between a response arriving and its caller waking up.
+        self._thread: threading.Thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.name = f"{info.service_name.replace('/','_')}_service_client"
+        self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def call_async(self, request: Message) -> futures.Future:
+        """
+        Send a request without waiting for the response.
+
+        Returns:
+            futures.Future: completes with the response, or a ServiceError
+        """
+
+        if request.DESCRIPTOR.full_name != self.info.request_type:
+            raise TypeError(f"Service <{self.info.service_name}> takes <{self.info.request_type}>, " \
+                f"not <{request.DESCRIPTOR.full_name}>")
+
+        future: futures.Future = futures.Future()
+        with self._lock:
+            if self._closed:
+                raise ServiceError(f"Connection to service <{self.info.service_name}> is closed.")
+            correlation_id: int = next(self._correlation_ids) & 0xFFFFFFFF
+            self._pending[correlation_id] = future
+            future.correlation_id = correlation_id
+
+            try:
+                self._sock.sendall(pack_service_frame(correlation_id, message=request))
+            except OSError as e:
+                self._pending.pop(correlation_id, None)
+                future.set_exception(ServiceError(f"Failed to send request to <{self.info.service_name}>: {e}"))
+
+        return future
+
+    def call(self, request: Message, timeout: float | None = DEFAULT_CALL_TIMEOUT) -> Message:
+        """
+        Send a request, and wait (up to `timeout` seconds) for its response.
+
+        Raises:
+            TimeoutError: if the response doesn't arrive in time
+            ServiceError: if the call failed
+        """
+
+        future: futures.Future = self.call_async(request)
+        try:
+            return future.result(timeout=timeout)
+        except futures.TimeoutError:
+            # If the response ever does show up, drop it on the floor.
+            with self._lock:
+                self._pending.pop(future.correlation_id, None)
+            raise TimeoutError(f"Call to service <{self.info.service_name}> timed out after {timeout}s")
+
+    def close(self) -> None:
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    # threading.Thread
+    def _read(self) -> None:
+
+        buffer: bytearray = bytearray()
+        while True:
+            try:
+                data: bytes = self._sock.recv(RECV_SIZE)
+            except OSError:
+                data = b""
+            if not data:
+                break
+
+            buffer += data
+            for frame in unpack_service_frames(buffer):
+                self._complete(frame)
+
+        self.close()
+        self._fail_pending()
+
+    def _complete(self, frame: ServiceFrame) -> None:
+
+        with self._lock:
+            future: futures.Future | None = self._pending.pop(frame.correlation_id, None)
+        if future is None:
+            # Its caller already gave up on it.
+            return
+
+        if frame.status == SERVICE_ERROR:
+            future.set_exception(ServiceError(
+                f"Service <{self.info.service_name}> failed: {frame.payload.decode('utf-8')}"))
+            return
+
+        try:
+            future.set_result(unpack_message(obj_type=self.response_type, message_data=frame.payload))
+        except Exception as e:
+            future.set_exception(ServiceError(f"Bad response from <{self.info.service_name}>: {e}"))
+
+    def _fail_pending(self) -> None:
+
+        with self._lock:
+            pending: list[futures.Future] = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.set_exception(ServiceError(
+                f"Lost connection to <{self.info.provider_id}> for service <{self.info.service_name}>"))
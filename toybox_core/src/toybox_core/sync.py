@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+"""
+Lining up messages from several topics by their header stamps.
+
+A TimeSynchronizer subscribes to a handful of topics (whose messages have a core.Header),
+keeps the last few messages of each, and calls one callback with a message from every
+topic once it has a set that were all stamped at the same time. An
+ApproximateTimeSynchronizer does the same for stamps that are within `slop` seconds
+of each other, which is what sensors that aren't triggered together need.
+
+Each topic's buffer is kept sorted by stamp, so finding the best candidate for a new
+message is a binary search per topic, however many messages are buffered.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import threading
+from typing import Callable
+
+from google.protobuf.message import Message
+
+from toybox_core.logging import LOG
+from toybox_core.node import Node
+
+
+SyncCallback = Callable[..., None]
+
+
+def stamp_nanos(message: Message) -> int:
+    """
+    A message's header stamp, in integer nanoseconds (so exact matches are exact).
+    """
+    stamp = message.header.stamp
+    return (stamp.secs * 1_000_000_000) + stamp.nanosecs
+
+
+@dataclass
+class SyncStats:
+    # Sets of messages handed to the callback.
+    matched: int = 0
+    # Messages that were never part of a set, because they were too old to match
+    # anything, or were pushed out of a full buffer.
+    dropped: int = 0
+
+
+@dataclass
+class _Buffer:
+    """
+    One topic's messages, oldest first. `stamps` mirrors `messages`, for bisect.
+    """
+    stamps: list[int] = field(default_factory=list)
+    messages: list[Message] = field(default_factory=list)
+
+    def insert(self, stamp: int, message: Message) -> None:
+        index: int = bisect_left(self.stamps, stamp)
+        self.stamps.insert(index, stamp)
+        self.messages.insert(index, message)
+
+    def nearest(self, stamp: int) -> int | None:
+        """
+        The index of the message stamped closest to `stamp`, if there are any.
+        """
+        if not self.stamps:
+            return None
+        index: int = bisect_left(self.stamps, stamp)
+        if index == len(self.stamps):
+            return index - 1
+        if index > 0 and (stamp - self.stamps[index - 1]) <= (self.stamps[index] - stamp):
+            return index - 1
+        return index
+
+    def drop_through(self, index: int) -> int:
+        """
+        Forget the message at `index`, and everything older. Returns how many there were.
+        """
+        del self.stamps[:index + 1]
+        del self.messages[:index + 1]
+        return index + 1
+
+    def __len__(self) -> int:
+        return len(self.stamps)
+
+
+class TimeSynchronizer():
+
+    def __init__(
+        self,
+        topics: list[tuple[str,Message]],
+        callback: SyncCallback,
+        queue_size: int = 10,
+        node: Node | None = None,
+    ) -> None:
+        """
+        Args:
+            topics (list[tuple[str,Message]]): (topic name, message type) to line up. \
+                Every message type needs a `header`.
+            callback (SyncCallback): Called with one message per topic, in the same order.
+            queue_size (int): How many messages to keep per topic, waiting for a match.
+            node (Node | None): If given, subscribe to the topics through it. Otherwise, \
+                hand messages to add() yourself.
+        """
+
+        if len(topics) < 2:
+            raise ValueError("Synchronizing takes at least two topics.")
+        for topic_name, message_type in topics:
+            if "header" not in message_type.DESCRIPTOR.fields_by_name:
+                raise ValueError(
+                    f"<{message_type.DESCRIPTOR.full_name}> (on topic <{topic_name}>) has no header to synchronize on.")
+
+        self._topics: list[tuple[str,Message]] = topics
+        self._callback: SyncCallback = callback
+        self._queue_size: int = max(queue_size, 1)
+        self._slop: int = 0
+
+        self._buffers: list[_Buffer] = [_Buffer() for _ in topics]
+        self._lock: threading.Lock = threading.Lock()
+        self.stats: SyncStats = SyncStats()
+
+        if node is not None:
+            self.subscribe(node)
+
+    def subscribe(self, node: Node) -> bool:
+        """
+        Subscribe to every topic through `node`.
+        """
+        result: bool = True
+        for index, (topic_name, message_type) in enumerate(self._topics):
+            result &= node.declare_subscriber(
+                topic_name=topic_name,
+                message_type=message_type,
+                callback_fn=self._topic_callback(index))
+        return result
+
+    def _topic_callback(self, index: int) -> Callable[[Message], None]:
+        def callback(message: Message) -> None:
+            self.add(index, message)
+        return callback
+
+    def add(self, index: int, message: Message) -> None:
+        """
+        Buffer a message from the `index`th topic, and call back if it completes a set.
+        """
+
+        with self._lock:
+            stamp: int = stamp_nanos(message)
+            buffer: _Buffer = self._buffers[index]
+
+            buffer.insert(stamp, message)
+            if len(buffer) > self._queue_size:
+                self.stats.dropped += buffer.drop_through(0)
+
+            matched: tuple[Message, ...] | None = self._match(stamp)
+
+        if matched is not None:
+            try:
+                self._callback(*matched)
+            except Exception as e:
+                LOG("ERR", f"Synchronized callback for {[name for name, _ in self._topics]} failed: {e}")
+
+    def _match(self, stamp: int) -> tuple[Message, ...] | None:
+        """
+        Look for a set of messages around `stamp` (one from each topic) that are all
+        within slop of each other. If there is one, take it out of the buffers, along with
+        everything older, since nothing older can be part of a later set.
+        """
+
+        indices: list[int] = []
+        for buffer in self._buffers:
+            index: int | None = buffer.nearest(stamp)
+            if index is None:
+                return None
+            indices.append(index)
+
+        stamps: list[int] = [buffer.stamps[index] for buffer, index in zip(self._buffers, indices)]
+        if max(stamps) - min(stamps) > self._slop:
+            return None
+
+        matched: tuple[Message, ...] = tuple(
+            buffer.messages[index] for buffer, index in zip(self._buffers, indices))
+        for buffer, index in zip(self._buffers, indices):
+            # The matched message isn't dropped; everything older than it is.
+            self.stats.dropped += buffer.drop_through(index) - 1
+        self.stats.matched += 1
+        return matched
+
+    def clear(self) -> None:
+        with self._lock:
+            for buffer in self._buffers:
+                self.stats.dropped += buffer.drop_through(len(buffer) - 1)
+
+
+class ApproximateTimeSynchronizer(TimeSynchronizer):
+
+    def __init__(
+        self,
+        topics: list[tuple[str,Message]],
+        callback: SyncCallback,
+        slop: float,
+        queue_size: int = 10,
+        node: Node | None = None,
+    ) -> None:
+        """
+        Like TimeSynchronizer, but a set of messages only has to be stamped within `slop`
+        seconds of each other.
+        """
+        super().__init__(topics=topics, callback=callback, queue_size=queue_size, node=None)
+        self._slop = round(slop * 1e9)
+
+        if node is not None:
+            self.subscribe(node)
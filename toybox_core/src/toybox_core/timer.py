@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+
+"""
+Periodic work without a thread per loop.
+
+Timers are scheduled against absolute deadlines (start + n * period), so the time a
+callback takes doesn't push the next one back, and errors don't accumulate. One
+TimerScheduler thread keeps every timer of a Node (or a whole NodeContainer) in a
+heap, and hands callbacks to an executor when they come due.
+
+For code that really does want to block in a loop, Rate does the same deadline
+arithmetic for a single caller.
+
+Both run on a SteadyClock unless given another; on a SimClock, they keep simulated time.
+"""
+
+import concurrent.futures as futures
+from dataclasses import dataclass
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import Callable
+
+from toybox_core.clock import Clock, SteadyClock
+from toybox_core.logging import LOG
+
+
+# At most how often a timer that keeps overrunning complains about it, in seconds.
+OVERRUN_LOG_PERIOD: float = 5.0
+
+
+@dataclass
+class TimerStats:
+    # Callbacks that were run.
+    calls: int = 0
+    # Deadlines that passed without a callback, because the previous one was still
+    # running or the scheduler fell behind.
+    overruns: int = 0
+    # How late callbacks were handed to the executor, relative to their deadlines (s).
+    mean_jitter: float = 0.0
+    max_jitter: float = 0.0
+    # How long the last callback took (s).
+    last_duration: float = 0.0
+
+    def record_jitter(self, jitter: float) -> None:
+        self.calls += 1
+        self.mean_jitter += (jitter - self.mean_jitter) / self.calls
+        self.max_jitter = max(self.max_jitter, jitter)
+
+
+class Timer():
+
+    def __init__(
+        self,
+        period: float,
+        callback: Callable[[], None],
+        name: str = "",
+        oneshot: bool = False,
+    ) -> None:
+
+        if period <= 0:
+            raise ValueError(f"Timer period must be positive, got {period}")
+
+        self.period: float = period
+        self.callback: Callable[[], None] = callback
+        self.name: str = name if name else getattr(callback, "__qualname__", repr(callback))
+        self.oneshot: bool = oneshot
+        self.stats: TimerStats = TimerStats()
+
+        self._deadline: float = time.monotonic() + period
+        self._running: bool = False
+        self._cancelled: bool = False
+        self._last_overrun_log: float = -math.inf
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def deadline(self) -> float:
+        return self._deadline
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def _run(self) -> None:
+
+        start: float = time.monotonic()
+        try:
+            self.callback()
+        except Exception as e:
+            LOG("ERR", f"Timer <{self.name}> callback raised: {e}")
+        finally:
+            self.stats.last_duration = time.monotonic() - start
+            self._running = False
+
+    def _advance(self, now: float) -> None:
+        """
+        Move on to the next deadline that hasn't already passed, counting any we skip.
+        """
+
+        self._deadline += self.period
+        if self._deadline > now:
+            return
+
+        missed: int = math.floor((now - self._deadline) / self.period) + 1
+        self._deadline += missed * self.period
+        self._overrun(missed, now)
+
+    def _overrun(self, missed: int, now: float) -> None:
+
+        self.stats.overruns += missed
+        if now - self._last_overrun_log >= OVERRUN_LOG_PERIOD:
+            self._last_overrun_log = now
+            LOG("WARN", f"Timer <{self.name}> (period {self.period}s) is overrunning, " \
+                f"{self.stats.overruns} deadlines missed so far.")
+
+
+class TimerScheduler():
+
+    def __init__(
+        self,
+        executor: futures.Executor,
+        name: str = "tbx_timers",
+        clock: Clock | None = None,
+    ) -> None:
+
+        self._executor: futures.Executor = executor
+        self._name: str = name
+        self._clock: Clock = clock if clock is not None else SteadyClock()
+
+        # (deadline, tie-breaker, timer)
+        self._heap: list[tuple[float, int, Timer]] = []
+        self._counter: itertools.count = itertools.count()
+        self._condition: threading.Condition = threading.Condition()
+
+        self._stopping: bool = False
+        self._thread: threading.Thread | None = None
+
+        # A simulated clock can't say how long a wait will take, so it wakes us when it moves.
+        self._clock.add_listener(self._wake)
+
+    @property
+    def clock(self) -> Clock:
+        return self._clock
+
+    def add(self, timer: Timer) -> Timer:
+
+        with self._condition:
+            timer._deadline = self._clock.now() + timer.period
+            heapq.heappush(self._heap, (timer.deadline, next(self._counter), timer))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.name = self._name
+                self._thread.start()
+            # The new timer might be due before whatever we're waiting on.
+            self._condition.notify()
+        return timer
+
+    def stop(self) -> None:
+
+        self._clock.remove_listener(self._wake)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def _wake(self, now: float) -> None:
+        with self._condition:
+            self._condition.notify()
+
+    # threading.Thread
+    def _run(self) -> None:
+
+        with self._condition:
+            while not self._stopping:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                deadline, _, timer = self._heap[0]
+                now: float = self._clock.now()
+                if deadline - now > timer.period:
+                    # The clock went backwards (e.g., a replay started over); start over with it.
+                    heapq.heapreplace(self._heap, (now + timer.period, next(self._counter), timer))
+                    timer._deadline = now + timer.period
+                    continue
+                if deadline > now:
+                    self._condition.wait(timeout=self._clock.wall_timeout(deadline - now))
+                    continue
+
+                heapq.heappop(self._heap)
+                if timer.cancelled:
+                    continue
+                self._fire(timer, now)
+
+                if timer.oneshot:
+                    continue
+                timer._advance(now)
+                heapq.heappush(self._heap, (timer.deadline, next(self._counter), timer))
+
+    def _fire(self, timer: Timer, now: float) -> None:
+
+        if timer._running:
+            # Still busy with the last one; don't pile up behind it.
+            timer._overrun(1, now)
+            return
+
+        timer._running = True
+        timer.stats.record_jitter(now - timer.deadline)
+        try:
+            self._executor.submit(timer._run)
+        except RuntimeError:
+            # The executor's been shut down, so there's nobody left to run timers.
+            timer._running = False
+            timer.cancel()
+
+
+class Rate():
+    """
+    Sleep out the rest of each period of a loop, against absolute deadlines:
+
+        rate: Rate = Rate(hz=30)
+        while running:
+            do_work()
+            rate.sleep()
+    """
+
+    def __init__(self, hz: float, clock: Clock | None = None) -> None:
+
+        if hz <= 0:
+            raise ValueError(f"Rate must be positive, got {hz}")
+
+        self.period: float = 1 / hz
+        self._clock: Clock = clock if clock is not None else SteadyClock()
+        self._deadline: float = self._clock.now() + self.period
+        self.overruns: int = 0
+
+    def sleep(self) -> bool:
+        """
+        Returns:
+            bool: False if the loop overran its period (and we didn't sleep at all)
+        """
+
+        now: float = self._clock.now()
+        if now < self._deadline:
+            self._clock.sleep_until(self._deadline)
+            self._deadline += self.period
+            return True
+
+        # Too late for this deadline. Rather than rushing through the ones we missed,
+        # start over from now.
+        self.overruns += 1
+        self._deadline = now + self.period
+        return False
+
+    def reset(self) -> None:
+        self._deadline = self._clock.now() + self.period
@@ -12,6 +12,10 @@ class Topic():
     message_type: Message
     publishers: dict[str, tuple[str,int]] = field(default_factory=dict) # {client, addr}
     subscribers: list[str] = field(default_factory=list)
+    # Clients that re-publish this topic, {client, addr}; and which of them each of the
+    # subscribers that were sent to a relay is getting the topic from, {subscriber: relay}.
+    relays: dict[str, tuple[str,int]] = field(default_factory=dict)
+    relayed: dict[str, str] = field(default_factory=dict)
 
     callbacks: list[Callable] = field(default_factory=list)
 
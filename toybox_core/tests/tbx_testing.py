@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+Things the tests that need a tbx-server have in common.
+"""
+
+import threading
+import time
+from typing import Any, Callable
+import unittest
+
+from toybox_core.connection import get_available_port
+import toybox_core.rpc.channel as channel
+from toybox_core.rpc.health import try_health_check_rpc
+from toybox_core.server import ToyboxServer
+
+
+# How long a test server gets to come up before the test gives up on it, in seconds.
+SERVER_START_TIMEOUT: float = 10.0
+
+
+def wait_for(condition: Callable[[], Any], timeout: float = 2.0) -> bool:
+    """
+    Poll `condition` until it's true, or `timeout` runs out.
+
+    Returns:
+        bool: whether it came true
+    """
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class ServerTestCase(unittest.TestCase):
+    """
+    A test case with a tbx-server of its own, running in a thread for the length of
+    each test, that everything in the test talks to.
+
+    Each test file asks for a different PORT, so that they can run side by side; if
+    it's taken anyway (e.g., by a stuck run), the next free one up is used instead.
+    """
+
+    PORT: int = 50520
+    # Extra ToyboxServer arguments.
+    SERVER_ARGS: dict[str,Any] = {}
+
+    def setUp(self) -> None:
+        self.start_server()
+
+    def tearDown(self) -> None:
+        self.stop_server()
+
+    def start_server(self, **kwargs) -> ToyboxServer:
+
+        if not hasattr(self, "port"):
+            self.port: int = get_available_port(start=self.PORT)
+        channel.configure(target=f"localhost:{self.port}")
+
+        self.tbx: ToyboxServer = ToyboxServer(
+            port=self.port, **{"lease_duration": 60.0, **self.SERVER_ARGS, **kwargs})
+        threading.Thread(target=self.tbx.serve, daemon=True).start()
+        if not wait_for(try_health_check_rpc, timeout=SERVER_START_TIMEOUT):
+            self.stop_server()
+            self.fail(f"tbx-server never came up on port {self.port}.")
+        return self.tbx
+
+    def stop_server(self, notify_clients: bool | None = False) -> None:
+        self.tbx.shutdown(notify_clients=notify_clients)
+        channel.configure(target=None)
+
+    def wait_for(self, condition: Callable[[], Any], timeout: float = 2.0) -> bool:
+        return wait_for(condition, timeout=timeout)
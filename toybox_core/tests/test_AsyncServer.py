@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import grpc
+import threading
+import time
+import unittest
+
+from toybox_core.aio_server import AsyncToyboxServer
+from toybox_core.rpc.health import try_health_check_rpc
+from toybox_msgs.core.Metrics_pb2 import MetricsRequest, MetricsSnapshot
+from toybox_msgs.core.Metrics_pb2_grpc import MetricsStub
+import toybox_msgs.core.Register_pb2 as Register_pb2
+from toybox_msgs.core.Register_pb2_grpc import RegisterStub
+
+
+class Test_AsyncToyboxServer(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.port: int = 50507
+        self.tbx: AsyncToyboxServer = AsyncToyboxServer(port=self.port, lease_duration=60.0)
+        self.thread: threading.Thread = threading.Thread(target=self.tbx.serve, daemon=True)
+        self.thread.start()
+
+        deadline: float = time.monotonic() + 5.0
+        while not try_health_check_rpc(addr="localhost", port=self.port):
+            self.assertLess(time.monotonic(), deadline, "AsyncToyboxServer never came up.")
+            time.sleep(0.05)
+
+        self.channel: grpc.Channel = grpc.insecure_channel(f"localhost:{self.port}")
+        self.stub: RegisterStub = RegisterStub(self.channel)
+
+    def tearDown(self) -> None:
+        self.channel.close()
+        self.tbx.shutdown(notify_clients=False)
+        self.thread.join(timeout=5.0)
+
+    def test_register_and_heartbeat(self) -> None:
+
+        req: Register_pb2.RegisterRequest = Register_pb2.RegisterRequest(client_id="test")
+        req.meta.addr = "localhost"
+        req.meta.port = self.port + 1
+        response: Register_pb2.RegisterResponse = self.stub.RegisterClient(req, timeout=1.0)
+        self.assertEqual(response.return_code, 0)
+
+        clients: Register_pb2.ClientList = self.stub.GetRegisteredClients(Register_pb2.ListClientsRequest(), timeout=1.0)
+        self.assertEqual([client.client_id for client in clients.clients], ["test"])
+
+        requests = iter([Register_pb2.HeartbeatRequest(client_ids=["test", "unknown"])])
+        responses: list[Register_pb2.HeartbeatResponse] = list(self.stub.Heartbeat(requests, timeout=1.0))
+        self.assertEqual(list(responses[0].unknown_client_ids), ["unknown"])
+
+    def test_metrics(self) -> None:
+
+        req: Register_pb2.RegisterRequest = Register_pb2.RegisterRequest(client_id="test")
+        req.meta.addr = "localhost"
+        req.meta.port = self.port + 1
+        self.stub.RegisterClient(req, timeout=1.0)
+        list(self.stub.Heartbeat(iter([Register_pb2.HeartbeatRequest(client_ids=["test"])]), timeout=1.0))
+
+        snapshot: MetricsSnapshot = MetricsStub(self.channel).GetMetrics(MetricsRequest(), timeout=1.0)
+        self.assertEqual(snapshot.client_count, 1)
+        calls: dict[str,int] = {rpc.method: rpc.calls for rpc in snapshot.rpcs}
+        self.assertEqual(calls["/core.Register/RegisterClient"], 1)
+        self.assertEqual(calls["/core.Register/Heartbeat"], 1)
+
+    def test_shutdown_from_another_thread(self) -> None:
+
+        self.tbx.shutdown(notify_clients=False)
+        self.thread.join(timeout=5.0)
+        self.assertFalse(self.thread.is_alive())
+
+    def test_spin_until_shutdown(self) -> None:
+
+        # Already serving, so spin() just waits it out.
+        spinner: threading.Thread = threading.Thread(target=self.tbx.spin, daemon=True)
+        spinner.start()
+        time.sleep(0.1)
+        self.assertTrue(spinner.is_alive())
+
+        self.tbx.shutdown(notify_clients=False)
+        spinner.join(timeout=5.0)
+        self.assertFalse(spinner.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import os
+import unittest
+
+import toybox_core.rpc.channel as channel
+from toybox_msgs.core.Health_pb2_grpc import HealthStub
+
+
+class Test_Channel(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        os.environ.pop(channel.TBX_SERVER_ENV, None)
+        channel.configure(target=None, timeout=None)
+
+    def test_target_from_environment(self) -> None:
+
+        self.assertEqual(channel.get_server_target(), channel.DEFAULT_TBX_SERVER_TARGET)
+
+        os.environ[channel.TBX_SERVER_ENV] = "unix:/tmp/tbx.sock"
+        self.assertEqual(channel.get_server_target(), "unix:/tmp/tbx.sock")
+
+        # Explicit configuration beats the environment.
+        channel.configure(target="otherhost:6000")
+        self.assertEqual(channel.get_server_target(), "otherhost:6000")
+
+    def test_bind_address(self) -> None:
+
+        self.assertEqual(channel.get_bind_address("localhost:6000"), "[::]:6000")
+        self.assertEqual(channel.get_bind_address("unix:/tmp/tbx.sock"), "unix:/tmp/tbx.sock")
+
+    def test_channel_is_lazy_and_shared(self) -> None:
+
+        channel.close_channel()
+        self.assertIsNone(channel._channel)
+
+        stub: HealthStub = channel.get_stub(HealthStub)
+        self.assertIsNotNone(channel._channel)
+        self.assertIs(channel.get_stub(HealthStub), stub)
+        self.assertIs(channel.get_channel(), channel.get_channel())
+
+        # Reconfiguring throws away the old channel (and stubs built on it).
+        channel.configure(target="localhost:6000")
+        self.assertIsNone(channel._channel)
+        self.assertIsNot(channel.get_stub(HealthStub), stub)
+
+
+if __name__ == '__main__':
+    unittest.main()
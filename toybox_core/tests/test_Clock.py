@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import concurrent.futures as futures
+import threading
+import time
+import unittest
+
+from toybox_core.clock import CLOCK_TOPIC, SimClock, from_timestamp, to_timestamp
+from toybox_core.node import Node
+from toybox_core.timer import Rate, Timer, TimerScheduler
+from toybox_msgs.core.Time_pb2 import Timestamp
+
+from tbx_testing import ServerTestCase
+
+
+class Test_SimClock(unittest.TestCase):
+
+    def test_timestamps(self) -> None:
+
+        self.assertEqual(to_timestamp(12.5), Timestamp(secs=12, nanosecs=500_000_000))
+        self.assertEqual(to_timestamp(0.9999999999).secs, 1)
+        self.assertAlmostEqual(from_timestamp(to_timestamp(1234.000001)), 1234.000001)
+
+    def test_timers_keep_sim_time(self) -> None:
+
+        clock: SimClock = SimClock()
+        executor: futures.ThreadPoolExecutor = futures.ThreadPoolExecutor(max_workers=2)
+        scheduler: TimerScheduler = TimerScheduler(executor=executor, clock=clock)
+
+        calls: list[float] = []
+        scheduler.add(Timer(period=1.0, callback=lambda: calls.append(clock.now())))
+
+        # However long we wait, nothing happens until simulated time moves...
+        time.sleep(0.05)
+        self.assertEqual(calls, [])
+
+        # ...and then it happens as fast as simulated time does.
+        for step in range(1, 41):
+            clock.set(step * 0.1)
+            time.sleep(0.002)
+        deadline: float = time.monotonic() + 1.0
+        while len(calls) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(scheduler._heap[0][0], 5.0)
+
+        scheduler.stop()
+        executor.shutdown()
+
+    def test_rate(self) -> None:
+
+        clock: SimClock = SimClock()
+        rate: Rate = Rate(hz=10, clock=clock)
+
+        slept: threading.Event = threading.Event()
+        threading.Thread(target=lambda: (rate.sleep(), slept.set()), daemon=True).start()
+        self.assertFalse(slept.wait(timeout=0.05))
+
+        clock.set(0.1)
+        self.assertTrue(slept.wait(timeout=1.0))
+
+
+class Test_NodeClock(ServerTestCase):
+
+    PORT: int = 50515
+
+    def test_follows_clock_topic(self) -> None:
+
+        simulator: Node = Node("simulator", clock=SimClock())
+        clock_pub = simulator.advertise(CLOCK_TOPIC, Timestamp)
+
+        follower: Node = Node("follower", clock=SimClock(topic=CLOCK_TOPIC))
+        self.assertEqual(follower.now(), 0.0)
+
+        deadline: float = time.monotonic() + 2.0
+        while follower.now() != 42.5 and time.monotonic() < deadline:
+            clock_pub.publish(to_timestamp(42.5))
+            time.sleep(0.01)
+
+        self.assertEqual(follower.now(), 42.5)
+        self.assertEqual(follower.timestamp(), Timestamp(secs=42, nanosecs=500_000_000))
+
+        follower.shutdown()
+        simulator.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
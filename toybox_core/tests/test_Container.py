@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import threading
+import unittest
+
+from toybox_core.container import NodeContainer
+from toybox_core.node import Node
+from toybox_msgs.core.Test_pb2 import TestMessage
+
+from tbx_testing import ServerTestCase
+
+
+class Test_NodeContainer(ServerTestCase):
+
+    PORT: int = 50511
+
+    def setUp(self) -> None:
+
+        super().setUp()
+        # Out of the way of the ports that the other tests' servers use, since each
+        # Node still probes for data ports upwards of this one.
+        self.container: NodeContainer = NodeContainer(port=50600)
+
+    def tearDown(self) -> None:
+        self.container.shutdown()
+        super().tearDown()
+
+    def test_nodes_share_a_runtime(self) -> None:
+
+        threads: int = threading.active_count()
+
+        # The subscriber comes first, so it has to be told about the publisher.
+        received: list[TestMessage] = []
+        subscriber: Node = Node("sub", container=self.container)
+        subscriber.subscribe("/t", TestMessage, received.append)
+
+        publisher: Node = Node("pub", container=self.container)
+        pub = publisher.advertise("/t", TestMessage)
+        for i in range(10):
+            Node(f"idle_{i}", container=self.container)
+
+        self.assertEqual(publisher._port, subscriber._port)
+        self.assertTrue(self.wait_for(lambda: subscriber.subscribers[0].publisher is not None))
+
+        def publish_and_check() -> bool:
+            pub.publish(TestMessage(test_string="hi"))
+            return len(received) > 0
+        self.assertTrue(self.wait_for(publish_and_check))
+
+        # On their own, twelve Nodes would have at least two threads each (plus three for
+        # the topics). Here, it's just the reactor plus whatever the shared executor and
+        # RPC server (and the tbx-server, in this same process) spun up.
+        self.assertLess(threading.active_count() - threads, 16)
+
+        subscriber.shutdown()
+        self.assertNotIn(subscriber, self.container.nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
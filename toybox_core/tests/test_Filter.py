@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import time
+import unittest
+
+from google.protobuf.message import Message
+
+from toybox_core.connection import Publisher, Subscriber, get_available_port
+from toybox_core.filter import MessageFilter
+from toybox_msgs.primitive.Vector_pb2 import Vector3
+from toybox_msgs.state.Velocity_pb2 import Velocity
+
+
+class Test_MessageFilter(unittest.TestCase):
+
+    def test_expressions(self) -> None:
+
+        message: Velocity = Velocity(linear=Vector3(x=1.0, y=-2.0))
+        message.header.frame_id = "base_link"
+
+        self.assertTrue(MessageFilter("linear.x > 0.5", Velocity)(message))
+        self.assertFalse(MessageFilter("linear.x > 0.5 and linear.y >= 0", Velocity)(message))
+        self.assertTrue(MessageFilter("header.frame_id == 'base_link' and angular.z == 0", Velocity)(message))
+        self.assertFalse(MessageFilter("header.frame_id != \"base_link\"")(message))
+
+    def test_bad_expressions(self) -> None:
+
+        for expression in ["", "linear.x >", "linear.w > 1", "linear > 1", "header.frame_id == base"]:
+            with self.assertRaises(ValueError, msg=expression):
+                MessageFilter(expression, Velocity)
+
+
+class Test_SubscriberOptions(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.publisher: Publisher = Publisher(
+            topic_name="/velocity", message_type=Velocity, host="localhost",
+            port=get_available_port(start=50700))
+        self.subscribers: list[Subscriber] = []
+
+    def tearDown(self) -> None:
+        for subscriber in self.subscribers:
+            subscriber.trigger_shutdown()
+        self.publisher.trigger_shutdown()
+
+    def subscribe(self, received: list[Message], **options) -> None:
+        self.subscribers.append(Subscriber(
+            topic_name="/velocity", message_type=Velocity, host="localhost",
+            port=get_available_port(start=50701),
+            publisher_info=("publisher", "localhost", self.publisher.port),
+            callback=received.append, **options))
+
+    def test_enforced_by_publisher(self) -> None:
+
+        everything: list[Velocity] = []
+        limited: list[Velocity] = []
+        filtered: list[Velocity] = []
+        self.subscribe(everything)
+        self.subscribe(limited, max_rate=10.0)
+        self.subscribe(filtered, filter_expression="linear.x >= 15")
+
+        deadline: float = time.monotonic() + 2.0
+        while len(self.publisher._subscribers) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.publisher._subscribers), 3)
+
+        # 50 Hz for half a second.
+        for i in range(25):
+            self.publisher.publish(Velocity(linear=Vector3(x=i)))
+            time.sleep(0.02)
+        time.sleep(0.3)
+
+        self.assertEqual(len(everything), 25)
+        self.assertTrue(4 <= len(limited) <= 7, len(limited))
+        self.assertEqual([message.linear.x for message in filtered], list(range(15, 25)))
+
+
+if __name__ == '__main__':
+    unittest.main()
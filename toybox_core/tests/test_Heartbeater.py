@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import threading
+import unittest
+
+from toybox_core.rpc.register import Heartbeater
+
+from tbx_testing import ServerTestCase
+
+
+class StallingHeartbeater(Heartbeater):
+    """
+    Stops (once) just after deciding there's nobody left to heartbeat for, before its
+    thread actually exits.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.stopping: threading.Event = threading.Event()
+        self.proceed: threading.Event = threading.Event()
+
+    def _keep_running(self) -> bool:
+        keep_running: bool = super()._keep_running()
+        if not keep_running and not self.stopping.is_set():
+            self.stopping.set()
+            self.proceed.wait(timeout=5.0)
+        return keep_running
+
+
+class Test_Heartbeater(ServerTestCase):
+
+    PORT: int = 50517
+
+    def test_add_as_last_client_leaves(self) -> None:
+
+        heartbeater: StallingHeartbeater = StallingHeartbeater()
+
+        # The server has never heard of either client, so each is dropped (and reported
+        # lost) on its first heartbeat.
+        lost: dict[str,threading.Event] = {"a": threading.Event(), "b": threading.Event()}
+        heartbeater.add("a", on_lease_lost=lambda client_id: lost[client_id].set())
+        self.assertTrue(lost["a"].wait(timeout=5.0))
+        # (Which it'd otherwise only notice at the next heartbeat.)
+        heartbeater.remove("a")
+        self.assertTrue(heartbeater.stopping.wait(timeout=5.0))
+
+        # The old thread has given up, but hasn't exited yet.
+        old_thread: threading.Thread | None = heartbeater._thread
+        heartbeater.add("b", on_lease_lost=lambda client_id: lost[client_id].set())
+        self.assertIsNot(heartbeater._thread, old_thread)
+        heartbeater.proceed.set()
+
+        self.assertTrue(lost["b"].wait(timeout=5.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
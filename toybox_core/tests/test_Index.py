@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from toybox_core.index import DistributionEntry, NodeEntry, PackageIndex
+from toybox_core.launch import indexed_node_params
+
+
+NODES_PY: str = '''
+from toybox_core.launchable import Launchable
+
+DEFAULT_RATE = 10.0
+
+class Talker(Launchable):
+    def __init__(self, name: str, rate: float = 5.0, topic: str | None = None) -> None:
+        pass
+
+class Clever(Launchable):
+    def __init__(self, name: str, rate: float = DEFAULT_RATE) -> None:
+        pass
+'''
+
+PYPROJECT_TOML: str = '''
+[project]
+name = "tbx_index_test"
+
+[project.entry-points."tbx.nodes"]
+Talker = "tbx_index_test.nodes:Talker"
+Clever = "tbx_index_test.nodes:Clever"
+
+[tool.toybox]
+launch-files = ["launch"]
+'''
+
+
+class Test_PackageIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.root: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        root: pathlib.Path = pathlib.Path(self.root.name)
+
+        # Just enough of an installed distribution for importlib.metadata to find it.
+        (root / "tbx_index_test").mkdir()
+        (root / "tbx_index_test" / "__init__.py").write_text("")
+        (root / "tbx_index_test" / "nodes.py").write_text(NODES_PY)
+        (root / "launch").mkdir()
+        self.pyproject: pathlib.Path = root / "pyproject.toml"
+        self.pyproject.write_text(PYPROJECT_TOML)
+        dist_info: pathlib.Path = root / "tbx_index_test-0.0.1.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: tbx_index_test\nVersion: 0.0.1\n")
+        (dist_info / "entry_points.txt").write_text(
+            "[tbx.nodes]\nTalker = tbx_index_test.nodes:Talker\nClever = tbx_index_test.nodes:Clever\n")
+
+        sys.path.insert(0, self.root.name)
+        self.index_path: pathlib.Path = root / "cache" / "index.json"
+
+    def tearDown(self) -> None:
+        sys.path.remove(self.root.name)
+        self.root.cleanup()
+
+    def test_index_without_importing(self) -> None:
+
+        index: PackageIndex = PackageIndex(self.index_path)
+        self.assertTrue(index.refresh())
+        self.assertTrue(self.index_path.exists())
+
+        self.assertEqual(index.packages()["tbx_index_test"].launch_file_locations, ["launch"])
+
+        talker: NodeEntry = index.nodes()["tbx_index_test.Talker"]
+        params = indexed_node_params(talker)
+        self.assertEqual(params["name"].type, str)
+        self.assertTrue(params["name"].required)
+        self.assertEqual(params["rate"].value, 5.0)
+        self.assertEqual(params["topic"].type, str | None)
+
+        # Too clever to read from source; that one gets imported when it's needed.
+        self.assertIsNone(index.nodes()["tbx_index_test.Clever"].params)
+
+        self.assertNotIn("tbx_index_test.nodes", sys.modules)
+
+    def test_incremental(self) -> None:
+
+        PackageIndex(self.index_path).refresh()
+
+        # Read back from disk, nothing's changed...
+        index: PackageIndex = PackageIndex(self.index_path)
+        self.assertIn("tbx_index_test.Talker", index.nodes())
+        self.assertFalse(index.refresh())
+
+        # ...until somebody edits a pyproject.toml, and only that distribution is re-read.
+        others: list[DistributionEntry] = [
+            entry for entry in index._distributions.values() if entry.name != "tbx_index_test"]
+        stat: os.stat_result = self.pyproject.stat()
+        os.utime(self.pyproject, (stat.st_atime, stat.st_mtime + 10))
+
+        self.assertTrue(index.refresh())
+        for entry in others:
+            self.assertTrue(any(entry is kept for kept in index._distributions.values()))
+        self.assertIn("tbx_index_test", index.packages())
+
+    def test_edited_nodes(self) -> None:
+
+        PackageIndex(self.index_path).refresh()
+
+        # An editable install: the source changes, but nothing about the distribution does.
+        nodes: pathlib.Path = pathlib.Path(self.root.name) / "tbx_index_test" / "nodes.py"
+        nodes.write_text(NODES_PY.replace("rate: float = 5.0", "rate: float = 20.0"))
+        stat: os.stat_result = nodes.stat()
+        os.utime(nodes, (stat.st_atime, stat.st_mtime + 10))
+
+        index: PackageIndex = PackageIndex(self.index_path)
+        self.assertTrue(index.refresh())
+        self.assertEqual(indexed_node_params(index.nodes()["tbx_index_test.Talker"])["rate"].value, 20.0)
+        self.assertFalse(index.refresh())
+
+
+if __name__ == '__main__':
+    unittest.main()
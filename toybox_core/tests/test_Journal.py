@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+import os
+from queue import Queue
+import tempfile
+import threading
+import time
+import unittest
+
+from toybox_core.client import Client
+from toybox_core.journal import JOURNAL_FILE, RegistryJournal
+from toybox_core.registry import RegistryEvents, apply_event, snapshot
+from toybox_core.rpc.register import Heartbeater, RegisterServicer, declare_node_rpc, register_client_rpc
+from toybox_core.rpc.topic import TopicRPCServicer
+from toybox_core.topic import Topic
+from toybox_msgs.core.Register_pb2 import DeclareNodeRequest, DeclareNodeResponse, RegistryEvent
+from toybox_msgs.core.Test_pb2 import TestMessage
+
+from tbx_testing import ServerTestCase
+
+
+class Test_RegistryJournal(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_round_trip(self) -> None:
+
+        events: RegistryEvents = RegistryEvents()
+        clients: dict[str,Client] = {}
+        topics: dict[str,Topic] = {}
+        journal: RegistryJournal = RegistryJournal(self.tmp.name, snapshot_interval=2)
+        journal.attach(events, clients=clients, topics=topics)
+
+        for name in ["a", "b", "c"]:
+            clients[name] = Client(client_id=name, addr="localhost", rpc_port=1, data_port=2)
+            events.client_updated(clients[name])
+        topics["/t"] = Topic(name="/t", message_type="test", publishers={"a": ("localhost", 3)})
+        events.topic_updated(topics["/t"])
+        del clients["b"]
+        events.client_removed("b")
+
+        # Leave a torn record at the end of the journal, like a crash mid-write would.
+        journal.flush()
+        with open(os.path.join(self.tmp.name, JOURNAL_FILE), "ab") as file:
+            file.write(b"\xff\x00")
+
+        restored_clients: dict[str,Client] = {}
+        restored_topics: dict[str,Topic] = {}
+        generation: int = RegistryJournal(self.tmp.name).load(
+            clients=restored_clients, topics=restored_topics)
+
+        self.assertEqual(generation, events.generation)
+        self.assertEqual(sorted(restored_clients.keys()), ["a", "c"])
+        self.assertEqual(restored_topics["/t"].publishers, {"a": ("localhost", 3)})
+        journal.close()
+
+
+class Test_Reassert(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.clients: dict[str,Client] = {}
+        self.topics: dict[str,Topic] = {}
+        self.events: RegistryEvents = RegistryEvents()
+        topic_servicer: TopicRPCServicer = TopicRPCServicer(
+            topics=self.topics, clients=self.clients, announcements=Queue(), events=self.events)
+        self.servicer: RegisterServicer = RegisterServicer(
+            clients=self.clients, topics=self.topics, topic_servicer=topic_servicer,
+            events=self.events, epoch=7)
+
+    def test_reassert_replaces_client(self) -> None:
+
+        self.clients["a"] = Client(client_id="a", addr="localhost", rpc_port=1, data_port=2)
+        self.topics["/old"] = Topic(name="/old", message_type="test", publishers={"a": ("localhost", 3)})
+
+        response: DeclareNodeResponse = self.servicer.DeclareNode(declare_request(reassert=False), None)
+        self.assertEqual(response.registration.return_code, 1)
+
+        response = self.servicer.DeclareNode(declare_request(reassert=True), None)
+        self.assertEqual(response.registration.return_code, 0)
+        self.assertEqual(response.registration.server_epoch, 7)
+        self.assertEqual(self.clients["a"].rpc_port, 4)
+        self.assertEqual(self.topics["/old"].publishers, {})
+        self.assertEqual(self.topics["/new"].publishers, {"a": ("localhost", 5)})
+
+    def test_reassert_is_seen_by_watchers(self) -> None:
+
+        response: DeclareNodeResponse = self.servicer.DeclareNode(declare_request(reassert=False), None)
+        self.assertEqual(response.registration.return_code, 0)
+        self.topics["/old"] = Topic(name="/old", message_type="test", subscribers=["a"])
+        self.events.topic_updated(self.topics["/old"])
+
+        # Somebody following along, the way the journal and WatchRegistry do.
+        seen: list[RegistryEvent] = []
+        clients: dict[str,Client] = {}
+        topics: dict[str,Topic] = {}
+        for event in snapshot(generation=self.events.generation, clients=self.clients, topics=self.topics):
+            apply_event(event, clients=clients, topics=topics)
+        self.events.add_listener(seen.append)
+
+        declared: DeclareNodeRequest = declare_request(reassert=True)
+        declared.registration.meta.port = 6
+        self.servicer.DeclareNode(declared, None)
+
+        self.assertIn(RegistryEvent.CLIENT_REMOVED, [event.kind for event in seen])
+        for event in seen:
+            apply_event(event, clients=clients, topics=topics)
+        self.assertEqual(clients["a"].rpc_port, 6)
+        self.assertEqual(topics["/old"].subscribers, [])
+        self.assertEqual(topics["/new"].publishers, {"a": ("localhost", 5)})
+
+
+def declare_request(reassert: bool) -> DeclareNodeRequest:
+    request: DeclareNodeRequest = DeclareNodeRequest(reassert=reassert)
+    request.registration.client_id = "a"
+    request.registration.meta.addr = "localhost"
+    request.registration.meta.port = 4
+    advertisement = request.advertisements.add()
+    advertisement.publisher.publisher_id = "a"
+    advertisement.publisher.publisher_host = "localhost"
+    advertisement.publisher.topic_port = 5
+    advertisement.topic_def.topic_name = "/new"
+    advertisement.topic_def.message_type = TestMessage.DESCRIPTOR.full_name
+    return request
+
+
+class Test_WarmRestart(ServerTestCase):
+
+    PORT: int = 50509
+
+    def setUp(self) -> None:
+        # The test starts (and restarts) the server itself.
+        self.tmp: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.SERVER_ARGS = {"state_dir": self.tmp.name}
+        self.heartbeater: Heartbeater = Heartbeater()
+
+    def tearDown(self) -> None:
+        self.heartbeater.remove("node")
+        self.stop_server(notify_clients=None)
+        self.tmp.cleanup()
+
+    def test_restart(self) -> None:
+
+        self.start_server()
+        self.assertTrue(declare_node_rpc(
+            name="node", host="localhost", port=1,
+            advertisements=[("/t", TestMessage.DESCRIPTOR.full_name, 2)]).registered)
+
+        lost: threading.Event = threading.Event()
+        self.heartbeater.add("node", on_lease_lost=lambda _: lost.set())
+        while not self.heartbeater._epoch:
+            time.sleep(0.01)
+
+        # Stopping a server that's keeping its state shouldn't take its clients down with it.
+        self.tbx.shutdown()
+        self.start_server()
+
+        self.assertIn("node", self.tbx._clients)
+        self.assertEqual(self.tbx._topics["/t"].publishers, {"node": ("localhost", 2)})
+        self.assertFalse(register_client_rpc(name="node", host="localhost", port=1))
+
+        # The heartbeater notices the new epoch, and has the node re-assert itself.
+        self.assertTrue(lost.wait(timeout=5.0))
+        self.assertTrue(declare_node_rpc(
+            name="node", host="localhost", port=1,
+            advertisements=[("/t", TestMessage.DESCRIPTOR.full_name, 2)],
+            reassert=True).registered)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from toybox_core.launch import (
+    LaunchDescription,
+    LaunchError,
+    LaunchReport,
+    LaunchType,
+    NodeParam,
+    after_ready,
+    launch_by_dependencies,
+    launch_in_processes,
+    launch_phase_by_phase,
+)
+from toybox_core.launchable import Launchable
+
+
+class Worker(Launchable):
+    """
+    Writes down where (which process, which CPUs) each of its phases ran.
+    """
+
+    def __init__(self, name: str, out_dir: str, fail: bool = False) -> None:
+        self._name: str = name
+        self._out_dir: pathlib.Path = pathlib.Path(out_dir)
+        self._fail: bool = fail
+
+    def _record(self, phase: str) -> None:
+        cpus: list[int] = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        (self._out_dir / f"{self._name}.{phase}").write_text(f"{os.getpid()} {cpus}")
+
+    def pre_launch(self) -> bool:
+        self._record("pre_launch")
+        # Whether we got grpc for free (from the launcher's forkserver), or not.
+        (self._out_dir / f"{self._name}.warm").write_text(str("grpc" in sys.modules))
+        return not self._fail
+
+    def launch(self) -> bool:
+        self._record("launch")
+        return True
+
+    def post_launch(self) -> bool:
+        self._record("post_launch")
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+
+class Test_ProcessLaunch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.out_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.out_dir.cleanup()
+
+    def worker(self, name: str, fail: bool = False) -> LaunchDescription:
+        description: LaunchDescription = LaunchDescription(name=name, params={
+            "name": NodeParam(name="name", type=str, value=name),
+            "out_dir": NodeParam(name="out_dir", type=str, value=self.out_dir.name),
+            "fail": NodeParam(name="fail", type=bool, value=fail, required=False),
+        })
+        description.to_launch = [Worker]
+        return description
+
+    def record(self, name: str, phase: str) -> tuple[str, str] | None:
+        path: pathlib.Path = pathlib.Path(self.out_dir.name) / f"{name}.{phase}"
+        if not path.exists():
+            return None
+        pid, cpus = path.read_text().split(" ", 1)
+        return pid, cpus
+
+    def group(self, name: str, members: list[LaunchDescription], **kwargs) -> LaunchDescription:
+        description: LaunchDescription = LaunchDescription(name=name, launch_type=LaunchType.GROUP, **kwargs)
+        description.to_launch = members
+        return description
+
+    def test_groups_get_processes(self) -> None:
+
+        pinned: LaunchDescription = self.group(
+            "pinned", [self.worker("a1"), self.worker("a2")], group="a", cpus=[0])
+        everything: LaunchDescription = self.group("everything", [pinned, self.worker("b")])
+
+        self.assertTrue(launch_in_processes(everything.recipes()))
+
+        for name in ["a1", "a2", "b"]:
+            for phase in ["pre_launch", "launch", "post_launch"]:
+                self.assertIsNotNone(self.record(name, phase), f"{name}.{phase}")
+
+        a1_pid, a1_cpus = self.record("a1", "launch")
+        a2_pid, _ = self.record("a2", "launch")
+        b_pid, _ = self.record("b", "launch")
+        self.assertEqual(a1_pid, a2_pid)
+        self.assertNotEqual(a1_pid, b_pid)
+        self.assertNotIn(str(os.getpid()), [a1_pid, b_pid])
+        if hasattr(os, "sched_setaffinity"):
+            self.assertEqual(a1_cpus, "[0]")
+
+    @unittest.skipUnless("forkserver" in multiprocessing.get_all_start_methods(), "no forkserver here")
+    def test_warm_processes(self) -> None:
+
+        self.assertTrue(launch_in_processes(self.worker("warm").recipes()))
+        self.assertTrue(launch_in_processes(self.worker("cold").recipes(), start_method="spawn"))
+
+        self.assertEqual((pathlib.Path(self.out_dir.name) / "warm.warm").read_text(), "True")
+        self.assertEqual((pathlib.Path(self.out_dir.name) / "cold.warm").read_text(), "False")
+
+    def test_phases_wait_for_every_process(self) -> None:
+
+        everything: LaunchDescription = self.group(
+            "everything", [self.worker("a"), self.worker("b", fail=True)])
+
+        self.assertFalse(launch_in_processes(everything.recipes()))
+
+        # Both got through pre-launch, but b failed it, so nobody launched.
+        self.assertIsNotNone(self.record("a", "pre_launch"))
+        self.assertIsNone(self.record("a", "launch"))
+        self.assertIsNone(self.record("b", "launch"))
+
+
+class Napper(Launchable):
+    """
+    Takes its time pre-launching.
+    """
+
+    def __init__(self, name: str, nap: float = 0.0) -> None:
+        self._name: str = name
+        self._nap: float = nap
+
+    def pre_launch(self) -> bool:
+        time.sleep(self._nap)
+        return True
+
+    def launch(self) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+
+class Runner(Launchable):
+    """
+    Runs until it's shut down, like a Node does; or fails pre_launch, if told to.
+    """
+
+    def __init__(self, name: str, fail: bool = False) -> None:
+        self._name: str = name
+        self._fail: bool = fail
+        self.stopped: threading.Event = threading.Event()
+
+    def pre_launch(self) -> bool:
+        return not self._fail
+
+    def launch(self) -> bool:
+        self.stopped.wait()
+        return True
+
+    def shutdown(self) -> None:
+        self.stopped.set()
+
+
+class Test_DependencyLaunch(unittest.TestCase):
+
+    def test_no_global_barriers(self) -> None:
+
+        slow: Napper = Napper("slow", nap=0.3)
+        fast: Napper = Napper("fast")
+        dependent: Napper = Napper("dependent", nap=0.1)
+
+        report: LaunchReport = launch_by_dependencies(
+            launchables=[slow, fast, dependent],
+            depends_on=[[], [], [after_ready("slow")]])
+        self.assertTrue(report.ok)
+        slow_times, fast_times, dependent_times = report.timelines
+
+        # Nobody waited on slow's pre_launch, so fast was done before it was...
+        self.assertLess(fast_times.phases["POSTLAUNCH"][1], slow_times.ready)
+        # ...except for dependent, which did.
+        self.assertGreaterEqual(dependent_times.phases["PRELAUNCH"][0], slow_times.ready)
+
+        self.assertEqual(report.time_to_ready(), dependent_times.ready)
+        path: list[str] = report.critical_path()
+        self.assertEqual(len(path), 3)
+        self.assertIn("<slow> pre-launched", path[0])
+        self.assertIn("<dependent> waited for <ready: slow>", path[1])
+        self.assertIn("<dependent> pre-launched", path[2])
+
+    def test_undeclared_keep_the_barrier(self) -> None:
+
+        # No dependencies given means the old behavior: nobody launches until
+        # everybody's pre-launched.
+        report: LaunchReport = launch_by_dependencies(
+            launchables=[Napper("slow", nap=0.2), Napper("fast")])
+        self.assertTrue(report.ok)
+        self.assertGreaterEqual(report.timelines[1].phases["LAUNCH"][0], report.timelines[0].ready)
+
+    def test_failure_shuts_down_whoever_started(self) -> None:
+
+        running: Runner = Runner("running")
+        failing: Runner = Runner("failing", fail=True)
+        never: Runner = Runner("never")
+
+        reports: list[LaunchReport] = []
+        launcher: threading.Thread = threading.Thread(target=lambda: reports.append(launch_by_dependencies(
+            launchables=[running, failing, never],
+            depends_on=[[], [after_ready("running")], [after_ready("failing")]])), daemon=True)
+        launcher.start()
+        launcher.join(timeout=5.0)
+
+        # running was already in launch() when failing failed, so it had to be told to stop...
+        self.assertFalse(launcher.is_alive(), "Launch hung after a failure.")
+        self.assertFalse(reports[0].ok)
+        self.assertEqual(reports[0].timelines[1].failed, "PRELAUNCH")
+        self.assertTrue(running.stopped.is_set())
+        # ...but never never started anything.
+        self.assertFalse(never.stopped.is_set())
+        self.assertEqual(reports[0].timelines[2].phases, {})
+
+    def test_bad_dependencies(self) -> None:
+
+        with self.assertRaises(LaunchError):
+            launch_by_dependencies(
+                launchables=[Napper("a"), Napper("b")],
+                depends_on=[[after_ready("b")], [after_ready("a")]])
+        with self.assertRaises(LaunchError):
+            launch_by_dependencies(launchables=[Napper("a")], depends_on=[[after_ready("nobody")]])
+
+
+class Gathering(Launchable):
+    """
+    Doesn't finish launching until everybody else has started.
+    """
+
+    def __init__(self, name: str, everybody: threading.Barrier) -> None:
+        self._name: str = name
+        self._everybody: threading.Barrier = everybody
+
+    def launch(self) -> bool:
+        try:
+            self._everybody.wait()
+        except threading.BrokenBarrierError:
+            return False
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+
+class Test_ManyLaunchables(unittest.TestCase):
+
+    # More than a ThreadPoolExecutor would give us, on anything short of 60 CPUs.
+    COUNT: int = 64
+
+    def gathering(self) -> list[Gathering]:
+        everybody: threading.Barrier = threading.Barrier(self.COUNT, timeout=10.0)
+        return [Gathering(f"gathering_{i}", everybody) for i in range(self.COUNT)]
+
+    def test_by_dependencies(self) -> None:
+        self.assertTrue(launch_by_dependencies(launchables=self.gathering()).ok)
+
+    def test_phase_by_phase(self) -> None:
+        self.assertIsNot(launch_phase_by_phase(launchables=self.gathering()), False)
+
+
+if __name__ == '__main__':
+    unittest.main()
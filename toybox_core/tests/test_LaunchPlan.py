@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+import toybox_core.launch
+from toybox_core.launch import LaunchRecipe
+from toybox_core.launch_plan import PlanCache, plan_key, plan_launch_file
+
+
+NODES_PY: str = '''
+from toybox_core.launchable import Launchable
+
+class Sleepy(Launchable):
+    def __init__(self, name: str, rate: float = 1.0) -> None:
+        self._name = name
+        self.rate = rate
+'''
+
+# Each launch file writes down every time it's run, so we can tell when it wasn't.
+OUTER_LAUNCH_PY: str = '''
+import pathlib
+
+from toybox_core.launch import LaunchDescription, LaunchType, NodeParam, \\
+    get_launch_descs_from_file, get_launch_params_from_file
+from tbx_plan_test.nodes import Sleepy
+
+HERE: pathlib.Path = pathlib.Path(__file__).parent
+with open(HERE.parent / "executions", "a") as file:
+    file.write("outer\\n")
+
+def get_launch_params() -> list[NodeParam]:
+    return [NodeParam(name="rate", type=str, value="2.0", required=False)]
+
+def get_launch_descriptions(launch_params: dict[str,NodeParam]) -> LaunchDescription:
+
+    outer: LaunchDescription = LaunchDescription(name="outer", params={
+        "name": NodeParam(name="name", type=str, value="outer"),
+        "rate": NodeParam(name="rate", type=float, value=float(launch_params["rate"].value)),
+    })
+    outer.to_launch = [Sleepy]
+
+    inner_file: pathlib.Path = HERE / "inner.launch.py"
+    inner: LaunchDescription = get_launch_descs_from_file(
+        launch_file_path=inner_file,
+        launch_params=get_launch_params_from_file(inner_file))
+
+    everything: LaunchDescription = LaunchDescription(
+        name="everything", launch_type=LaunchType.GROUP, group="sleepers", cpus=[0])
+    everything.to_launch = [outer, inner]
+    return everything
+'''
+
+INNER_LAUNCH_PY: str = '''
+import pathlib
+
+from toybox_core.launch import LaunchDescription, NodeParam
+from tbx_plan_test.nodes import Sleepy
+
+with open(pathlib.Path(__file__).parent.parent / "executions", "a") as file:
+    file.write("inner\\n")
+
+def get_launch_params() -> list[NodeParam]:
+    return []
+
+def get_launch_descriptions(launch_params: dict[str,NodeParam]) -> list[LaunchDescription]:
+    inner: LaunchDescription = LaunchDescription(name="inner", params={
+        "name": NodeParam(name="name", type=str, value="inner"),
+    })
+    inner.to_launch = [Sleepy]
+    return [inner]
+'''
+
+PYPROJECT_TOML: str = '''
+[project]
+name = "tbx_plan_test"
+
+[tool.toybox]
+launch-files = ["launch"]
+'''
+
+
+class Test_LaunchPlan(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.root: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        root: pathlib.Path = pathlib.Path(self.root.name)
+
+        (root / "tbx_plan_test").mkdir()
+        (root / "tbx_plan_test" / "__init__.py").write_text("")
+        (root / "tbx_plan_test" / "nodes.py").write_text(NODES_PY)
+        (root / "launch").mkdir()
+        (root / "launch" / "outer.launch.py").write_text(OUTER_LAUNCH_PY)
+        self.inner: pathlib.Path = root / "launch" / "inner.launch.py"
+        self.inner.write_text(INNER_LAUNCH_PY)
+        (root / "pyproject.toml").write_text(PYPROJECT_TOML)
+        self.executions: pathlib.Path = root / "executions"
+
+        sys.path.insert(0, self.root.name)
+        self.cache: PlanCache = PlanCache(root / "plans")
+
+    def tearDown(self) -> None:
+        sys.path.remove(self.root.name)
+        for name in [name for name in sys.modules if name.startswith("tbx_plan_test")]:
+            del sys.modules[name]
+        self.root.cleanup()
+
+    def launch(self, **args) -> list[LaunchRecipe]:
+        # As if it were a fresh tbx-launch.
+        toybox_core.launch._launch_files.clear()
+        return plan_launch_file("tbx_plan_test", "outer.launch.py", args=args, cache=self.cache)
+
+    def executed(self) -> list[str]:
+        return self.executions.read_text().split() if self.executions.exists() else []
+
+    def test_relaunch_from_plan(self) -> None:
+
+        compiled: list[LaunchRecipe] = self.launch(rate="3.0")
+        # Params and descriptions both come from each file, but each only ran once.
+        self.assertEqual(self.executed(), ["outer", "inner"])
+        self.assertEqual([recipe.kwargs for recipe in compiled], [
+            {"name": "outer", "rate": 3.0},
+            {"name": "inner"},
+        ])
+        self.assertEqual({recipe.group for recipe in compiled}, {"sleepers"})
+        self.assertTrue((self.cache.directory / f"{plan_key('tbx_plan_test', 'outer.launch.py', {'rate': '3.0'})}.json").exists())
+
+        planned: list[LaunchRecipe] = self.launch(rate="3.0")
+        self.assertEqual(self.executed(), ["outer", "inner"])
+        self.assertEqual(planned, compiled)
+        self.assertEqual(planned[0].build().rate, 3.0)
+
+        # Different arguments, different plan.
+        self.launch(rate="4.0")
+        self.assertEqual(self.executed(), ["outer", "inner"] * 2)
+
+    def test_changed_files_recompile(self) -> None:
+
+        self.launch()
+        self.launch()
+        self.assertEqual(self.executed(), ["outer", "inner"])
+
+        # Somebody edits a nested launch file.
+        self.inner.write_text(INNER_LAUNCH_PY.replace('value="inner"', 'value="renamed"'))
+        stat: os.stat_result = self.inner.stat()
+        os.utime(self.inner, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        recipes: list[LaunchRecipe] = self.launch()
+        self.assertEqual(self.executed(), ["outer", "inner"] * 2)
+        self.assertEqual(recipes[1].kwargs, {"name": "renamed"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import tempfile
+import threading
+from typing import Any
+import unittest
+
+from toybox_core.local_discovery import LocalDiscovery
+from toybox_core.node import Node
+import toybox_msgs.core.Node_pb2 as Node_pb2
+from toybox_msgs.core.Node_pb2_grpc import NodeServicer
+
+from tbx_testing import wait_for
+
+
+class RecordingServicer(NodeServicer):
+
+    def __init__(self) -> None:
+        self.found: list[str] = []
+        self.lost: list[str] = []
+
+    def InformOfPublisher(self, request: Node_pb2.TopicPublisherInfo, context) -> Node_pb2.InformConfirmation:
+        self.found.append(request.publisher.publisher_id)
+        return Node_pb2.InformConfirmation(return_code=0)
+
+    def InformOfPublisherLost(self, request: Node_pb2.TopicPublisherInfo, context) -> Node_pb2.InformConfirmation:
+        self.lost.append(request.publisher.publisher_id)
+        return Node_pb2.InformConfirmation(return_code=0)
+
+
+class Test_LocalDiscovery(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.path: str = os.path.join(self.tmp.name, "registry")
+        self.discovery: LocalDiscovery = LocalDiscovery(path=self.path)
+
+    def tearDown(self) -> None:
+        self.discovery.detach("sub")
+        self.discovery.close()
+        self.tmp.cleanup()
+
+    def test_same_rules_as_server(self) -> None:
+
+        self.assertTrue(self.discovery.register("a", "localhost", 1))
+        self.assertFalse(self.discovery.register("a", "localhost", 1))
+
+        self.assertTrue(self.discovery.advertise("a", "localhost", 2, "/t", "core.TestMessage"))
+        self.assertFalse(self.discovery.advertise("a", "localhost", 2, "/t", "core.TestMessage"))
+        self.assertEqual(self.discovery.subscribe("b", "/t", "wrong.Type"), [])
+        self.assertEqual(self.discovery.subscribe("b", "/t", "core.TestMessage"), [("a", "localhost", 2)])
+
+        # Another process sees the same registry.
+        other: LocalDiscovery = LocalDiscovery(path=self.path)
+        self.assertEqual(other.registry.generation, self.discovery.registry.generation)
+        self.assertIn("a", other.registry.read()[1]["clients"])
+        other.registry.close()
+
+    def test_dead_clients_are_ignored(self) -> None:
+
+        dead: subprocess.Popen = subprocess.Popen(["true"])
+        dead.wait()
+
+        with self.discovery.registry.update() as registry:
+            registry["clients"]["ghost"] = {"host": "localhost", "port": 1, "data_port": 2, "pid": dead.pid}
+            registry["topics"]["/ghost"] = {
+                "message_type": "core.TestMessage", "publishers": {"ghost": ["localhost", 3]}, "subscribers": []}
+
+        _, registry = self.discovery.registry.read()
+        self.assertNotIn("ghost", registry["clients"])
+        self.assertNotIn("/ghost", registry["topics"])
+
+    def test_threads_dont_lose_updates(self) -> None:
+
+        # Nodes in one process share one registry (and one file descriptor).
+        def increment() -> None:
+            for _ in range(50):
+                with self.discovery.registry.update() as registry:
+                    registry["services"]["count"] = registry["services"].get("count", 0) + 1
+
+        threads: list[threading.Thread] = [threading.Thread(target=increment) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.discovery.registry.read()[1]["services"]["count"], 400)
+
+    def test_subscribers_are_informed(self) -> None:
+
+        servicer: RecordingServicer = RecordingServicer()
+        self.discovery.register("sub", "localhost", 1)
+        self.discovery.subscribe("sub", "/t", "core.TestMessage")
+        self.discovery.attach("sub", servicer=servicer)
+
+        self.discovery.register("pub", "localhost", 2)
+        self.discovery.advertise("pub", "localhost", 3, "/t", "core.TestMessage")
+        self.assertTrue(wait_for(lambda: servicer.found == ["pub"]))
+
+        self.discovery.deregister("pub")
+        self.assertTrue(wait_for(lambda: servicer.lost == ["pub"]))
+
+    def test_params(self) -> None:
+
+        # Served from the registry file, with no tbx-server to wait for.
+        node: Node = Node("param_node", autostart=False, discovery=self.discovery)
+        self.assertEqual(node.get_param("/rate", 10), 10)
+
+        seen: list[Any] = []
+        node.on_param_change("/rate", lambda name, value: seen.append(value))
+
+        self.assertTrue(node.set_param("/rate", 30))
+        self.assertEqual(node.get_param("/rate"), 30)
+        self.assertFalse(node.set_param("/rate", "fast"))
+
+        # Another process sets it.
+        other: LocalDiscovery = LocalDiscovery(path=self.path)
+        self.assertTrue(other.set_param("/rate", 60))
+        self.assertTrue(other.set_param("/key", b"\x00\xff"))
+        self.assertTrue(wait_for(lambda: node.get_param("/rate") == 60))
+        self.assertEqual(seen, [30, 60])
+        self.assertEqual(other.param_cache().params(), {"/rate": 60, "/key": b"\x00\xff"})
+        other.close()
+
+        node.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from toybox_core.rpc.metrics import LATENCY_BOUNDS, RpcMetrics, get_metrics_rpc, percentile
+from toybox_core.rpc.register import register_client_rpc
+from toybox_core.rpc.topic import subscribe_topic_rpc
+from toybox_msgs.core.Metrics_pb2 import MetricsSnapshot, RpcStats
+from toybox_msgs.core.Test_pb2 import TestMessage
+
+from tbx_testing import ServerTestCase
+
+
+class Test_RpcMetrics(unittest.TestCase):
+
+    def test_histogram(self) -> None:
+
+        metrics: RpcMetrics = RpcMetrics()
+        for _ in range(99):
+            metrics.record("/a", latency=0.0002)
+        metrics.record("/a", latency=0.2, error=True)
+        metrics.record("/b", latency=60.0)
+        metrics.record("/c")
+
+        a, b, c = metrics.to_msgs()
+        self.assertEqual((a.method, a.calls, a.errors), ("/a", 100, 1))
+        self.assertEqual(percentile(a, list(LATENCY_BOUNDS), 0.5), 0.00025)
+        self.assertEqual(percentile(a, list(LATENCY_BOUNDS), 1.0), 0.25)
+        self.assertEqual(percentile(b, list(LATENCY_BOUNDS), 0.5), float("inf"))
+        self.assertIsNone(percentile(c, list(LATENCY_BOUNDS), 0.5))
+
+
+class Test_MetricsServicer(ServerTestCase):
+
+    PORT: int = 50510
+
+    def test_get_metrics(self) -> None:
+
+        self.assertTrue(register_client_rpc(name="a", host="localhost", port=1))
+        self.assertFalse(register_client_rpc(name="a", host="localhost", port=1))
+        subscribe_topic_rpc(subscriber_id="a", topic_name="/t", message_type=TestMessage.DESCRIPTOR.full_name)
+
+        snapshot: MetricsSnapshot | None = get_metrics_rpc(include_graph=True)
+        self.assertIsNotNone(snapshot)
+        self.assertEqual((snapshot.client_count, snapshot.topic_count), (1, 1))
+        self.assertEqual([topic.topic_def.topic_name for topic in snapshot.graph], ["/t"])
+
+        rpcs: dict[str,RpcStats] = {rpc.method: rpc for rpc in snapshot.rpcs}
+        self.assertEqual(rpcs["/core.Register/RegisterClient"].calls, 2)
+        self.assertEqual(sum(rpcs["/core.Register/RegisterClient"].latency_counts), 2)
+        self.assertEqual(rpcs["/core.Topic/SubscribeTopic"].calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
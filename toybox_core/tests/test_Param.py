@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+from typing import Any
+import unittest
+
+from toybox_core.node import Node
+from toybox_core.rpc.param import (
+    ParamCache,
+    ParamStore,
+    delete_param_rpc,
+    get_params_rpc,
+    set_param_rpc,
+    to_param_value,
+)
+from toybox_msgs.core.Param_pb2 import ParamEvent
+
+from tbx_testing import ServerTestCase
+
+
+class Test_ParamStore(unittest.TestCase):
+
+    def test_changes(self) -> None:
+
+        store: ParamStore = ParamStore(max_events=2)
+
+        self.assertTrue(store.set("/gain", to_param_value(1.5)))
+        self.assertTrue(store.set("/gain", to_param_value(1.5)))
+        self.assertEqual(store.generation, 1, "Setting the same value again isn't a change.")
+        self.assertFalse(store.set("/gain", to_param_value("high")))
+
+        store.set("/name", to_param_value("robot"))
+        store.delete("/name")
+        self.assertEqual([event.kind for event in store.since(1)], [ParamEvent.SET, ParamEvent.DELETED])
+
+        # Too far behind to catch up, so start over.
+        events: list[ParamEvent] = store.events_since(0, prefix="/g")
+        self.assertEqual(
+            [event.kind for event in events],
+            [ParamEvent.RESET, ParamEvent.SET, ParamEvent.SNAPSHOT_END])
+        self.assertEqual(events[1].param.value.double_value, 1.5)
+
+
+class Test_Params(ServerTestCase):
+
+    PORT: int = 50513
+
+    def test_cache_follows_server(self) -> None:
+
+        set_param_rpc("/controller/kp", 2.0)
+
+        cache: ParamCache = ParamCache(prefix="/controller")
+        changes: list[tuple[str,Any]] = []
+        cache.add_listener("/controller/k", lambda name, value: changes.append((name, value)))
+        self.assertTrue(cache.start(timeout=2.0))
+        self.assertEqual(cache.get("/controller/kp"), 2.0)
+
+        set_param_rpc("/controller/kd", 0.1)
+        set_param_rpc("/elsewhere", True)
+        delete_param_rpc("/controller/kp")
+        self.assertTrue(self.wait_for(lambda: cache.get("/controller/kp") is None))
+
+        self.assertEqual(cache.params(), {"/controller/kd": 0.1})
+        self.assertEqual(changes, [("/controller/kp", 2.0), ("/controller/kd", 0.1), ("/controller/kp", None)])
+        self.assertEqual(get_params_rpc(), {"/controller/kd": 0.1, "/elsewhere": True})
+        cache.stop()
+
+    def test_node_params(self) -> None:
+
+        node: Node = Node("param_node")
+        self.assertEqual(node.get_param("/rate", 10), 10)
+
+        seen: list[Any] = []
+        node.on_param_change("/rate", lambda name, value: seen.append(value))
+
+        self.assertTrue(node.set_param("/rate", 30))
+        self.assertEqual(node.get_param("/rate"), 30)
+        self.assertFalse(node.set_param("/rate", "fast"))
+
+        self.tbx._params.set("/rate", to_param_value(60))
+        self.assertTrue(self.wait_for(lambda: node.get_param("/rate") == 60))
+        self.assertEqual(seen, [30, 60])
+
+        node.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
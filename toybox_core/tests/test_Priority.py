@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import socket
+import statistics
+import time
+import unittest
+
+from toybox_core.connection import BULK_BACKLOG, Priority, Publisher, Subscriber, get_available_port
+import toybox_core.protocol
+from toybox_core.reactor import Reactor
+from toybox_msgs.core.Topic_pb2 import SubscriberOptions
+from toybox_msgs.primitive.Vector_pb2 import Vector3
+from toybox_msgs.state.Velocity_pb2 import Velocity
+
+
+class Test_Priority(unittest.TestCase):
+
+    def test_reactor_order(self) -> None:
+
+        steps: dict[str, object] = {}
+        reactor: Reactor = Reactor()
+        for name, priority in [("bulk", Priority.BULK), ("normal", Priority.NORMAL),
+                               ("bulk2", Priority.BULK), ("control", Priority.CONTROL)]:
+            steps[name] = lambda: True
+            reactor.add(steps[name], priority=priority)
+
+        names: dict[int, str] = {id(step): name for name, step in steps.items()}
+        self.assertEqual([names[id(step)] for step in reactor._steps], ["control", "normal", "bulk", "bulk2"])
+        reactor.stop()
+
+    def test_control_under_bulk_load(self) -> None:
+
+        reactor: Reactor = Reactor()
+
+        # A bulk topic, with a subscriber that never reads anything...
+        bulk: Publisher = Publisher(
+            topic_name="/scan", message_type=Velocity, host="localhost",
+            port=get_available_port(start=50750), reactor=reactor, priority=Priority.BULK)
+        stalled: socket.socket = socket.create_connection(("localhost", bulk.port))
+        stalled.sendall(toybox_core.protocol.pack_message(SubscriberOptions()))
+        while not bulk._subscribers:
+            time.sleep(0.01)
+
+        # ...and a control topic, on the same reactor.
+        received: list[float] = []
+        control: Publisher = Publisher(
+            topic_name="/cmd_vel", message_type=Velocity, host="localhost",
+            port=get_available_port(start=50755), reactor=reactor, priority=Priority.CONTROL)
+        subscriber: Subscriber = Subscriber(
+            topic_name="/cmd_vel", message_type=Velocity, host="localhost",
+            port=get_available_port(start=50760),
+            publisher_info=("control", "localhost", control.port),
+            callback=lambda _: received.append(time.perf_counter()),
+            reactor=reactor, priority=Priority.CONTROL)
+        while not control._subscribers:
+            time.sleep(0.01)
+
+        scan: Velocity = Velocity()
+        scan.header.frame_id = "x" * 60_000
+        latencies: list[float] = []
+        for _ in range(50):
+            for _ in range(10):
+                bulk.publish(scan)
+            sent: float = time.perf_counter()
+            control.publish(Velocity(linear=Vector3(x=1.0)))
+            deadline: float = time.monotonic() + 1.0
+            while len(received) <= len(latencies) and time.monotonic() < deadline:
+                time.sleep(0.0005)
+            self.assertGreater(len(received), len(latencies))
+            latencies.append(received[-1] - sent)
+
+        # Commands get through promptly, however much scan is stuck behind the stalled subscriber...
+        self.assertLess(statistics.median(latencies), 0.005)
+        # ...which only has so much queued up for it.
+        self.assertLessEqual(len(bulk._subscribers[0].unsent), BULK_BACKLOG + 61_000)
+
+        subscriber.trigger_shutdown()
+        control.trigger_shutdown()
+        bulk.trigger_shutdown()
+        stalled.close()
+        reactor.stop()
+
+    def test_idle_control_subscriber(self) -> None:
+
+        # No publisher yet, and none lost, so there's nothing to do but wait.
+        subscriber: Subscriber = Subscriber(
+            topic_name="/cmd_vel", message_type=Velocity, host="localhost",
+            port=get_available_port(start=50765), priority=Priority.CONTROL)
+
+        cpu: float = time.process_time()
+        time.sleep(0.5)
+        subscriber.trigger_shutdown()
+        self.assertLess(time.process_time() - cpu, 0.1)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
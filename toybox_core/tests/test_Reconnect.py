@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import socket
+import time
+import unittest
+
+from google.protobuf.message import Message
+
+from toybox_core.connection import HEARTBEAT_TIMEOUT, Publisher, Subscriber, get_available_port
+from toybox_msgs.primitive.Vector_pb2 import Vector3
+from toybox_msgs.state.Velocity_pb2 import Velocity
+
+
+def wait_for(condition, timeout: float) -> float | None:
+    """
+    How long it took `condition` to come true, or None if it didn't.
+    """
+    start: float = time.monotonic()
+    while time.monotonic() - start < timeout:
+        if condition():
+            return time.monotonic() - start
+        time.sleep(0.01)
+    return None
+
+
+class Test_Reconnect(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.publishers: list[Publisher] = []
+        self.subscriber: Subscriber | None = None
+        self.received: list[Message] = []
+        # Where the tbx-server would say the topic's publishers are.
+        self.registry: list[tuple[str,str,int]] = []
+
+    def tearDown(self) -> None:
+        if self.subscriber is not None:
+            self.subscriber.trigger_shutdown()
+        for publisher in self.publishers:
+            publisher.trigger_shutdown()
+
+    def publisher(self, start: int = 50720) -> Publisher:
+        publisher: Publisher = Publisher(
+            topic_name="/velocity", message_type=Velocity, host="localhost",
+            port=get_available_port(start=start))
+        self.publishers.append(publisher)
+        self.registry = [("talker", "localhost", publisher.port)]
+        return publisher
+
+    def subscribe(self, publisher_info: tuple[str,str,int]) -> Subscriber:
+        self.subscriber = Subscriber(
+            topic_name="/velocity", message_type=Velocity, host="localhost",
+            port=get_available_port(start=50730),
+            publisher_info=publisher_info,
+            callback=self.received.append,
+            resolver=lambda: self.registry)
+        return self.subscriber
+
+    def publish_until_received(self, publisher: Publisher, timeout: float) -> float | None:
+        self.received.clear()
+        return wait_for(
+            lambda: publisher.publish(Velocity(linear=Vector3(x=1.0))) or len(self.received) > 0,
+            timeout=timeout)
+
+    def test_restarted_publisher(self) -> None:
+
+        publisher: Publisher = self.publisher()
+        subscriber: Subscriber = self.subscribe(self.registry[0])
+        self.assertIsNotNone(self.publish_until_received(publisher, timeout=2.0))
+
+        # Our publisher goes away: we hear about it from the socket, not from anyone else...
+        publisher.trigger_shutdown()
+        self.assertIsNotNone(wait_for(lambda: subscriber.publisher is None, timeout=0.5))
+
+        # ...and it comes back somewhere else, which only the registry knows about.
+        restarted: Publisher = self.publisher(start=50725)
+        recovered: float | None = self.publish_until_received(restarted, timeout=2.0)
+        self.assertIsNotNone(recovered)
+        self.assertLess(recovered, 1.0)
+        self.assertEqual(subscriber.publisher, self.registry[0])
+
+    def test_heartbeats(self) -> None:
+
+        # A publisher with nothing to say keeps its subscribers...
+        publisher: Publisher = self.publisher()
+        subscriber: Subscriber = self.subscribe(self.registry[0])
+        time.sleep(HEARTBEAT_TIMEOUT * 1.5)
+        self.assertEqual(subscriber.publisher, self.registry[0])
+        subscriber.trigger_shutdown()
+
+        # ...but one that's hung (its socket is open, but nobody's home) doesn't.
+        hung: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        hung.bind(("localhost", get_available_port(start=50740)))
+        hung.listen()
+        self.registry = []
+
+        subscriber = self.subscribe(("hung", "localhost", hung.getsockname()[1]))
+        self.assertEqual(subscriber.publisher[0], "hung")
+        conn, _ = hung.accept()
+        hung.close()
+        self.assertIsNotNone(wait_for(lambda: subscriber.publisher is None, timeout=HEARTBEAT_TIMEOUT * 2))
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
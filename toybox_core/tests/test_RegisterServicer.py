@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+from concurrent import futures
+import grpc
+from queue import Queue
+import time
+import unittest
+
+from toybox_core.client import Client
+from toybox_core.rpc.register import RegisterServicer
+from toybox_core.rpc.topic import TopicRPCServicer
+from toybox_core.server import ToyboxServer
+from toybox_core.topic import Topic
+import toybox_msgs.core.Register_pb2 as Register_pb2
+from toybox_msgs.core.Test_pb2 import TestMessage
+from toybox_msgs.core.Register_pb2_grpc import add_RegisterServicer_to_server, RegisterStub
+
+
+class Test_RegisterServicer_Leases(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        self.port: int = 50505
+        self.host: str = "localhost"
+
+        self.clients: dict[str,Client] = {}
+        self.topics: dict[str,Topic] = {}
+        self.lease_duration: float = 2.0
+
+        self.topic_servicer: TopicRPCServicer = TopicRPCServicer(
+            topics=self.topics,
+            clients=self.clients,
+            announcements=Queue())
+        self.servicer: RegisterServicer = RegisterServicer(
+            clients=self.clients,
+            topics=self.topics,
+            lease_duration=self.lease_duration,
+            topic_servicer=self.topic_servicer)
+        add_RegisterServicer_to_server(servicer=self.servicer, server=self.server)
+        self.server.add_insecure_port(f'{self.host}:{self.port}')
+        self.server.start()
+
+        self.channel: grpc.Channel = grpc.insecure_channel(f'{self.host}:{self.port}')
+        self.stub: RegisterStub = RegisterStub(self.channel)
+
+    def tearDown(self) -> None:
+        self.channel.close()
+        self.server.stop(None)
+
+    def register(self, client_id: str) -> Register_pb2.RegisterResponse:
+        req: Register_pb2.RegisterRequest = Register_pb2.RegisterRequest(client_id=client_id)
+        req.meta.addr = self.host
+        req.meta.port = self.port + 1
+        return self.stub.RegisterClient(req)
+
+    def test_register_grants_lease(self) -> None:
+
+        response: Register_pb2.RegisterResponse = self.register("test")
+        self.assertEqual(response.return_code, 0)
+        self.assertEqual(response.lease_duration, self.lease_duration)
+        self.assertFalse(self.clients["test"].lease_expired())
+
+    def test_heartbeat_renews_lease(self) -> None:
+
+        self.register("test")
+        client: Client = self.clients["test"]
+        first_expiry: float = client.lease_expiry
+
+        time.sleep(0.05)
+        requests = iter([Register_pb2.HeartbeatRequest(client_ids=["test", "unknown"])])
+        responses: list[Register_pb2.HeartbeatResponse] = list(self.stub.Heartbeat(requests))
+
+        self.assertEqual(len(responses), 1)
+        self.assertGreater(client.lease_expiry, first_expiry)
+        self.assertEqual(list(responses[0].unknown_client_ids), ["unknown"])
+
+    def test_declare_node(self) -> None:
+
+        # Someone's already publishing the topic we want to subscribe to.
+        self.topics["/in"] = Topic(
+            name="/in", 
+            message_type=TestMessage.DESCRIPTOR.full_name, 
+            publishers={"other": (self.host, 1234)})
+
+        req: Register_pb2.DeclareNodeRequest = Register_pb2.DeclareNodeRequest()
+        req.registration.client_id = "test"
+        req.registration.meta.addr = self.host
+        req.registration.meta.port = self.port + 1
+
+        advertisement = req.advertisements.add()
+        advertisement.publisher.publisher_id = "test"
+        advertisement.publisher.publisher_host = self.host
+        advertisement.publisher.topic_port = 4321
+        advertisement.topic_def.topic_name = "/out"
+        advertisement.topic_def.message_type = TestMessage.DESCRIPTOR.full_name
+
+        subscription = req.subscriptions.add()
+        subscription.subscriber_id = "test"
+        subscription.topic_def.topic_name = "/in"
+        subscription.topic_def.message_type = TestMessage.DESCRIPTOR.full_name
+
+        response: Register_pb2.DeclareNodeResponse = self.stub.DeclareNode(req)
+        self.assertEqual(response.registration.return_code, 0)
+        self.assertIn("test", self.clients)
+
+        self.assertEqual(len(response.advertisements), 1)
+        self.assertEqual(response.advertisements[0].return_code, 0)
+        self.assertEqual(self.topics["/out"].publishers["test"], (self.host, 4321))
+
+        self.assertEqual(len(response.subscriptions), 1)
+        self.assertEqual(
+            [pub.publisher_id for pub in response.subscriptions[0].publisher_list], ["other"])
+        self.assertIn("test", self.topics["/in"].subscribers)
+
+        # Declaring the same node twice fails at registration, and touches nothing else.
+        response = self.stub.DeclareNode(req)
+        self.assertNotEqual(response.registration.return_code, 0)
+        self.assertEqual(len(response.advertisements), 0)
+
+
+class Test_ToyboxServer_LeaseExpiry(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tbx: ToyboxServer = ToyboxServer(port=50506, lease_duration=0.0)
+
+    def tearDown(self) -> None:
+        self.tbx.shutdown(notify_clients=False)
+
+    def add_client(self, client_id: str) -> Client:
+        client: Client = Client(client_id=client_id, addr="localhost", rpc_port=1, data_port=2)
+        client.initialize()
+        self.tbx._clients[client_id] = client
+        return client
+
+    def test_expired_clients_are_removed_in_bulk(self) -> None:
+
+        dead: Client = self.add_client("dead")
+        alive: Client = self.add_client("alive")
+        alive.renew_lease(60.0)
+
+        self.tbx._topics["/orphaned"] = Topic(
+            name="/orphaned", message_type="test", publishers={"dead": ("localhost", 3)})
+        self.tbx._topics["/shared"] = Topic(
+            name="/shared", message_type="test",
+            publishers={"alive": ("localhost", 4)}, subscribers=["dead", "alive"])
+
+        dead.lease_expiry = time.monotonic() - 1.0
+        self.tbx._last_lease_check = 0.0
+        self.tbx._expire_stale_clients()
+
+        self.assertNotIn("dead", self.tbx._clients)
+        self.assertIn("alive", self.tbx._clients)
+        self.assertNotIn("/orphaned", self.tbx._topics)
+        self.assertEqual(self.tbx._topics["/shared"].subscribers, ["alive"])
+
+    def test_lost_publishers_reported(self) -> None:
+
+        self.add_client("pub")
+        self.add_client("sub").renew_lease(60.0)
+        self.tbx._topics["/test"] = Topic(
+            name="/test", message_type="test",
+            publishers={"pub": ("localhost", 3)}, subscribers=["sub"])
+
+        lost: dict[str,list[str]] = self.tbx.deregister_clients(["pub"])
+        self.assertEqual(lost, {"/test": ["pub"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+from queue import Queue
+import unittest
+
+from toybox_core.client import Client
+from toybox_core.registry import RegistryEvents, paginate, snapshot
+import toybox_core.rpc.cache as cache
+from toybox_core.discovery import ServerDiscovery
+from toybox_core.rpc.cache import DiscoveryCache, get_discovery_cache, synced_discovery_cache
+from toybox_core.rpc.metrics import get_metrics_rpc
+from toybox_core.rpc.register import get_registered_clients_rpc, register_client_rpc
+from toybox_core.rpc.topic import TopicRPCServicer, advertise_topic_rpc, list_topics_rpc
+from toybox_core.topic import Topic
+from toybox_msgs.core.Register_pb2 import RegistryEvent
+from toybox_msgs.core.Test_pb2 import TestMessage
+from toybox_msgs.core.Topic_pb2 import ListTopicsRequest, TopicList
+
+from tbx_testing import ServerTestCase
+
+
+class Test_RegistryEvents(unittest.TestCase):
+
+    def test_since(self) -> None:
+
+        events: RegistryEvents = RegistryEvents(max_events=2)
+        self.assertIsNone(events.since(0))
+
+        events.topic_removed("/a")
+        events.topic_removed("/b")
+        events.topic_removed("/c")
+        self.assertEqual(events.generation, 3)
+
+        self.assertEqual([e.topic.topic_def.topic_name for e in events.since(1)], ["/b", "/c"])
+        self.assertEqual(events.since(3), [])
+        # Too old (fell out of the log), and too new (from some other server).
+        self.assertIsNone(events.since(0))
+        self.assertIsNone(events.since(5))
+
+    def test_snapshot(self) -> None:
+
+        clients: dict[str,Client] = {"a": Client(client_id="a", addr="localhost", rpc_port=1, data_port=2)}
+        topics: dict[str,Topic] = {"/t": Topic(name="/t", message_type="test", subscribers=["a"])}
+
+        kinds: list[int] = [event.kind for event in snapshot(7, clients=clients, topics=topics)]
+        self.assertEqual(kinds, [
+            RegistryEvent.RESET,
+            RegistryEvent.CLIENT_UPDATED,
+            RegistryEvent.TOPIC_UPDATED,
+            RegistryEvent.SNAPSHOT_END])
+
+    def test_paginate(self) -> None:
+
+        names: list[str] = ["a", "b", "c", "d", "e"]
+        self.assertEqual(paginate(names, page_size=2, page_token=""), (["a", "b"], "b"))
+        self.assertEqual(paginate(names, page_size=2, page_token="d"), (["e"], ""))
+        self.assertEqual(paginate(names, page_size=0, page_token="b"), (["c", "d", "e"], ""))
+
+
+class Test_ListTopics(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.events: RegistryEvents = RegistryEvents()
+        self.topics: dict[str,Topic] = {
+            name: Topic(name=name, message_type="test") for name in ["/a/1", "/a/2", "/a/3", "/b/1"]}
+        self.servicer: TopicRPCServicer = TopicRPCServicer(
+            topics=self.topics, clients={}, announcements=Queue(), events=self.events)
+        self.events.topic_removed("/old")
+
+    def test_unchanged(self) -> None:
+
+        response: TopicList = self.servicer.ListTopics(ListTopicsRequest(), None)
+        self.assertEqual(len(response.topics), 4)
+        self.assertEqual(response.generation, 1)
+
+        response = self.servicer.ListTopics(ListTopicsRequest(if_generation_changed=1), None)
+        self.assertTrue(response.unchanged)
+        self.assertEqual(len(response.topics), 0)
+
+    def test_filter_and_pages(self) -> None:
+
+        request: ListTopicsRequest = ListTopicsRequest(prefix="/a/", page_size=2)
+        response: TopicList = self.servicer.ListTopics(request, None)
+        self.assertEqual([t.topic_name for t in response.topics], ["/a/1", "/a/2"])
+
+        request.page_token = response.next_page_token
+        response = self.servicer.ListTopics(request, None)
+        self.assertEqual([t.topic_name for t in response.topics], ["/a/3"])
+        self.assertEqual(response.next_page_token, "")
+
+
+class Test_DiscoveryCache(ServerTestCase):
+
+    PORT: int = 50508
+
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.cache: DiscoveryCache = DiscoveryCache()
+
+    def tearDown(self) -> None:
+        self.cache.stop()
+        if cache._cache is not None:
+            cache._cache.stop()
+            cache._cache = None
+        super().tearDown()
+
+    def test_follows_registry(self) -> None:
+
+        self.assertTrue(register_client_rpc(name="early", host="localhost", port=1))
+        self.assertTrue(self.cache.start(timeout=2.0))
+        self.assertIsNotNone(self.cache.get_client("early"))
+
+        self.assertTrue(register_client_rpc(name="late", host="localhost", port=2))
+        self.assertTrue(advertise_topic_rpc(
+            client_name="late", client_host="localhost", topic_port=3,
+            topic_name="/late", message_type=TestMessage))
+        self.assertTrue(self.wait_for(lambda: self.cache.get_topic("/late") is not None))
+        self.assertEqual(self.cache.get_topic("/late").publishers, {"late": ("localhost", 3)})
+        self.assertEqual(self.cache.generation, self.tbx._events.generation)
+
+        self.tbx.deregister_clients(["late"])
+        self.assertTrue(self.wait_for(lambda: self.cache.get_topic("/late") is None))
+        self.assertEqual([client.client_id for client in self.cache.clients()], ["early"])
+
+    def test_answers_lookups(self) -> None:
+
+        self.assertTrue(register_client_rpc(name="pub", host="localhost", port=1))
+        self.assertTrue(advertise_topic_rpc(
+            client_name="pub", client_host="localhost", topic_port=2,
+            topic_name="/pub", message_type=TestMessage))
+
+        def lookups() -> int:
+            calls: dict[str,int] = {rpc.method: rpc.calls for rpc in get_metrics_rpc().rpcs}
+            return calls.get("/core.Topic/ListTopics", 0) + \
+                calls.get("/core.Register/GetRegisteredClients", 0)
+
+        # Not following the registry yet, so these go to the server (and don't start
+        # following it, either).
+        self.assertEqual([topic.name for topic in list_topics_rpc()], ["/pub"])
+        self.assertEqual(ServerDiscovery().topic_publishers("/pub"), ["pub"])
+        self.assertEqual(ServerDiscovery().topic_publishers("/pu"), [])
+        self.assertEqual(lookups(), 3)
+        self.assertIsNone(synced_discovery_cache())
+
+        self.assertTrue(get_discovery_cache().synced)
+        self.assertEqual([topic.name for topic in list_topics_rpc()], ["/pub"])
+        self.assertEqual([client.client_id for client in get_registered_clients_rpc()], ["pub"])
+        self.assertEqual(ServerDiscovery().topic_publishers("/pub"), ["pub"])
+        self.assertEqual(lookups(), 3)
+
+        # Stopped, it's not trusted any more.
+        get_discovery_cache().stop()
+        self.assertEqual([topic.name for topic in list_topics_rpc()], ["/pub"])
+        self.assertEqual(lookups(), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
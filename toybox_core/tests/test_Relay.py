@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import time
+from typing import Any, Callable
+import unittest
+
+from toybox_core.connection import Publisher
+from toybox_core.node import Node
+from toybox_core.relay import TopicRelay
+from toybox_core.topic import Topic
+from toybox_msgs.primitive.Vector_pb2 import Vector3
+from toybox_msgs.state.Velocity_pb2 import Velocity
+
+from tbx_testing import ServerTestCase
+
+
+class Test_TopicRelay(ServerTestCase):
+
+    PORT: int = 50516
+    SERVER_ARGS: dict[str,Any] = {"fanout_threshold": 1}
+
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.nodes: list[Node] = []
+
+    def tearDown(self) -> None:
+        for node in self.nodes:
+            node.shutdown()
+        super().tearDown()
+
+    def wait_for(self, condition: Callable[[], Any], timeout: float = 3.0) -> bool:
+        return super().wait_for(condition, timeout=timeout)
+
+    def subscriber(self, name: str, received: list[float]) -> Node:
+        node: Node = Node(name)
+        self.nodes.append(node)
+        node.subscribe("/velocity", Velocity, lambda message: received.append(message.linear.x))
+        return node
+
+    def test_fan_out(self) -> None:
+
+        origin: Node = Node("origin")
+        self.nodes.append(origin)
+        publisher: Publisher = origin.advertise("/velocity", Velocity)
+
+        relay: TopicRelay = TopicRelay(name="relay", topic_name="/velocity", message_type="state/Velocity/Velocity")
+        self.assertTrue(relay.pre_launch())
+
+        # The first subscriber gets the publisher (the relay doesn't count), the rest
+        # get the relay.
+        direct: list[float] = []
+        relayed: list[float] = []
+        self.subscriber("direct", direct)
+        self.subscriber("relayed", relayed)
+
+        topic: Topic = self.tbx._topics["/velocity"]
+        self.assertEqual(topic.relayed, {"relayed": "relay"})
+        self.assertTrue(self.wait_for(lambda: len(publisher._subscribers) == 2))
+        self.assertTrue(self.wait_for(lambda: len(relay.publisher._subscribers) == 1))
+
+        for i in range(5):
+            publisher.publish(Velocity(linear=Vector3(x=i)))
+            time.sleep(0.02)
+        self.assertTrue(self.wait_for(lambda: len(relayed) == 5))
+        self.assertEqual(relayed, direct)
+
+        # Without the relay, its subscribers go back to the publisher.
+        relay.shutdown()
+        self.tbx.deregister_client("relay")
+        self.assertEqual(topic.relays, {})
+        self.assertEqual(topic.relayed, {})
+
+        def republished() -> bool:
+            publisher.publish(Velocity(linear=Vector3(x=5)))
+            time.sleep(0.02)
+            return relayed[-1:] == [5.0]
+        self.assertTrue(self.wait_for(republished))
+
+
+if __name__ == '__main__':
+    unittest.main()
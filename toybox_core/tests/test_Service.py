@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import concurrent.futures as futures
+import threading
+import unittest
+
+from toybox_core.node import Node
+from toybox_core.protocol import pack_service_frame, unpack_service_frames
+from toybox_core.service import ServiceError
+from toybox_msgs.core.Null_pb2 import Null
+from toybox_msgs.core.Test_pb2 import TestMessage
+
+from tbx_testing import ServerTestCase
+
+
+class Test_ServiceFraming(unittest.TestCase):
+
+    def test_partial_frames_wait_for_the_rest(self) -> None:
+
+        packed: bytes = pack_service_frame(7, message=TestMessage(test_string="hello")) \
+            + pack_service_frame(8, error="nope")
+
+        buffer: bytearray = bytearray(packed[:-3])
+        frames = unpack_service_frames(buffer)
+        self.assertEqual([frame.correlation_id for frame in frames], [7])
+        self.assertEqual(frames[0].message_type, "core.TestMessage")
+
+        buffer += packed[-3:]
+        frames = unpack_service_frames(buffer)
+        self.assertEqual([frame.correlation_id for frame in frames], [8])
+        self.assertEqual(frames[0].payload, b"nope")
+        self.assertEqual(len(buffer), 0)
+
+
+class Test_Service(ServerTestCase):
+
+    PORT: int = 50512
+
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.provider: Node = Node("provider")
+        self.caller: Node = Node("caller")
+
+    def tearDown(self) -> None:
+        self.caller.shutdown()
+        self.provider.shutdown()
+        super().tearDown()
+
+    def test_call(self) -> None:
+
+        def echo(request: TestMessage) -> TestMessage:
+            if request.test_string == "fail":
+                raise ValueError("asked to fail")
+            return TestMessage(test_string=request.test_string.upper())
+
+        self.assertIsNotNone(self.provider.create_service("echo", TestMessage, TestMessage, echo))
+
+        response: TestMessage = self.caller.call("echo", TestMessage(test_string="hi"), timeout=2.0)
+        self.assertEqual(response.test_string, "HI")
+
+        with self.assertRaisesRegex(ServiceError, "asked to fail"):
+            self.caller.call("echo", TestMessage(test_string="fail"), timeout=2.0)
+        with self.assertRaises(ServiceError):
+            self.caller.call("nobody_home", TestMessage(), timeout=2.0)
+        with self.assertRaises(TypeError):
+            self.caller.call("echo", Null(), timeout=2.0)
+
+    def test_pipelined_calls(self) -> None:
+
+        # The first request is held up until the last one has been handled, so its
+        # response comes back last, on the same connection.
+        last_handled: threading.Event = threading.Event()
+        def handler(request: TestMessage) -> TestMessage:
+            if request.test_string == "0":
+                last_handled.wait(timeout=2.0)
+            elif request.test_string == "4":
+                last_handled.set()
+            return request
+
+        self.provider.create_service("slow", TestMessage, TestMessage, handler)
+
+        calls: list[futures.Future] = [
+            self.caller.call_async("slow", TestMessage(test_string=str(i))) for i in range(5)]
+        responses: list[TestMessage] = [call.result(timeout=2.0) for call in calls]
+
+        self.assertEqual([response.test_string for response in responses], ["0", "1", "2", "3", "4"])
+        self.assertEqual(len(self.caller._service_clients), 1)
+
+    def test_timeout(self) -> None:
+
+        release: threading.Event = threading.Event()
+        def stuck(request: TestMessage) -> TestMessage:
+            release.wait(timeout=2.0)
+            return request
+
+        self.provider.create_service("stuck", TestMessage, TestMessage, stuck)
+        with self.assertRaises(TimeoutError):
+            self.caller.call("stuck", TestMessage(), timeout=0.1)
+        release.set()
+
+        # A late response to the call we gave up on doesn't get mixed up with the next call.
+        self.assertEqual(self.caller.call("stuck", TestMessage(test_string="x"), timeout=2.0).test_string, "x")
+
+    def test_services_go_with_their_provider(self) -> None:
+
+        self.provider.create_service("echo", TestMessage, TestMessage, lambda request: request)
+        self.assertIn("echo", self.tbx._services)
+
+        self.provider.shutdown()
+        self.provider._deregister()
+        self.assertNotIn("echo", self.tbx._services)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+
+# tbx-* entry point module -> (how long its import may take, modules it mustn't load).
+# Import times are in units of a bare interpreter start (`python -c pass`) on the same
+# machine in the same run, so they scale with whatever's running the tests; they're
+# also loose (a few times what they take on a dev machine). The modules are the part
+# that actually catches somebody adding a top-level `import grpc`.
+HEAVY: list[str] = ["grpc", "google.protobuf"]
+CLI_BUDGETS: dict[str,tuple[float,list[str]]] = {
+    "toybox_core": (5, HEAVY),
+    "toybox_core.scripts.topic": (5, HEAVY),
+    "toybox_core.scripts.echo": (5, HEAVY),
+    "toybox_core.scripts.publish": (5, HEAVY),
+    "toybox_core.scripts.info": (20, HEAVY),
+    "toybox_core.scripts.launch": (25, HEAVY),
+    "toybox_core.scripts.build": (25, []),
+    "toybox_core.scripts.server": (25, []),
+    "toybox_core.scripts.bench": (30, []),
+}
+
+# Best of a few, so one slow run on a busy machine doesn't fail anything.
+RUNS: int = 3
+
+IMPORT_SCRIPT: str = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "modules": list(sys.modules)}}))
+"""
+
+
+def cold_import(module: str) -> tuple[float,list[str]]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        tuple[float,list[str]]: how long the import took, and what was loaded by the end of it
+    """
+
+    result: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(module=module)],
+        capture_output=True, text=True, timeout=30, check=True)
+    data: dict = json.loads(result.stdout.strip().splitlines()[-1])
+    return data["seconds"], data["modules"]
+
+
+def bare_start() -> float:
+    """
+    How long a fresh interpreter takes to start up and exit, doing nothing, in seconds.
+    """
+
+    start: float = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], capture_output=True, timeout=30, check=True)
+    return time.perf_counter() - start
+
+
+class Test_Startup(unittest.TestCase):
+
+    def test_cli_import_budgets(self) -> None:
+
+        baseline: float = min(bare_start() for _ in range(RUNS))
+
+        for module, (budget, forbidden) in CLI_BUDGETS.items():
+            with self.subTest(module=module):
+                runs: list[tuple[float,list[str]]] = [cold_import(module) for _ in range(RUNS)]
+                for heavy in forbidden:
+                    self.assertNotIn(heavy, runs[0][1], f"`import {module}` loaded {heavy}")
+                seconds: float = min(run[0] for run in runs)
+                self.assertLess(seconds, budget * baseline,
+                    f"`import {module}` took {seconds:.3f}s, {seconds / baseline:.1f}x a bare " \
+                    f"interpreter start ({baseline:.3f}s); its budget is {budget}x")
+
+    def test_offline_verbs_stay_light(self) -> None:
+
+        # `tbx-info package` only reads the package index, so it shouldn't need grpc
+        # any more than importing it did.
+        with tempfile.TemporaryDirectory() as cache:
+            env: dict[str,str] = dict(os.environ, TBX_INDEX=os.path.join(cache, "index.json"))
+            result: subprocess.CompletedProcess = subprocess.run(
+                [sys.executable, "-c",
+                 "import sys\n"
+                 "from toybox_core.scripts import info\n"
+                 "sys.argv = ['tbx-info', 'package']\n"
+                 "try:\n"
+                 "    info.main()\n"
+                 "finally:\n"
+                 "    print('grpc' in sys.modules)\n"],
+                capture_output=True, text=True, timeout=60, env=env)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
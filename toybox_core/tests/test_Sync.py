@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from google.protobuf.message import Message
+
+from toybox_core.clock import to_timestamp
+from toybox_core.sync import ApproximateTimeSynchronizer, TimeSynchronizer
+from toybox_msgs.core.Test_pb2 import TestMessage
+from toybox_msgs.state.Orientation_pb2 import Orientation2D
+from toybox_msgs.state.Velocity_pb2 import Velocity
+
+
+def velocity(stamp: float) -> Velocity:
+    message: Velocity = Velocity()
+    message.header.stamp.CopyFrom(to_timestamp(stamp))
+    return message
+
+
+def orientation(stamp: float) -> Orientation2D:
+    message: Orientation2D = Orientation2D(theta=stamp)
+    message.header.stamp.CopyFrom(to_timestamp(stamp))
+    return message
+
+
+class Test_TimeSynchronizer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.topics: list[tuple[str,Message]] = [("/velocity", Velocity), ("/orientation", Orientation2D)]
+        self.matched: list[tuple[Velocity,Orientation2D]] = []
+
+    def callback(self, vel: Velocity, orient: Orientation2D) -> None:
+        self.matched.append((vel, orient))
+
+    def test_exact(self) -> None:
+
+        sync: TimeSynchronizer = TimeSynchronizer(self.topics, self.callback, queue_size=3)
+
+        sync.add(0, velocity(1.0))
+        sync.add(0, velocity(2.0))
+        sync.add(1, orientation(1.5))
+        self.assertEqual(self.matched, [])
+
+        # Out of order is fine, as long as it's still buffered.
+        sync.add(1, orientation(1.0))
+        self.assertEqual([orient.theta for _, orient in self.matched], [1.0])
+
+        # Full buffers push out their oldest messages.
+        for stamp in [3.0, 4.0, 5.0, 6.0]:
+            sync.add(0, velocity(stamp))
+        sync.add(1, orientation(2.0))
+        self.assertEqual(len(self.matched), 1)
+        sync.add(1, orientation(6.0))
+        self.assertEqual(len(self.matched), 2)
+        self.assertEqual(sync.stats.matched, 2)
+
+    def test_approximate(self) -> None:
+
+        sync: ApproximateTimeSynchronizer = ApproximateTimeSynchronizer(self.topics, self.callback, slop=0.02)
+
+        for i in range(10):
+            sync.add(0, velocity(i * 0.1))
+            sync.add(1, orientation((i * 0.1) + 0.015))
+        sync.add(1, orientation(5.0))
+
+        self.assertEqual(len(self.matched), 10)
+        for vel, orient in self.matched:
+            self.assertLess(abs(orient.theta - (vel.header.stamp.secs + vel.header.stamp.nanosecs * 1e-9)), 0.02)
+
+        # Nothing within slop of each other.
+        sync.add(0, velocity(5.5))
+        self.assertEqual(len(self.matched), 10)
+
+    def test_needs_header(self) -> None:
+        with self.assertRaises(ValueError):
+            TimeSynchronizer([("/velocity", Velocity), ("/test", TestMessage)], self.callback)
+
+
+if __name__ == '__main__':
+    unittest.main()
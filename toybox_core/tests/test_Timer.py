@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import concurrent.futures as futures
+import threading
+import time
+import unittest
+
+from toybox_core.timer import Rate, Timer, TimerScheduler
+
+
+class Test_TimerScheduler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.executor: futures.ThreadPoolExecutor = futures.ThreadPoolExecutor(max_workers=4)
+        self.scheduler: TimerScheduler = TimerScheduler(self.executor)
+
+    def tearDown(self) -> None:
+        self.scheduler.stop()
+        self.executor.shutdown()
+
+    def test_many_timers_one_thread(self) -> None:
+
+        counts: list[int] = [0] * 50
+        def make_callback(i: int):
+            def callback() -> None:
+                counts[i] += 1
+            return callback
+
+        threads: int = threading.active_count()
+        timers: list[Timer] = [
+            self.scheduler.add(Timer(period=0.02, callback=make_callback(i))) for i in range(50)]
+        time.sleep(0.5)
+        for timer in timers:
+            timer.cancel()
+
+        # One scheduler thread, plus at most the executor's workers.
+        self.assertLessEqual(threading.active_count() - threads, 5)
+        # ~25 calls each; deadlines are absolute, so they shouldn't drift far below that.
+        for count in counts:
+            self.assertGreaterEqual(count, 20)
+            self.assertLessEqual(count, 26)
+
+    def test_overruns(self) -> None:
+
+        slow: Timer = self.scheduler.add(Timer(period=0.01, callback=lambda: time.sleep(0.05)))
+        time.sleep(0.3)
+        slow.cancel()
+
+        self.assertGreater(slow.stats.overruns, 0)
+        self.assertGreater(slow.stats.calls, 0)
+        # Calls plus skipped deadlines should account for (about) every period.
+        self.assertGreaterEqual(slow.stats.calls + slow.stats.overruns, 25)
+        self.assertGreaterEqual(slow.stats.last_duration, 0.05)
+
+    def test_oneshot(self) -> None:
+
+        fired: threading.Event = threading.Event()
+        timer: Timer = self.scheduler.add(Timer(period=0.01, callback=fired.set, oneshot=True))
+        self.assertTrue(fired.wait(timeout=1.0))
+        time.sleep(0.05)
+        self.assertEqual(timer.stats.calls, 1)
+        self.assertEqual(len(self.scheduler), 0)
+
+
+class Test_Rate(unittest.TestCase):
+
+    def test_no_drift(self) -> None:
+
+        rate: Rate = Rate(hz=100)
+        start: float = time.monotonic()
+        for _ in range(20):
+            # Work that eats most of each period shouldn't stretch the loop.
+            time.sleep(0.005)
+            rate.sleep()
+        self.assertLess(time.monotonic() - start, 0.22)
+
+    def test_overrun(self) -> None:
+
+        rate: Rate = Rate(hz=100)
+        time.sleep(0.03)
+        self.assertFalse(rate.sleep())
+        self.assertTrue(rate.sleep())
+        self.assertEqual(rate.overruns, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
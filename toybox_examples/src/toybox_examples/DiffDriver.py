@@ -1,7 +1,5 @@
 #!/usr/bin/env python3
 
-import time
-
 from toybox_core import Publisher
 from toybox_core.launch import launch
 from toybox_core.launchable import Launchable
@@ -32,19 +30,21 @@ class DiffDriver(Launchable):
 
     def pre_launch(self) -> bool:
 
-        self._node.start()
-
-        self._cmd_vel_publisher = self._node.advertise(
+        # Declare everything up-front so that start() can register us, advertise, and
+        # subscribe in a single trip to the tbx-server.
+        self._cmd_vel_publisher = self._node.declare_publisher(
             topic_name=self._topic_cmd_vel, 
             message_type=VelocityMsg)
         if self._cmd_vel_publisher is None:
             return False
         
-        self._node.subscribe(
+        self._node.declare_subscriber(
             topic_name=self._topic_imu_in, 
             message_type=OrientationMsg, 
             callback_fn=self.imu_callback)
 
+        self._node.start()
+
         # TODO: something like this????
         # self._node.declare_param(required=True,)
         return True
@@ -52,17 +52,18 @@ class DiffDriver(Launchable):
     def launch(self) -> bool:
 
         loop_freq: int = 30 
-        while not self._node.is_shutdown():
-            
-            msg: VelocityMsg = VelocityMsg()
-            msg.linear.x = 0.0
-            msg.angular.z = 3.14
+        self._node.create_timer(period=1 / loop_freq, callback=self.publish_cmd_vel)
+        self._node.spin()
+
+        return True
 
-            self._cmd_vel_publisher.publish(msg)
+    def publish_cmd_vel(self) -> None:
 
-            time.sleep(1 / loop_freq)
+        msg: VelocityMsg = VelocityMsg()
+        msg.linear.x = 0.0
+        msg.angular.z = 3.14
 
-        return True
+        self._cmd_vel_publisher.publish(msg)
 
     def post_launch(self) -> bool:
         return True
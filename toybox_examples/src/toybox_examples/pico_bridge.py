@@ -1,7 +1,5 @@
 #!/usr/bin/env python3
 
-import time
-
 import toybox_core as tbx
 from toybox_core import Publisher
 from toybox_core.launchable import Launchable
@@ -24,22 +22,24 @@ class PicoBridge(Launchable):
         self._publisher: Publisher | None
 
     def pre_launch(self) -> bool:
-        self._node.start()
-        self._publisher = self._node.advertise(
+        self._publisher = self._node.declare_publisher(
             topic_name="/test",
             message_type=TestMessage)
         if self._publisher is None:
             return False
-        else:
-            return True
+        
+        self._node.start()
+        return True
         
     def launch(self) -> bool:
         freq: int = 10
-        while not self._node.is_shutdown():
-            time.sleep(1/freq)
-            self._publisher.publish(TestMessage(test_string="test test test"))
+        self._node.create_timer(period=1/freq, callback=self.publish)
+        self._node.spin()
         return True
 
+    def publish(self) -> None:
+        self._publisher.publish(TestMessage(test_string="test test test"))
+
     def shutdown(self) -> None:
         self._node.shutdown()
 
@@ -70,29 +70,22 @@ class Listener(Launchable):
         print(f"{self._name} got {message}")
 
     def pre_launch(self) -> bool:
-        self._node.start()
-        
-        self._subscribed: bool = self._node.subscribe(
+        self._subscribed: bool = self._node.declare_subscriber(
             topic_name=self.topic,
             message_type=TestMessage,
             callback_fn=self.callback)
         if not self._subscribed:
             return False
 
+        self._node.start()
         return True
         
     def launch(self) -> bool:
 
-        if self.finish_early:
-            start_time = time.time()
-
-        freq: int = 10
-        while not self._node.is_shutdown():
-            if self.finish_early:
-                if time.time() > (start_time + self._finish_after_secs):
-                    self._node.log("DEBUG", "FINISHING EARLY")
-                    return True
-            time.sleep(1/freq)
+        # Everything happens in our callback, so just wait around for it.
+        timeout: float | None = self._finish_after_secs if self.finish_early else None
+        if not self._node.spin(timeout=timeout):
+            self._node.log("DEBUG", "FINISHING EARLY")
         return True
     
     def post_launch(self) -> bool:
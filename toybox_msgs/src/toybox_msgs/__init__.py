@@ -0,0 +1,20 @@
+# The message subpackages (and the generated *_pb2 modules in them, which bring protobuf
+# with them) are loaded the first time they're asked for (PEP 562), not on `import toybox_msgs`.
+import importlib
+from typing import Any, List
+
+_SUBPACKAGES: List[str] = ["core", "primitive", "state"]
+
+
+def __getattr__(name: str) -> Any:
+
+    if name not in _SUBPACKAGES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(f".{name}", __name__)
+    globals()[name] = module
+    return module
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_SUBPACKAGES))
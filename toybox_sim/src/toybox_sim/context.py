@@ -2,6 +2,7 @@
 
 from typing import TYPE_CHECKING
 
+from toybox_core.clock import SimClock
 from toybox_sim.primitives import Pose, Velocity
 if TYPE_CHECKING:
     from toybox_sim.world import World
@@ -28,6 +29,10 @@ class PluginContext:
         if entity_name not in self._world._entities.keys():
             return None
         return self._world._entities[entity_name].velocity
+
+    @property
+    def clock(self) -> SimClock:
+        return self._world.clock
     
 class WindowContext:
 
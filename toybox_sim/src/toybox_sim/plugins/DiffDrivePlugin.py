@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 
 import math
-import time
 from typing import Tuple
 
 import toybox_core as tbx
+from toybox_core.container import get_container
 
 from toybox_sim.plugins.plugins import Plugin, BaseControlPluginIF, PLUGIN_TYPE
 from toybox_sim.primitives import Pose, Velocity
@@ -113,7 +113,11 @@ class DiffDrivePlugin(Plugin, BaseControlPluginIF):
         self._node: tbx.node.Node = tbx.node.Node(
             name=f"{self.owner_id}/{self.id}",
             log_level="DEBUG",
-            autostart=True)
+            autostart=True,
+            # Every plugin of every entity gets a Node, so share one runtime between them.
+            container=get_container(),
+            # Keep the World's time, so that timeouts mean the same thing at any sim speed.
+            clock=self.context.clock if self.context is not None else None)
         
         if not self._node.ready:
             raise Exception
@@ -150,7 +154,7 @@ class DiffDrivePlugin(Plugin, BaseControlPluginIF):
 
         assert self.context is not None, "Context not attached"
 
-        call_time: float = time.time()
+        call_time: float = self._node.now()
 
         if self._time_last_call < 0:
             self._time_last_call = call_time
@@ -166,7 +170,9 @@ class DiffDrivePlugin(Plugin, BaseControlPluginIF):
         if current_vel is not None:
             left_vel, right_vel = self.calc_wheel_vels(current_vel)
 
-            self._vel_pub.publish(current_vel.to_msg())
+            vel_msg: VelocityMsg = current_vel.to_msg()
+            vel_msg.header.stamp.CopyFrom(self._node.timestamp())
+            self._vel_pub.publish(vel_msg)
             self._left_wheel_vel_pub.publish(FloatMsg(value=left_vel))
             self._right_wheel_vel_pub.publish(FloatMsg(value=right_vel))
 
@@ -191,7 +197,7 @@ class DiffDrivePlugin(Plugin, BaseControlPluginIF):
             self._vel_target = target_vel
 
         self._use_target_timeout = timeout
-        self._time_last_target = time.time()
+        self._time_last_target = self._node.now()
 
     def get_target_velocity(self) -> Tuple[float,float]:
         return self._vel_target
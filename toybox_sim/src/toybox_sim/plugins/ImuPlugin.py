@@ -5,6 +5,7 @@ import time
 from typing import ClassVar, Dict, Tuple, TYPE_CHECKING
 
 import toybox_core as tbx
+from toybox_core.container import get_container
 
 from toybox_sim.plugins.plugins import Plugin, InteroceptivePluginIF, PLUGIN_TYPE
 from toybox_sim.primitives import Pose, Velocity
@@ -64,7 +65,9 @@ class ImuPlugin(Plugin, InteroceptivePluginIF):
         self.node: tbx.node.Node = tbx.node.Node(
             name=f"{self.owner_id}/{self.id}",
             log_level="INFO",
-            autostart=True)
+            autostart=True,
+            container=get_container(),
+            clock=self.context.clock if self.context is not None else None)
 
         self.orientation_topic = self.orientation_topic if self.orientation_topic else \
             f"{self.owner_id}/imu/orientation"
@@ -82,6 +85,7 @@ class ImuPlugin(Plugin, InteroceptivePluginIF):
             raise Exception(f"Our owner <{self._owner_id}> doesn't have a pose?????")
         
         orientation_msg: Orientation2D = current_pose.orientation.to_msg()
+        orientation_msg.header.stamp.CopyFrom(self.node.timestamp())
         self.orientation_pub.publish(orientation_msg)
     
     def visualize(self) -> None:
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 
-import time
 from typing import Dict, Tuple
 
+import toybox_core as tbx
+from toybox_core.clock import CLOCK_TOPIC, SimClock, to_timestamp
+from toybox_core.container import get_container
+from toybox_core.timer import Rate
+from toybox_msgs.core.Time_pb2 import Timestamp
+
 from toybox_sim.entity import Entity
 from toybox_sim.plugins.plugins import PLUGIN_TYPE, BaseControlPluginIF
 from toybox_sim.primitives import Velocity, Vector3D, Pose
@@ -20,6 +25,12 @@ class World:
         self._time: float = 0.0
         self._loop_frequency: int = 60
 
+        # Simulated time. Plugins' Nodes keep time by it, and it's published on the
+        # CLOCK_TOPIC for everyone else.
+        self._clock: SimClock = SimClock(start=self._time)
+        self._clock_node: tbx.node.Node | None = None
+        self._clock_pub: tbx.Publisher | None = None
+
         self._entities: dict[str, Entity] = entities if entities else {}
         self._shutdown: bool = False
 
@@ -31,6 +42,10 @@ class World:
     def name(self, new_name: str) -> None:
         self._name = new_name
 
+    @property
+    def clock(self) -> SimClock:
+        return self._clock
+
     @property
     def entities(self) -> dict[str, Entity]:
         return self._entities
@@ -56,28 +71,37 @@ class World:
         """
         To be called AFTER tbx-server is available (or ELSE)
         """
+        self._clock_node = tbx.node.Node(
+            name=f"{self._name}/clock",
+            autostart=True,
+            container=get_container(),
+            clock=self._clock)
+        self._clock_pub = self._clock_node.advertise(topic_name=CLOCK_TOPIC, message_type=Timestamp)
+
         for entity in self.entities.values():
             entity.init_plugins()
 
     def loop(
         self, 
         frequency: int = 1,
-        timestep: float = -1
+        timestep: float = -1,
+        real_time_factor: float = 1.0,
     ) -> None:
+        """
+        Step the world `frequency` times per (simulated) second, `real_time_factor` times
+        as fast as real time. A real_time_factor of zero (or less) steps as fast as possible.
+        """
         
         loop_period: float = 1 / frequency
         dt: float = timestep if (timestep > 0) else loop_period
-        start_time: float = time.time()
 
+        # Steps are kept on a fixed schedule, however long each one takes.
+        rate: Rate | None = Rate(hz=frequency * real_time_factor) if real_time_factor > 0 else None
         while not self._shutdown:
 
             self.step(dt)
-            
-            # "best effort" time sync 
-            time_delta: float = time.time() - start_time
-            if time_delta < loop_period:
-                time.sleep(loop_period - time_delta)
-            start_time = time.time()
+            if rate is not None:
+                rate.sleep()
 
     def step(
         self, 
@@ -138,6 +162,9 @@ class World:
             entity.pose.update(delta_p=position_delta)
 
         self._time += dt
+        self._clock.set(self._time)
+        if self._clock_pub is not None:
+            self._clock_pub.publish(to_timestamp(self._time))
 
     def trigger_shutdown(self) -> None:
         self._shutdown = True
\ No newline at end of file